@@ -0,0 +1,661 @@
+# benchmarks/fake_supabase.py
+
+# In-memory stand-in for the parts of Supabase the views use, served to the
+# real supabase-py clients through an httpx.MockTransport, so the views run
+# unchanged and every round-trip still goes through the client libraries and
+# the metrics hooks. It implements:
+#
+# - PostgREST reads: select lists with aliases, embedded resources (by table
+#   name or foreign key column, !inner), eq/neq/gt/gte/lt/lte/in/is/like/ilike
+#   filters (also on embedded columns, negated with not.), or=(...) trees with
+#   nested and(...), order, limit/offset, count=exact and single objects
+# - PostgREST writes: insert, upsert (merge-duplicates, missing=default),
+#   update and delete with return=representation, and the database functions
+#   the views call (RPC_FUNCTIONS)
+# - Auth admin user lookups
+#
+# Every call sleeps for `latency` seconds (plus up to `jitter`), so the cost
+# of a view's round-trips shows up in its timings like it would against a
+# remote project. Served calls are recorded in `calls`.
+import json
+import random
+import re
+import threading
+import time
+from datetime import date, datetime, timezone
+from urllib.parse import parse_qsl, unquote, urlsplit
+
+import httpx
+
+# (table, column) -> referenced table, used to resolve embedded resources
+FOREIGN_KEYS = {
+    ("attendance", "employee_id"): "employee",
+    ("attendance", "attendance_time"): "attendance_time",
+    ("attendance", "attendance_status"): "attendance_status",
+    ("disposed_inventory", "inventory_id"): "inventory",
+    ("disposed_inventory", "disposed_unit"): "unit_of_measurement",
+    ("disposed_inventory", "reason_id"): "reason_of_disposal",
+    ("disposed_inventory", "disposer"): "employee",
+    ("employee", "status_id"): "employee_status",
+    ("employee_role", "employee_id"): "employee",
+    ("employee_role", "role_id"): "role",
+    ("expenses", "type_id"): "expenses_type",
+    ("expenses", "stockin_id"): "receipts",
+    ("gcash_reference", "attached_transaction"): "transaction",
+    ("inventory", "item"): "items",
+    ("items", "category"): "item_category",
+    ("items", "measurement"): "unit_of_measurement",
+    ("menu_ingredients", "menu_id"): "menu_items",
+    ("menu_ingredients", "inventory_id"): "inventory",
+    ("menu_ingredients", "unit_id"): "unit_of_measurement",
+    ("menu_items", "type_id"): "menu_type",
+    ("menu_items", "status_id"): "menu_status",
+    ("menu_items", "category_id"): "menu_category",
+    ("order_details", "transaction_id"): "transaction",
+    ("order_details", "menu_id"): "menu_items",
+    ("order_details", "discount_id"): "discounts",
+    ("order_details", "instore_category"): "instore_category",
+    ("receipts", "supplier"): "supplier",
+    ("stockin", "receipt_id"): "receipts",
+    ("stockin", "inventory_id"): "inventory",
+    ("stockin", "item_id"): "items",
+    ("transaction", "order_status"): "order_status_type",
+    ("transaction", "payment_method"): "payment_methods",
+    ("transaction", "employee_id"): "employee",
+    ("unit_of_measurement", "unit_category"): "um_category",
+}
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+# table -> {column: callable returning the column default}
+COLUMN_DEFAULTS = {
+    "transaction": {"date": _now},
+    "disposed_inventory": {"disposal_datetime": _now},
+    "attendance_time": {"time_in": _now},
+}
+
+RESERVED_PARAMS = {"select", "order", "limit", "offset", "columns", "on_conflict"}
+
+
+class FakeError(Exception):
+    """A PostgREST-style error answered with `status`."""
+
+    def __init__(self, message: str, status: int = 400, code: str = "PGRST100"):
+        super().__init__(message)
+        self.status = status
+        self.code = code
+
+
+# -- Select lists ---------------------------------------------------------------
+
+def _split_top_level(text: str, separator: str = ",") -> list:
+    """Split on `separator` outside parentheses and double quotes."""
+    parts, depth, quoted, current = [], 0, False, []
+    for char in text:
+        if char == '"':
+            quoted = not quoted
+        elif not quoted and char == "(":
+            depth += 1
+        elif not quoted and char == ")":
+            depth -= 1
+        if char == separator and depth == 0 and not quoted:
+            parts.append("".join(current))
+            current = []
+        else:
+            current.append(char)
+    parts.append("".join(current))
+    return [part for part in parts if part != ""]
+
+
+def parse_select(text: str) -> list:
+    """
+    Parse a select list into nodes: ("column", name, alias) and
+    ("embed", name, alias, inner, children).
+    """
+    nodes = []
+    for part in _split_top_level("".join(text.split()) or "*"):
+        alias = None
+        head = part.split("(", 1)[0]
+        if ":" in head and "::" not in head:
+            alias, part = part.split(":", 1)
+        if "(" in part:
+            name, children = part.split("(", 1)
+            inner = name.endswith("!inner")
+            name = name.split("!", 1)[0]
+            nodes.append(("embed", name, alias or name, inner, parse_select(children[:-1])))
+        else:
+            name = part.strip('"').split("::", 1)[0]
+            nodes.append(("column", name, alias or name))
+    return nodes
+
+
+# -- Filters --------------------------------------------------------------------
+
+def _temporal(value):
+    if isinstance(value, (date, datetime)):
+        value = value.isoformat()
+    if not isinstance(value, str) or len(value) < 10 or value[4:5] != "-" or value[7:8] != "-":
+        return None
+    try:
+        if len(value) == 10:
+            return datetime.combine(date.fromisoformat(value), datetime.min.time(), timezone.utc)
+        parsed = datetime.fromisoformat(value.replace(" ", "T"))
+    except ValueError:
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def _coerce(stored, literal):
+    """Return (stored, literal) in comparable types, the way Postgres would cast the literal."""
+    if isinstance(literal, str) and len(literal) >= 2 and literal[0] == literal[-1] == '"':
+        literal = literal[1:-1]
+    if isinstance(stored, bool):
+        return stored, str(literal).lower() == "true"
+    if isinstance(stored, (int, float)):
+        try:
+            return stored, float(literal)
+        except (TypeError, ValueError):
+            return str(stored), str(literal)
+    stored_time, literal_time = _temporal(stored), _temporal(literal)
+    if stored_time is not None and literal_time is not None:
+        return stored_time, literal_time
+    return str(stored), str(literal)
+
+
+def _pattern(literal: str, flags=0):
+    literal = literal.strip('"')
+    return re.compile("^" + ".*".join(re.escape(part) for part in literal.replace("%", "*").split("*")) + "$", flags | re.S)
+
+
+def _parse_list(literal: str) -> list:
+    return [item.strip('"') for item in _split_top_level(literal.strip()[1:-1])]
+
+
+def compile_condition(column: str, expression: str):
+    """Compile "op.value" (optionally "not.op.value") on `column` into a row predicate."""
+    negate = expression.startswith("not.")
+    if negate:
+        expression = expression[4:]
+    operator, _, literal = expression.partition(".")
+
+    if operator == "in":
+        values = _parse_list(literal)
+        texts = set(values)
+        numbers = set()
+        for item in values:
+            try:
+                numbers.add(float(item))
+            except ValueError:
+                pass
+
+        def test(value):
+            if value is None:
+                return False
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                return float(value) in numbers
+            return str(value) in texts or any(_equal(value, item) for item in values)
+    elif operator == "is":
+        wanted = {"null": None, "true": True, "false": False}.get(literal.lower(), literal)
+
+        def test(value):
+            return value is wanted if wanted is None else value == wanted
+    elif operator in ("like", "ilike"):
+        pattern = _pattern(literal, re.I if operator == "ilike" else 0)
+
+        def test(value):
+            return value is not None and bool(pattern.match(str(value)))
+    elif operator in _COMPARISONS:
+        compare = _COMPARISONS[operator]
+
+        def test(value):
+            if value is None:
+                return False
+            return compare(*_coerce(value, literal))
+    else:
+        raise FakeError(f"Unsupported operator {operator!r}")
+
+    path = column.split(".")
+
+    def predicate(row):
+        value = row
+        for key in path:
+            value = value.get(key) if isinstance(value, dict) else None
+        return test(value) != negate
+    return predicate
+
+
+def _equal(value, literal) -> bool:
+    left, right = _coerce(value, literal)
+    return left == right
+
+
+_COMPARISONS = {
+    "eq": lambda a, b: a == b,
+    "neq": lambda a, b: a != b,
+    "gt": lambda a, b: a > b,
+    "gte": lambda a, b: a >= b,
+    "lt": lambda a, b: a < b,
+    "lte": lambda a, b: a <= b,
+}
+
+
+def compile_logic_tree(operator: str, body: str):
+    """Compile an or=(...) / and=(...) tree into a row predicate."""
+    predicates = []
+    for part in _split_top_level(body):
+        negate = part.startswith("not.")
+        if negate:
+            part = part[4:]
+        if part.startswith(("and(", "or(")):
+            name, inner = part.split("(", 1)
+            predicate = compile_logic_tree(name, inner[:-1])
+        else:
+            column, _, expression = part.partition(".")
+            predicate = compile_condition(column, expression)
+        predicates.append((lambda p: (lambda row: not p(row)))(predicate) if negate else predicate)
+    combine = any if operator == "or" else all
+    return lambda row: combine(predicate(row) for predicate in predicates)
+
+
+# -- The store ------------------------------------------------------------------
+
+class FakeSupabase:
+    """
+    In-memory tables behind a PostgREST/Auth-compatible HTTP handler.
+
+    `tables` maps table names to lists of row dicts; rows get integer ids
+    when inserted without one. `views` maps read-only view names to
+    callables computing their rows from the store.
+    """
+
+    def __init__(self, tables=None, auth_users=(), latency: float = 0.0, jitter: float = 0.0, seed: int = 0):
+        self.tables = {name: [dict(row) for row in rows] for name, rows in (tables or {}).items()}
+        self.auth_users = {user["id"]: user for user in auth_users}
+        self.latency = latency
+        self.jitter = jitter
+        self.views = {"daily_sales_totals": _daily_sales_totals}
+        self.calls = []
+        self._random = random.Random(seed)
+        self._lock = threading.RLock()
+        self._next_ids = {}
+        self._versions = {}
+        self._indexes = {}
+
+    # Rows and indexes
+
+    def rows(self, table: str) -> list:
+        if table in self.views:
+            return self.views[table](self)
+        return self.tables.setdefault(table, [])
+
+    def _changed(self, table: str) -> None:
+        self._versions[table] = self._versions.get(table, 0) + 1
+
+    def index(self, table: str, column: str) -> dict:
+        """{value: [rows]} for `column`, rebuilt after the table changes."""
+        version = self._versions.get(table, 0)
+        cached = self._indexes.get((table, column))
+        if cached and cached[0] == version:
+            return cached[1]
+        index = {}
+        for row in self.rows(table):
+            index.setdefault(row.get(column), []).append(row)
+        self._indexes[(table, column)] = (version, index)
+        return index
+
+    def next_id(self, table: str) -> int:
+        if table not in self._next_ids:
+            self._next_ids[table] = max((row.get("id") or 0 for row in self.rows(table)), default=0) + 1
+        next_id = self._next_ids[table]
+        self._next_ids[table] += 1
+        return next_id
+
+    def insert_rows(self, table: str, rows, columns=None, missing_default: bool = False) -> list:
+        """Insert rows the way PostgREST does and return them as stored."""
+        inserted = []
+        for row in rows:
+            stored = {}
+            if columns and not missing_default:
+                stored.update({column: None for column in columns})
+            stored.update(row)
+            for column, default in COLUMN_DEFAULTS.get(table, {}).items():
+                if stored.get(column) is None and column not in row:
+                    stored[column] = default()
+            if stored.get("id") is None:
+                stored["id"] = self.next_id(table)
+            self.rows(table).append(stored)
+            inserted.append(stored)
+        self._changed(table)
+        return inserted
+
+    def upsert_rows(self, table: str, rows, conflict_columns, columns=None, missing_default: bool = False,
+                    ignore_duplicates: bool = False) -> list:
+        existing = {
+            tuple(row.get(column) for column in conflict_columns): row
+            for row in self.rows(table)
+        }
+        written = []
+        for row in rows:
+            key = tuple(row.get(column) for column in conflict_columns)
+            stored = existing.get(key) if None not in key else None
+            if stored is None:
+                written.extend(self.insert_rows(table, [row], columns, missing_default))
+            elif not ignore_duplicates:
+                if columns and not missing_default:
+                    stored.update({column: None for column in columns if column not in row})
+                stored.update(row)
+                written.append(stored)
+        self._changed(table)
+        return written
+
+    def update_rows(self, table: str, rows, values: dict) -> list:
+        for row in rows:
+            row.update(values)
+        self._changed(table)
+        return rows
+
+    def delete_rows(self, table: str, rows) -> list:
+        doomed = {id(row) for row in rows}
+        self.tables[table] = [row for row in self.rows(table) if id(row) not in doomed]
+        self._changed(table)
+        return rows
+
+    # Reads
+
+    def _candidates(self, table: str, filters: list) -> list:
+        """Narrow the scan with an index for a plain eq/in filter on a top-level column."""
+        for column, expression in filters:
+            if "." in column or expression.startswith("not."):
+                continue
+            operator, _, literal = expression.partition(".")
+            if operator == "eq":
+                values = [literal]
+            elif operator == "in":
+                values = _parse_list(literal)
+            else:
+                continue
+            index = self.index(table, column)
+            sample = next((key for key in index if key is not None), None)
+            if sample is None or isinstance(sample, bool) or _temporal(sample) is not None:
+                continue
+            if isinstance(sample, (int, float)):
+                try:
+                    keys = {int(float(value)) if float(value).is_integer() else float(value) for value in values}
+                except ValueError:
+                    return []
+            else:
+                keys = set(values)
+            rows = []
+            for key in keys:
+                rows.extend(index.get(key, []))
+            return rows
+        return self.rows(table)
+
+    def _resolve_embed(self, table: str, name: str):
+        """Return (target table, kind, local column, remote column) for an embed."""
+        if (table, name) in FOREIGN_KEYS:
+            return FOREIGN_KEYS[(table, name)], "one", name, "id"
+        for (source, column), target in FOREIGN_KEYS.items():
+            if source == table and target == name:
+                return name, "one", column, "id"
+        for (source, column), target in FOREIGN_KEYS.items():
+            if source == name and target == table:
+                return name, "many", "id", column
+        raise FakeError(f"Could not find a relationship between '{table}' and '{name}'", code="PGRST200")
+
+    def shape(self, table: str, rows, nodes, filters_by_path: dict, path: tuple = ()):
+        """Project `rows` onto the select nodes, resolving embeds; drops rows failing !inner embeds."""
+        shaped_rows = []
+        embeds = [
+            (node, self._resolve_embed(table, node[1]))
+            for node in nodes if node[0] == "embed"
+        ]
+        columns = [node for node in nodes if node[0] == "column"]
+        for row in rows:
+            shaped = {}
+            for _, name, alias in columns:
+                if name == "*":
+                    shaped.update(row)
+                else:
+                    shaped[alias] = row.get(name)
+            keep = True
+            for (_, _, alias, inner, children), (target, kind, local, remote) in embeds:
+                embed_path = path + (alias,)
+                predicates = filters_by_path.get(embed_path, [])
+                matches = [
+                    related for related in self.index(target, remote).get(row.get(local), [])
+                    if all(predicate(related) for predicate in predicates)
+                ] if row.get(local) is not None else []
+                matches = self.shape(target, matches, children, filters_by_path, embed_path)
+                shaped[alias] = (matches[0] if matches else None) if kind == "one" else matches
+                if inner and not matches:
+                    keep = False
+            if keep:
+                shaped_rows.append(shaped)
+        return shaped_rows
+
+    def select(self, table: str, params: list) -> tuple:
+        """Run a read. Returns (rows, total count before limit/offset)."""
+        query = dict(params)
+        nodes = parse_select(query.get("select", "*"))
+        aliases = {node[2] for node in nodes if node[0] == "embed"}
+
+        plain, embedded, logic = [], {}, []
+        for key, value in params:
+            if key in RESERVED_PARAMS or key.endswith((".limit", ".offset", ".order")):
+                continue
+            head, _, rest = key.partition(".")
+            if key in ("or", "and"):
+                logic.append(compile_logic_tree(key, value[1:-1]))
+            elif rest and head in aliases:
+                embedded.setdefault((head,), []).append(compile_condition(rest, value))
+            else:
+                plain.append((key, value))
+
+        predicates = [compile_condition(key, value) for key, value in plain] + logic
+        rows = [row for row in self._candidates(table, plain) if all(predicate(row) for predicate in predicates)]
+        rows = self.shape(table, rows, nodes, embedded)
+
+        for term in reversed(query.get("order", "").split(",") if query.get("order") else []):
+            column, *modifiers = term.split(".")
+            descending = "desc" in modifiers
+            nulls_first = "nullsfirst" in modifiers or (descending and "nullslast" not in modifiers)
+            present = [row for row in rows if row.get(column) is not None]
+            missing = [row for row in rows if row.get(column) is None]
+            present.sort(key=lambda row: _sort_key(row.get(column)), reverse=descending)
+            rows = missing + present if nulls_first else present + missing
+
+        total = len(rows)
+        offset = int(query.get("offset", 0))
+        if "limit" in query:
+            rows = rows[offset:offset + int(query["limit"])]
+        elif offset:
+            rows = rows[offset:]
+        return rows, total
+
+    # HTTP
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0)
+        if delay:
+            time.sleep(delay)
+        url = urlsplit(str(request.url))
+        segments = [unquote(segment) for segment in url.path.split("/") if segment]
+        params = parse_qsl(url.query, keep_blank_values=True)
+        with self._lock:
+            self.calls.append({"method": request.method, "path": "/".join(segments)})
+            try:
+                if segments[:2] == ["rest", "v1"]:
+                    return self._handle_rest(request, segments[2:], params)
+                if segments[:2] == ["auth", "v1"]:
+                    return self._handle_auth(request, segments[2:], params)
+                raise FakeError(f"No fake for {request.method} {url.path}", status=404, code="PGRST000")
+            except FakeError as e:
+                return httpx.Response(e.status, json={"code": e.code, "message": str(e), "details": None, "hint": None})
+
+    def _handle_rest(self, request, segments, params):
+        prefer = request.headers.get("prefer", "")
+        single = "vnd.pgrst.object" in request.headers.get("accept", "")
+        body = json.loads(request.content) if request.content else None
+
+        if segments[0] == "rpc":
+            function = RPC_FUNCTIONS.get(segments[1])
+            if function is None:
+                raise FakeError(f"Could not find the function public.{segments[1]}", status=404, code="PGRST202")
+            return httpx.Response(200, json=function(self, **(body or {})))
+
+        table = segments[0]
+        query = dict(params)
+        if request.method in ("GET", "HEAD"):
+            rows, total = self.select(table, params)
+            headers = {"Content-Range": f"0-{max(len(rows) - 1, 0)}/{total if 'count=' in prefer else '*'}"}
+            if single:
+                if len(rows) != 1:
+                    raise FakeError("JSON object requested, multiple (or no) rows returned", status=406, code="PGRST116")
+                rows = rows[0]
+            if request.method == "HEAD":
+                return httpx.Response(200, headers=headers)
+            return httpx.Response(200, json=rows, headers=headers)
+
+        columns = [column.strip('"') for column in query["columns"].split(",")] if "columns" in query else None
+        missing_default = "missing=default" in prefer
+        if request.method == "POST":
+            rows = body if isinstance(body, list) else [body]
+            if "resolution=" in prefer:
+                conflict = query.get("on_conflict", "id").split(",")
+                written = self.upsert_rows(table, rows, conflict, columns, missing_default,
+                                           ignore_duplicates="resolution=ignore-duplicates" in prefer)
+            else:
+                written = self.insert_rows(table, rows, columns, missing_default)
+            status = 201
+        else:
+            filters = [(key, value) for key, value in params if key not in RESERVED_PARAMS]
+            predicates = [compile_condition(key, value) for key, value in filters]
+            matched = [row for row in self._candidates(table, filters) if all(p(row) for p in predicates)]
+            if request.method == "PATCH":
+                written = self.update_rows(table, matched, body or {})
+            elif request.method == "DELETE":
+                written = self.delete_rows(table, matched)
+            else:
+                raise FakeError(f"Unsupported method {request.method}", status=405)
+            status = 200
+
+        if "return=representation" not in prefer:
+            return httpx.Response(204 if status == 200 else status)
+        shaped = self.shape(table, written, parse_select(query.get("select", "*")), {})
+        if single:
+            shaped = shaped[0] if shaped else None
+        return httpx.Response(status, json=shaped)
+
+    def _handle_auth(self, request, segments, params):
+        if segments[:2] == ["admin", "users"] and request.method == "GET":
+            if len(segments) == 3:
+                user = self.auth_users.get(segments[2])
+                if user is None:
+                    raise FakeError("User not found", status=404, code="user_not_found")
+                return httpx.Response(200, json=user)
+            query = dict(params)
+            users = list(self.auth_users.values())
+            per_page = int(query.get("per_page") or 50)
+            page = int(query.get("page") or 1)
+            return httpx.Response(200, json={
+                "users": users[(page - 1) * per_page:page * per_page],
+                "aud": "authenticated",
+            })
+        raise FakeError(f"No fake for auth {request.method} /{'/'.join(segments)}", status=404, code="not_found")
+
+    # Installation
+
+    def install(self, *clients):
+        """
+        Route the PostgREST, Storage and Auth calls of the given supabase-py
+        clients to this store. Returns a callable that restores the real
+        transports.
+        """
+        transport = httpx.MockTransport(self.handle)
+        sessions = []
+        for client in clients:
+            sessions.extend([client.postgrest.session, client.storage.session, client.auth._http_client])
+        originals = [(session, session._transport) for session in sessions]
+        for session in sessions:
+            session._transport = transport
+
+        def restore():
+            for session, original in originals:
+                session._transport = original
+        return restore
+
+
+def _sort_key(value):
+    temporal = _temporal(value) if isinstance(value, str) else None
+    return temporal if temporal is not None else value
+
+
+# -- Database functions and views ----------------------------------------------
+
+def _adjust_inventory_quantities(store, adjustments, clamp_at_zero=False):
+    inventory = store.index("inventory", "id")
+    updated = []
+    for adjustment in adjustments:
+        for row in inventory.get(int(adjustment["inventory_id"]), []):
+            quantity = float(row.get("quantity") or 0) + float(adjustment["delta"])
+            row["quantity"] = max(quantity, 0) if clamp_at_zero else quantity
+            updated.append({"id": row["id"], "quantity": row["quantity"]})
+    store._changed("inventory")
+    return updated
+
+
+def _replace_daily_sales(store, sales_dates, summary_rows):
+    if sales_dates is None:
+        store.tables["daily_sales_summary"] = []
+    else:
+        wanted = set(sales_dates)
+        store.tables["daily_sales_summary"] = [
+            row for row in store.rows("daily_sales_summary") if row.get("sales_date") not in wanted
+        ]
+    store.insert_rows("daily_sales_summary", summary_rows)
+    return None
+
+
+def _bump_menu_availability_version(store):
+    rows = store.rows("menu_availability_version")
+    if not rows:
+        store.insert_rows("menu_availability_version", [{"id": 1, "version": 0}])
+    rows[0]["version"] = int(rows[0].get("version") or 0) + 1
+    return rows[0]["version"]
+
+
+def _post_stockin_receipt(store, receipt, stock_ins, adjustments, expense):
+    inventory = store.index("inventory", "id")
+    if any(int(adjustment["inventory_id"]) not in inventory for adjustment in adjustments):
+        raise FakeError("Inventory record not found for one of the stock in entries.", code="P0001")
+    receipt_id = store.insert_rows("receipts", [{
+        "receipt_no": receipt.get("receipt_no"), "supplier": receipt.get("supplier"), "date": receipt.get("date"),
+    }])[0]["id"]
+    store.insert_rows("stockin", [
+        {key: line.get(key) for key in ("inventory_id", "item_id", "quantity_in", "price")} | {"receipt_id": receipt_id}
+        for line in stock_ins
+    ])
+    updated = _adjust_inventory_quantities(store, adjustments)
+    store.insert_rows("expenses", [{**expense, "stockin_id": receipt_id}])
+    return {"receipt_id": receipt_id, "inventory": updated}
+
+
+def _daily_sales_totals(store):
+    rows = store.rows("daily_sales_summary")
+    return [{
+        "order_count": sum(row.get("order_count") or 0 for row in rows),
+        "gross_sales": round(sum(row.get("gross_sales") or 0 for row in rows), 2),
+        "net_sales": round(sum(row.get("net_sales") or 0 for row in rows), 2),
+    }]
+
+
+RPC_FUNCTIONS = {
+    "adjust_inventory_quantities": _adjust_inventory_quantities,
+    "replace_daily_sales": _replace_daily_sales,
+    "bump_menu_availability_version": _bump_menu_availability_version,
+    "post_stockin_receipt": _post_stockin_receipt,
+}
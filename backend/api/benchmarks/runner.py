@@ -0,0 +1,255 @@
+# benchmarks/runner.py
+
+# Endpoint benchmark and query budgets. Each scenario sends one request to a
+# view through the Django test client while the shared Supabase clients are
+# routed to a seeded FakeSupabase store (see fake_supabase.py and seed.py).
+# For every data volume (months of history) a scenario reports:
+#
+# - calls: Supabase round-trips per request (PostgREST, Auth and Storage)
+# - p50/p99: request latency, including the fake's per-call latency
+# - bytes: size of the response body sent to the client
+#
+# The cache is cleared before every request, so each one runs cold: the
+# reference data, table versions and auth lookups it needs are read again
+# and counted. A scenario whose call count exceeds its budget in
+# budgets.json fails the run; the count of a view without an N+1 pattern
+# does not grow with the data volume, so budgets recorded at a small volume
+# catch per-row queries at a larger one.
+import contextlib
+import io
+import json
+import logging
+import time
+from pathlib import Path
+from typing import Callable, NamedTuple, Optional
+
+import jwt
+from django.core.cache import cache
+from django.test import Client
+
+from ..supabase_client import jwt_secret, supabase_anon, supabase_service
+from .fake_supabase import FakeSupabase
+from .seed import seed_tables
+
+BUDGETS_PATH = Path(__file__).with_name("budgets.json")
+DEFAULT_VOLUMES = (1, 3, 6)
+
+
+class BenchmarkError(Exception):
+    """Raised when a scenario's request fails."""
+
+
+class Scenario(NamedTuple):
+    name: str
+    method: str
+    path: object                        # str, or callable(store) -> str
+    body: Optional[Callable] = None     # callable(store) -> JSON payload
+    admin: bool = False                 # send an admin's bearer token
+
+
+def _latest_transaction_path(store) -> str:
+    return f"/fetch-order-data/{store.rows('transaction')[-1]['id']}/"
+
+
+def _new_order(store) -> dict:
+    """An in-store order with two Ala Carte lines and an Unli Wings group."""
+    menu_ids = [menu["id"] for menu in store.rows("menu_items") if menu["type_id"] == 1][:4]
+    return {
+        "employee_id": 1,
+        "payment_method": 1,
+        "payment_amount": 2000,
+        "order_details": [
+            {"menu_id": menu_ids[0], "quantity": 2, "instore_category": 1},
+            {"menu_id": menu_ids[1], "quantity": 1, "instore_category": 1, "discount_id": 1},
+            {"menu_id": menu_ids[2], "quantity": 1, "instore_category": 2, "unli_wings_group": "1"},
+            {"menu_id": menu_ids[3], "quantity": 1, "instore_category": 2, "unli_wings_group": "1"},
+        ],
+    }
+
+
+def _pending_order_path(store) -> str:
+    """Store a fresh pending order and return the path that completes it."""
+    order = _new_order(store)
+    transaction = store.insert_rows("transaction", [{
+        "payment_amount": order["payment_amount"],
+        "payment_method": order["payment_method"],
+        "employee_id": order["employee_id"],
+        "order_status": 1,
+    }])[0]
+    store.insert_rows("order_details", [
+        {"transaction_id": transaction["id"], "discount_id": None, "instore_category": None,
+         "unli_wings_group": None, "base_amount": None, **detail}
+        for detail in order["order_details"]
+    ])
+    return f"/update-order-status/{transaction['id']}/"
+
+
+SCENARIOS = [
+    Scenario("fetch_employee_data", "GET", "/fetch-employee-data/", admin=True),
+    Scenario("fetch_attendance_data", "GET", "/fetch-attendance-data/"),
+    Scenario("fetch_item_data", "GET", "/fetch-item-data/"),
+    Scenario("fetch_items_page_data", "GET", "/fetch-items-page-data/"),
+    Scenario("fetch_inventory_page_data", "GET", "/fetch-inventory-page-data/"),
+    Scenario("fetch_stockin_page_data", "GET", "/fetch-stockin-page-data/"),
+    Scenario("fetch_stockout_page_data", "GET", "/fetch-stockout-page-data/"),
+    Scenario("fetch_menu_data", "GET", "/fetch-menu-data/"),
+    Scenario("fetch_order_reference_data", "GET", "/fetch-order-reference-data/"),
+    Scenario("fetch_order_data", "GET", "/fetch-order-data/"),
+    Scenario("fetch_transaction_data", "GET", _latest_transaction_path),
+    Scenario("fetch_inventory_order_data", "GET", "/fetch-inventory-order-data/"),
+    Scenario("fetch_sales_data", "GET", "/fetch-sales-data/"),
+    Scenario("fetch_sales_report", "GET", "/sales-report/"),
+    Scenario("fetch_sales_report_details", "GET", "/sales-report/details/"),
+    Scenario("fetch_dashboard_data", "GET", "/fetch-dashboard-data/"),
+    Scenario("add_order", "POST", "/add-order/", body=_new_order, admin=True),
+    Scenario("update_order_status", "PUT", _pending_order_path, body=lambda store: {"status_id": 2}),
+    Scenario("update_menu_availability", "POST", "/update-menu-availability/"),
+]
+
+
+def admin_token(user_id: str) -> str:
+    """A Supabase access token for `user_id`, signed with the project's JWT secret."""
+    now = int(time.time())
+    return jwt.encode(
+        {"sub": user_id, "aud": "authenticated", "role": "authenticated", "iat": now, "exp": now + 3600},
+        jwt_secret,
+        algorithm="HS256",
+    )
+
+
+def percentile(values, fraction: float) -> float:
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    rank = max(int(round(fraction * len(ordered) + 0.5)) - 1, 0)
+    return ordered[min(rank, len(ordered) - 1)]
+
+
+@contextlib.contextmanager
+def _quiet():
+    """Silence the views' prints and the per-request metrics log lines."""
+    metrics_logger = logging.getLogger("api.metrics")
+    disabled = metrics_logger.disabled
+    metrics_logger.disabled = True
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            yield
+    finally:
+        metrics_logger.disabled = disabled
+
+
+def run_scenario(client: Client, store: FakeSupabase, scenario: Scenario, token: str, repeat: int) -> dict:
+    """Send `repeat` cold requests for `scenario`. Raises BenchmarkError on a failed request."""
+    calls, durations, sizes = [], [], []
+    resources = {}
+    for _ in range(repeat):
+        cache.clear()
+        path = scenario.path(store) if callable(scenario.path) else scenario.path
+        body = scenario.body(store) if scenario.body else None
+        headers = {"HTTP_AUTHORIZATION": f"Bearer {token}"} if scenario.admin else {}
+
+        store.calls.clear()
+        start = time.perf_counter()
+        with _quiet():
+            response = client.generic(
+                scenario.method, path,
+                json.dumps(body) if body is not None else "",
+                content_type="application/json",
+                **headers,
+            )
+        durations.append(time.perf_counter() - start)
+
+        if response.status_code >= 400:
+            raise BenchmarkError(
+                f"{scenario.name}: {scenario.method} {path} answered {response.status_code}: "
+                f"{response.content[:500].decode(errors='replace')}"
+            )
+        calls.append(len(store.calls))
+        sizes.append(len(response.content))
+        resources = {}
+        for call in store.calls:
+            resource = f"{call['method']} {call['path']}"
+            resources[resource] = resources.get(resource, 0) + 1
+
+    return {
+        "scenario": scenario.name,
+        "calls": max(calls),
+        "p50_ms": round(percentile(durations, 0.5) * 1000, 1),
+        "p99_ms": round(percentile(durations, 0.99) * 1000, 1),
+        "bytes": max(sizes),
+        "resources": dict(sorted(resources.items())),
+    }
+
+
+def run_benchmark(volumes=DEFAULT_VOLUMES, repeat: int = 5, latency: float = 0.0, jitter: float = 0.0,
+                  scenario_names=None, seed: int = 0, orders_per_day: int = 40, progress=None) -> list:
+    """
+    Run the scenarios (all, or those named in `scenario_names`) against a
+    store seeded with each volume in `volumes` (months of history).
+
+    Returns one result dict per scenario and volume: {"scenario",
+    "months", "rows", "calls", "p50_ms", "p99_ms", "bytes", "resources"},
+    where resources counts the calls of the last request by method and path.
+    `progress` is called with each result as it completes.
+    """
+    scenarios = [scenario for scenario in SCENARIOS if not scenario_names or scenario.name in scenario_names]
+    unknown = set(scenario_names or ()) - {scenario.name for scenario in SCENARIOS}
+    if unknown:
+        raise BenchmarkError(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+
+    results = []
+    for months in volumes:
+        data = seed_tables(months=months, orders_per_day=orders_per_day, seed=seed)
+        rows = {"transactions": len(data.tables["transaction"]), "order_details": len(data.tables["order_details"])}
+        store = FakeSupabase(data.tables, data.auth_users, latency=latency, jitter=jitter, seed=seed)
+        restore = store.install(supabase_anon, supabase_service)
+        try:
+            client = Client()
+            token = admin_token(data.admin_user_id)
+            for scenario in scenarios:
+                result = {"months": months, "rows": rows, **run_scenario(client, store, scenario, token, repeat)}
+                results.append(result)
+                if progress:
+                    progress(result)
+        finally:
+            restore()
+            cache.clear()
+    return results
+
+
+def load_budgets(path: Path = BUDGETS_PATH) -> dict:
+    """{scenario: maximum Supabase calls per request}."""
+    if not path.exists():
+        return {}
+    with open(path) as budgets_file:
+        return json.load(budgets_file)
+
+
+def record_budgets(results, path: Path = BUDGETS_PATH) -> dict:
+    """Write the highest call count seen per scenario as its budget, keeping the budgets of scenarios not run."""
+    budgets = load_budgets(path)
+    recorded = {}
+    for result in results:
+        recorded[result["scenario"]] = max(recorded.get(result["scenario"], 0), result["calls"])
+    budgets.update(recorded)
+    with open(path, "w") as budgets_file:
+        json.dump(dict(sorted(budgets.items())), budgets_file, indent=2)
+        budgets_file.write("\n")
+    return budgets
+
+
+def check_budgets(results, budgets: dict) -> list:
+    """
+    Return a message for every result over its scenario's budget or
+    without a recorded budget.
+    """
+    failures = []
+    for result in results:
+        budget = budgets.get(result["scenario"])
+        if budget is None:
+            failures.append(f"{result['scenario']}: no recorded query budget (run with --record)")
+        elif result["calls"] > budget:
+            failures.append(
+                f"{result['scenario']}: {result['calls']} Supabase calls at {result['months']} months "
+                f"of data, over its budget of {budget}"
+            )
+    return failures
@@ -0,0 +1,360 @@
+# benchmarks/seed.py
+
+# Seeded generators for the benchmark store (see fake_supabase.py). The
+# reference tables are fixed; menus, ingredients, inventory and employees are
+# sized by their own arguments, and the history (transactions with their
+# order details, GCash references, receipts with stock-ins and expenses,
+# disposals, attendance and the daily sales summary) covers `months` months
+# up to `today`, so data volume grows with the history length the way it
+# does in a running shop. The same seed always produces the same tables.
+import random
+import uuid
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+from typing import NamedTuple
+
+from django.utils import timezone
+
+from ..utils.date_ranges import business_today
+from ..utils.pricing import UNLI_WINGS_CATEGORY_ID
+from ..utils.sales_summary import build_daily_sales_rows
+
+COMPLETED_STATUS_ID = 2
+ADMIN_ROLE_ID = 1
+
+REFERENCE_TABLES = {
+    "um_category": [
+        {"id": 1, "name": "Weight"},
+        {"id": 2, "name": "Volume"},
+        {"id": 3, "name": "Count"},
+    ],
+    "unit_of_measurement": [
+        {"id": 1, "symbol": "kg", "unit_category": 1},
+        {"id": 2, "symbol": "g", "unit_category": 1},
+        {"id": 3, "symbol": "l", "unit_category": 2},
+        {"id": 4, "symbol": "ml", "unit_category": 2},
+        {"id": 5, "symbol": "pcs", "unit_category": 3},
+    ],
+    "item_category": [
+        {"id": 1, "name": "Meat"},
+        {"id": 2, "name": "Produce"},
+        {"id": 3, "name": "Sauces"},
+        {"id": 4, "name": "Beverages"},
+        {"id": 5, "name": "Packaging"},
+    ],
+    "menu_type": [
+        {"id": 1, "name": "In-Store", "deduction_percentage": 0},
+        {"id": 2, "name": "Grab", "deduction_percentage": 0.3},
+        {"id": 3, "name": "FoodPanda", "deduction_percentage": 0.32},
+    ],
+    "menu_status": [
+        {"id": 1, "name": "Available"},
+        {"id": 2, "name": "Unavailable"},
+    ],
+    "menu_category": [
+        {"id": 1, "name": "Wings"},
+        {"id": 2, "name": "Rice Meals"},
+        {"id": 3, "name": "Sides"},
+        {"id": 4, "name": "Drinks"},
+    ],
+    "discounts": [
+        {"id": 1, "type": "Senior Citizen", "percentage": 0.2},
+        {"id": 2, "type": "PWD", "percentage": 0.2},
+        {"id": 3, "type": "Promo", "percentage": 0.1},
+    ],
+    "payment_methods": [
+        {"id": 1, "name": "Cash"},
+        {"id": 2, "name": "GCash"},
+    ],
+    "instore_category": [
+        {"id": 1, "name": "Ala Carte", "base_amount": 0},
+        {"id": 2, "name": "Unli Wings", "base_amount": 299},
+    ],
+    "order_status_type": [
+        {"id": 1, "name": "Pending"},
+        {"id": 2, "name": "Completed"},
+        {"id": 3, "name": "Cancelled"},
+        {"id": 4, "name": "Complimentary"},
+    ],
+    "role": [
+        {"id": 1, "role_name": "Admin"},
+        {"id": 2, "role_name": "Staff"},
+    ],
+    "employee_status": [
+        {"id": 1, "status_name": "Active"},
+        {"id": 2, "status_name": "Inactive"},
+    ],
+    "attendance_status": [
+        {"id": 1, "name": "Present"},
+        {"id": 2, "name": "Absent"},
+    ],
+    "reason_of_disposal": [
+        {"id": 1, "name": "Sold"},
+        {"id": 2, "name": "Spoiled"},
+        {"id": 3, "name": "Damaged"},
+        {"id": 4, "name": "Other"},
+        {"id": 5, "name": "Complimentary"},
+    ],
+    "expenses_type": [
+        {"id": 1, "name": "Stock-In"},
+        {"id": 2, "name": "Utilities"},
+        {"id": 3, "name": "Rent"},
+    ],
+}
+
+# Bulk units an item is stocked in, and the unit its recipes use
+STOCK_UNITS = {1: (1, 2), 3: (3, 4), 5: (5, 5)}
+
+
+class SeedData(NamedTuple):
+    tables: dict
+    auth_users: list
+    admin_user_id: str
+
+
+def _local_timestamp(day, hour: int, minute: int) -> str:
+    moment = datetime.combine(day, time(hour, minute), tzinfo=timezone.get_default_timezone())
+    return moment.astimezone(dt_timezone.utc).isoformat()
+
+
+def seed_tables(months: int = 3, orders_per_day: int = 40, menus: int = 60, items: int = 40,
+                employees: int = 12, seed: int = 0, today=None) -> SeedData:
+    """
+    Generate every table the benchmarked views read.
+
+    - `months`: length of the order, stock-in, expense and attendance
+      history ending `today` (default: today's business date)
+    - `orders_per_day`, `menus`, `items`, `employees`: table sizes
+    """
+    rng = random.Random(seed)
+    today = today or business_today()
+    start = today - timedelta(days=30 * months - 1)
+    days = [start + timedelta(days=offset) for offset in range((today - start).days + 1)]
+    tables = {name: [dict(row) for row in rows] for name, rows in REFERENCE_TABLES.items()}
+
+    tables["supplier"] = [{"id": index, "name": f"Supplier {index}"} for index in range(1, 9)]
+
+    # Items and their inventory
+    tables["items"] = []
+    tables["inventory"] = []
+    for item_id in range(1, items + 1):
+        stock_unit = rng.choice(list(STOCK_UNITS))
+        tables["items"].append({
+            "id": item_id,
+            "name": f"Item {item_id}",
+            "category": rng.randint(1, len(REFERENCE_TABLES["item_category"])),
+            "measurement": stock_unit,
+            "stock_trigger": rng.randint(2, 10),
+            "is_archived": False,
+        })
+        tables["inventory"].append({"id": item_id, "item": item_id, "quantity": float(rng.randint(0, 200))})
+
+    # Menus and their recipes
+    tables["menu_items"] = []
+    tables["menu_ingredients"] = []
+    for menu_id in range(1, menus + 1):
+        type_id = 1 if menu_id % 5 else rng.choice([2, 3])
+        tables["menu_items"].append({
+            "id": menu_id,
+            "name": f"Menu {menu_id}",
+            "type_id": type_id,
+            "price": float(rng.choice([59, 79, 99, 129, 159, 189, 249])),
+            "image": f"menus/menu-{menu_id}.jpeg",
+            "thumbnail": f"menus/menu-{menu_id}-thumb.jpeg",
+            "status_id": 1,
+            "category_id": rng.randint(1, len(REFERENCE_TABLES["menu_category"])),
+        })
+        for inventory in rng.sample(tables["inventory"], k=min(rng.randint(2, 4), items)):
+            item = tables["items"][inventory["item"] - 1]
+            tables["menu_ingredients"].append({
+                "id": len(tables["menu_ingredients"]) + 1,
+                "menu_id": menu_id,
+                "inventory_id": inventory["id"],
+                "quantity": float(rng.randint(1, 250)) if item["measurement"] != 5 else float(rng.randint(1, 3)),
+                "unit_id": STOCK_UNITS[item["measurement"]][1],
+            })
+    tables["menu_availability_version"] = [{"id": 1, "version": 1}]
+
+    # Employees, their roles and auth users; employee 1 is the admin
+    tables["employee"] = []
+    tables["employee_role"] = []
+    auth_users = []
+    for employee_id in range(1, employees + 1):
+        user_id = str(uuid.UUID(int=rng.getrandbits(128), version=4))
+        auth_users.append({
+            "id": user_id,
+            "aud": "authenticated",
+            "role": "authenticated",
+            "email": f"employee{employee_id}@example.com",
+            "app_metadata": {},
+            "user_metadata": {},
+            "created_at": _local_timestamp(start, 9, 0),
+        })
+        tables["employee"].append({
+            "id": employee_id,
+            "first_name": f"First{employee_id}",
+            "last_name": f"Last{employee_id}",
+            "contact": f"0917{employee_id:07d}",
+            "base_salary": 610.0,
+            "user_id": user_id,
+            "status_id": 1 if employee_id == 1 or rng.random() < 0.85 else 2,
+        })
+        tables["employee_role"].append({
+            "id": employee_id,
+            "employee_id": employee_id,
+            "role_id": ADMIN_ROLE_ID if employee_id == 1 else 2,
+        })
+
+    # Orders
+    tables["transaction"] = []
+    tables["order_details"] = []
+    tables["gcash_reference"] = []
+    menu_rows = tables["menu_items"]
+    for day in days:
+        for _ in range(orders_per_day):
+            transaction_id = len(tables["transaction"]) + 1
+            payment_method = 2 if rng.random() < 0.3 else 1
+            order_status = COMPLETED_STATUS_ID if day < today or rng.random() < 0.7 else rng.choice([1, 3, 4])
+            tables["transaction"].append({
+                "id": transaction_id,
+                "date": _local_timestamp(day, rng.randint(10, 21), rng.randint(0, 59)),
+                "payment_amount": 0.0,
+                "order_status": order_status,
+                "payment_method": payment_method,
+                "employee_id": rng.randint(1, employees),
+            })
+            details = _order_details(rng, menu_rows, transaction_id, len(tables["order_details"]))
+            tables["order_details"].extend(details)
+            tables["transaction"][-1]["payment_amount"] = float(
+                sum(menu_rows[detail["menu_id"] - 1]["price"] * detail["quantity"] for detail in details) + 500
+            )
+            if payment_method == 2:
+                tables["gcash_reference"].append({
+                    "id": len(tables["gcash_reference"]) + 1,
+                    "name": f"{rng.getrandbits(40):013d}",
+                    "attached_transaction": transaction_id,
+                    "paid_amount": tables["transaction"][-1]["payment_amount"],
+                })
+
+    # Stock-ins, expenses and disposals
+    tables["receipts"] = []
+    tables["stockin"] = []
+    tables["expenses"] = []
+    tables["disposed_inventory"] = []
+    for day in days:
+        if rng.random() < 0.5:
+            receipt_id = len(tables["receipts"]) + 1
+            tables["receipts"].append({
+                "id": receipt_id,
+                "receipt_no": f"OR-{receipt_id:06d}",
+                "supplier": rng.choice(tables["supplier"])["id"],
+                "date": day.isoformat(),
+            })
+            cost = 0.0
+            for inventory in rng.sample(tables["inventory"], k=min(rng.randint(2, 6), items)):
+                line = {
+                    "id": len(tables["stockin"]) + 1,
+                    "receipt_id": receipt_id,
+                    "inventory_id": inventory["id"],
+                    "item_id": inventory["item"],
+                    "quantity_in": rng.randint(5, 50),
+                    "price": float(rng.randint(20, 400)),
+                }
+                cost += line["quantity_in"] * line["price"]
+                tables["stockin"].append(line)
+            tables["expenses"].append({
+                "id": len(tables["expenses"]) + 1, "type_id": 1, "stockin_id": receipt_id,
+                "date": day.isoformat(), "cost": cost, "note": None,
+            })
+        if day.day == 1:
+            for type_id, cost in ((2, 8500.0), (3, 25000.0)):
+                tables["expenses"].append({
+                    "id": len(tables["expenses"]) + 1, "type_id": type_id, "stockin_id": None,
+                    "date": day.isoformat(), "cost": cost, "note": REFERENCE_TABLES["expenses_type"][type_id - 1]["name"],
+                })
+        for _ in range(rng.randint(0, 2)):
+            inventory = rng.choice(tables["inventory"])
+            item = tables["items"][inventory["item"] - 1]
+            tables["disposed_inventory"].append({
+                "id": len(tables["disposed_inventory"]) + 1,
+                "inventory_id": inventory["id"],
+                "disposed_quantity": float(rng.randint(1, 5)),
+                "disposed_unit": item["measurement"],
+                "reason_id": rng.randint(2, 4),
+                "disposer": rng.randint(1, employees),
+                "disposal_datetime": _local_timestamp(day, 22, 0),
+                "other_reason": None,
+            })
+
+    # Attendance: one time-in/time-out per active employee per day
+    tables["attendance_time"] = []
+    tables["attendance"] = []
+    for day in days:
+        for employee in tables["employee"]:
+            if employee["status_id"] != 1 or rng.random() < 0.1:
+                continue
+            time_id = len(tables["attendance_time"]) + 1
+            tables["attendance_time"].append({
+                "id": time_id,
+                "time_in": _local_timestamp(day, 9, rng.randint(0, 30)),
+                "time_out": _local_timestamp(day, 21, rng.randint(0, 59)) if day < today else None,
+            })
+            tables["attendance"].append({
+                "id": time_id,
+                "employee_id": employee["id"],
+                "attendance_status": 1,
+                "attendance_time": time_id,
+            })
+
+    tables["daily_sales_summary"] = _daily_sales_summary(tables)
+    return SeedData(tables, auth_users, auth_users[0]["id"])
+
+
+def _order_details(rng, menu_rows, transaction_id: int, detail_count: int) -> list:
+    """One order: delivery orders are all Grab or all FoodPanda, in-store orders may include an Unli Wings group."""
+    kind = rng.random()
+    details = []
+    if kind < 0.15:
+        type_id = rng.choice([2, 3])
+        choices = [menu for menu in menu_rows if menu["type_id"] == type_id] or menu_rows
+        for menu in rng.sample(choices, k=min(rng.randint(1, 3), len(choices))):
+            details.append({"menu_id": menu["id"], "instore_category": None, "unli_wings_group": None, "base_amount": None})
+    else:
+        choices = [menu for menu in menu_rows if menu["type_id"] == 1]
+        for menu in rng.sample(choices, k=min(rng.randint(1, 4), len(choices))):
+            details.append({"menu_id": menu["id"], "instore_category": 1, "unli_wings_group": None, "base_amount": None})
+        if kind > 0.8:
+            for menu in rng.sample(choices, k=min(2, len(choices))):
+                details.append({
+                    "menu_id": menu["id"], "instore_category": UNLI_WINGS_CATEGORY_ID,
+                    "unli_wings_group": "1", "base_amount": 299,
+                })
+
+    discount_id = rng.choice([1, 2, 3]) if rng.random() < 0.1 else None
+    return [
+        {
+            "id": detail_count + index + 1,
+            "transaction_id": transaction_id,
+            "quantity": rng.randint(1, 3),
+            "discount_id": discount_id if index == 0 else None,
+            **detail,
+        }
+        for index, detail in enumerate(details)
+    ]
+
+
+def _daily_sales_summary(tables: dict) -> list:
+    """The daily_sales_summary rows rebuild_daily_sales would write for the seeded orders."""
+    completed = [row for row in tables["transaction"] if row["order_status"] == COMPLETED_STATUS_ID]
+    completed_ids = {row["id"] for row in completed}
+    details_by_transaction = {}
+    for detail in tables["order_details"]:
+        if detail["transaction_id"] in completed_ids:
+            details_by_transaction.setdefault(detail["transaction_id"], []).append(detail)
+    tables_by_id = {
+        "menu_items": {row["id"]: row for row in tables["menu_items"]},
+        "menu_types": {row["id"]: row for row in tables["menu_type"]},
+        "discounts": {row["id"]: row for row in tables["discounts"]},
+        "instore_categories": {row["id"]: row for row in tables["instore_category"]},
+    }
+    rows = build_daily_sales_rows(completed, details_by_transaction, tables_by_id)
+    return [{"id": index, **row} for index, row in enumerate(rows, start=1)]
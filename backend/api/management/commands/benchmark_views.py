@@ -0,0 +1,81 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.benchmarks.runner import (
+    BUDGETS_PATH, DEFAULT_VOLUMES, SCENARIOS, BenchmarkError,
+    check_budgets, load_budgets, record_budgets, run_benchmark,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the POS views against a seeded in-memory Supabase stand-in: Supabase calls, "
+        "p50/p99 latency and payload size per view and data volume. Fails when a view exceeds "
+        "its query budget."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--volumes", default=",".join(str(months) for months in DEFAULT_VOLUMES),
+            help="Comma-separated months of seeded history to benchmark (default: %(default)s).",
+        )
+        parser.add_argument("--repeat", type=int, default=5, help="Requests per scenario and volume (default: 5).")
+        parser.add_argument("--latency-ms", type=float, default=0.0, help="Latency added to every Supabase call.")
+        parser.add_argument("--jitter-ms", type=float, default=0.0, help="Random extra latency of up to this much per call.")
+        parser.add_argument("--orders-per-day", type=int, default=40, help="Seeded orders per day (default: 40).")
+        parser.add_argument("--seed", type=int, default=0, help="Seed for the data generators and jitter.")
+        parser.add_argument(
+            "--scenario", action="append", dest="scenarios", choices=[scenario.name for scenario in SCENARIOS],
+            help="Only run this scenario (repeatable).",
+        )
+        parser.add_argument("--record", action="store_true", help=f"Record the observed call counts as the budgets in {BUDGETS_PATH.name}.")
+        parser.add_argument("--json", action="store_true", help="Print the results as JSON instead of a table.")
+
+    def handle(self, *args, **options):
+        try:
+            volumes = [int(months) for months in options["volumes"].split(",") if months.strip()]
+        except ValueError:
+            raise CommandError("--volumes must be a comma-separated list of month counts.")
+        if not volumes or min(volumes) < 1 or options["repeat"] < 1:
+            raise CommandError("--volumes and --repeat must be positive.")
+
+        if not options["json"]:
+            self.stdout.write(
+                f"{'scenario':<28} {'months':>6} {'orders':>7} {'calls':>5} {'p50 ms':>8} {'p99 ms':>8} {'KiB':>9}"
+            )
+
+        def progress(result):
+            if options["json"]:
+                return
+            self.stdout.write(
+                f"{result['scenario']:<28} {result['months']:>6} {result['rows']['transactions']:>7} "
+                f"{result['calls']:>5} {result['p50_ms']:>8.1f} {result['p99_ms']:>8.1f} {result['bytes'] / 1024:>9.1f}"
+            )
+
+        try:
+            results = run_benchmark(
+                volumes=volumes,
+                repeat=options["repeat"],
+                latency=options["latency_ms"] / 1000,
+                jitter=options["jitter_ms"] / 1000,
+                scenario_names=options["scenarios"],
+                seed=options["seed"],
+                orders_per_day=options["orders_per_day"],
+                progress=progress,
+            )
+        except BenchmarkError as e:
+            raise CommandError(str(e))
+
+        if options["json"]:
+            self.stdout.write(json.dumps(results, indent=2))
+
+        if options["record"]:
+            budgets = record_budgets(results)
+            self.stdout.write(self.style.SUCCESS(f"Recorded query budgets for {len(budgets)} views in {BUDGETS_PATH}."))
+            return
+
+        failures = check_budgets(results, load_budgets())
+        if failures:
+            raise CommandError("Query budgets exceeded:\n  " + "\n  ".join(failures))
+        self.stdout.write(self.style.SUCCESS(f"All {len(results)} results are within their query budgets."))
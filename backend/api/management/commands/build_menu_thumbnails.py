@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+
+from api.supabase_client import supabase_service
+from api.utils.menu_images import BUCKET, thumbnail_path, build_image_variants, upload_menu_thumbnail
+from api.utils.table_versions import bump_table_versions
+
+
+class Command(BaseCommand):
+    help = "Generate thumbnails for menu images uploaded before thumbnails existed."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--all", action="store_true", help="Regenerate thumbnails for every menu with an image.")
+
+    def handle(self, *args, **options):
+        query = supabase_service.table("menu_items").select("id, image, thumbnail").not_.is_("image", "null")
+        if not options["all"]:
+            query = query.is_("thumbnail", "null")
+        menus = query.execute().data or []
+
+        built = 0
+        for menu in menus:
+            try:
+                image_data = supabase_service.storage.from_(BUCKET).download(menu["image"])
+                variants = build_image_variants(image_data)
+                upload_menu_thumbnail(supabase_service, menu["image"], variants["thumbnail"])
+            except Exception as e:
+                self.stderr.write(f"Menu {menu['id']} ({menu['image']}): {e}")
+                continue
+            supabase_service.table("menu_items").update({"thumbnail": thumbnail_path(menu["image"])}).eq("id", menu["id"]).execute()
+            built += 1
+
+        if built:
+            bump_table_versions("menu_items")
+        self.stdout.write(self.style.SUCCESS(f"Built {built} of {len(menus)} menu thumbnails."))
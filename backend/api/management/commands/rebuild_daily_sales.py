@@ -0,0 +1,33 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.supabase_client import supabase_service
+from api.utils.sales_summary import rebuild_daily_sales
+
+
+class Command(BaseCommand):
+    help = "Backfill or rebuild the daily_sales_summary table from completed transactions."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--start", help="First date to rebuild (YYYY-MM-DD).")
+        parser.add_argument("--end", help="Last date to rebuild (YYYY-MM-DD), inclusive.")
+
+    def handle(self, *args, **options):
+        try:
+            start = date.fromisoformat(options["start"]) if options["start"] else None
+            end = date.fromisoformat(options["end"]) if options["end"] else None
+        except ValueError as e:
+            raise CommandError(f"Invalid date: {e}")
+
+        if (start is None) != (end is None):
+            raise CommandError("--start and --end must be given together.")
+        if start and end < start:
+            raise CommandError("--end must not be before --start.")
+
+        rows = rebuild_daily_sales(supabase_service, start, end)
+        scope = f"{start} to {end}" if start else "all dates"
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt daily sales summary for {scope}: {len(rows)} rows, "
+            f"{sum(row['order_count'] for row in rows)} orders."
+        ))
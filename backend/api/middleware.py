@@ -1,3 +1,58 @@
+import json
+import logging
+import time
+
+from .utils.metrics import begin_request_calls, end_request_calls, registry, server_timing
+
+logger = logging.getLogger("api.metrics")
+
+
+class SupabaseMetricsMiddleware:
+    """
+    Collects the Supabase calls made while serving each request and reports
+    them as a Server-Timing header, one structured "api.metrics" log line and
+    the /metrics registry (see utils/metrics.py). Calls made while a
+    streaming response is being sent are not included.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        calls, token = begin_request_calls()
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            end_request_calls(token)
+        duration = time.perf_counter() - start
+
+        match = getattr(request, "resolver_match", None)
+        view = (match.url_name or match.view_name) if match else "unmatched"
+        summary = calls.summary()
+
+        response["Server-Timing"] = server_timing(summary, duration)
+        registry.record_request(view, request.method, response.status_code, duration, calls)
+        logger.info(json.dumps({
+            "event": "request",
+            "view": view,
+            "method": request.method,
+            "path": request.path,
+            "status": response.status_code,
+            "duration_ms": round(duration * 1000, 1),
+            "supabase": {
+                service: {
+                    "calls": total["count"],
+                    "duration_ms": round(total["duration"] * 1000, 1),
+                    "bytes_sent": total["sent"],
+                    "bytes_received": total["received"],
+                }
+                for service, total in summary.items()
+            },
+        }))
+        return response
+
+
 # import jwt
 # import requests
 # from django.http import JsonResponse
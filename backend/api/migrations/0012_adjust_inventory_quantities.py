@@ -0,0 +1,46 @@
+# Generated by Django 5.1.5 on 2026-10-18 09:12
+
+from django.db import migrations
+
+
+ADJUST_INVENTORY_QUANTITIES_SQL = """
+CREATE OR REPLACE FUNCTION public.adjust_inventory_quantities(
+    adjustments jsonb,
+    clamp_at_zero boolean DEFAULT false
+)
+RETURNS TABLE (id bigint, quantity numeric)
+LANGUAGE sql
+AS $$
+    UPDATE public.inventory AS inv
+    SET quantity = CASE
+        WHEN clamp_at_zero THEN GREATEST(0, inv.quantity + deltas.delta)
+        ELSE inv.quantity + deltas.delta
+    END
+    FROM (
+        SELECT (elem->>'inventory_id')::bigint AS inventory_id,
+               SUM((elem->>'delta')::numeric) AS delta
+        FROM jsonb_array_elements(adjustments) AS elem
+        GROUP BY 1
+    ) AS deltas
+    WHERE inv.id = deltas.inventory_id
+    RETURNING inv.id::bigint, inv.quantity::numeric;
+$$;
+"""
+
+DROP_ADJUST_INVENTORY_QUANTITIES_SQL = """
+DROP FUNCTION IF EXISTS public.adjust_inventory_quantities(jsonb, boolean);
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0011_remove_employee_role_remove_employee_status_and_more'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            ADJUST_INVENTORY_QUANTITIES_SQL,
+            reverse_sql=DROP_ADJUST_INVENTORY_QUANTITIES_SQL,
+        ),
+    ]
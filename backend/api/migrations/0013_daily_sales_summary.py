@@ -0,0 +1,74 @@
+# Generated by Django 5.1.5 on 2026-10-18 11:40
+
+from django.db import migrations
+
+
+CREATE_DAILY_SALES_SUMMARY_SQL = """
+CREATE TABLE IF NOT EXISTS public.daily_sales_summary (
+    id bigserial PRIMARY KEY,
+    sales_date date NOT NULL,
+    menu_type_id bigint,
+    payment_method_id bigint,
+    order_count integer NOT NULL DEFAULT 0,
+    gross_sales numeric(14, 2) NOT NULL DEFAULT 0,
+    net_sales numeric(14, 2) NOT NULL DEFAULT 0,
+    updated_at timestamptz NOT NULL DEFAULT now()
+);
+
+CREATE UNIQUE INDEX IF NOT EXISTS daily_sales_summary_bucket_idx
+    ON public.daily_sales_summary (sales_date, menu_type_id, payment_method_id) NULLS NOT DISTINCT;
+
+CREATE OR REPLACE VIEW public.daily_sales_totals AS
+    SELECT COALESCE(SUM(order_count), 0)::bigint AS order_count,
+           COALESCE(SUM(gross_sales), 0)::numeric AS gross_sales,
+           COALESCE(SUM(net_sales), 0)::numeric AS net_sales
+    FROM public.daily_sales_summary;
+
+-- Replaces every summary row for the given dates (or the whole table when
+-- sales_dates is NULL) with `summary_rows`, in a single transaction.
+CREATE OR REPLACE FUNCTION public.replace_daily_sales(
+    sales_dates date[],
+    summary_rows jsonb
+)
+RETURNS void
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    IF sales_dates IS NULL THEN
+        DELETE FROM public.daily_sales_summary;
+    ELSE
+        DELETE FROM public.daily_sales_summary WHERE sales_date = ANY (sales_dates);
+    END IF;
+
+    INSERT INTO public.daily_sales_summary
+        (sales_date, menu_type_id, payment_method_id, order_count, gross_sales, net_sales)
+    SELECT (elem->>'sales_date')::date,
+           (elem->>'menu_type_id')::bigint,
+           (elem->>'payment_method_id')::bigint,
+           (elem->>'order_count')::integer,
+           (elem->>'gross_sales')::numeric,
+           (elem->>'net_sales')::numeric
+    FROM jsonb_array_elements(summary_rows) AS elem;
+END;
+$$;
+"""
+
+DROP_DAILY_SALES_SUMMARY_SQL = """
+DROP FUNCTION IF EXISTS public.replace_daily_sales(date[], jsonb);
+DROP VIEW IF EXISTS public.daily_sales_totals;
+DROP TABLE IF EXISTS public.daily_sales_summary;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0012_adjust_inventory_quantities'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            CREATE_DAILY_SALES_SUMMARY_SQL,
+            reverse_sql=DROP_DAILY_SALES_SUMMARY_SQL,
+        ),
+    ]
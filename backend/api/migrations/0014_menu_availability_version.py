@@ -0,0 +1,47 @@
+# Generated by Django 5.1.5 on 2026-10-18 14:05
+
+from django.db import migrations
+
+
+CREATE_MENU_AVAILABILITY_VERSION_SQL = """
+CREATE TABLE IF NOT EXISTS public.menu_availability_version (
+    id smallint PRIMARY KEY DEFAULT 1 CHECK (id = 1),
+    version bigint NOT NULL DEFAULT 0,
+    updated_at timestamptz NOT NULL DEFAULT now()
+);
+
+INSERT INTO public.menu_availability_version (id, version)
+VALUES (1, 0)
+ON CONFLICT (id) DO NOTHING;
+
+-- Increments the single availability version row and returns the new value.
+CREATE OR REPLACE FUNCTION public.bump_menu_availability_version()
+RETURNS bigint
+LANGUAGE sql
+AS $$
+    UPDATE public.menu_availability_version
+    SET version = version + 1,
+        updated_at = now()
+    WHERE id = 1
+    RETURNING version;
+$$;
+"""
+
+DROP_MENU_AVAILABILITY_VERSION_SQL = """
+DROP FUNCTION IF EXISTS public.bump_menu_availability_version();
+DROP TABLE IF EXISTS public.menu_availability_version;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0013_daily_sales_summary'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            CREATE_MENU_AVAILABILITY_VERSION_SQL,
+            reverse_sql=DROP_MENU_AVAILABILITY_VERSION_SQL,
+        ),
+    ]
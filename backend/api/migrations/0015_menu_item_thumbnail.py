@@ -0,0 +1,29 @@
+# Generated by Django 5.1.5 on 2026-10-18 16:20
+
+from django.db import migrations
+
+
+ADD_MENU_THUMBNAIL_SQL = """
+-- Storage path of the small POS-grid variant of menu_items.image (see
+-- api/utils/menu_images.py). NULL for images uploaded before thumbnails
+-- existed; clients fall back to the full image.
+ALTER TABLE public.menu_items ADD COLUMN IF NOT EXISTS thumbnail text;
+"""
+
+DROP_MENU_THUMBNAIL_SQL = """
+ALTER TABLE public.menu_items DROP COLUMN IF EXISTS thumbnail;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0014_menu_availability_version'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            ADD_MENU_THUMBNAIL_SQL,
+            reverse_sql=DROP_MENU_THUMBNAIL_SQL,
+        ),
+    ]
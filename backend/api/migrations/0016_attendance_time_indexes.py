@@ -0,0 +1,36 @@
+# Generated by Django 5.1.5 on 2026-10-18 16:45
+
+from django.db import migrations
+
+
+CREATE_ATTENDANCE_INDEXES_SQL = """
+-- Day lookups filter attendance_time on a [start, end) range of time_in and
+-- join attendance back through attendance_time / employee_id
+-- (see api/utils/attendance.py).
+CREATE INDEX IF NOT EXISTS attendance_time_time_in_idx
+    ON public.attendance_time (time_in);
+CREATE INDEX IF NOT EXISTS attendance_attendance_time_idx
+    ON public.attendance (attendance_time);
+CREATE INDEX IF NOT EXISTS attendance_employee_id_idx
+    ON public.attendance (employee_id);
+"""
+
+DROP_ATTENDANCE_INDEXES_SQL = """
+DROP INDEX IF EXISTS public.attendance_employee_id_idx;
+DROP INDEX IF EXISTS public.attendance_attendance_time_idx;
+DROP INDEX IF EXISTS public.attendance_time_time_in_idx;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0015_menu_item_thumbnail'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            CREATE_ATTENDANCE_INDEXES_SQL,
+            reverse_sql=DROP_ATTENDANCE_INDEXES_SQL,
+        ),
+    ]
@@ -0,0 +1,70 @@
+# Generated by Django 5.1.5 on 2026-10-18 17:30
+
+from django.db import migrations
+
+
+POST_STOCKIN_RECEIPT_SQL = """
+-- Posts a supplier receipt in one transaction: the receipt row, all of its
+-- stockin rows, the summed inventory deltas (through
+-- adjust_inventory_quantities, see 0012) and the stock-in expense. Any
+-- failure, including an inventory record that no longer exists, rolls the
+-- whole receipt back. Rows are read with jsonb_populate_record(set) so
+-- values take the column types of the target tables.
+CREATE OR REPLACE FUNCTION public.post_stockin_receipt(
+    receipt jsonb,
+    stock_ins jsonb,
+    adjustments jsonb,
+    expense jsonb
+)
+RETURNS jsonb
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    new_receipt_id bigint;
+    updated_inventory jsonb;
+BEGIN
+    INSERT INTO public.receipts (receipt_no, supplier, date)
+    SELECT r.receipt_no, r.supplier, r.date
+    FROM jsonb_populate_record(NULL::public.receipts, receipt) AS r
+    RETURNING id INTO new_receipt_id;
+
+    INSERT INTO public.stockin (receipt_id, inventory_id, item_id, quantity_in, price)
+    SELECT new_receipt_id, s.inventory_id, s.item_id, s.quantity_in, s.price
+    FROM jsonb_populate_recordset(NULL::public.stockin, stock_ins) AS s;
+
+    SELECT COALESCE(jsonb_agg(jsonb_build_object('id', updated.id, 'quantity', updated.quantity)), '[]'::jsonb)
+    INTO updated_inventory
+    FROM public.adjust_inventory_quantities(adjustments) AS updated;
+
+    IF jsonb_array_length(updated_inventory) < (
+        SELECT COUNT(DISTINCT elem->>'inventory_id') FROM jsonb_array_elements(adjustments) AS elem
+    ) THEN
+        RAISE EXCEPTION 'Inventory record not found for one of the stock in entries.';
+    END IF;
+
+    INSERT INTO public.expenses (type_id, stockin_id, date, cost)
+    SELECT e.type_id, new_receipt_id, e.date, e.cost
+    FROM jsonb_populate_record(NULL::public.expenses, expense) AS e;
+
+    RETURN jsonb_build_object('receipt_id', new_receipt_id, 'inventory', updated_inventory);
+END;
+$$;
+"""
+
+DROP_POST_STOCKIN_RECEIPT_SQL = """
+DROP FUNCTION IF EXISTS public.post_stockin_receipt(jsonb, jsonb, jsonb, jsonb);
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0016_attendance_time_indexes'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            POST_STOCKIN_RECEIPT_SQL,
+            reverse_sql=DROP_POST_STOCKIN_RECEIPT_SQL,
+        ),
+    ]
@@ -1,5 +1,8 @@
 import os
-from supabase import create_client, Client
+import jwt
+from supabase import Client
+
+from .utils.metrics import instrument_http_client
 
 # Load environment variables
 url: str = os.environ.get("SUPABASE_URL")
@@ -10,14 +13,58 @@ jwt_secret: str = os.environ.get("SUPABASE_JWT_SECRET")
 if not url or not service_key or not anon_key or not jwt_secret:
     raise ValueError("SUPABASE_URL, SUPABASE_SERVICE_KEY, SUPABASE_ANON_KEY, and SUPABASE_JWT_SECRET must be set in environment variables.")
 
+
+class InstrumentedClient(Client):
+    """
+    Supabase client whose PostgREST, Storage and Auth sub-clients report every
+    call they make to the current request's metrics (see utils/metrics.py).
+    The sub-clients are rebuilt on auth state changes, so they are hooked as
+    they are created.
+    """
+
+    @staticmethod
+    def _init_postgrest_client(*args, **kwargs):
+        postgrest = Client._init_postgrest_client(*args, **kwargs)
+        instrument_http_client(postgrest.session, "postgrest")
+        return postgrest
+
+    @staticmethod
+    def _init_storage_client(*args, **kwargs):
+        storage = Client._init_storage_client(*args, **kwargs)
+        instrument_http_client(storage.session, "storage")
+        return storage
+
+    @staticmethod
+    def _init_supabase_auth_client(*args, **kwargs):
+        auth = Client._init_supabase_auth_client(*args, **kwargs)
+        instrument_http_client(auth._http_client, "auth")
+        return auth
+
+
 # Create two Supabase clients:
-supabase_service: Client = create_client(url, service_key)
-supabase_anon: Client = create_client(url, anon_key)
+supabase_service: Client = InstrumentedClient.create(url, service_key)
+supabase_anon: Client = InstrumentedClient.create(url, anon_key)
 
-def is_valid_supabase_token(token: str) -> bool:
-    """Verify Supabase JWT using Supabase authentication API."""
+def decode_supabase_token(token: str):
+    """
+    Verify a Supabase JWT locally against the project's JWT secret.
+
+    Returns the decoded claims, or None if the token is missing, expired,
+    or not signed by this project.
+    """
+    if not token:
+        return None
     try:
-        response = supabase_service.auth.get_user(token)
-        return response.user is not None  # If user exists, token is valid
-    except Exception:
-        return False
\ No newline at end of file
+        return jwt.decode(
+            token,
+            jwt_secret,
+            algorithms=["HS256"],
+            audience="authenticated",
+            options={"require": ["exp", "sub"]},
+        )
+    except jwt.InvalidTokenError:
+        return None
+
+def is_valid_supabase_token(token: str) -> bool:
+    """Verify Supabase JWT locally (no round-trip to the Supabase Auth API)."""
+    return decode_supabase_token(token) is not None
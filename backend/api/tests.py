@@ -1,3 +1,143 @@
-from django.test import TestCase
+import csv
+import io
+import zipfile
 
-# Create your tests here.
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+from PIL import Image
+
+from .benchmarks.fake_supabase import FakeSupabase
+from .benchmarks.runner import check_budgets, load_budgets, run_benchmark
+from .benchmarks.seed import seed_tables
+from .utils.menu_images import build_image_variants, thumbnail_path, versioned_path
+from .supabase_client import supabase_anon, supabase_service
+
+
+class FakeSupabaseTestCase(SimpleTestCase):
+    """Runs each test against a small seeded FakeSupabase store (see benchmarks/)."""
+
+    def setUp(self):
+        cache.clear()
+        data = seed_tables(months=1, orders_per_day=5)
+        self.store = FakeSupabase(data.tables, data.auth_users)
+        self.addCleanup(cache.clear)
+        self.addCleanup(self.store.install(supabase_anon, supabase_service))
+
+
+class QueryBudgetTests(SimpleTestCase):
+    """The benchmarked views stay within their recorded Supabase query budgets (see benchmarks/runner.py)."""
+
+    def test_views_within_query_budgets(self):
+        results = run_benchmark(volumes=(1, 2), repeat=1, orders_per_day=10)
+        self.assertEqual(check_budgets(results, load_budgets()), [])
+
+
+class SalesExportTests(FakeSupabaseTestCase):
+
+    def test_csv_export(self):
+        response = self.client.get("/export-sales/", {"file_format": "csv"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "text/csv")
+        rows = list(csv.reader(io.StringIO(b"".join(response.streaming_content).decode("utf-8"))))
+        self.assertGreater(len(rows), 1)
+
+    def test_xlsx_export(self):
+        response = self.client.get("/export-sales/", {"file_format": "xlsx"})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response["Content-Disposition"].endswith('.xlsx"'))
+        workbook = zipfile.ZipFile(io.BytesIO(b"".join(response.streaming_content)))
+        self.assertIn(b"<row", workbook.read("xl/worksheets/sheet1.xml"))
+
+    def test_unknown_file_format(self):
+        response = self.client.get("/export-sales/", {"file_format": "pdf"})
+        self.assertEqual(response.status_code, 400)
+
+
+class MenuAvailabilityChangesTests(FakeSupabaseTestCase):
+
+    def test_non_finite_timeout(self):
+        for timeout in ("nan", "inf", "-inf", "soon"):
+            response = self.client.get("/menu-availability/changes/", {"since": "0", "timeout": timeout})
+            self.assertEqual(response.status_code, 400, timeout)
+
+    @override_settings(MENU_AVAILABILITY_MAX_WAIT=0)
+    def test_timeout_capped(self):
+        version = self.client.get("/menu-availability/changes/").data["version"]
+        response = self.client.get("/menu-availability/changes/", {"since": version, "timeout": "60"})
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.data["changed"])
+
+
+class CartInventoryTests(FakeSupabaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+        # Menu 1 needs 0.2 of inventory 1 per serving, in the item's own unit, and 1.0 is in stock
+        ingredients = self.store.rows("menu_ingredients")
+        ingredients[:] = [ingredient for ingredient in ingredients if ingredient["menu_id"] != 1]
+        item = self.store.rows("items")[0]
+        self.store.insert_rows("menu_ingredients", [
+            {"menu_id": 1, "inventory_id": 1, "quantity": 0.2, "unit_id": item["measurement"]},
+        ])
+        self.store.rows("inventory")[0]["quantity"] = 1.0
+
+    def check(self, items):
+        return self.client.post("/check-cart-inventory/", {"items": items}, content_type="application/json")
+
+    def test_servings_survive_float_rounding(self):
+        response = self.check([{"menu_id": 1, "quantity": 5}])
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.data["has_sufficient_inventory"])
+        self.assertEqual(response.data["menus"][0]["max_sellable_quantity"], 5)
+
+        response = self.check([{"menu_id": 1, "quantity": 6}])
+        self.assertFalse(response.data["has_sufficient_inventory"])
+
+    def test_missing_inventory_record(self):
+        self.store.insert_rows("menu_ingredients", [
+            {"menu_id": 1, "inventory_id": 9999, "quantity": 1.0, "unit_id": None},
+        ])
+        response = self.check([{"menu_id": 1, "quantity": 1}])
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.data["has_sufficient_inventory"])
+        menu = response.data["menus"][0]
+        self.assertEqual(menu["max_sellable_quantity"], 0)
+        self.assertEqual([warning["inventory_id"] for warning in menu["warnings"]], [9999])
+
+    def test_invalid_quantity(self):
+        for quantity in (0, -1, "nan", "inf", "two"):
+            response = self.check([{"menu_id": 1, "quantity": quantity}])
+            self.assertEqual(response.status_code, 400, quantity)
+
+
+class MenuImagePathTests(SimpleTestCase):
+
+    def display_jpeg(self, color):
+        buffer = io.BytesIO()
+        Image.new("RGB", (64, 48), color).save(buffer, format="PNG")
+        return build_image_variants(buffer.getvalue())["display"]
+
+    def test_paths_change_with_content(self):
+        red, blue = self.display_jpeg("red"), self.display_jpeg("blue")
+        path = versioned_path("menu_images/menu-Wings-1.jpeg", red)
+        self.assertRegex(path, r"^menu_images/menu-Wings-1-[0-9a-f]{12}\.jpeg$")
+        self.assertEqual(path, versioned_path("menu_images/menu-Wings-1.jpeg", red))
+        self.assertNotEqual(path, versioned_path("menu_images/menu-Wings-1.jpeg", blue))
+        self.assertEqual(thumbnail_path(path), path[:-len(".jpeg")] + "-thumb.jpeg")
+
+
+class MetricsAccessTests(SimpleTestCase):
+
+    @override_settings(METRICS_TOKEN=None, DEBUG=False)
+    def test_hidden_without_token(self):
+        self.assertEqual(self.client.get("/metrics/").status_code, 404)
+
+    @override_settings(METRICS_TOKEN=None, DEBUG=True)
+    def test_open_in_debug(self):
+        self.assertEqual(self.client.get("/metrics/").status_code, 200)
+
+    @override_settings(METRICS_TOKEN="scrape-me", DEBUG=False)
+    def test_token_required(self):
+        self.assertEqual(self.client.get("/metrics/").status_code, 401)
+        response = self.client.get("/metrics/", HTTP_AUTHORIZATION="Bearer scrape-me")
+        self.assertEqual(response.status_code, 200)
@@ -0,0 +1,41 @@
+# utils/attendance.py
+
+# Attendance lookups for a single day. An attendance row points at one
+# attendance_time row whose time_in decides which day it belongs to, so a
+# day's records are read with a range filter on the embedded time_in
+# (attendance_time!inner makes the filter drop non-matching attendance rows)
+# instead of loading every employee's full history and matching dates in
+# Python. Days are business days in settings.TIME_ZONE (see date_ranges.py).
+# Migration 0016 indexes attendance_time.time_in and attendance.employee_id
+# for these reads.
+from datetime import date
+
+from .date_ranges import business_today, filter_timestamp_range
+
+PRESENT_STATUS_ID = 1
+ABSENT_STATUS_ID = 2
+ATTENDANCE_COLUMNS = "id, employee_id, attendance_status, attendance_time!inner(id, time_in, time_out)"
+
+
+def fetch_attendance_by_date(client, day: date, employee_ids=None, columns: str = ATTENDANCE_COLUMNS) -> dict:
+    """
+    Return {employee_id: attendance row} for the attendance records whose
+    time_in falls on `day`, optionally limited to `employee_ids`. When an
+    employee has several records that day the earliest time_in wins.
+    `columns` must keep employee_id and the attendance_time!inner embed.
+    """
+    query = filter_timestamp_range(client.table("attendance").select(columns), "attendance_time.time_in", day, day)
+    if employee_ids is not None:
+        query = query.in_("employee_id", list(employee_ids))
+    rows = query.execute().data or []
+
+    records = {}
+    for row in sorted(rows, key=lambda row: row["attendance_time"]["time_in"]):
+        records.setdefault(row["employee_id"], row)
+    return records
+
+
+def fetch_employee_attendance(client, employee_id, day: date = None):
+    """Return an employee's attendance row for `day` (default today), or None."""
+    records = fetch_attendance_by_date(client, day or business_today(), employee_ids=[employee_id])
+    return next(iter(records.values()), None)
@@ -0,0 +1,67 @@
+# utils/auth_cache.py
+
+# Caches the resolved auth context (auth user UUID, employee primary key and
+# role names) for a Supabase access token, so repeated admin requests with the
+# same token skip the employee/role lookups entirely.
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+TOKEN_KEY_PREFIX = "auth:token:"
+REVOKED_KEY_PREFIX = "auth:revoked:"
+DEFAULT_AUTH_CACHE_TTL = 300
+
+
+def _auth_cache_ttl() -> int:
+    return getattr(settings, "SUPABASE_AUTH_CACHE_TTL", DEFAULT_AUTH_CACHE_TTL)
+
+
+def token_cache_key(token: str) -> str:
+    """
+    Build the cache key for a token. Only a SHA-256 digest of the token is
+    stored, never the token itself.
+    """
+    return TOKEN_KEY_PREFIX + hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+def get_cached_auth_context(token: str):
+    """
+    Return the cached auth context for `token`, or None on a miss.
+
+    An entry is discarded if its token has expired or if the employee's
+    access was revoked after the entry was cached.
+    """
+    key = token_cache_key(token)
+    entry = cache.get(key)
+    if not entry:
+        return None
+
+    now = time.time()
+    revoked_at = cache.get(f"{REVOKED_KEY_PREFIX}{entry['employee_pk']}")
+    if entry["expires_at"] <= now or (revoked_at and revoked_at >= entry["cached_at"]):
+        cache.delete(key)
+        return None
+    return entry
+
+
+def cache_auth_context(token: str, context: dict, expires_at: float) -> None:
+    """
+    Cache `context` for `token`. The entry lives for SUPABASE_AUTH_CACHE_TTL
+    seconds at most, and never past the token's own `exp` claim.
+    """
+    now = time.time()
+    ttl = min(_auth_cache_ttl(), expires_at - now)
+    if ttl <= 0:
+        return
+    entry = {**context, "cached_at": now, "expires_at": expires_at}
+    cache.set(token_cache_key(token), entry, timeout=int(ttl) or 1)
+
+
+def invalidate_employee_auth(employee_pk: int) -> None:
+    """
+    Drop every cached auth context belonging to `employee_pk` (e.g. after
+    their roles change or their record is deleted).
+    """
+    cache.set(f"{REVOKED_KEY_PREFIX}{employee_pk}", time.time(), timeout=_auth_cache_ttl())
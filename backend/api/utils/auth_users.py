@@ -0,0 +1,56 @@
+# utils/auth_users.py
+
+# Directory of Supabase Auth users for the staff pages. Employees only store
+# their auth user_id, so their emails come from the Auth admin API; instead
+# of one get_user_by_id call per employee, every user is listed once with
+# paginated list_users calls and the {user_id: email} map is cached for
+# SUPABASE_AUTH_USERS_CACHE_TTL seconds. Views that create, update or delete
+# auth users call invalidate_auth_user_emails() afterwards.
+from django.conf import settings
+from django.core.cache import cache
+
+EMAILS_CACHE_KEY = "auth:user_emails"
+LIST_USERS_PAGE_SIZE = 1000
+DEFAULT_AUTH_USERS_CACHE_TTL = 300
+
+
+def list_auth_users(client, per_page: int = LIST_USERS_PAGE_SIZE) -> list:
+    """Return every Supabase Auth user, reading `per_page` users per admin API call."""
+    users = []
+    page = 1
+    while True:
+        batch = client.auth.admin.list_users(page=page, per_page=per_page)
+        users.extend(batch)
+        if len(batch) < per_page:
+            return users
+        page += 1
+
+
+def get_auth_user_emails(client) -> dict:
+    """Return {auth user id: email} for every Supabase Auth user (cached)."""
+    emails = cache.get(EMAILS_CACHE_KEY)
+    if emails is None:
+        emails = {str(user.id): user.email for user in list_auth_users(client)}
+        cache.set(
+            EMAILS_CACHE_KEY,
+            emails,
+            timeout=getattr(settings, "SUPABASE_AUTH_USERS_CACHE_TTL", DEFAULT_AUTH_USERS_CACHE_TTL),
+        )
+    return emails
+
+
+def find_auth_user_id_by_email(client, email: str):
+    """Return the id of the auth user registered with `email` (case-insensitive), or None."""
+    if not email:
+        return None
+    wanted = email.lower()
+    return next(
+        (user_id for user_id, user_email in get_auth_user_emails(client).items()
+         if user_email and user_email.lower() == wanted),
+        None,
+    )
+
+
+def invalidate_auth_user_emails() -> None:
+    """Forget the cached email directory after auth users change."""
+    cache.delete(EMAILS_CACHE_KEY)
@@ -0,0 +1,245 @@
+# utils/availability.py
+
+# Menu availability engine. A menu is Available when every inventory record
+# it draws from holds at least the quantity one serving needs.
+#
+# The recipe side rarely changes, so it is compiled once into an index and
+# cached: per-menu requirements already converted to each inventory item's
+# unit, and the reverse map inventory_id -> menu_ids. Views that change
+# inventory call recompute_menu_availability() with the inventory IDs they
+# touched, which re-checks only the menus using those records and writes
+# status changes back with one bulk update per new status. Views that change
+# recipes or item units call invalidate_availability_index().
+#
+# Every time statuses change, the persisted availability version
+# (public.menu_availability_version) is bumped. Clients long-poll
+# wait_for_availability_change() with the last version they saw and are
+# answered as soon as it moves, instead of re-scanning on a timer.
+import math
+import threading
+import time
+
+from django.core.cache import cache
+
+from .inventory import convert_ingredient_quantity
+from .pagination import fetch_all_pages
+from .reference_cache import get_reference_data
+from .table_versions import bump_table_versions
+
+AVAILABLE_STATUS_ID = 1
+UNAVAILABLE_STATUS_ID = 2
+STATUS_NAMES = {AVAILABLE_STATUS_ID: "Available", UNAVAILABLE_STATUS_ID: "Unavailable"}
+
+INDEX_CACHE_KEY = "availability:index"
+INDEX_TTL = 300
+IN_FILTER_CHUNK = 200
+
+# Recipe requirements are converted and summed floats, so quantities are
+# compared with a relative tolerance: 0.1 + 0.2 units must be covered by a
+# stock of 0.3, and a stock of 1.0 holds five 0.2 servings even though
+# 1.0 // 0.2 == 4.0
+QUANTITY_TOLERANCE = 1e-9
+
+# The version is re-read from the database at most once per interval per
+# process, so waiting clients cost one tiny query every few seconds in total
+VERSION_CACHE_KEY = "availability:version"
+VERSION_POLL_INTERVAL = 2
+
+# Wakes this process's waiting long-polls as soon as it bumps the version;
+# changes made by other processes are picked up on the next poll interval
+_version_changed = threading.Condition()
+
+
+def _chunks(values, size: int = IN_FILTER_CHUNK):
+    values = list(values)
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def build_availability_index(client) -> dict:
+    """
+    Compile every menu recipe into:
+      - "requirements": {menu_id: {inventory_id: quantity per serving}}, in
+        the inventory item's unit and summed when a recipe lists the same
+        inventory record twice; None marks an ingredient whose inventory or
+        item no longer exists (the menu can never be made)
+      - "menus_by_inventory": {inventory_id: [menu_id, ...]}
+    """
+    ingredients = fetch_all_pages(
+        lambda: client.table("menu_ingredients").select("id, menu_id, inventory_id, quantity, unit_id")
+    )
+
+    inventory_ids = {i["inventory_id"] for i in ingredients if i.get("inventory_id") is not None}
+    inventory_by_id = {}
+    for chunk in _chunks(inventory_ids):
+        rows = client.table("inventory") \
+            .select("id, item, items(id, measurement)") \
+            .in_("id", chunk) \
+            .execute().data or []
+        inventory_by_id.update({row["id"]: row for row in rows})
+
+    units_by_id = {unit["id"]: unit for unit in get_reference_data("unit_of_measurement", "id, symbol, unit_category")}
+    category_names = {c["id"]: c["name"] for c in get_reference_data("um_category", "id, name")}
+
+    requirements = {}
+    menus_by_inventory = {}
+    for ingredient in ingredients:
+        menu_id = ingredient.get("menu_id")
+        inventory_id = ingredient.get("inventory_id")
+        if menu_id is None or inventory_id is None:
+            continue
+
+        menu_requirements = requirements.setdefault(menu_id, {})
+        menus = menus_by_inventory.setdefault(inventory_id, [])
+        if menu_id not in menus:
+            menus.append(menu_id)
+
+        inventory = inventory_by_id.get(inventory_id)
+        if not inventory or not inventory.get("items"):
+            menu_requirements[inventory_id] = None
+            continue
+        if menu_requirements.get(inventory_id, 0) is None:
+            continue
+
+        required = convert_ingredient_quantity(
+            float(ingredient.get("quantity") or 0),
+            units_by_id.get(ingredient.get("unit_id")),
+            units_by_id.get(inventory["items"].get("measurement")),
+            category_names,
+        )
+        menu_requirements[inventory_id] = menu_requirements.get(inventory_id, 0) + required
+
+    return {"requirements": requirements, "menus_by_inventory": menus_by_inventory}
+
+
+def get_availability_index(client) -> dict:
+    """Return the cached availability index, building it on a miss."""
+    index = cache.get(INDEX_CACHE_KEY)
+    if index is None:
+        index = build_availability_index(client)
+        cache.set(INDEX_CACHE_KEY, index, timeout=INDEX_TTL)
+    return index
+
+
+def invalidate_availability_index() -> None:
+    """Drop the cached index after menu recipes or item units change."""
+    cache.delete(INDEX_CACHE_KEY)
+
+
+def covers(available: float, required: float) -> bool:
+    """Whether a stock of `available` covers `required`, allowing for float rounding."""
+    return available >= required or math.isclose(available, required, rel_tol=QUANTITY_TOLERANCE)
+
+
+def max_servings(available: float, per_serving: float) -> int:
+    """Whole servings of `per_serving` (> 0) that a stock of `available` covers."""
+    if available <= 0:
+        return 0
+    servings = available / per_serving
+    nearest = round(servings)
+    if math.isclose(servings, nearest, rel_tol=QUANTITY_TOLERANCE):
+        return int(nearest)
+    return math.floor(servings)
+
+
+def evaluate_menu_status(menu_requirements: dict, quantities: dict) -> int:
+    """Return the status a menu should have given current inventory quantities."""
+    for inventory_id, required in menu_requirements.items():
+        available = quantities.get(inventory_id)
+        if required is None or available is None or not covers(available, required):
+            return UNAVAILABLE_STATUS_ID
+    return AVAILABLE_STATUS_ID
+
+
+def get_availability_version(client) -> int:
+    """Return the current availability version."""
+    version = cache.get(VERSION_CACHE_KEY)
+    if version is None:
+        rows = client.table("menu_availability_version").select("version").eq("id", 1).execute().data or []
+        version = int(rows[0]["version"]) if rows else 0
+        cache.set(VERSION_CACHE_KEY, version, timeout=VERSION_POLL_INTERVAL)
+    return version
+
+
+def bump_availability_version(client) -> int:
+    """Increment the availability version and wake this process's waiting clients."""
+    version = int(client.rpc("bump_menu_availability_version", {}).execute().data or 0)
+    cache.set(VERSION_CACHE_KEY, version, timeout=VERSION_POLL_INTERVAL)
+    with _version_changed:
+        _version_changed.notify_all()
+    return version
+
+
+def wait_for_availability_change(client, since: int, timeout: float) -> int:
+    """
+    Block until the availability version differs from `since` or `timeout`
+    seconds pass, and return the current version (equal to `since` on
+    timeout).
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        version = get_availability_version(client)
+        remaining = deadline - time.monotonic()
+        if version != since or remaining <= 0:
+            return version
+        with _version_changed:
+            _version_changed.wait(min(VERSION_POLL_INTERVAL, remaining))
+
+
+def recompute_menu_availability(client, inventory_ids=None, menu_ids=None) -> list:
+    """
+    Re-check the menus that use any of `inventory_ids`, plus the menus in
+    `menu_ids` (every menu with a recipe when both are None), and persist
+    status changes.
+
+    Quantities and current statuses are read in bulk, and changed menus are
+    written with one update per target status, after which the availability
+    version is bumped. Returns the changed menus as
+    [{"id", "name", "new_status", "new_status_id"}].
+    """
+    index = get_availability_index(client)
+    requirements = index["requirements"]
+
+    if inventory_ids is None and menu_ids is None:
+        menu_ids = set(requirements)
+    else:
+        menu_ids = set(menu_ids or [])
+        for inventory_id in inventory_ids or []:
+            menu_ids.update(index["menus_by_inventory"].get(inventory_id, []))
+    if not menu_ids:
+        return []
+
+    needed_inventory_ids = {
+        inventory_id for menu_id in menu_ids for inventory_id in requirements.get(menu_id, {})
+    }
+    quantities = {}
+    for chunk in _chunks(needed_inventory_ids):
+        rows = client.table("inventory").select("id, quantity").in_("id", chunk).execute().data or []
+        quantities.update({row["id"]: float(row.get("quantity") or 0) for row in rows})
+
+    menus = []
+    for chunk in _chunks(menu_ids):
+        menus.extend(client.table("menu_items").select("id, name, status_id").in_("id", chunk).execute().data or [])
+
+    changes_by_status = {}
+    changed_menus = []
+    for menu in menus:
+        new_status_id = evaluate_menu_status(requirements.get(menu["id"], {}), quantities)
+        if new_status_id == menu.get("status_id"):
+            continue
+        changes_by_status.setdefault(new_status_id, []).append(menu["id"])
+        changed_menus.append({
+            "id": menu["id"],
+            "name": menu.get("name", "Unknown"),
+            "new_status": STATUS_NAMES[new_status_id],
+            "new_status_id": new_status_id,
+        })
+
+    for new_status_id, changed_ids in changes_by_status.items():
+        for chunk in _chunks(changed_ids):
+            client.table("menu_items").update({"status_id": new_status_id}).in_("id", chunk).execute()
+
+    if changed_menus:
+        bump_table_versions("menu_items")
+        bump_availability_version(client)
+    return changed_menus
@@ -0,0 +1,71 @@
+# utils/child_sync.py
+
+# Syncs a parent's child collection (order_details of a transaction,
+# menu_ingredients of a menu, ...) to a submitted list instead of deleting
+# every child row and inserting the list again. Submitted rows are matched to
+# the stored rows by a natural key; matched rows keep their id and are only
+# written when a value changed, new rows are inserted and stored rows left
+# unmatched are deleted. The writes are one bulk upsert (changed and new rows
+# together, new rows taking their column defaults for id) plus one bulk
+# delete, whatever the size of the collection.
+
+
+def _key(row: dict, key_columns) -> tuple:
+    return tuple(row.get(column) for column in key_columns)
+
+
+def diff_child_rows(existing_rows, rows, key_columns, id_column: str = "id") -> dict:
+    """
+    Match `rows` against `existing_rows` on `key_columns`. Rows sharing a
+    key are paired in order, so a collection may repeat a key.
+
+    Returns {"upserts", "deletes", "unchanged"}: matched rows whose values
+    changed (with the stored id) followed by new rows (without id), the ids
+    of stored rows left unmatched, and the number of rows left as they are.
+    """
+    stored_by_key = {}
+    for stored in existing_rows:
+        stored_by_key.setdefault(_key(stored, key_columns), []).append(stored)
+
+    changed = []
+    inserted = []
+    unchanged = 0
+    for row in rows:
+        candidates = stored_by_key.get(_key(row, key_columns))
+        if not candidates:
+            inserted.append({column: value for column, value in row.items() if column != id_column})
+            continue
+        stored = candidates.pop(0)
+        if all(stored.get(column) == value for column, value in row.items() if column != id_column):
+            unchanged += 1
+        else:
+            changed.append({**row, id_column: stored[id_column]})
+
+    return {
+        "upserts": changed + inserted,
+        "deletes": [stored[id_column] for candidates in stored_by_key.values() for stored in candidates],
+        "unchanged": unchanged,
+    }
+
+
+def sync_child_rows(client, table: str, parent_column: str, parent_id, rows, key_columns,
+                    existing_rows=None, id_column: str = "id") -> dict:
+    """
+    Make the `table` rows whose `parent_column` is `parent_id` match `rows`
+    (dicts of column values; `parent_column` is filled in). `existing_rows`
+    may be passed when the caller has already read the stored rows.
+
+    Returns the diff_child_rows() result after applying it with at most one
+    bulk delete and one bulk upsert.
+    """
+    if existing_rows is None:
+        existing_rows = client.table(table).select("*").eq(parent_column, parent_id).execute().data or []
+
+    rows = [{**row, parent_column: parent_id} for row in rows]
+    diff = diff_child_rows(existing_rows, rows, key_columns, id_column)
+
+    if diff["deletes"]:
+        client.table(table).delete().in_(id_column, diff["deletes"]).execute()
+    if diff["upserts"]:
+        client.table(table).upsert(diff["upserts"], default_to_null=False).execute()
+    return diff
@@ -0,0 +1,94 @@
+# utils/date_ranges.py
+
+# Business-day date ranges. The shop runs on settings.TIME_ZONE
+# (Asia/Manila) while timestamps (transaction.date, attendance_time.time_in,
+# ...) are stored as UTC instants, so a local business day such as
+# 2026-10-18 covers [2026-10-17T16:00Z, 2026-10-18T16:00Z). Reports and
+# lookups turn local days into those UTC bounds and filter with gte/lt, which
+# lets Postgres use a range scan on the timestamp index and puts late-night
+# orders on the right day. Columns that already hold a business date
+# (daily_sales_summary.sales_date, expenses.date) are filtered on plain
+# [start, end + 1 day) dates instead.
+from datetime import date, datetime, time, timedelta, timezone as dt_timezone
+
+from django.utils import timezone
+
+
+def business_today() -> date:
+    """Current business date."""
+    return timezone.localdate()
+
+
+def parse_business_date(value, default_today: bool = True):
+    """
+    Parse a YYYY-MM-DD string. An empty value gives today's business date
+    (or None when `default_today` is False). Raises ValueError.
+    """
+    if not value:
+        return business_today() if default_today else None
+    try:
+        return date.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise ValueError("Invalid date format. Use YYYY-MM-DD.")
+
+
+def month_range(day: date) -> tuple:
+    """First and last date of the month containing `day`."""
+    start = day.replace(day=1)
+    end = (start.replace(day=28) + timedelta(days=4)).replace(day=1) - timedelta(days=1)
+    return start, end
+
+
+def day_bounds(start: date, end: date = None) -> tuple:
+    """
+    UTC [start, end) datetimes covering the local business days start..end
+    (inclusive; end defaults to start).
+    """
+    end = end or start
+    tz = timezone.get_default_timezone()
+    lower = datetime.combine(start, time.min, tzinfo=tz)
+    upper = datetime.combine(end + timedelta(days=1), time.min, tzinfo=tz)
+    return lower.astimezone(dt_timezone.utc), upper.astimezone(dt_timezone.utc)
+
+
+def filter_timestamp_range(query, column: str, start: date = None, end: date = None):
+    """
+    Restrict a timestamp `column` to the business days start..end
+    (inclusive). Either side may be None for an open range.
+    """
+    if start is not None:
+        query = query.gte(column, day_bounds(start)[0].isoformat())
+    if end is not None:
+        query = query.lt(column, day_bounds(end)[1].isoformat())
+    return query
+
+
+def filter_date_range(query, column: str, start: date = None, end: date = None):
+    """
+    Restrict a date `column` (already a business date) to start..end
+    (inclusive). Either side may be None for an open range.
+    """
+    if start is not None:
+        query = query.gte(column, start.isoformat())
+    if end is not None:
+        query = query.lt(column, (end + timedelta(days=1)).isoformat())
+    return query
+
+
+def to_business_datetime(timestamp: str):
+    """
+    Parse an ISO timestamp returned by PostgREST into a business-time
+    datetime, or None. Timestamps without an offset are taken as UTC.
+    """
+    if not timestamp:
+        return None
+    value = datetime.fromisoformat(timestamp)
+    if timezone.is_naive(value):
+        value = value.replace(tzinfo=dt_timezone.utc)
+    return timezone.localtime(value)
+
+
+def business_date(timestamp: str):
+    """Business date of an ISO timestamp, or None."""
+    value = to_business_datetime(timestamp)
+    return value.date() if value else None
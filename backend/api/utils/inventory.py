@@ -0,0 +1,183 @@
+# utils/inventory.py
+
+# Set-based helpers for turning order lines into inventory deductions.
+# Everything is prefetched in bulk, computed in memory, and written back with
+# a fixed number of calls regardless of how many lines/ingredients an order has.
+#
+# Inventory quantities are only ever changed through adjust_inventory(), which
+# applies deltas atomically on the database server (see the
+# adjust_inventory_quantities function in migrations/0012), so concurrent
+# cashiers and stock-ins cannot overwrite each other's updates.
+from django.utils import timezone
+
+from .conversion import convert_value
+from .reference_cache import get_reference_data
+from .table_versions import bump_table_versions
+
+
+def adjust_inventory(client, adjustments, clamp_at_zero: bool = False) -> dict:
+    """
+    Atomically apply a batch of inventory quantity changes in one call.
+
+    - `adjustments` is an iterable of (inventory_id, delta) pairs; deltas for
+      the same inventory_id are summed.
+    - `clamp_at_zero` keeps the resulting quantities from going negative.
+
+    Returns {inventory_id: new_quantity} for every inventory record that
+    exists; missing inventory IDs are simply absent from the result.
+    """
+    payload = [
+        {"inventory_id": int(inventory_id), "delta": float(delta)}
+        for inventory_id, delta in adjustments
+        if delta
+    ]
+    if not payload:
+        return {}
+
+    response = client.rpc("adjust_inventory_quantities", {
+        "adjustments": payload,
+        "clamp_at_zero": clamp_at_zero,
+    }).execute()
+    bump_table_versions("inventory")
+    return {row["id"]: float(row["quantity"]) for row in response.data or []}
+
+
+def prefetch_deduction_data(client, menu_ids) -> dict:
+    """
+    Bulk-load everything needed to compute ingredient deductions for the
+    given menus:
+      - their menu_ingredients, grouped by menu_id
+      - the inventory rows those ingredients draw from (with the item's unit)
+      - all units of measurement and unit category names
+    """
+    ingredients_by_menu = {}
+    inventory_by_id = {}
+
+    menu_ids = list({menu_id for menu_id in menu_ids if menu_id is not None})
+    if menu_ids:
+        ingredients = client.table("menu_ingredients") \
+            .select("id, menu_id, inventory_id, quantity, unit_id") \
+            .in_("menu_id", menu_ids) \
+            .execute().data or []
+        for ingredient in ingredients:
+            ingredients_by_menu.setdefault(ingredient["menu_id"], []).append(ingredient)
+
+        inventory_ids = list({i["inventory_id"] for i in ingredients if i.get("inventory_id") is not None})
+        if inventory_ids:
+            inventory = client.table("inventory") \
+                .select("id, item, quantity, items(id, name, measurement)") \
+                .in_("id", inventory_ids) \
+                .execute().data or []
+            inventory_by_id = {inv["id"]: inv for inv in inventory}
+
+    units = get_reference_data("unit_of_measurement", "id, symbol, unit_category")
+    categories = get_reference_data("um_category", "id, name")
+
+    return {
+        "ingredients_by_menu": ingredients_by_menu,
+        "inventory_by_id": inventory_by_id,
+        "units_by_id": {unit["id"]: unit for unit in units},
+        "category_names": {category["id"]: category["name"] for category in categories},
+    }
+
+
+def convert_ingredient_quantity(quantity: float, ingredient_unit, inventory_unit, category_names: dict) -> float:
+    """
+    Express `quantity` (measured in `ingredient_unit`) in the inventory item's unit.
+
+    Weight and Volume quantities are converted when the unit symbols differ.
+    Count units, missing unit information and unsupported symbols fall back
+    to the raw quantity.
+    """
+    if not ingredient_unit or not inventory_unit:
+        return quantity
+
+    from_symbol = ingredient_unit.get("symbol")
+    to_symbol = inventory_unit.get("symbol")
+    category_name = category_names.get(ingredient_unit.get("unit_category"))
+
+    if from_symbol and to_symbol and from_symbol != to_symbol and category_name in ["Weight", "Volume"]:
+        try:
+            return convert_value(quantity, from_symbol, to_symbol, category_name)
+        except ValueError:
+            return quantity
+    return quantity
+
+
+def compute_ingredient_deductions(order_details, data: dict) -> dict:
+    """
+    Aggregate the inventory consumed by `order_details` into one entry per
+    inventory_id, summing across order lines that share an ingredient.
+
+    Returns {inventory_id: {"item_id", "unit_id", "deduction"}} with the
+    deduction expressed in the inventory item's unit.
+    """
+    units_by_id = data["units_by_id"]
+    deductions = {}
+
+    for order_line in order_details:
+        line_quantity = order_line.get("quantity") or 0
+        for ingredient in data["ingredients_by_menu"].get(order_line.get("menu_id"), []):
+            inventory = data["inventory_by_id"].get(ingredient.get("inventory_id"))
+            if not inventory or not inventory.get("items"):
+                continue
+
+            item_unit_id = inventory["items"].get("measurement")
+            amount = convert_ingredient_quantity(
+                line_quantity * float(ingredient.get("quantity") or 0),
+                units_by_id.get(ingredient.get("unit_id")),
+                units_by_id.get(item_unit_id),
+                data["category_names"],
+            )
+
+            entry = deductions.setdefault(inventory["id"], {
+                "item_id": inventory.get("item"),
+                "unit_id": item_unit_id,
+                "deduction": 0,
+            })
+            entry["deduction"] += amount
+
+    return deductions
+
+
+def apply_ingredient_deductions(client, deductions: dict, reason_id: int, disposer_id) -> list:
+    """
+    Write `deductions` back with one atomic inventory adjustment and one bulk
+    disposed_inventory insert. Quantities never go below zero.
+
+    Returns the deducted ingredients as
+    [{"inventory_id", "item_id", "deducted_amount", "new_quantity"}].
+    """
+    if not deductions:
+        return []
+
+    new_quantities = adjust_inventory(
+        client,
+        [(inventory_id, -entry["deduction"]) for inventory_id, entry in deductions.items()],
+        clamp_at_zero=True,
+    )
+
+    disposal_datetime = timezone.now().isoformat()
+    disposal_rows = []
+    deducted_ingredients = []
+
+    for inventory_id, entry in deductions.items():
+        disposal_rows.append({
+            "disposed_quantity": entry["deduction"],
+            "inventory_id": inventory_id,
+            "reason_id": reason_id,
+            "disposal_datetime": disposal_datetime,
+            "disposed_unit": entry["unit_id"],
+            "disposer": disposer_id,
+        })
+        deducted_ingredients.append({
+            "inventory_id": inventory_id,
+            "item_id": entry["item_id"],
+            "deducted_amount": entry["deduction"],
+            "new_quantity": new_quantities.get(inventory_id),
+        })
+
+    client.table("disposed_inventory").insert(disposal_rows).execute()
+    bump_table_versions("disposed_inventory")
+
+    return deducted_ingredients
@@ -0,0 +1,112 @@
+# utils/menu_images.py
+
+# Menu image pipeline. Uploads are decoded once with Pillow and stored as two
+# JPEG variants in the menu-images bucket: the display image (capped at
+# DISPLAY_MAX_SIZE) and a small thumbnail for the POS grid. menu_items.image
+# keeps the display path and menu_items.thumbnail the thumbnail path.
+#
+# Objects are served with a one-day max-age, so an object's content must
+# never change once uploaded: the display path carries a hash of the
+# display JPEG (menu-{name}-{type}-{hash}.jpeg), a replaced image gets a new
+# path and therefore a new URL, and browsers and the CDN never serve a stale
+# copy. For the same reason public URLs, a pure function of the object path,
+# are memoized in-process instead of being rebuilt through the storage
+# client for every menu on every request.
+import hashlib
+import io
+from functools import lru_cache
+from pathlib import PurePosixPath
+
+from PIL import Image, ImageOps
+
+from ..supabase_client import supabase_anon
+
+BUCKET = "menu-images"
+DISPLAY_MAX_SIZE = (1024, 1024)
+THUMBNAIL_MAX_SIZE = (320, 320)
+DISPLAY_QUALITY = 85
+THUMBNAIL_QUALITY = 75
+CONTENT_HASH_LENGTH = 12
+
+
+@lru_cache(maxsize=2048)
+def menu_image_url(path: str):
+    """Return the public URL of an object in the menu-images bucket, or None."""
+    if not path:
+        return None
+    return supabase_anon.storage.from_(BUCKET).get_public_url(path)
+
+
+def thumbnail_path(path: str) -> str:
+    """Storage path of the thumbnail variant for a display image path."""
+    image_path = PurePosixPath(path)
+    return str(image_path.with_name(f"{image_path.stem}-thumb.jpeg"))
+
+
+def versioned_path(path: str, data: bytes) -> str:
+    """`path` with a hash of `data` appended to its stem, so new content always gets a new path."""
+    image_path = PurePosixPath(path)
+    digest = hashlib.sha256(data).hexdigest()[:CONTENT_HASH_LENGTH]
+    return str(image_path.with_name(f"{image_path.stem}-{digest}{image_path.suffix}"))
+
+
+def _encode_jpeg(image, max_size, quality: int) -> bytes:
+    variant = image.copy()
+    variant.thumbnail(max_size, Image.Resampling.LANCZOS)
+    buffer = io.BytesIO()
+    variant.save(buffer, format="JPEG", quality=quality, optimize=True, progressive=True)
+    return buffer.getvalue()
+
+
+def build_image_variants(image_data: bytes) -> dict:
+    """
+    Decode an uploaded image and return {"display": bytes, "thumbnail": bytes},
+    both as JPEG, upright per the EXIF orientation and without transparency.
+    Raises ValueError when the data is not an image Pillow can read.
+    """
+    try:
+        image = Image.open(io.BytesIO(image_data))
+        image.load()
+        image = ImageOps.exif_transpose(image)
+    except (OSError, Image.DecompressionBombError) as e:
+        raise ValueError("Uploaded file is not a supported image.") from e
+
+    if image.mode in ("RGBA", "LA", "P"):
+        image = image.convert("RGBA")
+        background = Image.new("RGB", image.size, (255, 255, 255))
+        background.paste(image, mask=image.getchannel("A"))
+        image = background
+    elif image.mode != "RGB":
+        image = image.convert("RGB")
+
+    return {
+        "display": _encode_jpeg(image, DISPLAY_MAX_SIZE, DISPLAY_QUALITY),
+        "thumbnail": _encode_jpeg(image, THUMBNAIL_MAX_SIZE, THUMBNAIL_QUALITY),
+    }
+
+
+_FILE_OPTIONS = {"content-type": "image/jpeg", "cache-control": "86400", "upsert": "true"}
+
+
+def upload_menu_thumbnail(client, path: str, thumbnail_data: bytes) -> str:
+    """Upload the thumbnail variant of the image at `path` and return its path."""
+    client.storage.from_(BUCKET).upload(thumbnail_path(path), thumbnail_data, _FILE_OPTIONS)
+    return thumbnail_path(path)
+
+
+def upload_menu_image(client, path: str, image_data: bytes) -> dict:
+    """
+    Resize and upload an image and its thumbnail under `path`, versioned with
+    a hash of the resized image (see versioned_path). Returns the columns to
+    store on the menu row: {"image", "thumbnail"}.
+    """
+    variants = build_image_variants(image_data)
+    path = versioned_path(path, variants["display"])
+    client.storage.from_(BUCKET).upload(path, variants["display"], _FILE_OPTIONS)
+    return {"image": path, "thumbnail": upload_menu_thumbnail(client, path, variants["thumbnail"])}
+
+
+def remove_menu_image(client, path: str) -> None:
+    """Delete a display image and its thumbnail from storage."""
+    if path:
+        client.storage.from_(BUCKET).remove([path, thumbnail_path(path)])
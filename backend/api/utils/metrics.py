@@ -0,0 +1,223 @@
+# utils/metrics.py
+
+# Supabase call instrumentation. The shared clients (see supabase_client.py)
+# hook every HTTP call their PostgREST, Storage and Auth sub-clients make and
+# report it here with its duration and payload sizes. Calls are collected per
+# request: SupabaseMetricsMiddleware opens a collector for each request,
+# turns it into a Server-Timing header and a structured log line, and folds
+# it into the in-process registry that the /metrics endpoint renders in the
+# Prometheus text format:
+#
+# - pos_request_duration_seconds: histogram per view, method and status class
+# - pos_supabase_call_duration_seconds: histogram per view and service
+# - pos_supabase_calls_total: calls per view, service and resource
+# - pos_supabase_bytes_total: bytes sent/received per view and service
+#
+# Collectors live in a context variable, so reads run by run_queries() in
+# worker threads are attributed to the request that started them. Each
+# process keeps its own registry; scrape every worker process.
+import contextvars
+import threading
+import time
+import weakref
+from urllib.parse import urlsplit
+
+import httpx
+
+REQUEST_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+CALL_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5)
+
+_current_calls = contextvars.ContextVar("supabase_calls", default=None)
+
+
+class RequestCalls:
+    """The Supabase calls made while serving one request."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.calls = []
+
+    def record(self, call: dict) -> None:
+        with self._lock:
+            self.calls.append(call)
+
+    def summary(self) -> dict:
+        """{service: {"count", "duration", "sent", "received"}} for the services that were called."""
+        totals = {}
+        with self._lock:
+            calls = list(self.calls)
+        for call in calls:
+            total = totals.setdefault(call["service"], {"count": 0, "duration": 0.0, "sent": 0, "received": 0})
+            total["count"] += 1
+            total["duration"] += call["duration"]
+            total["sent"] += call["sent"]
+            total["received"] += call["received"]
+        return totals
+
+
+def begin_request_calls():
+    """Start collecting calls for the current request. Returns (collector, token)."""
+    calls = RequestCalls()
+    return calls, _current_calls.set(calls)
+
+
+def end_request_calls(token) -> None:
+    _current_calls.reset(token)
+
+
+def _resource(service: str, path: str) -> str:
+    """
+    Low-cardinality name of the called resource: the table or rpc/<function>
+    for PostgREST, the endpoint for Auth and object/<bucket> for Storage.
+    """
+    segments = [segment for segment in path.split("/") if segment]
+    # Drop the "/rest/v1", "/storage/v1", "/auth/v1" prefix
+    if len(segments) >= 2 and segments[1] == "v1":
+        segments = segments[2:]
+    return "/".join(segments[:2]) or service
+
+
+def _request_size(request: httpx.Request) -> int:
+    try:
+        return len(request.content)
+    except httpx.RequestNotRead:
+        return 0
+
+
+def instrument_http_client(http_client: httpx.Client, service: str) -> httpx.Client:
+    """
+    Report every call `http_client` makes for `service` to the current
+    request's collector. The body is read inside the response hook so the
+    duration covers the whole download; callers read it from memory
+    afterwards.
+    """
+    started = weakref.WeakKeyDictionary()
+
+    def on_request(request: httpx.Request) -> None:
+        started[request] = time.perf_counter()
+
+    def on_response(response: httpx.Response) -> None:
+        response.read()
+        request = response.request
+        start = started.pop(request, None)
+        calls = _current_calls.get()
+        if calls is None or start is None:
+            return
+        calls.record({
+            "service": service,
+            "method": request.method,
+            "resource": _resource(service, urlsplit(str(request.url)).path),
+            "status": response.status_code,
+            "duration": time.perf_counter() - start,
+            "sent": _request_size(request),
+            "received": len(response.content),
+        })
+
+    hooks = http_client.event_hooks
+    hooks["request"] = [*hooks.get("request", []), on_request]
+    hooks["response"] = [*hooks.get("response", []), on_response]
+    http_client.event_hooks = hooks
+    return http_client
+
+
+def server_timing(summary: dict, duration: float) -> str:
+    """Server-Timing header value: one entry per called service plus the whole request."""
+    entries = [
+        f'{service};dur={total["duration"] * 1000:.1f};desc="{total["count"]} calls"'
+        for service, total in sorted(summary.items())
+    ]
+    entries.append(f"total;dur={duration * 1000:.1f}")
+    return ", ".join(entries)
+
+
+class _Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[index] += 1
+        self.sum += value
+        self.count += 1
+
+
+class MetricsRegistry:
+    """In-process aggregate of request and Supabase call metrics."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = {}
+        self.call_durations = {}
+        self.calls = {}
+        self.bytes = {}
+
+    def record_request(self, view: str, method: str, status: int, duration: float, calls: RequestCalls) -> None:
+        with self._lock:
+            key = (view, method, f"{status // 100}xx")
+            self.requests.setdefault(key, _Histogram(REQUEST_BUCKETS)).observe(duration)
+            for call in list(calls.calls):
+                service = call["service"]
+                self.call_durations.setdefault((view, service), _Histogram(CALL_BUCKETS)).observe(call["duration"])
+                call_key = (view, service, call["resource"])
+                self.calls[call_key] = self.calls.get(call_key, 0) + 1
+                for direction in ("sent", "received"):
+                    bytes_key = (view, service, direction)
+                    self.bytes[bytes_key] = self.bytes.get(bytes_key, 0) + call[direction]
+
+    def render(self) -> str:
+        """The registry in the Prometheus text exposition format."""
+        lines = []
+        with self._lock:
+            _render_histograms(
+                lines, "pos_request_duration_seconds", "Time to serve a request.",
+                ("view", "method", "status"), self.requests,
+            )
+            _render_histograms(
+                lines, "pos_supabase_call_duration_seconds", "Duration of Supabase calls, including the response body.",
+                ("view", "service"), self.call_durations,
+            )
+            _render_counters(
+                lines, "pos_supabase_calls_total", "Supabase calls made.",
+                ("view", "service", "resource"), self.calls,
+            )
+            _render_counters(
+                lines, "pos_supabase_bytes_total", "Supabase request and response payload bytes.",
+                ("view", "service", "direction"), self.bytes,
+            )
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names, values, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}"
+
+
+def _render_histograms(lines, name: str, help_text: str, label_names, histograms: dict) -> None:
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} histogram")
+    for key, histogram in sorted(histograms.items()):
+        for bound, count in [*zip(histogram.buckets, histogram.counts), ("+Inf", histogram.count)]:
+            le = 'le="%s"' % bound
+            lines.append(f"{name}_bucket{_labels(label_names, key, le)} {count}")
+        lines.append(f"{name}_sum{_labels(label_names, key)} {histogram.sum}")
+        lines.append(f"{name}_count{_labels(label_names, key)} {histogram.count}")
+
+
+def _render_counters(lines, name: str, help_text: str, label_names, counters: dict) -> None:
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} counter")
+    for key, value in sorted(counters.items()):
+        lines.append(f"{name}{_labels(label_names, key)} {value}")
+
+
+registry = MetricsRegistry()
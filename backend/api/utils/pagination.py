@@ -0,0 +1,100 @@
+# utils/pagination.py
+
+# Keyset (cursor) pagination for PostgREST queries ordered by a sort column
+# plus the primary key, newest first. Cursors are opaque URL-safe tokens that
+# encode the sort value and id of the last row of the previous page, so each
+# page is a single indexed range scan no matter how deep the client pages.
+import base64
+import json
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+def parse_page_size(value, default: int = DEFAULT_PAGE_SIZE, maximum: int = MAX_PAGE_SIZE) -> int:
+    """
+    Parse a page_size query parameter, falling back to `default` and capping
+    it at `maximum`. Raises ValueError for non-positive or non-numeric values.
+    """
+    if value in (None, ""):
+        return default
+    page_size = int(value)
+    if page_size < 1:
+        raise ValueError("page_size must be a positive integer")
+    return min(page_size, maximum)
+
+
+def encode_cursor(row: dict, sort_column: str) -> str:
+    """Build the cursor that resumes right after `row`."""
+    payload = json.dumps({"v": row.get(sort_column), "id": row.get("id")}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> dict:
+    """
+    Decode a cursor produced by encode_cursor(). Raises ValueError when the
+    cursor is malformed.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8"))
+        return {"value": payload["v"], "id": int(payload["id"])}
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
+
+
+def apply_keyset(query, sort_column: str, cursor: str = None, descending: bool = True):
+    """
+    Order `query` by (sort_column, id) and, when a cursor is given, restrict
+    it to the rows that come after the cursor position.
+    """
+    if cursor:
+        position = decode_cursor(cursor)
+        op = "lt" if descending else "gt"
+        value = json.dumps(position["value"])  # double-quoted for the PostgREST logic tree
+        query = query.or_(
+            f"{sort_column}.{op}.{value},"
+            f"and({sort_column}.eq.{value},id.{op}.{position['id']})"
+        )
+    return query.order(sort_column, desc=descending).order("id", desc=descending)
+
+
+def paginate(query, sort_column: str, page_size: int, cursor: str = None, descending: bool = True) -> dict:
+    """
+    Execute one page of `query` using keyset pagination.
+
+    Returns {"rows", "next_cursor", "has_more"}; `next_cursor` is None on the
+    last page.
+    """
+    rows = apply_keyset(query, sort_column, cursor, descending) \
+        .limit(page_size + 1) \
+        .execute().data or []
+
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+    return {
+        "rows": rows,
+        "next_cursor": encode_cursor(rows[-1], sort_column) if has_more and rows else None,
+        "has_more": has_more,
+    }
+
+
+def fetch_all_pages(build_query, order_column: str = "id", page_size: int = 1000) -> list:
+    """
+    Fetch every row of a query in fixed-size pages, so results are not
+    silently truncated at PostgREST's max-rows limit.
+
+    `build_query` is called once per page and must return a fresh, filtered
+    query builder (PostgREST builders cannot be re-executed with a new range).
+    """
+    rows = []
+    offset = 0
+    while True:
+        page = build_query() \
+            .order(order_column) \
+            .range(offset, offset + page_size - 1) \
+            .execute().data or []
+        rows.extend(page)
+        if len(page) < page_size:
+            return rows
+        offset += page_size
@@ -0,0 +1,313 @@
+# utils/pricing.py
+
+# Order pricing rules, shared by add_order/edit_order (what the customer is
+# charged), the daily sales summary and the sales reports/exports (what was
+# earned). Every caller prices the same compact OrderLine records against
+# the same PriceTables:
+#
+# - Ala Carte lines: price x quantity, less the line's discount
+# - Grab/FoodPanda lines (no in-store category): price x quantity, less the
+#   menu type's deduction percentage, then less the line's discount
+# - Unli Wings: one charge per unli_wings_group at the base_amount stored on
+#   the group's first line (falling back to the category's current base
+#   amount), less the group's discount
+#
+# Discount and deduction percentages are fractions (0.2 = 20%) everywhere.
+# Line amounts are rounded to centavos as they are charged.
+#
+# price_order() prices one order and returns a per-line breakdown;
+# price_orders() is the batch mode for reports, which only needs
+# (menu type, gross, net) per transaction and prices thousands of them in a
+# single pass over column lists without building breakdown dicts.
+from typing import NamedTuple
+
+IN_STORE_MENU_TYPE_ID = 1
+DELIVERY_MENU_TYPE_NAMES = {2: "Grab", 3: "FoodPanda"}
+ALA_CARTE_CATEGORY_ID = 1
+UNLI_WINGS_CATEGORY_ID = 2
+
+
+class PricingError(ValueError):
+    """Raised when an order line cannot be priced (unknown menu, discount, ...)."""
+
+
+class OrderLine(NamedTuple):
+    menu_id: int
+    quantity: float
+    discount_id: int = None
+    instore_category: int = None
+    unli_wings_group: str = None
+    base_amount: float = None
+
+
+class PriceTables(NamedTuple):
+    prices: dict           # menu_id -> price
+    menu_types: dict       # menu_id -> menu type id
+    deductions: dict       # menu type id -> deduction fraction
+    discounts: dict        # discount id -> discount fraction
+    category_bases: dict   # in-store category id -> base amount
+
+
+def price_tables(menu_items, menu_types=(), discounts=(), instore_categories=()) -> PriceTables:
+    """
+    Build PriceTables from rows of menu_items (id, price, type_id),
+    menu_type (id, deduction_percentage), discounts (id, percentage) and
+    instore_category (id, base_amount).
+    """
+    menu_items = list(menu_items)
+    return PriceTables(
+        prices={menu["id"]: menu.get("price") or 0 for menu in menu_items},
+        menu_types={menu["id"]: menu.get("type_id") for menu in menu_items},
+        deductions={row["id"]: row.get("deduction_percentage") or 0 for row in menu_types},
+        discounts={row["id"]: row.get("percentage") or 0 for row in discounts},
+        category_bases={row["id"]: row.get("base_amount") or 0 for row in instore_categories},
+    )
+
+
+def build_price_tables(pricing: dict) -> PriceTables:
+    """
+    PriceTables for a load_sales_pricing() dict ({"menu_items",
+    "menu_types", "discounts", "instore_categories"}, each keyed by id).
+    """
+    return price_tables(
+        pricing.get("menu_items", {}).values(),
+        pricing.get("menu_types", {}).values(),
+        pricing.get("discounts", {}).values(),
+        pricing.get("instore_categories", {}).values(),
+    )
+
+
+def order_lines(details) -> list:
+    """Build OrderLines from order_details rows (or request payload items)."""
+    return [
+        OrderLine(
+            detail.get("menu_id"),
+            detail.get("quantity") or 0,
+            detail.get("discount_id"),
+            detail.get("instore_category"),
+            detail.get("unli_wings_group"),
+            detail.get("base_amount"),
+        )
+        for detail in details
+    ]
+
+
+def _discount(tables: PriceTables, discount_id, strict: bool) -> float:
+    if not discount_id:
+        return 0
+    if discount_id not in tables.discounts:
+        if strict:
+            raise PricingError(f"Discount with ID {discount_id} not found.")
+        return 0
+    return tables.discounts[discount_id]
+
+
+def price_order(lines, tables: PriceTables, strict: bool = True) -> dict:
+    """
+    Price one order. Returns {"menu_type_id", "gross", "net", "lines"}:
+      - menu_type_id: type of the first priced menu, or None
+      - gross: total before deductions and discounts
+      - net: total charged (sum of the rounded line totals)
+      - lines: one dict per priced line with kind ("ala_carte", "delivery" or
+        "unli_wings"), menu_type_id, menu_id (None for Unli Wings), menu_ids,
+        unli_wings_group, quantity, unit_price, base_price,
+        deduction_percentage, discount_percentage and final_price
+
+    With `strict`, unknown menus, discounts and in-store categories raise
+    PricingError; otherwise such lines (or discounts) are skipped, as
+    historical reports do.
+    """
+    menu_type_id = None
+    gross = 0
+    net = 0
+    priced_lines = []
+    unli_wings_groups = {}
+
+    for line in lines:
+        if line.menu_id not in tables.prices:
+            if strict:
+                raise PricingError(f"Menu item with ID {line.menu_id} not found.")
+            continue
+        line_type_id = tables.menu_types[line.menu_id]
+        if menu_type_id is None:
+            menu_type_id = line_type_id
+
+        if line.instore_category == UNLI_WINGS_CATEGORY_ID:
+            group = unli_wings_groups.get(line.unli_wings_group)
+            if group is None:
+                group = unli_wings_groups[line.unli_wings_group] = {
+                    "menu_type_id": line_type_id,
+                    "menu_ids": [],
+                    "quantity": 0,
+                    "base_amount": line.base_amount,
+                    "discount_id": line.discount_id,
+                }
+            elif not group["discount_id"] and line.discount_id:
+                group["discount_id"] = line.discount_id
+            group["menu_ids"].append(line.menu_id)
+            group["quantity"] += line.quantity
+            continue
+
+        unit_price = tables.prices[line.menu_id]
+        base_price = unit_price * line.quantity
+        price = base_price
+        deduction_percentage = 0
+        if line.instore_category is None:
+            deduction_percentage = tables.deductions.get(line_type_id, 0)
+            price -= price * deduction_percentage
+        elif strict and line.instore_category not in tables.category_bases:
+            raise PricingError(f"In-Store Category with ID {line.instore_category} not found.")
+        discount_percentage = _discount(tables, line.discount_id, strict)
+        price -= price * discount_percentage
+
+        price = round(price, 2)
+        gross += base_price
+        net += price
+        priced_lines.append({
+            "kind": "delivery" if line.instore_category is None else "ala_carte",
+            "menu_type_id": line_type_id,
+            "menu_id": line.menu_id,
+            "menu_ids": [line.menu_id],
+            "unli_wings_group": None,
+            "quantity": line.quantity,
+            "unit_price": unit_price,
+            "base_price": round(base_price, 2),
+            "deduction_percentage": deduction_percentage,
+            "discount_percentage": discount_percentage,
+            "final_price": price,
+        })
+
+    if unli_wings_groups and UNLI_WINGS_CATEGORY_ID not in tables.category_bases and strict:
+        raise PricingError(f"In-Store Category with ID {UNLI_WINGS_CATEGORY_ID} not found.")
+    category_base = tables.category_bases.get(UNLI_WINGS_CATEGORY_ID, 0)
+    for group_key, group in unli_wings_groups.items():
+        base_price = group["base_amount"] or category_base
+        discount_percentage = _discount(tables, group["discount_id"], strict)
+        price = round(base_price - base_price * discount_percentage, 2)
+        gross += base_price
+        net += price
+        priced_lines.append({
+            "kind": "unli_wings",
+            "menu_type_id": group["menu_type_id"],
+            "menu_id": None,
+            "menu_ids": group["menu_ids"],
+            "unli_wings_group": group_key,
+            "quantity": group["quantity"],
+            "unit_price": base_price,
+            "base_price": round(base_price, 2),
+            "deduction_percentage": 0,
+            "discount_percentage": discount_percentage,
+            "final_price": price,
+        })
+
+    return {
+        "menu_type_id": menu_type_id,
+        "gross": round(gross, 2),
+        "net": round(net, 2),
+        "lines": priced_lines,
+    }
+
+
+def calculation_breakdown(priced_lines) -> list:
+    """Shape price_order() lines as the calculation_details returned by add_order/edit_order."""
+    breakdown = []
+    for line in priced_lines:
+        if line["kind"] == "unli_wings":
+            breakdown.append({
+                "instore_category": "Unli Wings",
+                "unli_wings_group": line["unli_wings_group"],
+                "aggregated_quantity": line["quantity"],
+                "base_price": line["base_price"],
+                "discount_percentage": line["discount_percentage"],
+                "final_price": line["final_price"],
+            })
+        elif line["kind"] == "ala_carte":
+            breakdown.append({
+                "menu_id": line["menu_id"],
+                "instore_category": "Ala Carte",
+                "quantity": line["quantity"],
+                "base_price": line["base_price"],
+                "discount_percentage": line["discount_percentage"],
+                "final_price": line["final_price"],
+            })
+        else:
+            breakdown.append({
+                "menu_id": line["menu_id"],
+                "menu_type": DELIVERY_MENU_TYPE_NAMES.get(line["menu_type_id"], "Delivery"),
+                "quantity": line["quantity"],
+                "base_price": line["base_price"],
+                "deduction_percentage": line["deduction_percentage"],
+                "discount_percentage": line["discount_percentage"],
+                "final_price": line["final_price"],
+            })
+    return breakdown
+
+
+def price_orders(details_by_transaction: dict, tables: PriceTables) -> dict:
+    """
+    Batch mode: price many historical orders at once, leniently (unknown
+    menus and discounts are skipped). Returns {transaction_id: (menu_type_id,
+    gross, net)} for every transaction with at least one known menu, with
+    the same totals price_order() gives.
+
+    The details are first flattened into parallel column lists, then a
+    single pass accumulates per-transaction totals and Unli Wings groups, so
+    no per-line dicts are built.
+    """
+    prices = tables.prices
+    menu_types = tables.menu_types
+    deductions = tables.deductions
+    discounts = tables.discounts
+    category_base = tables.category_bases.get(UNLI_WINGS_CATEGORY_ID, 0)
+
+    transaction_ids, menu_ids, quantities, discount_ids, categories, groups, base_amounts = [], [], [], [], [], [], []
+    for transaction_id, details in details_by_transaction.items():
+        for detail in details:
+            menu_id = detail.get("menu_id")
+            if menu_id not in prices:
+                continue
+            transaction_ids.append(transaction_id)
+            menu_ids.append(menu_id)
+            quantities.append(detail.get("quantity") or 0)
+            discount_ids.append(detail.get("discount_id"))
+            categories.append(detail.get("instore_category"))
+            groups.append(detail.get("unli_wings_group"))
+            base_amounts.append(detail.get("base_amount"))
+
+    totals = {}
+    unli_wings_groups = {}
+    for transaction_id, menu_id, quantity, discount_id, category, group, base_amount in zip(
+        transaction_ids, menu_ids, quantities, discount_ids, categories, groups, base_amounts
+    ):
+        total = totals.get(transaction_id)
+        if total is None:
+            total = totals[transaction_id] = [menu_types[menu_id], 0, 0]
+
+        if category == UNLI_WINGS_CATEGORY_ID:
+            key = (transaction_id, group)
+            entry = unli_wings_groups.get(key)
+            if entry is None:
+                unli_wings_groups[key] = [base_amount, discount_id]
+            elif not entry[1] and discount_id:
+                entry[1] = discount_id
+            continue
+
+        base_price = prices[menu_id] * quantity
+        price = base_price
+        if category is None:
+            price -= price * deductions.get(menu_types[menu_id], 0)
+        if discount_id:
+            price -= price * discounts.get(discount_id, 0)
+        total[1] += base_price
+        total[2] += round(price, 2)
+
+    for (transaction_id, _), (base_amount, discount_id) in unli_wings_groups.items():
+        base_price = base_amount or category_base
+        total = totals[transaction_id]
+        total[1] += base_price
+        total[2] += round(base_price - base_price * (discounts.get(discount_id, 0) if discount_id else 0), 2)
+
+    return {
+        transaction_id: (type_id, round(gross, 2), round(net, 2))
+        for transaction_id, (type_id, gross, net) in totals.items()
+    }
@@ -0,0 +1,63 @@
+# utils/query_batch.py
+
+# Runs independent PostgREST reads of one request concurrently. A page that
+# needs several unrelated reads (reference tables, menus, employees, ...)
+# declares them as named zero-argument callables and gets the results back
+# in a dict, so its latency is close to the slowest read rather than the sum.
+# The supabase-py clients are backed by a thread-safe httpx.Client, so plain
+# threads are enough; each batch gets its own small pool capped by
+# QUERY_BATCH_MAX_WORKERS and an overall QUERY_BATCH_TIMEOUT in seconds.
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, FIRST_EXCEPTION, wait
+
+from django.conf import settings
+
+DEFAULT_MAX_WORKERS = 6
+DEFAULT_TIMEOUT = 15
+
+
+class QueryBatchTimeout(TimeoutError):
+    """Raised when a batch does not finish within its timeout."""
+
+
+def run_queries(queries: dict, max_workers: int = None, timeout: float = None) -> dict:
+    """
+    Run every callable in `queries` ({name: callable}) concurrently and
+    return {name: result}.
+
+    - At most `max_workers` callables run at once (settings
+      QUERY_BATCH_MAX_WORKERS by default)
+    - The whole batch must finish within `timeout` seconds (settings
+      QUERY_BATCH_TIMEOUT by default) or QueryBatchTimeout is raised
+    - The first exception raised by a callable is re-raised and reads that
+      have not started yet are cancelled
+    """
+    if not queries:
+        return {}
+    if max_workers is None:
+        max_workers = getattr(settings, "QUERY_BATCH_MAX_WORKERS", DEFAULT_MAX_WORKERS)
+    if timeout is None:
+        timeout = getattr(settings, "QUERY_BATCH_TIMEOUT", DEFAULT_TIMEOUT)
+
+    # A single read gains nothing from a thread
+    if len(queries) == 1 or max_workers <= 1:
+        return {name: query() for name, query in queries.items()}
+
+    executor = ThreadPoolExecutor(max_workers=min(max_workers, len(queries)), thread_name_prefix="query-batch")
+    try:
+        # Run each read in a copy of the request's context so its Supabase
+        # calls are still counted towards the request (see metrics.py)
+        futures = {executor.submit(contextvars.copy_context().run, query): name for name, query in queries.items()}
+        done, pending = wait(futures, timeout=timeout, return_when=FIRST_EXCEPTION)
+
+        for future in done:
+            if future.exception() is not None:
+                raise future.exception()
+        if pending:
+            names = ", ".join(sorted(futures[future] for future in pending))
+            raise QueryBatchTimeout(f"Queries did not finish within {timeout}s: {names}")
+
+        return {name: future.result() for future, name in futures.items()}
+    finally:
+        # Don't block the request on reads that are still running after a failure
+        executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,73 @@
+# utils/reference_cache.py
+
+# In-process cache for the small lookup tables that almost every page reads
+# (units, menu types, discounts, payment methods, ...). Each table is cached
+# whole through the Django cache framework with its own TTL, and the admin
+# views that modify a table call invalidate_reference_data() right after the
+# write so the next read goes back to Supabase.
+from django.conf import settings
+from django.core.cache import cache
+
+from ..supabase_client import supabase_anon
+from .table_versions import bump_table_versions
+
+CACHE_KEY_PREFIX = "reference:"
+
+# Seconds each table stays cached. Tables edited from the admin UI are also
+# invalidated explicitly, so these only bound staleness across processes.
+REFERENCE_TABLE_TTLS = {
+    "unit_of_measurement": 3600,
+    "um_category": 3600,
+    "menu_type": 600,
+    "menu_category": 600,
+    "menu_status": 3600,
+    "discounts": 600,
+    "payment_methods": 3600,
+    "instore_category": 600,
+    "order_status_type": 3600,
+    "reason_of_disposal": 3600,
+    "expenses_type": 600,
+    "supplier": 600,
+    "item_category": 600,
+    "employee_status": 3600,
+    "role": 3600,
+}
+
+
+def _table_ttl(table: str) -> int:
+    overrides = getattr(settings, "REFERENCE_CACHE_TTLS", {})
+    return overrides.get(table, REFERENCE_TABLE_TTLS[table])
+
+
+def get_reference_data(table: str, fields: str = None) -> list:
+    """
+    Return every row of a reference table, served from the cache when possible.
+
+    - `table` must be one of REFERENCE_TABLE_TTLS.
+    - `fields` is an optional comma-separated column list (e.g. "id, name");
+      rows are projected onto those columns so callers get the same shape
+      they would from `.select(fields)`.
+    """
+    if table not in REFERENCE_TABLE_TTLS:
+        raise ValueError(f"Unsupported reference table: {table}")
+
+    key = f"{CACHE_KEY_PREFIX}{table}"
+    rows = cache.get(key)
+    if rows is None:
+        rows = supabase_anon.table(table).select("*").execute().data or []
+        cache.set(key, rows, timeout=_table_ttl(table))
+
+    if not fields:
+        return rows
+    columns = [column.strip() for column in fields.split(",") if column.strip()]
+    return [{column: row.get(column) for column in columns} for row in rows]
+
+
+def invalidate_reference_data(*tables: str) -> None:
+    """
+    Drop the cached copy of the given reference tables and bump their
+    versions (see table_versions.py). Called by the views that insert,
+    update or delete rows in those tables.
+    """
+    cache.delete_many([f"{CACHE_KEY_PREFIX}{table}" for table in tables])
+    bump_table_versions(*tables)
@@ -0,0 +1,228 @@
+# utils/sales_export.py
+
+# Streaming sales export. Completed transactions are read one keyset page at
+# a time (see pagination.py), priced line by line by the pricing engine
+# add_order uses (see pricing.py), and written out as CSV or XLSX while the
+# next page is fetched, so exporting a month or a year keeps a constant
+# amount of rows in memory. The XLSX writer emits a minimal single-sheet workbook through
+# zipfile on an unseekable buffer, so no spreadsheet library is needed.
+import csv
+import zipfile
+from datetime import date
+from xml.sax.saxutils import escape
+
+from .date_ranges import filter_timestamp_range, to_business_datetime
+from .pagination import paginate
+from .reference_cache import get_reference_data
+from .pricing import PriceTables, build_price_tables, order_lines, price_order
+from .sales_summary import COMPLETED_STATUS_ID, fetch_order_details, load_sales_pricing
+
+EXPORT_PAGE_SIZE = 200
+EXPORT_DETAIL_COLUMNS = "id, transaction_id, menu_id, quantity, instore_category, discount_id, unli_wings_group, base_amount"
+
+# (row key, header) in output order
+EXPORT_COLUMNS = (
+    ("transaction_id", "Transaction ID"),
+    ("date", "Date"),
+    ("payment_method", "Payment Method"),
+    ("menu_type", "Menu Type"),
+    ("category", "Category"),
+    ("item", "Item"),
+    ("quantity", "Quantity"),
+    ("unit_price", "Unit Price"),
+    ("base_price", "Base Price"),
+    ("deduction_percentage", "Deduction %"),
+    ("discount_percentage", "Discount %"),
+    ("line_total", "Line Total"),
+)
+LINE_CATEGORIES = {"ala_carte": "Ala Carte", "delivery": "Delivery", "unli_wings": "Unli Wings"}
+
+
+def price_transaction_lines(details, pricing: dict, tables: PriceTables = None) -> list:
+    """
+    Price the order details of one transaction with the pricing engine (the
+    rules add_order uses, see pricing.py). Pass `tables` when pricing many
+    transactions against the same `pricing`.
+
+    Returns one dict per priced line with category, item, quantity,
+    unit_price, base_price, deduction_percentage, discount_percentage and
+    line_total.
+    """
+    menu_items = pricing["menu_items"]
+    priced = price_order(order_lines(details), tables or build_price_tables(pricing), strict=False)
+    return [
+        {
+            "category": LINE_CATEGORIES[line["kind"]],
+            "item": ", ".join(menu_items[menu_id].get("name", "Unknown") for menu_id in line["menu_ids"]),
+            "quantity": line["quantity"],
+            "unit_price": line["unit_price"],
+            "base_price": line["base_price"],
+            "deduction_percentage": line["deduction_percentage"],
+            "discount_percentage": line["discount_percentage"],
+            "line_total": line["final_price"],
+        }
+        for line in priced["lines"]
+    ]
+
+
+def iter_export_rows(client, start: date, end: date, page_size: int = EXPORT_PAGE_SIZE):
+    """
+    Yield one export row per priced line of every completed transaction made
+    on the business days start..end, oldest first, dated in business time.
+    Only one page of transactions and their details is held at a time; menu
+    pricing is loaded as new menus appear.
+    """
+    menu_type_names = {row["id"]: row["name"] for row in get_reference_data("menu_type", "id, name")}
+    payment_method_names = {row["id"]: row["name"] for row in get_reference_data("payment_methods", "id, name")}
+    pricing = load_sales_pricing(client, [], menu_columns="id, name, price, type_id")
+    tables = None
+
+    cursor = None
+    while True:
+        query = client.table("transaction") \
+            .select("id, date, payment_method") \
+            .eq("order_status", COMPLETED_STATUS_ID)
+        query = filter_timestamp_range(query, "date", start, end)
+        page = paginate(query, "date", page_size, cursor, descending=False)
+
+        details_by_transaction = fetch_order_details(client, [t["id"] for t in page["rows"]], EXPORT_DETAIL_COLUMNS)
+        new_menu_ids = {
+            detail.get("menu_id")
+            for details in details_by_transaction.values() for detail in details
+            if detail.get("menu_id") not in pricing["menu_items"]
+        }
+        if new_menu_ids:
+            pricing["menu_items"].update(
+                load_sales_pricing(client, new_menu_ids, menu_columns="id, name, price, type_id")["menu_items"]
+            )
+            tables = None
+        if tables is None:
+            tables = build_price_tables(pricing)
+
+        for transaction in page["rows"]:
+            details = details_by_transaction.get(transaction["id"], [])
+            menu_type_id = next(
+                (tables.menu_types[d["menu_id"]] for d in details if d.get("menu_id") in tables.menu_types),
+                None,
+            )
+            for line in price_transaction_lines(details, pricing, tables):
+                yield {
+                    "transaction_id": transaction["id"],
+                    "date": to_business_datetime(transaction.get("date")).strftime("%Y-%m-%d %H:%M:%S"),
+                    "payment_method": payment_method_names.get(transaction.get("payment_method"), ""),
+                    "menu_type": menu_type_names.get(menu_type_id, ""),
+                    **line,
+                }
+
+        if not page["has_more"]:
+            return
+        cursor = page["next_cursor"]
+
+
+class _Echo:
+    """File-like object whose write() returns the value, for csv.writer."""
+
+    def write(self, value):
+        return value
+
+
+def iter_csv(rows):
+    """Yield the CSV export of `rows` line by line, header first."""
+    writer = csv.writer(_Echo())
+    yield writer.writerow([header for _, header in EXPORT_COLUMNS])
+    for row in rows:
+        yield writer.writerow([row.get(key, "") for key, _ in EXPORT_COLUMNS])
+
+
+class _ChunkBuffer:
+    """Unseekable write target that hands back whatever was written since the last drain()."""
+
+    def __init__(self):
+        self._chunks = []
+        self._offset = 0
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._offset += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._offset
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+_XLSX_STATIC_PARTS = {
+    "[Content_Types].xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '</Types>'
+    ),
+    "_rels/.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>'
+        '</Relationships>'
+    ),
+    "xl/workbook.xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        '<sheets><sheet name="Sales" sheetId="1" r:id="rId1"/></sheets>'
+        '</workbook>'
+    ),
+    "xl/_rels/workbook.xml.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" Target="worksheets/sheet1.xml"/>'
+        '</Relationships>'
+    ),
+}
+
+
+def _xlsx_row(values) -> str:
+    cells = []
+    for value in values:
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            cells.append(f'<c><v>{value}</v></c>')
+        else:
+            text = "" if value is None else str(value)
+            cells.append(f'<c t="inlineStr"><is><t>{escape(text)}</t></is></c>')
+    return f"<row>{''.join(cells)}</row>"
+
+
+def iter_xlsx(rows, flush_every: int = EXPORT_PAGE_SIZE):
+    """
+    Yield the XLSX export of `rows` as byte chunks, header row first. The
+    worksheet is deflated as it is written and drained every `flush_every`
+    rows.
+    """
+    buffer = _ChunkBuffer()
+    with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_DEFLATED) as workbook:
+        for name, content in _XLSX_STATIC_PARTS.items():
+            workbook.writestr(name, content)
+
+        with workbook.open("xl/worksheets/sheet1.xml", "w") as sheet:
+            sheet.write(
+                b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+            )
+            sheet.write(_xlsx_row(header for _, header in EXPORT_COLUMNS).encode("utf-8"))
+            for count, row in enumerate(rows, start=1):
+                sheet.write(_xlsx_row(row.get(key, "") for key, _ in EXPORT_COLUMNS).encode("utf-8"))
+                if count % flush_every == 0:
+                    chunk = buffer.drain()
+                    if chunk:
+                        yield chunk
+            sheet.write(b"</sheetData></worksheet>")
+    yield buffer.drain()
@@ -0,0 +1,123 @@
+# utils/sales_report.py
+
+# Period aggregation for the sales report. Revenue comes from the
+# daily_sales_summary rows (see sales_summary.py) and expenses from the
+# expenses table; both are bucketed by day, ISO week or month with dict
+# indexes, so building a report is linear in the number of rows read.
+from datetime import date, timedelta
+
+GRANULARITIES = ("day", "week", "month")
+
+
+def bucket_start(day: date, granularity: str) -> date:
+    """Return the first date of the day/week/month bucket containing `day`."""
+    if granularity == "day":
+        return day
+    if granularity == "week":
+        return day - timedelta(days=day.weekday())  # ISO weeks start on Monday
+    if granularity == "month":
+        return day.replace(day=1)
+    raise ValueError(f"Unsupported granularity: {granularity}")
+
+
+def iter_buckets(start: date, end: date, granularity: str):
+    """Yield the start date of every bucket overlapping start..end (inclusive)."""
+    current = bucket_start(start, granularity)
+    while current <= end:
+        yield current
+        if granularity == "day":
+            current += timedelta(days=1)
+        elif granularity == "week":
+            current += timedelta(days=7)
+        else:
+            current = (current.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+
+def _empty_bucket() -> dict:
+    return {"order_count": 0, "gross_sales": 0.0, "revenue": 0.0, "expenses": 0.0}
+
+
+def build_sales_report(summary_rows, expenses, start: date, end: date, granularity: str) -> dict:
+    """
+    Aggregate daily summary rows and expense rows into a report for
+    start..end (inclusive).
+
+    Returns {"series", "totals", "by_menu_type", "by_payment_method",
+    "by_expense_type"}; every series entry and total carries order_count,
+    gross_sales, revenue (net sales), expenses and margin (revenue - expenses).
+    Buckets with no activity are included with zeros so charts line up.
+    """
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"Unsupported granularity: {granularity}")
+
+    series = {bucket: _empty_bucket() for bucket in iter_buckets(start, end, granularity)}
+    by_menu_type = {}
+    by_payment_method = {}
+    by_expense_type = {}
+
+    for row in summary_rows:
+        bucket = series.get(bucket_start(date.fromisoformat(row["sales_date"]), granularity))
+        if bucket is None:
+            continue
+        order_count = row.get("order_count") or 0
+        gross = float(row.get("gross_sales") or 0)
+        net = float(row.get("net_sales") or 0)
+
+        bucket["order_count"] += order_count
+        bucket["gross_sales"] += gross
+        bucket["revenue"] += net
+
+        for index, key in ((by_menu_type, row.get("menu_type_id")), (by_payment_method, row.get("payment_method_id"))):
+            entry = index.setdefault(key, {"order_count": 0, "gross_sales": 0.0, "revenue": 0.0})
+            entry["order_count"] += order_count
+            entry["gross_sales"] += gross
+            entry["revenue"] += net
+
+    for expense in expenses:
+        if not expense.get("date"):
+            continue
+        bucket = series.get(bucket_start(date.fromisoformat(expense["date"][:10]), granularity))
+        if bucket is None:
+            continue
+        cost = float(expense.get("cost") or 0)
+        bucket["expenses"] += cost
+        by_expense_type[expense.get("type_id")] = by_expense_type.get(expense.get("type_id"), 0.0) + cost
+
+    totals = _empty_bucket()
+    series_list = []
+    for bucket_date, bucket in series.items():
+        for key in totals:
+            totals[key] += bucket[key]
+        series_list.append({
+            "period_start": bucket_date.isoformat(),
+            "order_count": bucket["order_count"],
+            "gross_sales": round(bucket["gross_sales"], 2),
+            "revenue": round(bucket["revenue"], 2),
+            "expenses": round(bucket["expenses"], 2),
+            "margin": round(bucket["revenue"] - bucket["expenses"], 2),
+        })
+
+    return {
+        "series": series_list,
+        "totals": {
+            "order_count": totals["order_count"],
+            "gross_sales": round(totals["gross_sales"], 2),
+            "revenue": round(totals["revenue"], 2),
+            "expenses": round(totals["expenses"], 2),
+            "margin": round(totals["revenue"] - totals["expenses"], 2),
+        },
+        "by_menu_type": [
+            {"menu_type_id": key, "order_count": entry["order_count"],
+             "gross_sales": round(entry["gross_sales"], 2), "revenue": round(entry["revenue"], 2)}
+            for key, entry in by_menu_type.items()
+        ],
+        "by_payment_method": [
+            {"payment_method_id": key, "order_count": entry["order_count"],
+             "gross_sales": round(entry["gross_sales"], 2), "revenue": round(entry["revenue"], 2)}
+            for key, entry in by_payment_method.items()
+        ],
+        "by_expense_type": [
+            {"expense_type_id": key, "expenses": round(cost, 2)}
+            for key, cost in by_expense_type.items()
+        ],
+    }
@@ -0,0 +1,175 @@
+# utils/sales_summary.py
+
+# Maintains public.daily_sales_summary: one row per business date x menu type
+# x payment method holding the number of completed orders and their gross and
+# net sales. Views that complete or edit an order call refresh_daily_sales()
+# for the affected date; the rebuild_daily_sales management command
+# recomputes the whole table (or a date range) from scratch. Sales dates are
+# business dates in settings.TIME_ZONE (see date_ranges.py).
+from datetime import date, timedelta
+
+from .date_ranges import business_date, filter_timestamp_range
+from .pagination import fetch_all_pages
+from .pricing import build_price_tables, order_lines, price_order, price_orders
+from .reference_cache import get_reference_data
+
+COMPLETED_STATUS_ID = 2
+PAGE_SIZE = 1000
+IN_FILTER_CHUNK = 200
+ORDER_DETAIL_COLUMNS = "id, transaction_id, menu_id, quantity, instore_category, discount_id, unli_wings_group, base_amount"
+
+
+def transaction_sales_date(transaction: dict):
+    """Return the YYYY-MM-DD business date of a transaction, or None."""
+    sales_date = business_date(transaction.get("date"))
+    return sales_date.isoformat() if sales_date else None
+
+
+def load_sales_pricing(client, menu_ids, menu_columns: str = "id, price, type_id") -> dict:
+    """
+    Prefetch what the pricing engine needs: the given menu items'
+    price and type, plus the menu type deductions, discounts and in-store
+    category base amounts. `menu_columns` may add display columns to the
+    menu rows but must keep id, price and type_id.
+    """
+    menu_ids = list({menu_id for menu_id in menu_ids if menu_id is not None})
+    menu_items = {}
+    for start in range(0, len(menu_ids), IN_FILTER_CHUNK):
+        rows = client.table("menu_items") \
+            .select(menu_columns) \
+            .in_("id", menu_ids[start:start + IN_FILTER_CHUNK]) \
+            .execute().data or []
+        menu_items.update({row["id"]: row for row in rows})
+
+    return {
+        "menu_items": menu_items,
+        "menu_types": {row["id"]: row for row in get_reference_data("menu_type", "id, deduction_percentage")},
+        "discounts": {row["id"]: row for row in get_reference_data("discounts", "id, percentage")},
+        "instore_categories": {row["id"]: row for row in get_reference_data("instore_category", "id, base_amount")},
+    }
+
+
+def compute_transaction_sales(details, pricing: dict):
+    """
+    Price one completed transaction from its order details with the
+    pricing engine (see pricing.py).
+
+    Returns (menu_type_id, gross, net) where gross is before delivery app
+    deductions and discounts and net is after them, or None when none of
+    the details reference a known menu item.
+    """
+    priced = price_order(order_lines(details), build_price_tables(pricing), strict=False)
+    if priced["menu_type_id"] is None:
+        return None
+    return priced["menu_type_id"], priced["gross"], priced["net"]
+
+
+def build_daily_sales_rows(transactions, details_by_transaction: dict, pricing: dict) -> list:
+    """
+    Aggregate completed transactions into daily_sales_summary rows keyed by
+    (sales_date, menu_type_id, payment_method_id).
+    """
+    priced_by_transaction = price_orders(details_by_transaction, build_price_tables(pricing))
+
+    buckets = {}
+    for transaction in transactions:
+        sales_date = transaction_sales_date(transaction)
+        priced = priced_by_transaction.get(transaction.get("id"))
+        if not sales_date or priced is None:
+            continue
+        type_id, gross, net = priced
+
+        key = (sales_date, type_id, transaction.get("payment_method"))
+        bucket = buckets.setdefault(key, {"order_count": 0, "gross_sales": 0, "net_sales": 0})
+        bucket["order_count"] += 1
+        bucket["gross_sales"] += gross
+        bucket["net_sales"] += net
+
+    return [
+        {
+            "sales_date": sales_date,
+            "menu_type_id": type_id,
+            "payment_method_id": payment_method_id,
+            "order_count": bucket["order_count"],
+            "gross_sales": round(bucket["gross_sales"], 2),
+            "net_sales": round(bucket["net_sales"], 2),
+        }
+        for (sales_date, type_id, payment_method_id), bucket in sorted(
+            buckets.items(), key=lambda item: (item[0][0], item[0][1] or 0, item[0][2] or 0)
+        )
+    ]
+
+
+def _fetch_completed_transactions(client, start=None, end=None) -> list:
+    """Fetch completed transactions made on the business days start..end (inclusive)."""
+    def build_query():
+        query = client.table("transaction") \
+            .select("id, date, payment_method") \
+            .eq("order_status", COMPLETED_STATUS_ID)
+        return filter_timestamp_range(query, "date", start, end)
+
+    return fetch_all_pages(build_query, page_size=PAGE_SIZE)
+
+
+def fetch_order_details(client, transaction_ids, columns: str = ORDER_DETAIL_COLUMNS) -> dict:
+    """Return the order details of `transaction_ids` grouped by transaction_id."""
+    details_by_transaction = {}
+    transaction_ids = list(transaction_ids)
+    for start in range(0, len(transaction_ids), IN_FILTER_CHUNK):
+        chunk = transaction_ids[start:start + IN_FILTER_CHUNK]
+        rows = fetch_all_pages(
+            lambda: client.table("order_details").select(columns).in_("transaction_id", chunk),
+            page_size=PAGE_SIZE,
+        )
+        for row in rows:
+            details_by_transaction.setdefault(row["transaction_id"], []).append(row)
+    return details_by_transaction
+
+
+def _summarize(client, start=None, end=None) -> list:
+    """Build summary rows for completed transactions made on start..end (inclusive)."""
+    transactions = _fetch_completed_transactions(client, start, end)
+    details_by_transaction = fetch_order_details(client, [t["id"] for t in transactions])
+    pricing = load_sales_pricing(
+        client,
+        [detail.get("menu_id") for details in details_by_transaction.values() for detail in details],
+    )
+    return build_daily_sales_rows(transactions, details_by_transaction, pricing)
+
+
+def refresh_daily_sales(client, sales_dates) -> list:
+    """
+    Recompute the summary rows of the given dates (YYYY-MM-DD strings or
+    date objects) from their completed transactions and replace them in one
+    atomic call. Returns the rows written.
+    """
+    dates = sorted({date.fromisoformat(str(d)[:10]) for d in sales_dates if d})
+    if not dates:
+        return []
+
+    wanted = {d.isoformat() for d in dates}
+    rows = _summarize(client, dates[0], dates[-1])
+    rows = [row for row in rows if row["sales_date"] in wanted]
+
+    client.rpc("replace_daily_sales", {
+        "sales_dates": sorted(wanted),
+        "summary_rows": rows,
+    }).execute()
+    return rows
+
+
+def rebuild_daily_sales(client, start: date = None, end: date = None) -> list:
+    """
+    Rebuild the summary for start <= date <= end, or the whole table when no
+    range is given. Returns the rows written.
+    """
+    if start is None and end is None:
+        rows = _summarize(client)
+        client.rpc("replace_daily_sales", {"sales_dates": None, "summary_rows": rows}).execute()
+        return rows
+
+    if start is None or end is None:
+        raise ValueError("Both start and end dates are required for a partial rebuild")
+
+    dates = [start + timedelta(days=offset) for offset in range((end - start).days + 1)]
+    return refresh_daily_sales(client, dates)
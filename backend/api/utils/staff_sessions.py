@@ -0,0 +1,92 @@
+# utils/staff_sessions.py
+
+# Verified staff sessions for the POS terminals. After a cashier's email and
+# passcode have been checked against Supabase Auth once, the terminal gets
+# an opaque session token bound to that employee and terminal. Later POS
+# actions (orders, order edits, disposals, time-out) present the token and
+# are verified from the cache alone, without the three Auth round-trips.
+#
+# - Sessions slide: each successful use extends them by STAFF_SESSION_TTL
+#   seconds, up to STAFF_SESSION_MAX_AGE seconds after they were issued
+# - revoke_staff_session() ends one session; revoke_employee_staff_sessions()
+#   ends every session of an employee (time-out, passcode or status change,
+#   deletion)
+# - Only a SHA-256 digest of the token is used as the cache key
+#
+# Sessions live in the shared cache (see CACHES in settings), so a session
+# issued or revoked by one worker process is honoured by every other one.
+import hashlib
+import secrets
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+SESSION_KEY_PREFIX = "staff_session:"
+REVOKED_KEY_PREFIX = "staff_session:revoked:"
+DEFAULT_STAFF_SESSION_TTL = 900
+DEFAULT_STAFF_SESSION_MAX_AGE = 12 * 3600
+
+
+def _session_ttl() -> int:
+    return getattr(settings, "STAFF_SESSION_TTL", DEFAULT_STAFF_SESSION_TTL)
+
+
+def _session_max_age() -> int:
+    return getattr(settings, "STAFF_SESSION_MAX_AGE", DEFAULT_STAFF_SESSION_MAX_AGE)
+
+
+def _session_key(token: str) -> str:
+    return SESSION_KEY_PREFIX + hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+def issue_staff_session(employee_id, terminal_id: str) -> dict:
+    """
+    Start a session for `employee_id` on `terminal_id` after a successful
+    passcode check. Returns {"token", "expires_in"} for the client.
+    """
+    token = secrets.token_urlsafe(32)
+    now = time.time()
+    ttl = _session_ttl()
+    cache.set(_session_key(token), {
+        "employee_id": str(employee_id),
+        "terminal_id": terminal_id,
+        "issued_at": now,
+    }, timeout=ttl)
+    return {"token": token, "expires_in": ttl}
+
+
+def verify_staff_session(token: str, employee_id, terminal_id: str) -> bool:
+    """
+    Return True if `token` is a live session of `employee_id` on
+    `terminal_id`, extending it by STAFF_SESSION_TTL. Sessions past their
+    maximum age or revoked after they were issued are dropped.
+    """
+    if not token or not terminal_id:
+        return False
+
+    key = _session_key(token)
+    entry = cache.get(key)
+    if not entry or entry["employee_id"] != str(employee_id) or entry["terminal_id"] != terminal_id:
+        return False
+
+    now = time.time()
+    revoked_at = cache.get(f"{REVOKED_KEY_PREFIX}{entry['employee_id']}")
+    remaining = entry["issued_at"] + _session_max_age() - now
+    if remaining <= 0 or (revoked_at and revoked_at >= entry["issued_at"]):
+        cache.delete(key)
+        return False
+
+    cache.touch(key, timeout=int(min(_session_ttl(), remaining)) or 1)
+    return True
+
+
+def revoke_staff_session(token: str) -> None:
+    """End a single session."""
+    if token:
+        cache.delete(_session_key(token))
+
+
+def revoke_employee_staff_sessions(employee_id) -> None:
+    """End every session of `employee_id` on every terminal."""
+    cache.set(f"{REVOKED_KEY_PREFIX}{employee_id}", time.time(), timeout=_session_max_age())
@@ -0,0 +1,224 @@
+# utils/stockins.py
+
+# Bulk stock-in ingestion for supplier receipts. All lines of a receipt are
+# validated up front against one prefetched inventory map, then the receipt,
+# its stockin rows, the summed per-inventory deltas and the stock-in expense
+# are written by a single call to the post_stockin_receipt database function
+# (see migrations/0017). The function runs as one transaction, so a receipt
+# is either posted in full or not at all, in two round-trips however many
+# lines it has.
+#
+# Receipt edits are turned into a diff against the receipt's current stockin
+# rows (inserts, updates, deletes and the net quantity change per
+# inventory_id), validated as a whole, then applied with one bulk call per
+# kind of change and one batched inventory adjustment.
+from .inventory import adjust_inventory
+from .table_versions import bump_table_versions
+
+STOCKIN_EXPENSE_TYPE_ID = 1
+
+
+class StockInError(ValueError):
+    """Raised when a stock-in line is incomplete or does not match its inventory record."""
+
+
+def fetch_inventory_items(client, inventory_ids) -> dict:
+    """Return {inventory_id: item_id} for the inventory records that exist."""
+    inventory_ids = list({int(inventory_id) for inventory_id in inventory_ids})
+    if not inventory_ids:
+        return {}
+    rows = client.table("inventory") \
+        .select("id, item") \
+        .in_("id", inventory_ids) \
+        .execute().data or []
+    return {row["id"]: row.get("item") for row in rows}
+
+
+def parse_stock_in_line(entry: dict) -> dict:
+    """
+    Validate the fields of one stock-in entry and return them as
+    {"inventory_id", "item_id", "quantity_in", "price"}. Raises StockInError.
+    """
+    inventory_id = entry.get("inventory_id")
+    item_id = entry.get("item_id")
+    quantity_in = entry.get("quantity_in")
+    price = entry.get("price")
+
+    if not inventory_id or not item_id or quantity_in is None or price is None:
+        raise StockInError("All fields (inventory_id, item_id, quantity_in, price) are required for each stock in entry.")
+    try:
+        return {
+            "inventory_id": int(inventory_id),
+            "item_id": item_id,
+            "quantity_in": int(quantity_in),
+            "price": float(price),
+        }
+    except (TypeError, ValueError):
+        raise StockInError("Invalid quantity or price format.")
+
+
+def check_inventory_items(lines, inventory_items: dict) -> None:
+    """
+    Check that every line's inventory record exists and holds the line's
+    item. Raises StockInError.
+    """
+    for line in lines:
+        if line["inventory_id"] not in inventory_items:
+            raise StockInError(f"Inventory record not found for ID {line['inventory_id']}")
+        if str(inventory_items[line["inventory_id"]]) != str(line["item_id"]):
+            raise StockInError(
+                f"Mismatch between provided Item ID {line['item_id']} and inventory record for Inventory ID {line['inventory_id']}."
+            )
+
+
+def validate_stock_in_lines(client, stock_ins) -> list:
+    """
+    Validate all stock-in entries of a receipt with a single inventory
+    lookup. Returns the parsed lines; raises StockInError on the first bad
+    entry, before anything is written.
+    """
+    lines = [parse_stock_in_line(entry) for entry in stock_ins]
+    check_inventory_items(lines, fetch_inventory_items(client, [line["inventory_id"] for line in lines]))
+    return lines
+
+
+def stock_in_cost(lines) -> float:
+    """Total cost of stock-in lines (price per unit x quantity)."""
+    return sum(float(line.get("price") or 0) * int(line.get("quantity_in") or 0) for line in lines)
+
+
+def post_stockin_receipt(client, receipt: dict, lines) -> dict:
+    """
+    Atomically post a receipt ({"receipt_no", "supplier", "date"}) with its
+    validated stock-in `lines`: inserts the receipt and stockin rows, adds
+    each inventory's summed quantity_in and records the stock-in expense.
+
+    Returns {"receipt_id", "inventory": {inventory_id: new_quantity}}.
+    """
+    deltas = {}
+    for line in lines:
+        deltas[line["inventory_id"]] = deltas.get(line["inventory_id"], 0) + line["quantity_in"]
+
+    response = client.rpc("post_stockin_receipt", {
+        "receipt": receipt,
+        "stock_ins": list(lines),
+        "adjustments": [
+            {"inventory_id": inventory_id, "delta": delta}
+            for inventory_id, delta in deltas.items()
+        ],
+        "expense": {
+            "type_id": STOCKIN_EXPENSE_TYPE_ID,
+            "date": receipt.get("date"),
+            "cost": stock_in_cost(lines),
+        },
+    }).execute()
+    bump_table_versions("receipts", "stockin", "inventory")
+
+    result = response.data or {}
+    return {
+        "receipt_id": result.get("receipt_id"),
+        "inventory": {row["id"]: float(row["quantity"]) for row in result.get("inventory", [])},
+    }
+
+
+def diff_receipt_stock_ins(existing_rows, stock_in_updates) -> dict:
+    """
+    Compute the changes a receipt edit makes to the receipt's current
+    stockin rows. Each entry of `stock_in_updates` is either
+      - {"id", "delete": True}: delete the row (entries without an id are
+        new rows removed before saving and are ignored)
+      - {"id", "quantity_in", "price"}: update the row
+      - {"inventory_id", "item_id", "quantity_in", "price"}: insert a row
+
+    Returns {"inserts", "updates", "deletes", "deltas", "stock_ins"}:
+    rows to insert (without id), full rows to upsert, ids to delete, the net
+    quantity change per inventory_id, and the receipt's resulting rows
+    except the inserts. Quantity changes are measured against the stored
+    rows. Raises StockInError.
+    """
+    rows_by_id = {row["id"]: row for row in existing_rows}
+    inserts = []
+    updates = {}
+    deletes = set()
+    deltas = {}
+
+    def add_delta(inventory_id, delta):
+        deltas[inventory_id] = deltas.get(inventory_id, 0) + delta
+
+    for stock in stock_in_updates:
+        stockin_id = stock.get("id")
+        if stockin_id and stockin_id not in rows_by_id:
+            raise StockInError(f"Stock-in record with id {stockin_id} not found.")
+
+        if stock.get("delete"):
+            if stockin_id and stockin_id not in deletes:
+                row = updates.pop(stockin_id, rows_by_id[stockin_id])
+                deletes.add(stockin_id)
+                add_delta(row["inventory_id"], -int(row.get("quantity_in") or 0))
+            continue
+
+        if stockin_id:
+            if stockin_id in deletes:
+                continue
+            row = updates.get(stockin_id, rows_by_id[stockin_id])
+            try:
+                quantity_in = int(stock.get("quantity_in", 0))
+                price = float(stock.get("price", 0))
+            except (TypeError, ValueError):
+                raise StockInError("Invalid quantity or price format.")
+            add_delta(row["inventory_id"], quantity_in - int(row.get("quantity_in") or 0))
+            updates[stockin_id] = {**row, "quantity_in": quantity_in, "price": price}
+        else:
+            line = parse_stock_in_line(stock)
+            inserts.append(line)
+            add_delta(line["inventory_id"], line["quantity_in"])
+
+    stock_ins = [
+        updates.get(row["id"], row)
+        for row in existing_rows
+        if row["id"] not in deletes
+    ]
+    return {
+        "inserts": inserts,
+        "updates": list(updates.values()),
+        "deletes": sorted(deletes),
+        "deltas": {inventory_id: delta for inventory_id, delta in deltas.items() if delta},
+        "stock_ins": stock_ins,
+    }
+
+
+def check_receipt_diff(client, diff: dict) -> None:
+    """
+    Check with one inventory lookup that the inserted lines match their
+    inventory records and that every inventory to adjust still exists.
+    Raises StockInError.
+    """
+    inventory_ids = {line["inventory_id"] for line in diff["inserts"]} | set(diff["deltas"])
+    inventory_items = fetch_inventory_items(client, inventory_ids)
+    check_inventory_items(diff["inserts"], inventory_items)
+    for inventory_id in diff["deltas"]:
+        if int(inventory_id) not in inventory_items:
+            raise StockInError(f"Inventory record not found for inventory_id {inventory_id}")
+
+
+def apply_receipt_diff(client, receipt_id, diff: dict) -> list:
+    """
+    Apply a diff_receipt_stock_ins() diff: one bulk upsert for the updated
+    rows, one bulk insert, one bulk delete and one batched inventory
+    adjustment. Returns the receipt's stockin rows after the edit, ordered
+    by id.
+    """
+    stock_ins = list(diff["stock_ins"])
+    if diff["updates"]:
+        client.table("stockin").upsert(diff["updates"]).execute()
+    if diff["inserts"]:
+        inserted = client.table("stockin") \
+            .insert([{**line, "receipt_id": receipt_id} for line in diff["inserts"]]) \
+            .execute().data or []
+        stock_ins.extend(inserted)
+    if diff["deletes"]:
+        client.table("stockin").delete().in_("id", diff["deletes"]).execute()
+    if diff["updates"] or diff["inserts"] or diff["deletes"]:
+        bump_table_versions("stockin")
+    adjust_inventory(client, diff["deltas"].items())
+    return sorted(stock_ins, key=lambda row: row["id"])
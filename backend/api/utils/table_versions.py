@@ -0,0 +1,88 @@
+# utils/table_versions.py
+
+# Per-table version counters for conditional GETs. Views that write a table
+# call bump_table_versions() after the write; page endpoints decorated with
+# @versioned_etag(...) derive a strong ETag from the versions of the tables
+# they read and answer a matching If-None-Match with 304 before any Supabase
+# query runs.
+#
+# Versions live in the Django cache. A missing version (first use, restart,
+# eviction or expiry) is seeded with a random token rather than 0, so an
+# unknown state can never reproduce an old ETag; the TTL bounds how long
+# writes made outside these views (e.g. from the Supabase dashboard) can go
+# unnoticed. The cache is shared by every worker process (see CACHES in
+# settings), so a bump made by one worker is seen by all of them.
+import functools
+import hashlib
+import uuid
+
+from django.core.cache import cache
+from rest_framework import status
+from rest_framework.response import Response
+
+CACHE_KEY_PREFIX = "table_version:"
+VERSION_TTL = 3600
+
+
+def _version_key(table: str) -> str:
+    return f"{CACHE_KEY_PREFIX}{table}"
+
+
+def get_table_versions(*tables: str) -> dict:
+    """Return {table: version token}, seeding tables that have none yet."""
+    keys = {_version_key(table): table for table in tables}
+    versions = {keys[key]: value for key, value in cache.get_many(list(keys)).items()}
+    missing = {key: uuid.uuid4().hex for key, table in keys.items() if table not in versions}
+    if missing:
+        for key, value in missing.items():
+            # add() keeps a token another request seeded in the meantime
+            if not cache.add(key, value, timeout=VERSION_TTL):
+                value = cache.get(key, value)
+            versions[keys[key]] = value
+    return versions
+
+
+def bump_table_versions(*tables: str) -> None:
+    """Give the given tables new versions after a write."""
+    cache.set_many({_version_key(table): uuid.uuid4().hex for table in tables}, timeout=VERSION_TTL)
+
+
+def compute_etag(name: str, tables) -> str:
+    """Strong ETag for endpoint `name` built from the versions of `tables`."""
+    versions = get_table_versions(*tables)
+    digest = hashlib.sha1(name.encode("utf-8"))
+    for table in sorted(versions):
+        digest.update(f"|{table}={versions[table]}".encode("utf-8"))
+    return f'"{digest.hexdigest()[:32]}"'
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
+
+
+def versioned_etag(*tables: str):
+    """
+    Decorate a GET view whose response depends only on `tables`.
+
+    - Requests whose If-None-Match matches the current ETag get an empty 304
+    - Successful responses carry the ETag and "Cache-Control: private,
+      no-cache" so browsers revalidate on every navigation
+    - The ETag is computed before the view runs, so a write that lands while
+      the view is building its payload yields a new ETag on the next request
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(request, *args, **kwargs):
+            etag = compute_etag(view.__name__, tables)
+            if _etag_matches(request.headers.get("If-None-Match", ""), etag):
+                response = Response(status=status.HTTP_304_NOT_MODIFIED)
+            else:
+                response = view(request, *args, **kwargs)
+                if response.status_code != status.HTTP_200_OK:
+                    return response
+            response["ETag"] = etag
+            response["Cache-Control"] = "private, no-cache"
+            return response
+        return wrapper
+    return decorator
@@ -13,18 +13,40 @@ from rest_framework import status
 from rest_framework.permissions import IsAuthenticated, AllowAny, BasePermission
 from rest_framework.authentication import BaseAuthentication
 from rest_framework import exceptions
-from django.http import JsonResponse
+from django.conf import settings
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
 from .serializers import *
 from .models import *
-from .supabase_client import supabase_anon, supabase_service, jwt_secret, is_valid_supabase_token 
+from .supabase_client import supabase_anon, supabase_service, jwt_secret, is_valid_supabase_token, decode_supabase_token
 from django.views.decorators.csrf import csrf_exempt
 import json
 import jwt
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 import base64
+import hmac
 import io
+import math
 from django.utils.timezone import now
-from .utils.conversion import convert_value, CONVERSION_FACTORS
+from .utils.conversion import convert_value
+from .utils.auth_cache import get_cached_auth_context, cache_auth_context, invalidate_employee_auth
+from .utils.staff_sessions import issue_staff_session, verify_staff_session, revoke_staff_session, revoke_employee_staff_sessions
+from .utils.auth_users import get_auth_user_emails, find_auth_user_id_by_email, invalidate_auth_user_emails
+from .utils.inventory import adjust_inventory, prefetch_deduction_data, compute_ingredient_deductions, apply_ingredient_deductions
+from .utils.stockins import StockInError, validate_stock_in_lines, post_stockin_receipt, stock_in_cost, diff_receipt_stock_ins, check_receipt_diff, apply_receipt_diff
+from .utils.reference_cache import get_reference_data, invalidate_reference_data
+from .utils.sales_summary import refresh_daily_sales, transaction_sales_date, fetch_order_details, load_sales_pricing
+from .utils.pricing import PricingError, build_price_tables, calculation_breakdown, order_lines, price_order, price_orders, price_tables
+from .utils.pagination import parse_page_size, paginate, fetch_all_pages
+from .utils.availability import recompute_menu_availability, invalidate_availability_index, get_availability_version, wait_for_availability_change, covers, max_servings
+from .utils.sales_report import build_sales_report, GRANULARITIES as REPORT_GRANULARITIES
+from .utils.query_batch import run_queries
+from .utils.sales_export import iter_export_rows, iter_csv, iter_xlsx
+from .utils.date_ranges import business_today, month_range, parse_business_date, filter_timestamp_range, filter_date_range
+from .utils.attendance import fetch_attendance_by_date, fetch_employee_attendance, PRESENT_STATUS_ID, ABSENT_STATUS_ID
+from .utils.menu_images import menu_image_url, upload_menu_image, remove_menu_image
+from .utils.table_versions import versioned_etag, bump_table_versions
+from .utils.child_sync import sync_child_rows
+from .utils.metrics import registry as metrics_registry
 import uuid
 import  mimetypes
 from io import BytesIO
@@ -38,6 +60,11 @@ def authenticate_user(request):
     Authorization header, validates the token, retrieves the user from
     Supabase Auth, and looks up the corresponding employee record.
 
+    The token is verified locally against the project's JWT secret, and the
+    resolved employee/role context is cached per token (see
+    utils/auth_cache.py), so repeated calls with the same token make no
+    Supabase round-trips until the cache entry or the token expires.
+
     Assumptions:
       - The Supabase Auth user ID (UUID) is stored in the employee table's
         `user_id` column.
@@ -46,10 +73,11 @@ def authenticate_user(request):
 
     Returns:
         A dictionary containing:
-          - client: The Supabase client to use (authenticated or anonymous).
+          - client: The Supabase client to use for table queries.
           - token: The extracted JWT token.
           - auth_user_uuid: The UUID of the authenticated user.
           - employee_pk: The employee's primary key (integer) from the employee table.
+          - roles: The names of the roles assigned to the employee.
 
     Raises:
         Exception: If the token is missing/invalid, if the user cannot be retrieved,
@@ -61,38 +89,150 @@ def authenticate_user(request):
     if auth_header and auth_header.startswith("Bearer "):
         token = auth_header.split(" ")[1]
 
-    # Validate the token and select the appropriate Supabase client.
-    if token and is_valid_supabase_token(token):
-        client = supabase_service  # Use the authenticated client.
-    else:
-        client = supabase_anon     # Fall back to the anonymous client.
-
-    # Retrieve the user from Supabase Auth using the token.
-    user_response = supabase_service.auth.get_user(token)
-    if not (user_response and user_response.user):
+    if not token:
         raise Exception("Unauthorized. Could not fetch user.")
 
-    auth_user_uuid = user_response.user.id
+    auth_context = get_cached_auth_context(token)
+    if auth_context is None:
+        # Verify the token signature and expiry locally.
+        claims = decode_supabase_token(token)
+        if not claims:
+            raise Exception("Unauthorized. Could not fetch user.")
 
-    # Look up the employee record by matching the Supabase auth UUID with employee.user_id.
-    employee_lookup = client.table("employee") \
-        .select("id") \
-        .eq("user_id", auth_user_uuid) \
-        .single() \
-        .execute()
+        auth_user_uuid = claims["sub"]
+
+        # Look up the employee record and its role names in a single query.
+        employee_lookup = supabase_service.table("employee") \
+            .select("id, employee_role(role(role_name))") \
+            .eq("user_id", auth_user_uuid) \
+            .single() \
+            .execute()
+
+        if not employee_lookup.data:
+            raise Exception("Employee record not found.")
 
-    if not employee_lookup.data:
-        raise Exception("Employee record not found.")
+        roles = [
+            entry["role"]["role_name"]
+            for entry in employee_lookup.data.get("employee_role") or []
+            if entry.get("role")
+        ]
 
-    employee_pk = employee_lookup.data["id"]
+        auth_context = {
+            "auth_user_uuid": auth_user_uuid,
+            "employee_pk": employee_lookup.data["id"],
+            "roles": roles,
+        }
+        cache_auth_context(token, auth_context, claims["exp"])
 
     return {
-        "client": client,
+        "client": supabase_service,
         "token": token,
-        "auth_user_uuid": auth_user_uuid,
-        "employee_pk": employee_pk,
+        "auth_user_uuid": auth_context["auth_user_uuid"],
+        "employee_pk": auth_context["employee_pk"],
+        "roles": auth_context["roles"],
     }
 
+def is_admin_request(request):
+    """
+    Returns True if the request carries a valid Supabase token that belongs
+    to an employee with the "Admin" role. Used by the POS endpoints, which
+    let admins skip the per-action passcode verification.
+    """
+    auth_header = request.headers.get("Authorization")
+    if not (auth_header and auth_header.startswith("Bearer ")):
+        return False
+    try:
+        auth_data = authenticate_user(request)
+    except Exception as e:
+        print(f"Error checking admin status: {str(e)}")
+        return False
+    return "Admin" in auth_data["roles"]
+
+def verify_staff_passcode(employee_id, provided_email, entered_passcode):
+    """
+    Verifies a cashier's email and passcode against Supabase Auth: the
+    employee must be linked to an auth user registered with
+    `provided_email`, and the passcode must sign that user in.
+
+    Returns (employee, None) on success, or (None, error Response).
+    """
+    employee_response = (
+        supabase_service.table("employee")
+        .select("id, user_id, first_name, last_name")
+        .eq("id", employee_id)
+        .single()
+        .execute()
+    )
+    if not employee_response.data:
+        return None, Response({"error": "Employee not found."}, status=404)
+
+    employee = employee_response.data
+    if not employee.get("user_id"):
+        return None, Response({"error": "Employee not linked to an auth user."}, status=400)
+
+    # Fetch user details using the admin client.
+    user_response = supabase_service.auth.admin.get_user_by_id(employee["user_id"])
+    if not (user_response and user_response.user):
+        return None, Response({"error": "Unable to fetch user authentication details."}, status=404)
+
+    # Ensure the provided email matches the employee's registered email.
+    if provided_email.lower() != user_response.user.email.lower():
+        return None, Response(
+            {"error": "Provided email does not match the selected employee's email."},
+            status=400,
+        )
+
+    # Attempt to sign in using the provided email and passcode.
+    sign_in_response = supabase_service.auth.sign_in_with_password({
+        "email": provided_email,
+        "password": entered_passcode
+    })
+    if not getattr(sign_in_response, "user", None):
+        return None, Response({"error": "Invalid passcode."}, status=401)
+    # Sign out after successful sign in.
+    supabase_service.auth.sign_out()
+
+    return employee, None
+
+def verify_pos_staff(data, employee_id):
+    """
+    Verifies the employee performing a POS action (time in/out, orders,
+    disposals).
+
+    A `staff_session` token issued to the same employee on this terminal
+    (`terminal_id`) is checked locally without calling Supabase Auth (see
+    utils/staff_sessions.py). Otherwise `email` and `passcode` are verified
+    with verify_staff_passcode and, when the request names its terminal, a
+    new session is issued.
+
+    Returns (staff_session, error_response):
+      - staff_session: the newly issued {"token", "expires_in"} to hand back
+        to the terminal, or None when an existing session was used
+      - error_response: a Response to return as is when verification fails
+    """
+    terminal_id = data.get("terminal_id")
+    session_token = data.get("staff_session")
+    if verify_staff_session(session_token, employee_id, terminal_id):
+        return None, None
+
+    provided_email = data.get("email")
+    entered_passcode = data.get("passcode")
+    if not employee_id or not entered_passcode or not provided_email:
+        if session_token:
+            return None, Response(
+                {"error": "Staff session expired. Please verify again.", "code": "staff_session_expired"},
+                status=401,
+            )
+        return None, Response({"error": "Missing employee verification fields."}, status=400)
+
+    employee, error_response = verify_staff_passcode(employee_id, provided_email, entered_passcode)
+    if error_response:
+        return None, error_response
+
+    if not terminal_id:
+        return None, None
+    return issue_staff_session(employee["id"], terminal_id), None
+
 class SupabaseAuthentication(BaseAuthentication):
     def authenticate(self, request):
         try:
@@ -131,37 +271,8 @@ class SupabaseIsAdmin(BasePermission):
         if not employee_pk:
             return False
 
-        try:
-            # Query the employee_role table to get the role IDs for this employee.
-            role_mapping = supabase_service.table("employee_role") \
-                .select("role_id") \
-                .eq("employee_id", employee_pk) \
-                .execute()
-
-            if not role_mapping.data:
-                return False
-
-            # Extract role IDs from the mapping.
-            role_ids = [entry["role_id"] for entry in role_mapping.data]
-
-            # Now query the role table to retrieve the role names corresponding to these IDs.
-            roles_response = supabase_service.table("role") \
-                .select("role_name") \
-                .in_("id", role_ids) \
-                .execute()
-
-            if not roles_response.data:
-                return False
-
-            role_names = [role["role_name"] for role in roles_response.data]
-
-            # Check if "Admin" is one of the roles.
-            return "Admin" in role_names
-
-        except Exception as e:
-            # Optionally log the error here.
-            print("Error in SupabaseIsAdmin permission:", e)
-            return False
+        # Role names are resolved (and cached) by authenticate_user.
+        return "Admin" in request.user.get("roles", [])
 
 
 # LOGIN AS ADMIN
@@ -237,38 +348,31 @@ def fetch_employee_data(request):
         auth_data = authenticate_user(request)
         supabase_client = auth_data["client"]  # Use the authenticated client for table queries
 
-        # Fetch statuses
-        status_response = supabase_client.table("employee_status") \
-            .select("id, status_name") \
-            .execute()
-        statuses = status_response.data if status_response.data else []
-
-        # Fetch roles
-        roles_response = supabase_client.table("role") \
-            .select("id, role_name") \
-            .execute()
-        roles = roles_response.data if roles_response.data else []
-
-        # Fetch employees with roles and status
-        employee_response = supabase_client.table("employee") \
-            .select(
-                "id, first_name, last_name, contact, base_salary, user_id, "
-                "employee_role(role_id, role(id, role_name)), "
-                "employee_status(id, status_name)"
-            ) \
-            .execute()
-        employees = employee_response.data if employee_response.data else []
+        # Statuses, roles, employees with their roles and status, and the
+        # emails of every auth user (listed once through the admin API and
+        # cached) are independent reads, so run them concurrently.
+        results = run_queries({
+            "statuses": lambda: get_reference_data("employee_status", "id, status_name"),
+            "roles": lambda: get_reference_data("role", "id, role_name"),
+            "employees": lambda: supabase_client.table("employee")
+                .select("id, first_name, last_name, contact, base_salary, user_id, "
+                        "employee_role(role_id, role(id, role_name)), "
+                        "employee_status(id, status_name)")
+                .execute().data or [],
+            "user_emails": lambda: get_auth_user_emails(supabase_client),
+        })
+        statuses = results["statuses"]
+        roles = results["roles"]
+        employees = results["employees"]
+        user_emails = results["user_emails"]
 
-        # Reformat the employee data and fetch auth details for each employee using the admin client.
+        # Reformat the employee data with each employee's auth email.
         formatted_employees = []
         for employee in employees:
             user_email = None
             if employee.get("user_id"):
-                # Use the admin client (with service role key) to fetch user details.
-                user_response = supabase_client.auth.admin.get_user_by_id(employee["user_id"])
-                if user_response and user_response.user:
-                    user_email = user_response.user.email
-                else:
+                user_email = user_emails.get(str(employee["user_id"]))
+                if user_email is None:
                     # Optionally, log the failure to fetch user details.
                     print(f"Could not fetch auth details for user_id: {employee['user_id']}")
 
@@ -314,21 +418,8 @@ def add_employee(request):
         supabase_client = auth_data["client"]
         employee_pk = auth_data["employee_pk"]
 
-        # Step 3: Check if the employee has an Admin role using the integer primary key.
-        admin_role_check = supabase_client.table("employee_role") \
-            .select("role_id") \
-            .eq("employee_id", employee_pk) \
-            .execute()
-
-        user_roles = admin_role_check.data if admin_role_check.data else []
-        role_ids = [role["role_id"] for role in user_roles]
-
-        role_names_response = supabase_client.table("role") \
-            .select("id, role_name") \
-            .in_("id", role_ids) \
-            .execute()
-
-        role_names = [role["role_name"] for role in role_names_response.data if "role_name" in role]
+        # Step 3: Check if the employee has an Admin role (resolved by authenticate_user).
+        role_names = auth_data["roles"]
 
         if "Admin" not in role_names:
             return Response({"error": "Forbidden. Only Admin users can add employees."}, status=403)
@@ -345,12 +436,11 @@ def add_employee(request):
         roles = data.get("roles", [])    # List of role IDs.
 
         # Step 5: Check if the employee (user) already exists in Supabase Auth.
-        existing_users_response = supabase_client.auth.admin.list_users()
-        user = next((user_data for user_data in existing_users_response if user_data.email == email), None)
+        existing_user_id = find_auth_user_id_by_email(supabase_client, email)
 
         # Use the existing user's UUID or create a new one.
-        if user:
-            new_employee_user_uuid = user.id
+        if existing_user_id:
+            new_employee_user_uuid = existing_user_id
         else:
             auth_response = supabase_client.auth.admin.create_user({
                 "email": email,
@@ -360,6 +450,7 @@ def add_employee(request):
             if not auth_response or not hasattr(auth_response, 'user'):
                 return Response({"error": "Failed to create user in Supabase Auth"}, status=500)
             new_employee_user_uuid = auth_response.user.id
+            invalidate_auth_user_emails()
 
         # Step 6: Insert the new employee record.
         insert_data = {
@@ -372,6 +463,7 @@ def add_employee(request):
             "status_id": 1  # Automatically assign Active status.
         }
         response = supabase_client.table("employee").insert(insert_data).execute()
+        bump_table_versions("employee")
         if not response.data:
             return Response({"error": "Failed to create employee"}, status=500)
 
@@ -413,6 +505,7 @@ def delete_employee(request, employee_id):
         # Delete the authentication record from Supabase Auth.
         # This call removes the user's auth details (email, password, etc.).
         supabase_client.auth.admin.delete_user(target_employee_user_id)
+        invalidate_auth_user_emails()
         # Optionally, inspect delete_auth_response for any errors.
 
         # Delete associated roles first.
@@ -420,6 +513,9 @@ def delete_employee(request, employee_id):
 
         # Delete the employee record.
         supabase_client.table("employee").delete().eq("id", employee_id).execute()
+        bump_table_versions("employee")
+        invalidate_employee_auth(employee_id)
+        revoke_employee_staff_sessions(employee_id)
 
         return Response({"message": "Employee deleted successfully"}, status=200)
 
@@ -439,25 +535,11 @@ def edit_employee(request, employee_id):
         employee_pk = auth_data["employee_pk"]  # Authenticated employee ID
 
         # Step 2: Check if the authenticated user is an Admin
-        admin_role_check = client.table("employee_role") \
-            .select("role_id") \
-            .eq("employee_id", employee_pk) \
-            .execute()
+        role_names = auth_data["roles"]
 
-        user_roles = admin_role_check.data if admin_role_check.data else []
-        role_ids = [role["role_id"] for role in user_roles]
-
-        if not role_ids:
+        if not role_names:
             return Response({"error": "Unauthorized. No roles assigned."}, status=403)
 
-        # Fetch role names
-        role_names_response = client.table("role") \
-            .select("id, role_name") \
-            .in_("id", role_ids) \
-            .execute()
-
-        role_names = [role["role_name"] for role in role_names_response.data] if role_names_response.data else []
-
         is_admin = "Admin" in role_names
 
         # Restrict access: Only Admins can edit
@@ -487,6 +569,7 @@ def edit_employee(request, employee_id):
         }
 
         client.table("employee").update(update_data).eq("id", employee_id).execute()
+        bump_table_versions("employee")
 
         # Step 5: Update Supabase Auth if email or password is changed
         employee_record = client.table("employee").select("user_id").eq("id", employee_id).execute()
@@ -503,6 +586,8 @@ def edit_employee(request, employee_id):
 
         if auth_update_data:
             client.auth.admin.update_user_by_id(auth_user_id, auth_update_data)
+            if email:
+                invalidate_auth_user_emails()
 
         # Step 6: Update employee roles if needed
         new_roles = set(roles)
@@ -519,6 +604,10 @@ def edit_employee(request, employee_id):
             if role_entries:
                 client.table("employee_role").insert(role_entries).execute()
 
+        # Cached auth contexts and staff sessions still carry the old roles/credentials.
+        invalidate_employee_auth(employee_id)
+        revoke_employee_staff_sessions(employee_id)
+
         return Response({"message": "Employee updated successfully", "employee_id": employee_id}, status=200)
 
     except Exception as e:
@@ -527,17 +616,6 @@ def edit_employee(request, employee_id):
 
 # ATTENDANCE 
 
-def extract_date(timestamp_str):
-    """
-    Extract the date portion from a timestamp string.
-    If the timestamp contains a "T", split on it;
-    otherwise, split on a space.
-    """
-    if "T" in timestamp_str:
-        return timestamp_str.split("T")[0]
-    else:
-        return timestamp_str.split(" ")[0]
-
 @api_view(['GET'])
 @authentication_classes([])
 @permission_classes([AllowAny])
@@ -548,22 +626,22 @@ def fetch_attendance_data(request):
     """
     try:
         # Retrieve the date parameter (format: YYYY-MM-DD) from the query string or POST data.
-        date_str = request.GET.get("date") or request.data.get("date")
-        if not date_str:
-            date_str = datetime.now().strftime("%Y-%m-%d")
-
-        # Query for active employees and their attendance details for the specified date.
-        response = supabase_anon.table("employee").select(
-            "id, first_name, last_name, "
-            "employee_status:employee_status(id, status_name), "
-            "attendance:attendance(attendance_status:attendance_status(id, status_name), "
-            "attendance_time:attendance_time(time_in, time_out))"
-        ).eq("employee_status.id", 1).execute()
-
-        employees = response.data if response.data else []
-        attendance_data = []
+        try:
+            day = parse_business_date(request.GET.get("date") or request.data.get("date"))
+        except ValueError as e:
+            return Response({"error": str(e)}, status=400)
+
+        # Active employees and only the attendance records for the requested date.
+        results = run_queries({
+            "employees": lambda: supabase_anon.table("employee").select(
+                "id, first_name, last_name, "
+                "employee_status:employee_status(id, status_name)"
+            ).eq("employee_status.id", 1).execute().data or [],
+            "attendance": lambda: fetch_attendance_by_date(supabase_anon, day),
+        })
 
-        for emp in employees:
+        attendance_data = []
+        for emp in results["employees"]:
             # Safely get employee_status or default to empty dict
             emp_status = emp.get("employee_status", {})
             if not emp_status:
@@ -571,27 +649,20 @@ def fetch_attendance_data(request):
 
             full_name = f"{emp.get('first_name', '')} {emp.get('last_name', '')}".strip()
             employee_status = emp_status.get("status_name", "N/A")
-            attendance = emp.get("attendance", [])
 
-            # Initialize default values
+            # Default to absent when the employee has no record for the date
             current_attendance_status = "Absent"
             time_in = "-"
             time_out = "-"
 
-            # Process attendance records if they exist
-            if attendance:
-                if isinstance(attendance, list):
-                    for record in attendance:
-                        time_obj = record.get("attendance_time", {})
-                        t_in = time_obj.get("time_in")
-                        if t_in and extract_date(t_in) == date_str:
-                            status_obj = record.get("attendance_status", {})
-                            time_in = t_in
-                            time_out = time_obj.get("time_out", "-")
-                            current_attendance_status = (
-                                "Present" if status_obj.get("id") == 1 else "Absent"
-                            )
-                            break
+            record = results["attendance"].get(emp.get("id"))
+            if record:
+                time_obj = record["attendance_time"]
+                time_in = time_obj.get("time_in")
+                time_out = time_obj.get("time_out", "-")
+                current_attendance_status = (
+                    "Present" if record.get("attendance_status") == PRESENT_STATUS_ID else "Absent"
+                )
 
             attendance_data.append({
                 "id": emp.get("id"),
@@ -618,11 +689,13 @@ def time_in(request):
       - employee_id: the selected employee's id (from the employee table)
       - email: the provided email (from the frontend)
       - passcode: the entered 6-digit passcode
+      - terminal_id: optional POS terminal id; when given, the response carries a
+        verified staff session for that terminal (see utils/staff_sessions.py)
     
     Workflow:
       1. Verify the employee's credentials.
       2. Ensure that the provided email matches the email associated with the employee.
-      3. Query for existing attendance records for this employee (including joined attendance_time to check time_in).
+      3. Look up this employee's attendance record for today (filtered on attendance_time.time_in).
       4. If a record for today exists and is marked as absent (status = 2), update it to present (status = 1).
          Otherwise, create a new attendance record:
              a. Insert a new record into attendance_time with the current time_in.
@@ -638,76 +711,29 @@ def time_in(request):
         if not employee_id or not entered_passcode or not provided_email:
             return Response({"error": "Missing required fields."}, status=400)
 
-        # Query the employee record.
-        employee_response = (
-            supabase_service.table("employee")
-            .select("id, user_id, first_name, last_name")
-            .eq("id", employee_id)
-            .single()
-            .execute()
-        )
-        if not employee_response.data:
-            return Response({"error": "Employee not found."}, status=404)
-
-        employee = employee_response.data
-        if not employee.get("user_id"):
-            return Response({"error": "Employee not linked to an auth user."}, status=400)
-
-        # Fetch user details using the admin client.
-        user_response = supabase_service.auth.admin.get_user_by_id(employee["user_id"])
-        if not (user_response and user_response.user):
-            return Response({"error": "Unable to fetch user authentication details."}, status=404)
-
-        # Ensure the provided email matches the employee's registered email.
-        if provided_email.lower() != user_response.user.email.lower():
-            return Response(
-                {"error": "Provided email does not match the selected employee's email."},
-                status=400,
-            )
+        # Verify the passcode and start a staff session for this terminal.
+        employee, error_response = verify_staff_passcode(employee_id, provided_email, entered_passcode)
+        if error_response:
+            return error_response
+        terminal_id = request.data.get("terminal_id")
+        staff_session = issue_staff_session(employee["id"], terminal_id) if terminal_id else None
 
-        # Attempt to sign in using the provided email and passcode.
-        sign_in_response = supabase_service.auth.sign_in_with_password({
-            "email": provided_email,
-            "password": entered_passcode
-        })
-        if not getattr(sign_in_response, "user", None):
-            return Response({"error": "Invalid passcode."}, status=401)
-        # Sign out after successful sign in.
-        supabase_service.auth.sign_out()
-
-        # Determine today's date (as a string in YYYY-MM-DD format).
-        today_str = datetime.now().strftime("%Y-%m-%d")
-
-        # Query for existing attendance records for this employee,
-        # joining the related attendance_time (to check its time_in).
-        existing_response = supabase_service.table("attendance").select(
-            "id, attendance_status, attendance_time(time_in)"
-        ).eq("employee_id", employee_id).execute()
-
-        attendance_record = None
-        if existing_response.data:
-            for record in existing_response.data:
-                att_time = record.get("attendance_time")
-                if att_time and isinstance(att_time, dict):
-                    time_in_val = att_time.get("time_in")
-                    # Check if the time_in value starts with today's date.
-                    if time_in_val and time_in_val.startswith(today_str):
-                        attendance_record = record
-                        break
+        # Look up only this employee's attendance record for today.
+        attendance_record = fetch_employee_attendance(supabase_service, employee_id)
 
         if attendance_record:
             attendance_id = attendance_record["id"]
             # If the record is still marked absent (status = 2), update it to present (status = 1).
-            if attendance_record.get("attendance_status") == 2:
+            if attendance_record.get("attendance_status") == ABSENT_STATUS_ID:
                 update_response = supabase_service.table("attendance").update(
-                    {"attendance_status": 1}
+                    {"attendance_status": PRESENT_STATUS_ID}
                 ).eq("id", attendance_id).execute()
                 if not update_response.data:
                     return Response({"error": "Error updating attendance status."}, status=500)
         else:
             # 1. Insert a new record into the attendance_time table.
             new_time_record = {
-                "time_in": datetime.now().isoformat(),
+                "time_in": now().isoformat(),
                 "time_out": None
             }
             time_response = supabase_service.table("attendance_time").insert(new_time_record).execute()
@@ -718,7 +744,7 @@ def time_in(request):
             # 2. Insert a new attendance record referencing the new attendance_time.
             new_attendance = {
                 "employee_id": employee_id,
-                "attendance_status": 1,   # Mark as present.
+                "attendance_status": PRESENT_STATUS_ID,   # Mark as present.
                 "attendance_time": attendance_time_id
             }
             attendance_response = supabase_service.table("attendance").insert(new_attendance).execute()
@@ -735,7 +761,8 @@ def time_in(request):
             "employee": {
                 "id": employee.get("id"),
                 "name": full_name
-            }
+            },
+            "staff_session": staff_session
         })
 
     except Exception as e:
@@ -752,75 +779,29 @@ def time_out(request):
       - employee_id: the ID of the employee
       - email: employee's registered email
       - passcode: the entered 6-digit passcode
+      - staff_session, terminal_id: a verified staff session of this terminal,
+        accepted instead of email and passcode
 
     Steps:
-      1. Validate employee credentials.
-      2. Ensure the provided email matches the employee's registered email.
-      3. Authenticate the user using their passcode.
-      4. Check if there is an existing time-in record for today.
-      5. If time-in exists, update the corresponding attendance_time record with the time-out.
+      1. Verify the staff session, or validate the email and passcode.
+      2. Check if there is an existing time-in record for today.
+      3. If time-in exists, update the corresponding attendance_time record with the time-out.
+      4. End the employee's staff sessions.
 
     Note: Employees can only time out if they have already timed in for the same day.
     """
     try:
         employee_id = request.data.get("employee_id")
-        provided_email = request.data.get("email")
-        entered_passcode = request.data.get("passcode")
-
-        if not employee_id or not provided_email or not entered_passcode:
+        if not employee_id:
             return Response({"error": "Missing required fields."}, status=400)
 
-        # Query the employee record
-        employee_response = (
-            supabase_service.table("employee")
-            .select("id, user_id, first_name, last_name")
-            .eq("id", employee_id)
-            .single()
-            .execute()
-        )
-
-        if not employee_response.data:
-            return Response({"error": "Employee not found."}, status=404)
-
-        employee = employee_response.data
-        if not employee.get("user_id"):
-            return Response({"error": "Employee not linked to an auth user."}, status=400)
-
-        # Fetch user details using the admin client
-        user_response = supabase_service.auth.admin.get_user_by_id(employee["user_id"])
-        if not (user_response and user_response.user):
-            return Response({"error": "Unable to fetch user authentication details."}, status=404)
-
-        # Ensure provided email matches the employee's registered email
-        if provided_email.lower() != user_response.user.email.lower():
-            return Response({"error": "Email mismatch."}, status=400)
-
-        # Authenticate using the provided passcode
-        sign_in_response = supabase_service.auth.sign_in_with_password({
-            "email": provided_email,
-            "password": entered_passcode
-        })
-        if not getattr(sign_in_response, "user", None):
-            return Response({"error": "Invalid passcode."}, status=401)
-        # Sign out after successful sign-in
-        supabase_service.auth.sign_out()
-
-        # Get today's date
-        today_str = datetime.now().strftime("%Y-%m-%d")
+        # Verify the staff session or the email and passcode
+        _, error_response = verify_pos_staff(request.data, employee_id)
+        if error_response:
+            return error_response
 
         # Check if the employee has a time-in record for today
-        existing_response = supabase_service.table("attendance").select(
-            "id, attendance_status, attendance_time(id, time_in, time_out)"
-        ).eq("employee_id", employee_id).execute()
-
-        attendance_record = None
-        for record in existing_response.data:
-            att_time = record.get("attendance_time")
-            if att_time and isinstance(att_time, dict):
-                time_in_val = att_time.get("time_in")
-                if time_in_val and time_in_val.startswith(today_str):
-                    attendance_record = record
-                    break
+        attendance_record = fetch_employee_attendance(supabase_service, employee_id)
 
         if not attendance_record:
             return Response({"error": "No time-in record found for today."}, status=400)
@@ -833,12 +814,15 @@ def time_out(request):
 
         # Update attendance_time with the time-out
         update_response = supabase_service.table("attendance_time").update(
-            {"time_out": datetime.now().isoformat()}
+            {"time_out": now().isoformat()}
         ).eq("id", attendance_time_id).execute()
 
         if not update_response.data:
             return Response({"error": "Failed to update time-out."}, status=500)
 
+        # The shift is over: end the employee's staff sessions on every terminal
+        revoke_employee_staff_sessions(employee_id)
+
         return Response({
             "success": True,
             "message": "Time out successful."
@@ -848,6 +832,25 @@ def time_out(request):
         return Response({"error": str(e)}, status=500)
 
 
+@api_view(["POST"])
+@authentication_classes([])
+@permission_classes([AllowAny])
+def revoke_staff_session_view(request):
+    """
+    Ends a POS terminal's verified staff session (e.g. when a cashier
+    leaves the terminal). Expects {"staff_session": token}.
+    """
+    try:
+        token = request.data.get("staff_session")
+        if not token:
+            return Response({"error": "Missing staff session."}, status=400)
+        revoke_staff_session(token)
+        return Response({"success": True, "message": "Staff session ended."})
+
+    except Exception as e:
+        return Response({"error": str(e)}, status=500)
+
+
 @api_view(['GET'])
 @authentication_classes([])  # You can add authentication classes if needed
 @permission_classes([AllowAny])
@@ -856,26 +859,48 @@ def fetch_item_data(request):
     Fetches units, categories, items, inventory, stock-in and out data, menus, menu items, and menu types.
     """
     try:
-        # Fetch units
-        units_response = supabase_anon.table("unit_of_measurement") \
-            .select("id, symbol, unit_category, unit_category") \
-            .execute()
-        units = units_response.data if units_response.data else []
+        active_status_id = 1  # Adjust based on your actual "Active" status ID
 
-        # Fetch categories
-        categories_response = supabase_anon.table("item_category") \
-            .select("id, name") \
-            .execute()
-        categories = categories_response.data if categories_response.data else []
-
-        # Fetch items
-        items_response = supabase_anon.table("items") \
-            .select("id, name, stock_trigger, "
-                    "unit_of_measurement(id, symbol), "
-                    "item_category(id, name)"
-            ) \
-            .execute()
-        items = items_response.data if items_response.data else []
+        # None of the reads depend on each other, so run them concurrently
+        results = run_queries({
+            "units": lambda: get_reference_data("unit_of_measurement", "id, symbol, unit_category"),
+            "categories": lambda: get_reference_data("item_category", "id, name"),
+            "items": lambda: supabase_anon.table("items")
+                .select("id, name, category, measurement, stock_trigger, "
+                        "unit_of_measurement(id, symbol), "
+                        "item_category(id, name)")
+                .execute().data or [],
+            "inventory": lambda: supabase_anon.table("inventory").select("id, item, quantity").execute().data or [],
+            "suppliers": lambda: supabase_anon.table("supplier").select("id", "name").execute().data or [],
+            "receipts": lambda: supabase_anon.table("receipts")
+                .select("id, receipt_no, supplier (id, name), date")
+                .execute().data or [],
+            "stockins": lambda: supabase_anon.table("stockin")
+                .select("id, price, quantity_in, inventory_id, receipt_id")
+                .execute().data or [],
+            "employees": lambda: supabase_anon.table("employee")
+                .select("id, first_name, last_name, status_id")
+                .eq("status_id", active_status_id)
+                .execute().data or [],
+            "disposed_inventory": lambda: supabase_anon.table("disposed_inventory")
+                .select("id, inventory_id, disposed_quantity, disposed_unit(id, symbol), "
+                        "reason_id(id, name), disposer(id, first_name, last_name), disposal_datetime, other_reason, "
+                        "inventory(id, item, quantity, items(name))")
+                .execute().data or [],
+            "reason_disposal": lambda: get_reference_data("reason_of_disposal", "id, name"),
+            "menu_types": lambda: get_reference_data("menu_type", "id, name"),
+            "menu_statuses": lambda: get_reference_data("menu_status", "id, name"),
+            "menu_categories": lambda: get_reference_data("menu_category", "id, name"),
+            "menus": lambda: supabase_anon.table("menu_items")
+                .select("id, name, type_id, price, image, status_id, category_id")
+                .execute().data or [],
+            "menu_ingredients": lambda: supabase_anon.table("menu_ingredients")
+                .select("id, menu_id, inventory_id, quantity, unit_id")
+                .execute().data or [],
+        })
+        units = results["units"]
+        categories = results["categories"]
+        items = results["items"]
 	
         formatted_items = []
         for item in items:
@@ -891,17 +916,17 @@ def fetch_item_data(request):
                 "is_archived": item.get("is_archived", False)
             })
 
-        # Fetch inventory data
-        inventory_response = supabase_anon.table("inventory") \
-            .select("id, item, quantity") \
-            .execute()
-        inventory_data = inventory_response.data if inventory_response.data else []
+        inventory_data = results["inventory"]
 	
-	    # Format inventory with item details
+        # Index items and inventory by ID for O(1) lookups
+        items_by_id = {item["id"]: item for item in items}
+        inventory_by_id = {inventory["id"]: inventory for inventory in inventory_data}
+
+        # Format inventory with item details
         formatted_inventory = []
         for inventory in inventory_data:
             # Find the corresponding item data
-            item = next((i for i in items if i["id"] == inventory.get("item")), None)
+            item = items_by_id.get(inventory.get("item"))
             
             if item:
                 formatted_inventory.append({
@@ -913,65 +938,46 @@ def fetch_item_data(request):
                     "quantity": inventory.get("quantity", 0)
                 })
         
-        #Fetch suppliers
-
-        suppliers_response = supabase_anon.table("supplier") \
-            .select("id","name") \
-            .execute()
-        suppliers = suppliers_response.data if suppliers_response.data else []
+        suppliers = results["suppliers"]
+        receipts = results["receipts"]
 
-        # Fetch receipts
-        receipts_response = supabase_anon.table("receipts") \
-            .select("id, receipt_no, supplier (id, name), date") \
-            .execute()
-        receipts = receipts_response.data if receipts_response.data else []
+        # Group the stock-in records by receipt; inventory and item details
+        # are joined from the lookups above instead of being queried per
+        # stock-in.
+        stockins_by_receipt = {}
+        for stockin in results["stockins"]:
+            stockins_by_receipt.setdefault(stockin.get("receipt_id"), []).append(stockin)
 
         formatted_receipts = []
 
         for receipt in receipts:
-            receipt_id = receipt["id"]
-
-            # Fetch stock-in records for this receipt
-            stockins_response = supabase_anon.table("stockin") \
-                .select("id, price, quantity_in, inventory_id") \
-                .eq("receipt_id", receipt_id) \
-                .execute()
             stockins_data = []
 
-            if stockins_response.data:
-                for stockin in stockins_response.data:
-                    inventory_id = stockin.get("inventory_id")
-                    inventory_details = None
-                    item_details = None
-
-                    if inventory_id:
-                        inventory_response = supabase_anon.table("inventory") \
-                            .select("id, item, quantity") \
-                            .eq("id", inventory_id) \
-                            .execute()
-
-                        if inventory_response.data:
-                            inventory_details = inventory_response.data[0]
-                            item_id = inventory_details.get("item")
-
-                            if item_id:
-                                item_response = supabase_anon.table("items") \
-                                    .select("id, name, category, measurement, stock_trigger") \
-                                    .eq("id", item_id) \
-                                    .execute()
-
-                                item_details = item_response.data[0] if item_response.data else None
-
-                    stockins_data.append({
-                        "id": stockin["id"],
-                        "price": stockin["price"],
-                        "quantity_in": stockin["quantity_in"],
-                        "inventory": {
-                            "id": inventory_details["id"] if inventory_details else None,
-                            "current_stock": inventory_details["quantity"] if inventory_details else None,
-                            "item": item_details
-                        } if inventory_details else None
-                    })
+            for stockin in stockins_by_receipt.get(receipt["id"], []):
+                inventory_details = inventory_by_id.get(stockin.get("inventory_id"))
+                item_details = None
+
+                if inventory_details:
+                    item = items_by_id.get(inventory_details.get("item"))
+                    if item:
+                        item_details = {
+                            "id": item["id"],
+                            "name": item["name"],
+                            "category": item["category"],
+                            "measurement": item["measurement"],
+                            "stock_trigger": item["stock_trigger"]
+                        }
+
+                stockins_data.append({
+                    "id": stockin["id"],
+                    "price": stockin["price"],
+                    "quantity_in": stockin["quantity_in"],
+                    "inventory": {
+                        "id": inventory_details["id"],
+                        "current_stock": inventory_details["quantity"],
+                        "item": item_details
+                    } if inventory_details else None
+                })
 
             formatted_receipts.append({
                 "receipt_id": receipt["id"],
@@ -981,25 +987,10 @@ def fetch_item_data(request):
                 "stock_ins": stockins_data
             })
 
-        # Fetch employees
-        active_status_id = 1  # Adjust based on your actual "Active" status ID
-
-        employees_response = supabase_anon.table("employee") \
-            .select("id, first_name, last_name, status_id") \
-            .eq("status_id", active_status_id) \
-            .execute()
-
-        employees = employees_response.data if employees_response.data else []
-
-        # Fetch disposed inventory
-        # Fetch disposed inventory with related item details
-        disposed_inventory_response = supabase_anon.table("disposed_inventory") \
-            .select("id, inventory_id, disposed_quantity, disposed_unit(id, symbol), "
-                    "reason_id(id, name), disposer(id, first_name, last_name), disposal_datetime, other_reason, "
-                    "inventory(id, item, quantity, items(name))") \
-            .execute()
+        employees = results["employees"]
 
-        disposed_inventory = disposed_inventory_response.data if disposed_inventory_response.data else []
+        # Disposed inventory with related item details
+        disposed_inventory = results["disposed_inventory"]
 
         formatted_disposed_inventory = []
         for disposal in disposed_inventory:
@@ -1018,62 +1009,25 @@ def fetch_item_data(request):
             })
 
             
-        # Fetch reasons of disposal
-        reason_disposal_response = supabase_anon.table("reason_of_disposal") \
-            .select("id, name") \
-            .execute()
-        reason_disposal = reason_disposal_response.data if reason_disposal_response.data else []
-
-        # Fetch menu types
-        menu_types_response = supabase_anon.table("menu_type") \
-            .select("id, name") \
-            .execute()
-        menu_types = menu_types_response.data if menu_types_response.data else []
-
-        # Fetch menu statuses
-        menu_statuses_response = supabase_anon.table("menu_status") \
-            .select("id, name") \
-            .execute()
-        menu_statuses = menu_statuses_response.data if menu_statuses_response.data else []
-
-        # Fetch menu categories
-        menu_categories_response = supabase_anon.table("menu_category") \
-            .select("id, name") \
-            .execute()
-        menu_categories = menu_categories_response.data if menu_categories_response.data else []
-
-        # Fetch menus
-        menus_response = supabase_anon.table("menu_items") \
-            .select("id, name, type_id, price, image, status_id, category_id") \
-            .execute()
-        menus = menus_response.data if menus_response.data else []
+        reason_disposal = results["reason_disposal"]
+        menu_types = results["menu_types"]
+        menu_statuses = results["menu_statuses"]
+        menu_categories = results["menu_categories"]
+        menus = results["menus"]
 
         formatted_menus = []
         for menu in menus:
-            # Generate a public URL for the image
-            image_url = None
-            if menu["image"]:
-                try:
-                    image_url = supabase_anon.storage.from_("menu-images").get_public_url(menu["image"])
-
-                except Exception as e:
-                    print(f"Error generating URL for image {menu['image']}: {e}")
-
             formatted_menus.append({
                 "id": menu["id"],
                 "name": menu["name"],
                 "type_id": menu["type_id"],
                 "category_id": menu["category_id"],
                 "price": menu["price"],
-                "image": image_url,
+                "image": menu_image_url(menu["image"]),
                 "status_id": menu["status_id"]
             })
 
-        # Fetch menu ingredients
-        menu_items_response = supabase_anon.table("menu_ingredients") \
-            .select("id, menu_id, inventory_id, quantity, unit_id") \
-            .execute()
-        menu_ingredients = menu_items_response.data if menu_items_response.data else []
+        menu_ingredients = results["menu_ingredients"]
 
         formatted_menu_ingredients = []
         for menu_ingredient in menu_ingredients:
@@ -1086,10 +1040,11 @@ def fetch_item_data(request):
             })
 
         # Combine menu items with their respective menu.
+        ingredients_by_menu = {}
+        for mi in formatted_menu_ingredients:
+            ingredients_by_menu.setdefault(mi["menu_id"], []).append(mi)
         for menu in formatted_menus:
-            menu["menu_ingredients"] = [
-                mi for mi in formatted_menu_ingredients if mi["menu_id"] == menu["id"]
-            ]
+            menu["menu_ingredients"] = ingredients_by_menu.get(menu["id"], [])
 
         return Response({
             "employees": employees,
@@ -1114,23 +1069,21 @@ def fetch_item_data(request):
 @api_view(['GET'])
 @authentication_classes([])
 @permission_classes([AllowAny])
+@versioned_etag("items", "item_category", "unit_of_measurement")
 def fetch_items_page_data(request):
     """Specialized endpoint for Items.jsx"""
     try:
-        # Use supabase_anon for data retrieval
-        items = supabase_anon.table('items').select('*').execute()
-        categories = supabase_anon.table('item_category').select('*').execute()
-        units = supabase_anon.table('unit_of_measurement').select('*').execute()
-        
-        # Process data into the expected format
-        items_data = items.data
-        categories_data = categories.data
-        units_data = units.data
+        # Use supabase_anon for data retrieval; the reads are independent
+        results = run_queries({
+            'items': lambda: supabase_anon.table('items').select('*').execute().data,
+            'categories': lambda: get_reference_data('item_category'),
+            'units': lambda: get_reference_data('unit_of_measurement'),
+        })
         
         return Response({
-            'items': items_data,
-            'categories': categories_data,
-            'units': units_data,
+            'items': results['items'],
+            'categories': results['categories'],
+            'units': results['units'],
         })
     except Exception as e:
         import traceback
@@ -1141,54 +1094,31 @@ def fetch_items_page_data(request):
 @api_view(['GET'])
 @authentication_classes([])
 @permission_classes([AllowAny])
+@versioned_etag("inventory", "items", "unit_of_measurement", "item_category", "employee", "reason_of_disposal")
 def fetch_inventory_page_data(request):
     """
     Enhanced endpoint for Inventory.jsx that includes items data
     """
     try:
-        # Fetch inventory with related item data
-        inventory_response = supabase_anon.table("inventory") \
-            .select("*, item:items(*)") \
-            .execute()
-        inventory_data = inventory_response.data if inventory_response.data else []
-        
-        # Fetch units
-        units_response = supabase_anon.table("unit_of_measurement") \
-            .select("*") \
-            .execute()
-        units_data = units_response.data if units_response.data else []
-        
-        # Fetch categories
-        categories_response = supabase_anon.table("item_category") \
-            .select("*") \
-            .execute()
-        categories_data = categories_response.data if categories_response.data else []
-        
-        # Fetch employees
-        employees_response = supabase_anon.table("employee") \
-            .select("id, first_name, last_name") \
-            .execute()
-        employees_data = employees_response.data if employees_response.data else []
-        
-        # Fetch disposal reasons
-        disposal_reason_response = supabase_anon.table("reason_of_disposal") \
-            .select("*") \
-            .execute()
-        disposal_reason_data = disposal_reason_response.data if disposal_reason_response.data else []
-        
-        # Fetch items (previously in fetch_items_page_data)
-        items_response = supabase_anon.table('items') \
-            .select('*') \
-            .execute()
-        items_data = items_response.data if items_response.data else []
+        # The reads are independent, so run them concurrently
+        results = run_queries({
+            # Inventory with related item data
+            'inventory': lambda: supabase_anon.table("inventory").select("*, item:items(*)").execute().data or [],
+            'units': lambda: get_reference_data("unit_of_measurement"),
+            'categories': lambda: get_reference_data("item_category"),
+            'employees': lambda: supabase_anon.table("employee").select("id, first_name, last_name").execute().data or [],
+            'disposalreason': lambda: get_reference_data("reason_of_disposal"),
+            # Items (previously in fetch_items_page_data)
+            'items': lambda: supabase_anon.table('items').select('*').execute().data or [],
+        })
         
         return Response({
-            'inventory': inventory_data,
-            'units': units_data,
-            'categories': categories_data,
-            'employees': employees_data,
-            'disposalreason': disposal_reason_data,
-            'items': items_data  # Added items data
+            'inventory': results['inventory'],
+            'units': results['units'],
+            'categories': results['categories'],
+            'employees': results['employees'],
+            'disposalreason': results['disposalreason'],
+            'items': results['items']  # Added items data
         })
     except Exception as e:
         import traceback
@@ -1199,23 +1129,28 @@ def fetch_inventory_page_data(request):
 @api_view(['GET'])
 @authentication_classes([])
 @permission_classes([AllowAny])
+@versioned_etag("receipts", "stockin", "items", "inventory", "unit_of_measurement", "supplier")
 def fetch_stockin_page_data(request):
     """Specialized endpoint for StockIn.jsx"""
     try:
-        # Use supabase_anon for data retrieval with foreign keys
-        receipts = supabase_anon.table('receipts').select('*').execute()
-        stockin_items = supabase_anon.table('stockin').select('*').execute()
-        suppliers = supabase_anon.table('supplier').select('*').execute()
-        items = supabase_anon.table('items').select('*').execute()
-        inventory = supabase_anon.table('inventory').select('*, item:items(*)').execute()
-        units = supabase_anon.table('unit_of_measurement').select('*').execute()
+        # Use supabase_anon for data retrieval with foreign keys; the reads
+        # are independent, so run them concurrently
+        results = run_queries({
+            'receipts': lambda: supabase_anon.table('receipts').select('*').execute().data,
+            'stockin': lambda: supabase_anon.table('stockin').select('*').execute().data,
+            'items': lambda: supabase_anon.table('items').select('*').execute().data,
+            'inventory': lambda: supabase_anon.table('inventory').select('*, item:items(*)').execute().data,
+            'units': lambda: get_reference_data('unit_of_measurement'),
+            'suppliers': lambda: get_reference_data('supplier'),
+        })
         
         # Extract data
-        receipts_data = receipts.data
-        stockin_items_data = stockin_items.data
-        suppliers_data = suppliers.data
-        inventory_data = inventory.data
-        items_data = items.data
+        receipts_data = results['receipts']
+        stockin_items_data = results['stockin']
+        suppliers_data = results['suppliers']
+        inventory_data = results['inventory']
+        items_data = results['items']
+        units_data = results['units']
         
         # Get all items indexed by ID for quick lookup
         items_lookup = {item['id']: item for item in items_data}
@@ -1283,7 +1218,7 @@ def fetch_stockin_page_data(request):
             'supplier': suppliers_data,
             'items': items_data,
             'inventory': inventory_data,
-            'units': units.data,
+            'units': units_data,
         })
     except Exception as e:
         import traceback
@@ -1294,41 +1229,41 @@ def fetch_stockin_page_data(request):
 @api_view(['GET'])
 @authentication_classes([])
 @permission_classes([AllowAny])
+@versioned_etag("menu_items", "menu_ingredients", "menu_category", "menu_status", "menu_type", "unit_of_measurement", "inventory", "items")
 def fetch_menu_data(request):
     """
     Optimized endpoint for Menu.jsx that fetches menu-related data
     with improved performance.
     """
     try:
-        # Fetch all data in parallel to save time on network requests
-        # Let's use multiple tasks to fetch different pieces of data simultaneously
-        
-        # 1. Fetch static reference data and menus in parallel
-        menu_categories_task = supabase_anon.table("menu_category").select("id, name").execute()
-        menu_statuses_task = supabase_anon.table("menu_status").select("id, name").execute()
-        menu_types_task = supabase_anon.table("menu_type").select("id, name").execute()
-        units_task = supabase_anon.table("unit_of_measurement").select("id, symbol, unit_category").execute()
-        menus_task = supabase_anon.table("menu_items").select("id, name, type_id, price, image, status_id, category_id").execute()
+        # 1. Fetch static reference data, menus and their ingredients in parallel.
+        # Every menu is returned, so the ingredients don't need the menu IDs first.
+        results = run_queries({
+            "menus": lambda: supabase_anon.table("menu_items").select("id, name, type_id, price, image, thumbnail, status_id, category_id").execute().data or [],
+            "ingredients": lambda: supabase_anon.table("menu_ingredients").select("*").execute().data or [],
+            "menu_categories": lambda: get_reference_data("menu_category", "id, name"),
+            "menu_statuses": lambda: get_reference_data("menu_status", "id, name"),
+            "menu_types": lambda: get_reference_data("menu_type", "id, name"),
+            "units": lambda: get_reference_data("unit_of_measurement", "id, symbol, unit_category"),
+        })
         
         # 2. Extract results
-        menu_categories = menu_categories_task.data if menu_categories_task.data else []
-        menu_statuses = menu_statuses_task.data if menu_statuses_task.data else []
-        menu_types = menu_types_task.data if menu_types_task.data else []
-        units = units_task.data if units_task.data else []
-        menus = menus_task.data if menus_task.data else []
+        menu_categories = results["menu_categories"]
+        menu_statuses = results["menu_statuses"]
+        menu_types = results["menu_types"]
+        units = results["units"]
+        menus = results["menus"]
         
-        # 3. Get all menu IDs for bulk ingredient query
-        menu_ids = [menu["id"] for menu in menus]
+        # 3. Get all menu IDs to match ingredients against
+        menu_ids = {menu["id"] for menu in menus}
         
-        # 4. Fetch all menu ingredients in a single query
-        all_ingredients = []
+        # 4. Group the menu ingredients
         inventory_ids = set()
         unit_ids = set()
         ingredients_by_menu = {}
         
         if menu_ids:
-            menu_ingredients_response = supabase_anon.table("menu_ingredients").select("*").in_("menu_id", menu_ids).execute()
-            all_ingredients = menu_ingredients_response.data if menu_ingredients_response.data else []
+            all_ingredients = [i for i in results["ingredients"] if i.get("menu_id") in menu_ids]
             
             # Group ingredients by menu_id and collect inventory/unit IDs
             for ingredient in all_ingredients:
@@ -1369,14 +1304,6 @@ def fetch_menu_data(request):
         # 7. Build formatted menu items with all their ingredients
         formatted_menus = []
         for menu in menus:
-            # Handle image URL
-            image_url = None
-            if menu["image"]:
-                try:
-                    image_url = supabase_anon.storage.from_("menu-images").get_public_url(menu["image"])
-                except Exception as e:
-                    print(f"Error generating URL for image {menu['image']}: {e}")
-            
             # Process this menu's ingredients
             menu_ingredients = []
             for ingredient in ingredients_by_menu.get(menu["id"], []):
@@ -1406,7 +1333,8 @@ def fetch_menu_data(request):
                 "type_id": menu["type_id"],
                 "category_id": menu["category_id"],
                 "price": menu["price"],
-                "image": image_url,
+                "image": menu_image_url(menu["image"]),
+                "thumbnail": menu_image_url(menu.get("thumbnail")),
                 "status_id": menu["status_id"],
                 "menu_ingredients": menu_ingredients
             })
@@ -1429,19 +1357,26 @@ def fetch_menu_data(request):
 @api_view(['GET'])
 @authentication_classes([])
 @permission_classes([AllowAny])
+@versioned_etag("disposed_inventory", "inventory", "items", "employee", "unit_of_measurement", "reason_of_disposal")
 def fetch_stockout_page_data(request):
     """Specialized endpoint for StockOut.jsx"""
     try:
-        # Fetch disposed inventory with better joins to ensure we get all related data
-        disposed_inventory_response = supabase_anon.table("disposed_inventory") \
-            .select("id, inventory_id, disposed_quantity, reason_id, disposer, disposal_datetime, other_reason, "
-                    "disposed_unit:unit_of_measurement(id, symbol), "
-                    "reason:reason_id(id, name), "
-                    "employee:disposer(id, first_name, last_name), "
-                    "inventory:inventory_id(id, item, items(id, name, measurement))") \
-            .execute()
+        # Fetch disposed inventory with better joins to ensure we get all related
+        # data, together with what the DisposedInventory modal needs
+        results = run_queries({
+            "disposed_inventory": lambda: supabase_anon.table("disposed_inventory")
+                .select("id, inventory_id, disposed_quantity, reason_id, disposer, disposal_datetime, other_reason, "
+                        "disposed_unit:unit_of_measurement(id, symbol), "
+                        "reason:reason_id(id, name), "
+                        "employee:disposer(id, first_name, last_name), "
+                        "inventory:inventory_id(id, item, items(id, name, measurement))")
+                .execute().data or [],
+            "employees": lambda: supabase_anon.table("employee").select("id, first_name, last_name").execute().data or [],
+            "units": lambda: get_reference_data("unit_of_measurement"),
+            "disposalreason": lambda: get_reference_data("reason_of_disposal", "id, name"),
+        })
 
-        disposed_inventory = disposed_inventory_response.data if disposed_inventory_response.data else []
+        disposed_inventory = results["disposed_inventory"]
 
         # Format the data like in fetch_item_data
         formatted_disposed_inventory = []
@@ -1486,27 +1421,11 @@ def fetch_stockout_page_data(request):
         if formatted_disposed_inventory and len(formatted_disposed_inventory) > 0:
             print("First disposed item:", formatted_disposed_inventory[0])
         
-        # Fetch additional data needed for the DisposedInventory modal
-        employees_response = supabase_anon.table("employee") \
-            .select("id, first_name, last_name") \
-            .execute()
-        employees = employees_response.data if employees_response.data else []
-        
-        units_response = supabase_anon.table("unit_of_measurement") \
-            .select("*") \
-            .execute()
-        units = units_response.data if units_response.data else []
-        
-        reason_disposal_response = supabase_anon.table("reason_of_disposal") \
-            .select("id, name") \
-            .execute()
-        reason_disposal = reason_disposal_response.data if reason_disposal_response.data else []
-        
         return Response({
             'disposed_inventory': formatted_disposed_inventory,
-            'employees': employees,
-            'units': units,
-            'disposalreason': reason_disposal
+            'employees': results["employees"],
+            'units': results["units"],
+            'disposalreason': results["disposalreason"]
         })
     except Exception as e:
         import traceback
@@ -1537,6 +1456,7 @@ def add_inventory(request): # MAIN PURPOSE OF THIS IS TO MAKE A NEW DATA ENTRY W
             "item": item_id,
             "quantity": 0
         }).execute()
+        bump_table_versions("inventory")
 
         if insert_response.data:
             # Return the created inventory record
@@ -1579,6 +1499,7 @@ def add_item(request):
             "category": category_id,
             "is_archived": False
         }).execute()
+        bump_table_versions("items")
 
         if insert_response.data:
             return Response({
@@ -1612,6 +1533,7 @@ def archive_item(request, item_id):
         archive_response = supabase_client.table("items").update({
             "is_archived": True
         }).eq("id", item_id).execute()
+        bump_table_versions("items")
 
         if archive_response.data:
             return Response({"message": "Item archived successfully."}, status=200)
@@ -1642,6 +1564,7 @@ def unarchive_item(request, item_id):
         unarchive_response = supabase_client.table("items").update({
             "is_archived": False
         }).eq("id", item_id).execute()
+        bump_table_versions("items")
 
         if unarchive_response.data:
             return Response({"message": "Item restored successfully."}, status=200)
@@ -1688,6 +1611,10 @@ def edit_item(request, item_id):
             "measurement": unit_id,
             "category": category_id
         }).eq("id", item_id).execute()
+        bump_table_versions("items")
+        invalidate_availability_index()
+        # A unit change alters every converted requirement, so re-check all menus
+        refresh_menu_availability()
 
         if update_response.data:
             return Response({"message": "Item updated successfully."}, status=200)
@@ -1741,6 +1668,7 @@ def delete_item(request, item_id):
         
         # Delete the item if it's not used in any menus
         delete_response = supabase_client.table("items").delete().eq("id", item_id).execute()
+        bump_table_versions("items")
 
         if delete_response.data:
             return Response({"message": "Item deleted permanently."}, status=200)
@@ -1772,6 +1700,7 @@ def add_category(request):
         insert_response = supabase_client.table("item_category").insert({
             "name": name
         }).execute()
+        invalidate_reference_data("item_category")
 
         if insert_response.data:
             return Response({
@@ -1810,6 +1739,7 @@ def edit_category(request, category_id):
         update_response = supabase_client.table("item_category").update({
             "name": new_name
         }).eq("id", category_id).execute()
+        invalidate_reference_data("item_category")
 
         if update_response.data:
             return Response({"message": "Item Category updated successfully."}, status=200)
@@ -1851,6 +1781,7 @@ def delete_category(request, category_id):
         
         # Delete category if no items are using it
         delete_response = supabase_client.table("item_category").delete().eq("id", category_id).execute()
+        invalidate_reference_data("item_category")
 
         if delete_response.data:
             return Response({"message": "Item Category deleted successfully."}, status=200)
@@ -1883,6 +1814,7 @@ def add_supplier(request):
         insert_response = supabase_client.table("supplier").insert({
             "name": name
         }).execute()
+        invalidate_reference_data("supplier")
 
         if insert_response.data:
             return Response({
@@ -1921,6 +1853,7 @@ def edit_supplier(request, supplier_id):
         update_response = supabase_client.table("supplier").update({
             "name": new_name
         }).eq("id", supplier_id).execute()
+        invalidate_reference_data("supplier")
 
         if update_response.data:
             return Response({"message": "Supplier updated successfully."}, status=200)
@@ -1950,6 +1883,7 @@ def delete_supplier(request, supplier_id):
 
         # Delete category
         delete_response = supabase_client.table("supplier").delete().eq("id", supplier_id).execute()
+        invalidate_reference_data("supplier")
 
         if delete_response.data:
             return Response({"message": "Supplier deleted successfully."}, status=200)
@@ -1959,14 +1893,28 @@ def delete_supplier(request, supplier_id):
     except Exception as e:
         return Response({"error": str(e)}, status=500)
     
+def refresh_menu_availability(inventory_ids=None, menu_ids=None):
+    """
+    Re-check the menus affected by an inventory or recipe change after the
+    main write succeeded. Failures are logged rather than raised, so the
+    caller's response is not affected; returns the changed menus.
+    """
+    try:
+        return recompute_menu_availability(supabase_anon, inventory_ids, menu_ids)
+    except Exception:
+        print(traceback.format_exc())
+        return []
+
+
 @api_view(['POST'])
 @authentication_classes([])
 @permission_classes([AllowAny])
 def add_stockin_data(request):
     """
     Handles stocking in items and adding it to the inventory.
-    Inserts a new item and updates the current quantity of the item in the inventory
-    Also creates an expense entry for the total cost of the stock-in
+    Validates every stock in entry first, then inserts the receipt and its stock in
+    entries, updates the inventory quantities and creates an expense entry for the
+    total cost in a single transaction: the receipt is either fully applied or not at all.
     """
     try:
         data = json.loads(request.body)
@@ -1982,112 +1930,25 @@ def add_stockin_data(request):
                 status=400
             )
         
-        receipt_response = supabase_anon.table("receipts").insert({
+        # Validate every entry against one inventory lookup before writing
+        try:
+            stock_in_lines = validate_stock_in_lines(supabase_anon, stock_ins)
+        except StockInError as e:
+            return Response({"error": str(e)}, status=400)
+        
+        # Post the receipt, stock ins, inventory quantities and expense in one transaction
+        posted = post_stockin_receipt(supabase_service, {
             "receipt_no": receipt_no,
             "supplier": supplier,
-            "date": date 
-        }).execute()
-
-        if not receipt_response.data:
-            return Response({"error": "Failed to add receipt."}, status=500)
-        
-        # Get the newly created receipt ID
-        receipt_id = receipt_response.data[0].get("id")
-        if not receipt_id:
-            return Response({"error": "Receipt ID not returned."}, status=500)
-        
-        # Calculate total cost for the expense entry
-        total_cost = 0
-        
-        # Process each stock in entry
-        for entry in stock_ins:
-            inventory_id = entry.get("inventory_id")
-            item_id = entry.get("item_id")
-            quantity_in = entry.get("quantity_in")
-            price = entry.get("price")
-
-            if not inventory_id or not item_id or quantity_in is None or price is None:
-                return Response(
-                    {"error": "All fields (inventory_id, item_id, quantity_in, price) are required for each stock in entry."},
-                    status=400
-                )
-            
-            try:
-                quantity_in = int(quantity_in)
-                price = float(price)
-                
-                # Add to total cost (price per unit * quantity)
-                total_cost += price * quantity_in
-                
-            except Exception:
-                return Response({"error": "Invalid quantity or price format."}, status=400)
-            
-            # Insert the Stock In records with the Receipt ID
-            stock_in_response = supabase_anon.table("stockin").insert({
-                "receipt_id": receipt_id,
-                "inventory_id": inventory_id,
-                "item_id": item_id,
-                "quantity_in": quantity_in,
-                "price": price
-            }).execute()
-            
-            if not stock_in_response.data:
-                return Response(
-                    {"error": f"Failed to add stock in entry for ID {inventory_id}."},
-                    status=500
-                )
-            
-            # Retrieve current inventory to update quantity
-            inventory_response = supabase_anon.table("inventory") \
-                .select("quantity, item") \
-                .eq("id", inventory_id) \
-                .execute()
-            
-            if not inventory_response.data or len(inventory_response.data) == 0:
-                return Response(
-                    {"error": f"Inventory record not found for ID {inventory_id}"},
-                    status=404
-                )
-            
-            inventory_record = inventory_response.data[0]
-            current_quantity = inventory_record.get("quantity", 0)
-
-            # Validate that the inventory's item matches the provided Item ID
-            if str(inventory_record.get("item")) != str(item_id):
-                return Response(
-                    {"error": f"Mismatch between provided Item ID {item_id} and inventory record for Inventory ID {inventory_id}."},
-                    status=400
-                )
-            
-            new_quantity = current_quantity + quantity_in
-
-            # Update the inventory record with the new quantity
-            update_response = supabase_service.table("inventory").update({
-                "quantity": new_quantity
-            }).eq("id", inventory_id).execute()
-
-            if not update_response.data:
-                return Response(
-                    {"error": f"Failed to update inventory for inventory_id {inventory_id}."},
-                    status=500
-                )
+            "date": date
+        }, stock_in_lines)
         
-        # Create expense entry for the total stock-in cost
-        expense_data = {
-            "type_id": 1,
-            "stockin_id": receipt_id,
-            "date": date,
-            "cost": total_cost
-        }
+        if not posted["receipt_id"]:
+            return Response({"error": "Failed to add receipt."}, status=500)
         
-        # Insert expense record
-        expense_response = supabase_service.table("expenses").insert(expense_data).execute()
+        stocked_inventory_ids = list(posted["inventory"])
         
-        if not expense_response.data:
-            return Response(
-                {"error": "Failed to create expense entry for stock-in."},
-                status=500
-            )
+        refresh_menu_availability(stocked_inventory_ids)
             
         return Response(
             {"message": "Receipt, stock in entries, and expense record added; inventory updated successfully."},
@@ -2105,10 +1966,12 @@ def edit_receipt_stockin_data(request, receipt_id):
     """
     Updates receipt details (receipt_no, supplier_name, date) and the associated stock-in entries.
     For each stock-in update:
-      - If a 'delete' flag is present and True, delete the existing record (if any) and adjust inventory.
+      - If a 'delete' flag is present and True, delete the existing record (if any).
       - Else, if an 'id' is provided, update the existing record.
       - If no 'id' is provided, insert a new stock-in entry.
-    Inventory quantities are adjusted based on the changes.
+    The updates are turned into one diff against the stored stock-in entries and validated
+    before anything is written; the diff is then applied with bulk calls and a single
+    inventory adjustment, and the expense cost is taken from the resulting entries.
     All changes are only committed when the user clicks the submit button.
     Returns the updated receipt (including updated stock_ins) so the frontend can immediately show new IDs.
     """
@@ -2128,134 +1991,51 @@ def edit_receipt_stockin_data(request, receipt_id):
                 status=400,
             )
 
+        # Load the receipt and its current stock-in entries
+        current = run_queries({
+            "receipt": lambda: supabase_service.table("receipts").select("*").eq("id", receipt_id).execute().data,
+            "stock_ins": lambda: supabase_service.table("stockin").select("*").eq("receipt_id", receipt_id).execute().data,
+        })
+        if not current["receipt"]:
+            return Response({"error": "Receipt not found."}, status=404)
+
+        # Compute and validate the changes before writing anything
+        try:
+            diff = diff_receipt_stock_ins(current["stock_ins"] or [], stock_in_updates)
+            check_receipt_diff(supabase_service, diff)
+        except StockInError as e:
+            return Response({"error": str(e)}, status=400)
+
         # Update receipt details
-        supabase_service.table("receipts").update({
+        receipt_fields = {
             "receipt_no": receipt_no,
             "supplier": supplier,
             "date": date
-        }).eq("id", receipt_id).execute()
-
-        # Process stock_in updates
-        for stock in stock_in_updates:
-            # If marked for deletion, process deletion and adjust inventory.
-            if stock.get("delete"):
-                if "id" in stock and stock["id"]:
-                    stockin_response = supabase_service.table("stockin") \
-                        .select("*") \
-                        .eq("id", stock["id"]).execute()
-                    if not stockin_response.data:
-                        return Response({"error": f"Stock-in record with id {stock['id']} not found."}, status=404)
-                    existing_stock = stockin_response.data[0]
-                    inventory_id = existing_stock.get("inventory_id")
-                    inv_response = supabase_service.table("inventory") \
-                        .select("quantity") \
-                        .eq("id", inventory_id).execute()
-                    if not inv_response.data:
-                        return Response({"error": f"Inventory record not found for inventory_id {inventory_id}"}, status=404)
-                    current_quantity = int(inv_response.data[0].get("quantity", 0))
-                    quantity_to_subtract = int(existing_stock.get("quantity_in", 0))
-                    new_inv_quantity = current_quantity - quantity_to_subtract
-                    supabase_service.table("inventory") \
-                        .update({"quantity": new_inv_quantity}) \
-                        .eq("id", inventory_id).execute()
-                    supabase_service.table("stockin") \
-                        .delete().eq("id", stock["id"]).execute()
-                # For new entries marked for deletion, nothing to do.
-                continue
+        }
+        supabase_service.table("receipts").update(receipt_fields).eq("id", receipt_id).execute()
+        bump_table_versions("receipts")
 
-            # Process updates for existing records.
-            if "id" in stock and stock["id"]:
-                stockin_id = stock["id"]
-                stockin_response = supabase_service.table("stockin") \
-                    .select("*").eq("id", stockin_id).execute()
-                if not stockin_response.data:
-                    return Response({"error": f"Stock-in record with id {stockin_id} not found."}, status=404)
-                existing_stock = stockin_response.data[0]
-                old_quantity = int(stock.get("old_quantity", existing_stock.get("quantity_in", 0)))
-                new_quantity = int(stock.get("quantity_in", 0))
-                price = float(stock.get("price", 0))
-                diff = new_quantity - old_quantity
-
-                supabase_service.table("stockin").update({
-                    "quantity_in": new_quantity,
-                    "price": price
-                }).eq("id", stockin_id).execute()
-
-                inventory_id = existing_stock.get("inventory_id")
-                inv_response = supabase_service.table("inventory") \
-                    .select("quantity").eq("id", inventory_id).execute()
-                if not inv_response.data:
-                    return Response({"error": f"Inventory record not found for inventory_id {inventory_id}"}, status=404)
-                current_quantity = int(inv_response.data[0].get("quantity", 0))
-                new_inv_quantity = current_quantity + diff
-                supabase_service.table("inventory").update({"quantity": new_inv_quantity}) \
-                    .eq("id", inventory_id).execute()
+        # Apply the stock-in changes and the net inventory deltas
+        updated_receipt = {**current["receipt"][0], **receipt_fields}
+        updated_receipt["stock_ins"] = apply_receipt_diff(supabase_service, receipt_id, diff)
 
-            else:
-                # Process insertion for new stockin entries.
-                inventory_id = stock.get("inventory_id")
-                item_id = stock.get("item_id")
-                if not inventory_id or not item_id or stock.get("quantity_in") is None or stock.get("price") is None:
-                    return Response({"error": "For new stock-in entries, inventory_id, item_id, quantity_in, and price are required."}, status=400)
-                try:
-                    quantity_in = int(stock.get("quantity_in"))
-                    price = float(stock.get("price"))
-                except ValueError:
-                    return Response({"error": "Invalid quantity or price format."}, status=400)
-                insert_response = supabase_service.table("stockin").insert({
-                    "receipt_id": receipt_id,
-                    "inventory_id": inventory_id,
-                    "item_id": item_id,
-                    "quantity_in": quantity_in,
-                    "price": price
-                }).execute()
-                if not insert_response.data:
-                    return Response({"error": f"Failed to add new stock-in entry for inventory_id {inventory_id}."}, status=500)
-                inv_response = supabase_service.table("inventory") \
-                    .select("quantity").eq("id", inventory_id).execute()
-                if not inv_response.data:
-                    return Response({"error": f"Inventory record not found for inventory_id {inventory_id}."}, status=404)
-                current_quantity = int(inv_response.data[0].get("quantity", 0))
-                new_quantity = current_quantity + quantity_in
-                supabase_service.table("inventory").update({"quantity": new_quantity}) \
-                    .eq("id", inventory_id).execute()
-
-        # Fetch updated receipt (with stockin entries)
-        updated_receipt_resp = supabase_service.table("receipts") \
-            .select("*").eq("id", receipt_id).execute()
-        if not updated_receipt_resp.data:
-            return Response({"error": "Receipt not found after update."}, status=404)
-        updated_receipt = updated_receipt_resp.data[0]
-        stockins_resp = supabase_service.table("stockin") \
-            .select("*").eq("receipt_id", receipt_id).execute()
-        updated_receipt["stock_ins"] = stockins_resp.data if stockins_resp.data else []
-
-        # Calculate new total cost for updated expense entry
-        total_cost = 0
-        stockins_resp = supabase_service.table("stockin") \
-            .select("*").eq("receipt_id", receipt_id).execute()
-        if stockins_resp.data:
-            for stock in stockins_resp.data:
-                quantity = int(stock.get("quantity_in", 0))
-                price = float(stock.get("price", 0))
-                total_cost += price * quantity
-
-        # Update the expense record
+        # Update the expense record with the new total cost
         expense_response = supabase_service.table("expenses") \
-            .update({"cost": total_cost}) \
+            .update({"cost": stock_in_cost(updated_receipt["stock_ins"])}) \
             .eq("stockin_id", receipt_id) \
             .execute()
 
         if not expense_response.data:
             return Response({"error": "Failed to update expense record."}, status=500)
 
+        if diff["deltas"]:
+            refresh_menu_availability(list(diff["deltas"]))
+
         return Response({
             "message": "Receipt and stock-in details updated successfully.",
             "receipt": updated_receipt
         }, status=200)
 
-    except ValueError:
-        return Response({"error": "Invalid quantity or price format. Ensure numeric values."}, status=400)
     except Exception as e:
         return Response({"error": str(e)}, status=500)
 
@@ -2278,17 +2058,14 @@ def delete_receipt(request, receipt_id):
         # Retrieve all associated stock-in entries.
         stockins_response = supabase_service.table("stockin").select("*").eq("receipt_id", receipt_id).execute()
         if stockins_response.data:
-            for stock in stockins_response.data:
-                inventory_id = stock.get("inventory_id")
-                quantity_in = int(stock.get("quantity_in", 0))
-                # Get the current inventory quantity.
-                inv_response = supabase_service.table("inventory").select("quantity").eq("id", inventory_id).execute()
-                if inv_response.data:
-                    current_quantity = int(inv_response.data[0].get("quantity", 0))
-                    # Subtract the stock-in quantity.
-                    new_quantity = current_quantity - quantity_in
-                    supabase_service.table("inventory").update({"quantity": new_quantity}).eq("id", inventory_id).execute()
-                else:
+            # Subtract every stock-in quantity from its inventory record in one atomic batch.
+            adjustments = [
+                (stock.get("inventory_id"), -int(stock.get("quantity_in", 0)))
+                for stock in stockins_response.data
+            ]
+            new_quantities = adjust_inventory(supabase_service, adjustments)
+            for inventory_id, delta in adjustments:
+                if delta and inventory_id not in new_quantities:
                     return Response({"error": f"Inventory record not found for inventory_id {inventory_id}"}, status=404)
         
             # Delete all stock-in entries for this receipt.
@@ -2302,6 +2079,9 @@ def delete_receipt(request, receipt_id):
 
         # Delete the receipt.
         delete_response = supabase_service.table("receipts").delete().eq("id", receipt_id).execute()
+        bump_table_versions("receipts", "stockin")
+        if stockins_response.data:
+            refresh_menu_availability([stock.get("inventory_id") for stock in stockins_response.data])
         if delete_response.data:
             return Response({"message": "Receipt, associated stock-in entries, and expense record deleted successfully."}, status=200)
         else:
@@ -2323,94 +2103,16 @@ def dispose_item(request):
         other_reason = data.get("other_reason", "")
         disposer_id = int(data.get("disposer"))  # Get disposer ID
 
-        # Employee verification data
-        provided_email = data.get("email")
-        entered_passcode = data.get("passcode")
-        
         # Check if we need to verify the employee (skip verification for admin users)
-        is_admin = False
-        auth_header = request.headers.get("Authorization")
-        if auth_header and auth_header.startswith("Bearer "):
-            token = auth_header.split(" ")[1]
-            if token and is_valid_supabase_token(token):
-                # Check if this token belongs to an admin user
-                try:
-                    user_response = supabase_service.auth.get_user(token)
-                    if user_response and user_response.user:
-                        auth_user_uuid = user_response.user.id
-                        
-                        # Look up the employee by user_id
-                        employee_lookup = supabase_service.table("employee") \
-                            .select("id") \
-                            .eq("user_id", auth_user_uuid) \
-                            .single() \
-                            .execute()
-                        
-                        if employee_lookup.data:
-                            admin_employee_pk = employee_lookup.data["id"]
-                            
-                            # Check if this employee has admin role
-                            role_mapping = supabase_service.table("employee_role") \
-                                .select("role_id") \
-                                .eq("employee_id", admin_employee_pk) \
-                                .execute()
-                            
-                            if role_mapping.data:
-                                role_ids = [entry["role_id"] for entry in role_mapping.data]
-                                
-                                # Get admin role ID
-                                admin_role = supabase_service.table("role") \
-                                    .select("id") \
-                                    .eq("role_name", "Admin") \
-                                    .single() \
-                                    .execute()
-                                
-                                if admin_role.data and admin_role.data["id"] in role_ids:
-                                    is_admin = True
-                except Exception as e:
-                    print(f"Error checking admin status: {str(e)}")
+        is_admin = is_admin_request(request)
         
-        # Skip verification for admin users
+        # Skip verification for admin users; otherwise accept this terminal's
+        # staff session or verify the email and passcode
+        staff_session = None
         if not is_admin:
-            # Verify employee credentials - similar to add_order function
-            if not disposer_id or not entered_passcode or not provided_email:
-                return Response({"error": "Missing employee verification fields."}, status=400)
-            
-            # Query the employee record
-            employee_response = (
-                supabase_service.table("employee")
-                .select("id, user_id, first_name, last_name")
-                .eq("id", disposer_id)
-                .single()
-                .execute()
-            )
-            if not employee_response.data:
-                return Response({"error": "Employee not found."}, status=404)
-                
-            employee = employee_response.data
-            if not employee.get("user_id"):
-                return Response({"error": "Employee not linked to an auth user."}, status=400)
-                
-            # Fetch user details using the admin client
-            user_response = supabase_service.auth.admin.get_user_by_id(employee["user_id"])
-            if not (user_response and user_response.user):
-                return Response({"error": "Unable to fetch user authentication details."}, status=404)
-                
-            # Ensure the provided email matches the employee's registered email
-            if provided_email.lower() != user_response.user.email.lower():
-                return Response(
-                    {"error": "Provided email does not match the selected employee's email."},
-                    status=400,
-                )
-                
-            # Attempt to sign in using the provided email and passcode
-            sign_in_response = supabase_service.auth.sign_in_with_password({
-                "email": provided_email,
-                "password": entered_passcode
-            })
-            
-            if not sign_in_response or not sign_in_response.user:
-                return Response({"error": "Invalid email or passcode."}, status=401)
+            staff_session, error_response = verify_pos_staff(data, disposer_id)
+            if error_response:
+                return error_response
 
         # 1. Fetch the inventory record.
         inv_response = supabase_anon.table("inventory").select("*").eq("id", inventory_id).execute()
@@ -2454,9 +2156,9 @@ def dispose_item(request):
         if converted_disposed_qty > current_inventory_quantity:
             return Response({"error": "Disposed quantity exceeds current inventory quantity."}, status=400)
 
-        # 6. Update inventory record.
-        new_inventory_qty = current_inventory_quantity - converted_disposed_qty
-        update_response = supabase_anon.table("inventory").update({"quantity": new_inventory_qty}).eq("id", inventory_id).execute()
+        # 6. Atomically subtract the disposed quantity from the inventory record.
+        new_quantities = adjust_inventory(supabase_service, [(inventory_id, -converted_disposed_qty)])
+        new_inventory_qty = new_quantities.get(inventory_id, current_inventory_quantity)
 
         # 7. Insert disposal record including disposer.
         disposed_data = {
@@ -2468,58 +2170,17 @@ def dispose_item(request):
             "disposer": disposer_id,  # Store disposer ID
         }
         insert_response = supabase_anon.table("disposed_inventory").insert(disposed_data).execute()
+        bump_table_versions("disposed_inventory")
 
-        # After successful disposal and inventory update
-        insert_response = supabase_anon.table("disposed_inventory").insert(disposed_data).execute()
-
-        # Instead of directly calling the update_menu_availability function,
-        # just perform similar operations inline
-        try:
-            affected_menu_items = []
-            
-            # Get menu ingredients that use the disposed inventory item
-            menu_ingredients = supabase_anon.table("menu_ingredients").select("menu_id").eq("inventory_id", inventory_id).execute()
-            
-            if menu_ingredients.data:
-                menu_ids = [item.get('menu_id') for item in menu_ingredients.data]
-                unique_menu_ids = list(set(menu_ids))  # Remove duplicates
-                
-                # Update status of affected menu items to unavailable if inventory is insufficient
-                for menu_id in unique_menu_ids:
-                    # Check if this menu item should be marked unavailable
-                    menu_item = supabase_anon.table("menu_items").select("*").eq("id", menu_id).execute().data[0]
-                    
-                    # Get the required quantity for this menu item from menu_ingredients
-                    required_response = supabase_anon.table("menu_ingredients").select("quantity").eq("menu_id", menu_id).eq("inventory_id", inventory_id).execute()
-
-                    if required_response.data:
-                        required_quantity = float(required_response.data[0].get('quantity', 0))
-                        
-                        # Check if remaining inventory is less than what's required
-                        if new_inventory_qty < required_quantity:
-                            supabase_anon.table("menu_items").update({
-                                "status_id": 2  # Unavailable
-                            }).eq("id", menu_id).execute()
-                            
-                            affected_menu_items.append({
-                                "menu_id": menu_id,
-                                "name": menu_item.get('name', 'Unknown'),
-                                "new_status": "Unavailable"
-                            })
-            
-            availability_updated = True
-            
-        except Exception as e:
-            # Don't fail the main function if availability update fails
-            availability_updated = False
-            affected_menu_items = []
+        # Re-check only the menus that use the disposed inventory record
+        affected_menu_items = refresh_menu_availability([inventory_id])
 
         return Response({
             "status": "success",
-            "inventory_update": update_response.data,
+            "inventory_update": [{"id": inventory_id, "quantity": new_inventory_qty}],
             "disposed_record": insert_response.data,
-            "menu_availability_updated": availability_updated,
-            "affected_menu_items": affected_menu_items if availability_updated else []
+            "affected_menu_items": affected_menu_items,
+            "staff_session": staff_session
         }, status=200)
 
     except Exception as e:
@@ -2548,27 +2209,22 @@ def add_menu_item(request):
         status_id = request.data.get("status_id")
         image = request.FILES.get("image")  # Access image from request.FILES
 
-        # Read the image data
-        image_data = image.read()
-
         # Validate the required fields
         if not name or not type_id or not price or not status_id or not image:
             return Response({"error": "All fields (name, type_id, price, image) are required."}, status=400)
 
-        # Handle image upload to Supabase Storage
-        image_filename = f"menu_images/menu-{name}-{type_id}.jpeg"
-        storage_response = supabase_client.storage.from_("menu-images").upload(image_filename, image_data, {"content-type": "image.jpeg"})
-
-        # Check if an error occurred during the upload
-        if not storage_response:
-            return Response({"error": "Failed to upload image to Supabase."}, status=500)
+        # Resize the image and upload it with its thumbnail to Supabase Storage
+        try:
+            image_paths = upload_menu_image(supabase_client, f"menu_images/menu-{name}-{type_id}.jpeg", image.read())
+        except ValueError as e:
+            return Response({"error": str(e)}, status=400)
 
         # Insert menu details into the Menu table
         menu_response = supabase_client.table("menu_items").insert({
             "name": name,
             "type_id": type_id,
             "price": price,
-            "image": image_filename,
+            **image_paths,
             "status_id": status_id,
             "category_id": category_id,
         }).execute()
@@ -2634,6 +2290,9 @@ def add_menu_item(request):
             if hasattr(menu_item_response, 'error') and menu_item_response.error:
                 return Response({"error": f"Failed to add menu item for inventory_id {inventory_id}."}, status=500)
 
+        invalidate_availability_index()
+        bump_table_versions("menu_items", "menu_ingredients")
+        refresh_menu_availability(menu_ids=[menu_id])
         return Response({"message": "Menu and menu items added successfully."}, status=201)
 
     except Exception as e:
@@ -2680,25 +2339,19 @@ def edit_menu_item(request, menu_id):
         if image_file:
             # Retrieve the current menu record to get the current image filename
             current_menu_response = supabase_client.table("menu_items").select("image").eq("id", menu_id).execute()
-            if current_menu_response.data and len(current_menu_response.data) > 0:
-                current_image = current_menu_response.data[0].get("image")
-                if current_image:
-                    # Delete the current image from Supabase Storage
-                    delete_image_response = supabase_client.storage.from_("menu-images").remove([current_image])
-                    # Optionally check for errors in deletion here
-                    if hasattr(delete_image_response, "error") and delete_image_response.error:
-                        # Log or handle deletion error as needed (here we just pass)
-                        pass
-
-            # Upload the new image file
-            image_data = image_file.read()
-            image_filename = f"menu_images/menu-{name}-{type_id}.jpeg"
-            storage_response = supabase_client.storage.from_("menu-images").upload(
-                image_filename, image_data, {"content-type": "image/jpeg"}
-            )
-            if not storage_response:
-                return Response({"error": "Failed to upload image to Supabase."}, status=500)
-            update_data["image"] = image_filename
+            current_image = current_menu_response.data[0].get("image") if current_menu_response.data else None
+
+            # Resize and upload the new image file with its thumbnail under a content-versioned path
+            try:
+                update_data.update(upload_menu_image(
+                    supabase_client, f"menu_images/menu-{name}-{type_id}.jpeg", image_file.read()
+                ))
+            except ValueError as e:
+                return Response({"error": str(e)}, status=400)
+
+            # Delete the previous image and its thumbnail unless the upload was identical
+            if current_image and current_image != update_data["image"]:
+                remove_menu_image(supabase_client, current_image)
 
         # Update the Menu record using update_data
         menu_update_response = supabase_client.table("menu_items").update(update_data).eq("id", menu_id).execute()
@@ -2717,12 +2370,8 @@ def edit_menu_item(request, menu_id):
         if not isinstance(menu_items, list) or len(menu_items) == 0:
             return Response({"error": "At least one menu item must be provided."}, status=400)
 
-        # Delete existing menu_ingredients records for this menu
-        delete_response = supabase_client.table("menu_ingredients").delete().eq("menu_id", menu_id).execute()
-        if hasattr(delete_response, "error") and delete_response.error:
-            return Response({"error": "Failed to delete existing menu items."}, status=500)
-
-        # Insert new menu_ingredients records
+        # Validate the recipe rows
+        menu_ingredients = []
         for item in menu_items:
             if not isinstance(item, dict):
                 return Response({"error": "Each menu item must be a dictionary."}, status=400)
@@ -2740,16 +2389,21 @@ def edit_menu_item(request, menu_id):
             except Exception:
                 return Response({"error": "Invalid quantity format."}, status=400)
 
-            menu_item_response = supabase_client.table("menu_ingredients").insert({
-                "menu_id": menu_id,
+            menu_ingredients.append({
                 "inventory_id": inventory_id,
                 "quantity": quantity,
                 "unit_id": unit_id,
-            }).execute()
+            })
 
-            if hasattr(menu_item_response, "error") and menu_item_response.error:
-                return Response({"error": f"Failed to add menu item for inventory_id {inventory_id}."}, status=500)
+        # Sync menu_ingredients by inventory item: unchanged rows keep their IDs
+        sync_child_rows(
+            supabase_client, "menu_ingredients", "menu_id", menu_id, menu_ingredients,
+            key_columns=("inventory_id",)
+        )
 
+        invalidate_availability_index()
+        bump_table_versions("menu_items", "menu_ingredients")
+        refresh_menu_availability(menu_ids=[menu_id])
         return Response({"message": "Menu and menu items updated successfully."}, status=200)
 
     except Exception as e:
@@ -2795,22 +2449,23 @@ def delete_menu_item(request, menu_id):
         # Retrieve the current menu record to get the image filename
         current_menu_response = supabase_client.table("menu_items").select("image").eq("id", menu_id).execute()
         if current_menu_response.data and len(current_menu_response.data) > 0:
-            current_image = current_menu_response.data[0].get("image")
-            if current_image:
-                # Delete the current image from Supabase Storage
-                delete_image_response = supabase_client.storage.from_("menu-images").remove([current_image])
-                # Optionally log or handle deletion errors; here we continue even if deletion fails
-                if hasattr(delete_image_response, "error") and delete_image_response.error:
-                    print("Warning: Failed to delete image from storage.")
+            # Delete the image and its thumbnail from Supabase Storage; continue even if this fails
+            try:
+                remove_menu_image(supabase_client, current_menu_response.data[0].get("image"))
+            except Exception as e:
+                print(f"Warning: Failed to delete image from storage: {e}")
 
         # Delete associated menu_ingredients records for this menu
         delete_menu_items_response = supabase_client.table("menu_ingredients").delete().eq("menu_id", menu_id).execute()
+        bump_table_versions("menu_ingredients")
+        invalidate_availability_index()
         
         if hasattr(delete_menu_items_response, "error") and delete_menu_items_response.error:
             return Response({"error": "Failed to delete associated menu items."}, status=500)
 
         # Delete the menu record itself
         delete_menu_response = supabase_client.table("menu_items").delete().eq("id", menu_id).execute()
+        bump_table_versions("menu_items")
         if hasattr(delete_menu_response, "error") and delete_menu_response.error:
             return Response({"error": "Failed to delete menu item."}, status=500)
 
@@ -2819,6 +2474,81 @@ def delete_menu_item(request, menu_id):
     except Exception as e:
         return Response({"error": f"Unexpected error: {e}"}, status=500)
 
+def format_order_menus(menus, menu_ingredients):
+    """
+    Shape menu rows for the order pages: public image and thumbnail URLs for
+    menus that have them and each menu's ingredients attached as
+    `menu_ingredients`.
+    """
+    menu_ingredients_dict = {}
+    for mi in menu_ingredients:
+        menu_ingredients_dict.setdefault(mi.get("menu_id"), []).append(mi)
+
+    formatted_menus = []
+    for menu in menus:
+        menu_data = {
+            "id": menu["id"],
+            "name": menu["name"],
+            "type_id": menu["type_id"],
+            "category_id": menu["category_id"],
+            "price": menu["price"],
+            "status_id": menu["status_id"],
+            "menu_ingredients": menu_ingredients_dict.get(menu["id"], [])
+        }
+        if menu.get("image"):
+            menu_data["image"] = menu_image_url(menu["image"])
+        if menu.get("thumbnail"):
+            menu_data["thumbnail"] = menu_image_url(menu["thumbnail"])
+        formatted_menus.append(menu_data)
+    return formatted_menus
+
+@api_view(['GET'])
+@authentication_classes([])
+@permission_classes([AllowAny])
+def fetch_order_reference_data(request):
+    """
+    Reference data for the order pages (menus with ingredients, menu types,
+    discounts, payment methods, statuses, active employees). It does not
+    depend on any transaction, so clients fetch it once and reuse it while
+    paging through fetch_order_data.
+    """
+    try:
+        results = run_queries({
+            "menus": lambda: supabase_anon.table("menu_items").select(
+                "id, name, type_id, price, status_id, category_id, image, thumbnail"
+            ).execute().data or [],
+            "menu_ingredients": lambda: supabase_anon.table("menu_ingredients").select(
+                "id, menu_id, inventory_id, quantity, unit_id"
+            ).execute().data or [],
+            "employees": lambda: supabase_anon.table("employee").select(
+                "id, first_name, last_name, employee_role(role_id)"
+            ).eq("status_id", 1).execute().data or [],
+            "menu_types": lambda: get_reference_data("menu_type", "id, name, deduction_percentage"),
+            "menu_statuses": lambda: get_reference_data("menu_status", "id, name"),
+            "menu_categories": lambda: get_reference_data("menu_category", "id, name"),
+            "discounts": lambda: get_reference_data("discounts", "id, type, percentage"),
+            "payment_methods": lambda: get_reference_data("payment_methods", "id, name"),
+            "instore_categories": lambda: get_reference_data("instore_category", "id, name, base_amount"),
+            "order_status_types": lambda: get_reference_data("order_status_type", "id, name"),
+        })
+
+        response = Response({
+            "menu_types": results["menu_types"],
+            "menu_statuses": results["menu_statuses"],
+            "menu_categories": results["menu_categories"],
+            "menu_items": format_order_menus(results["menus"], results["menu_ingredients"]),
+            "menu_ingredients": results["menu_ingredients"],
+            "discounts": results["discounts"],
+            "payment_methods": results["payment_methods"],
+            "instore_categories": results["instore_categories"],
+            "order_status_types": results["order_status_types"],
+            "employees": results["employees"]
+        })
+        response["Cache-Control"] = "private, max-age=60"
+        return response
+    except Exception as e:
+        return Response({"error": f"Error fetching order reference data: {str(e)}"}, status=500)
+
 @api_view(['GET'])
 @authentication_classes([])
 @permission_classes([AllowAny])   
@@ -2851,7 +2581,7 @@ def fetch_order_data(request, transactionId=None):
                 ).in_("id", menu_ids).execute().data or []
                 
                 # Always fetch all discounts for the component
-                discounts = supabase_anon.table("discounts").select("id, type, percentage").execute().data or []
+                discounts = get_reference_data("discounts", "id, type, percentage")
                 
                 instore_categories = supabase_anon.table("instore_category").select(
                     "id, name, base_amount"
@@ -2908,106 +2638,98 @@ def fetch_order_data(request, transactionId=None):
             except Exception as e:
                 return Response({"error": f"Error fetching transaction data: {str(e)}"}, status=500)
         
-        # For the main list view, implement pagination
-        # page = int(request.query_params.get('page', 1))
-        # page_size = int(request.query_params.get('page_size', 50))  # Default to 50 items per page
-        # offset = (page - 1) * page_size
-        
-        # Fetch essential reference data first
+        # The list view returns one keyset-paginated page of transactions; the
+        # menus, discounts and other lookups live in fetch_order_reference_data
         try:
-            menu_types = supabase_anon.table("menu_type").select("id, name, deduction_percentage").execute().data or []
-            menu_statuses = supabase_anon.table("menu_status").select("id, name").execute().data or []
-            menu_categories = supabase_anon.table("menu_category").select("id, name").execute().data or []
-            order_status_types = supabase_anon.table("order_status_type").select("id, name").execute().data or []
-            
-            # Always fetch ALL discounts since they're needed for the OrderEssentials component
-            discounts = supabase_anon.table("discounts").select("id, type, percentage").execute().data or []
-            
-            # Always fetch payment methods for OrderEssentials component
-            payment_methods = supabase_anon.table("payment_methods").select("id, name").execute().data or []
-            
-            # Always fetch instore categories for OrderEssentials component
-            instore_categories = supabase_anon.table("instore_category").select("id, name, base_amount").execute().data or []
-            
-            # Only fetch and process transactions with pagination
-            transactions = supabase_anon.table("transaction").select(
+            page_size = parse_page_size(request.query_params.get("page_size"))
+            cursor = request.query_params.get("cursor")
+            date_from = request.query_params.get("from")
+            date_to = request.query_params.get("to")
+            status_param = request.query_params.get("status")
+            employee_param = request.query_params.get("employee")
+
+            transactions_query = supabase_anon.table("transaction").select(
                 "id, date, payment_amount, order_status(id, name), payment_method, employee_id"
-            ).order("date", desc=True).execute().data or []
-            
-            # If using pagination: ("date", desc=True).range(offset, offset + page_size - 1)
-            
-            # Only fetch order details for these transactions
+            )
+            transactions_query = filter_timestamp_range(
+                transactions_query,
+                "date",
+                parse_business_date(date_from, default_today=False),
+                parse_business_date(date_to, default_today=False),
+            )
+            if status_param:
+                transactions_query = transactions_query.in_(
+                    "order_status", [int(status_id) for status_id in status_param.split(",")]
+                )
+            if employee_param:
+                transactions_query = transactions_query.eq("employee_id", int(employee_param))
+        except ValueError as e:
+            return Response({"error": f"Invalid query parameter: {str(e)}"}, status=400)
+
+        try:
+            page = paginate(transactions_query, "date", page_size, cursor)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=400)
+
+        try:
+            transactions = page["rows"]
             transaction_ids = [tx.get("id") for tx in transactions]
             if not transaction_ids:
-                # Return early with empty transactions but include reference data
                 return Response({
-                    "menu_types": menu_types,
-                    "menu_statuses": menu_statuses,
-                    "menu_categories": menu_categories,
-                    "order_status_types": order_status_types,
-                    "discounts": discounts,
-                    "payment_methods": payment_methods,
-                    "instore_categories": instore_categories,
-                    "transactions": []
+                    "transactions": [],
+                    "gcash_references": [],
+                    "next_cursor": None,
+                    "has_more": False,
+                    "page_size": page_size
                 })
             
-            # Fetch only order details for the paginated transactions
-            order_details = supabase_anon.table("order_details").select(
-                "id, quantity, menu_id, discount_id, instore_category, transaction_id, unli_wings_group"
-            ).in_("transaction_id", transaction_ids).execute().data or []
-            
-            # CHANGE 1: Fetch ALL menu items instead of only those in existing orders
-            menus = supabase_anon.table("menu_items").select(
-                "id, name, type_id, price, status_id, category_id, image"
-            ).execute().data or []
-            
-            # Only add image URLs for menus that have images
-            formatted_menus = []
-            for menu in menus:
-                menu_data = {
-                    "id": menu["id"],
-                    "name": menu["name"],
-                    "type_id": menu["type_id"],
-                    "category_id": menu["category_id"],
-                    "price": menu["price"],
-                    "status_id": menu["status_id"]
-                }
-                if menu.get("image"):
-                    menu_data["image"] = supabase_anon.storage.from_("menu-images").get_public_url(menu["image"])
-                formatted_menus.append(menu_data)
-            
-            # CHANGE 2: Fetch ALL menu ingredients instead of only those for menu items in existing orders
-            menu_ingredients = supabase_anon.table("menu_ingredients").select(
-                "id, menu_id, inventory_id, quantity, unit_id"
-            ).execute().data or []
-            
-            # Organize menu ingredients by menu_id for faster lookup
-            menu_ingredients_dict = {}
-            for mi in menu_ingredients:
-                menu_id = mi.get("menu_id")
-                if menu_id not in menu_ingredients_dict:
-                    menu_ingredients_dict[menu_id] = []
-                menu_ingredients_dict[menu_id].append(mi)
-            
-            # Attach ingredients to menus
-            for menu in formatted_menus:
-                menu["menu_ingredients"] = menu_ingredients_dict.get(menu["id"], [])
-                
-            # Fetch GCash references related to these transactions
-            gcash_references = supabase_anon.table("gcash_reference").select(
-                "id, name, attached_transaction, paid_amount"
-            ).in_("attached_transaction", transaction_ids).execute().data or []
+            # Order details, GCash references and employees of this page's
+            # transactions and the reference lookups are independent reads
+            page_employee_ids = list({tx["employee_id"] for tx in transactions if tx.get("employee_id")})
+            reads = {
+                "order_details": lambda: supabase_anon.table("order_details")
+                    .select("id, quantity, menu_id, discount_id, instore_category, transaction_id, unli_wings_group")
+                    .in_("transaction_id", transaction_ids)
+                    .execute().data or [],
+                "gcash_references": lambda: supabase_anon.table("gcash_reference")
+                    .select("id, name, attached_transaction, paid_amount")
+                    .in_("attached_transaction", transaction_ids)
+                    .execute().data or [],
+                "discounts": lambda: get_reference_data("discounts", "id, type, percentage"),
+                "instore_categories": lambda: get_reference_data("instore_category", "id, name, base_amount"),
+                "payment_methods": lambda: get_reference_data("payment_methods", "id, name"),
+            }
+            if page_employee_ids:
+                reads["employees"] = lambda: supabase_anon.table("employee") \
+                    .select("id, first_name, last_name, employee_role(role_id)") \
+                    .in_("id", page_employee_ids) \
+                    .execute().data or []
+            results = run_queries(reads)
+            order_details = results["order_details"]
+            gcash_references = results["gcash_references"]
+            employees = results.get("employees", [])
             
-            # Get relevant employees based on their active status
-            employees = supabase_anon.table("employee").select(
-                "id, first_name, last_name, employee_role(role_id)"
-            ).eq("status_id", 1).execute().data or []
+            # Menus referenced by this page, with their ingredients attached
+            page_menu_ids = list({od["menu_id"] for od in order_details if od.get("menu_id")})
+            menu_results = {"menus": [], "menu_ingredients": []}
+            if page_menu_ids:
+                menu_results = run_queries({
+                    "menus": lambda: supabase_anon.table("menu_items")
+                        .select("id, name, type_id, price, status_id, category_id, image, thumbnail")
+                        .in_("id", page_menu_ids)
+                        .execute().data or [],
+                    "menu_ingredients": lambda: supabase_anon.table("menu_ingredients")
+                        .select("id, menu_id, inventory_id, quantity, unit_id")
+                        .in_("menu_id", page_menu_ids)
+                        .execute().data or [],
+                })
+            formatted_menus = format_order_menus(menu_results["menus"], menu_results["menu_ingredients"])
             
             # Create dictionaries for faster lookups
             menu_dict = {menu["id"]: menu for menu in formatted_menus}
-            discount_dict = {discount["id"]: discount for discount in discounts}
-            instore_category_dict = {cat["id"]: cat for cat in instore_categories}
-            payment_method_dict = {method["id"]: method for method in payment_methods}
+            discount_dict = {discount["id"]: discount for discount in results["discounts"]}
+            instore_category_dict = {cat["id"]: cat for cat in results["instore_categories"]}
+            payment_method_dict = {method["id"]: method for method in results["payment_methods"]}
             employee_dict = {emp["id"]: emp for emp in employees}
             
             # Group order details by transaction ID for faster lookups
@@ -3060,20 +2782,13 @@ def fetch_order_data(request, transactionId=None):
                     "gcash_references": gcash_references_for_transaction
                 })
             
-            # Return the data needed for the order table and components
+            # Return one page of transactions plus the cursor for the next one
             return Response({
-                "menu_types": menu_types,
-                "menu_statuses": menu_statuses,
-                "menu_categories": menu_categories,
-                "menu_items": formatted_menus,
-                "menu_ingredients": menu_ingredients,
-                "discounts": discounts,
-                "payment_methods": payment_methods,
-                "instore_categories": instore_categories,
-                "order_status_types": order_status_types,
-                "employees": employees,
                 "transactions": formatted_transactions,
-                "gcash_references": gcash_references
+                "gcash_references": gcash_references,
+                "next_cursor": page["next_cursor"],
+                "has_more": page["has_more"],
+                "page_size": page_size
             })
             
         except Exception as e:
@@ -3085,28 +2800,26 @@ def fetch_order_data(request, transactionId=None):
 @api_view(['GET'])
 @authentication_classes([])
 @permission_classes([AllowAny])
+@versioned_etag("inventory", "items", "unit_of_measurement")
 def fetch_inventory_order_data(request):
     try:
-        # Fetch units of measurement
-        units_response = supabase_anon.table("unit_of_measurement").select("*").execute()
-        units = units_response.data if units_response.data else []
-        
-        # Fetch inventory items with their units and item information
-        inventory_response = supabase_anon.table("inventory").select(
-            "id, quantity, item, items(id, name, measurement, unit_of_measurement(id, symbol))"
-        ).execute()
-        inventory = inventory_response.data if inventory_response.data else []
-        
-        # Fetch items table
-        items_response = supabase_anon.table("items").select(
-            "id, name, measurement, unit_of_measurement(id, symbol)"
-        ).execute()
-        items = items_response.data if items_response.data else []
+        results = run_queries({
+            # Units of measurement
+            "units": lambda: get_reference_data("unit_of_measurement"),
+            # Inventory items with their units and item information
+            "inventory": lambda: supabase_anon.table("inventory").select(
+                "id, quantity, item, items(id, name, measurement, unit_of_measurement(id, symbol))"
+            ).execute().data or [],
+            # Items table
+            "items": lambda: supabase_anon.table("items").select(
+                "id, name, measurement, unit_of_measurement(id, symbol)"
+            ).execute().data or [],
+        })
         
         return Response({
-            "units": units,
-            "inventory": inventory,
-            "items": items
+            "units": results["units"],
+            "inventory": results["inventory"],
+            "items": results["items"]
         })
     except Exception as e:
         return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -3135,6 +2848,7 @@ def add_discount(request):
             "type": type,
             "percentage": percentage,
         }).execute()
+        invalidate_reference_data("discounts")
 
         if insert_response.data:
             return Response({
@@ -3176,6 +2890,7 @@ def edit_discount(request, discount_id):
             "type": new_type,
             "percentage": new_percentage
         }).eq("id", discount_id).execute()
+        invalidate_reference_data("discounts")
 
         if update_response.data:
             return Response({"message": "Discount updated successfully."}, status=200)
@@ -3204,6 +2919,7 @@ def delete_discount(request, discount_id):
 
         # Delete category
         delete_response = supabase_client.table("discounts").delete().eq("id", discount_id).execute()
+        invalidate_reference_data("discounts")
 
         if delete_response.data:
             return Response({"message": "Discount deleted successfully."}, status=200)
@@ -3241,6 +2957,7 @@ def edit_delivery_deduction(request, delivery_id):
         update_response = supabase_client.table("menu_type").update({
             "deduction_percentage": new_deduction
         }).eq("id", delivery_id).execute()
+        invalidate_reference_data("menu_type")
 
         if update_response.data:
             return Response({"message": "Delivery deduction percentage updated successfully."}, status=200)
@@ -3277,6 +2994,7 @@ def edit_unli_wings_base_amount(request, category_id):
         update_response = supabase_client.table("instore_category").update({
             "base_amount": new_base_amount
         }).eq("id", category_id).execute()
+        invalidate_reference_data("instore_category")
 
         if update_response.data:
             return Response({"message": "Unli Wings base amount updated successfully."}, status=200)
@@ -3308,6 +3026,7 @@ def add_menu_category(request):
         insert_response = supabase_client.table("menu_category").insert({
             "name": name
         }).execute()
+        invalidate_reference_data("menu_category")
 
         if insert_response.data:
             return Response({
@@ -3346,6 +3065,7 @@ def edit_menu_category(request, category_id):
         update_response = supabase_client.table("menu_category").update({
             "name": new_name
         }).eq("id", category_id).execute()
+        invalidate_reference_data("menu_category")
 
         if update_response.data:
             return Response({"message": "Menu Category updated successfully."}, status=200)
@@ -3391,6 +3111,7 @@ def delete_menu_category(request, category_id):
             
         # Delete category
         delete_response = supabase_client.table("menu_category").delete().eq("id", category_id).execute()
+        invalidate_reference_data("menu_category")
 
         if delete_response.data:
             return Response({"message": "Menu Category deleted successfully."}, status=200)
@@ -3412,98 +3133,19 @@ def add_order(request):
         payment_amount = data.get("payment_amount")  # Amount paid by customer
         reference_id = data.get("reference_id")  # Optional, can be null
         order_details = data.get("order_details", [])
-        # Employee verification data
-        provided_email = data.get("email")
-        entered_passcode = data.get("passcode")
-        
         if not order_details:
             return Response({"error": "No order details provided."}, status=status.HTTP_400_BAD_REQUEST)
         
         # Check if we need to verify the employee (skip verification for admin users)
-        is_admin = False
-        auth_header = request.headers.get("Authorization")
-        if auth_header and auth_header.startswith("Bearer "):
-            token = auth_header.split(" ")[1]
-            if token and is_valid_supabase_token(token):
-                # Check if this token belongs to an admin user
-                try:
-                    user_response = supabase_service.auth.get_user(token)
-                    if user_response and user_response.user:
-                        auth_user_uuid = user_response.user.id
-                        
-                        # Look up the employee by user_id
-                        employee_lookup = supabase_service.table("employee") \
-                            .select("id") \
-                            .eq("user_id", auth_user_uuid) \
-                            .single() \
-                            .execute()
-                        
-                        if employee_lookup.data:
-                            admin_employee_pk = employee_lookup.data["id"]
-                            
-                            # Check if this employee has admin role
-                            role_mapping = supabase_service.table("employee_role") \
-                                .select("role_id") \
-                                .eq("employee_id", admin_employee_pk) \
-                                .execute()
-                            
-                            if role_mapping.data:
-                                role_ids = [entry["role_id"] for entry in role_mapping.data]
-                                
-                                # Get admin role ID
-                                admin_role = supabase_service.table("role") \
-                                    .select("id") \
-                                    .eq("role_name", "Admin") \
-                                    .single() \
-                                    .execute()
-                                
-                                if admin_role.data and admin_role.data["id"] in role_ids:
-                                    is_admin = True
-                except Exception as e:
-                    print(f"Error checking admin status: {str(e)}")
+        is_admin = is_admin_request(request)
         
-        # Skip verification for admin users
+        # Skip verification for admin users; otherwise accept this terminal's
+        # staff session or verify the email and passcode
+        staff_session = None
         if not is_admin:
-            # Verify employee credentials - similar to time_in function
-            if not employee_id or not entered_passcode or not provided_email:
-                return Response({"error": "Missing employee verification fields."}, status=400)
-            
-            # Query the employee record
-            employee_response = (
-                supabase_service.table("employee")
-                .select("id, user_id, first_name, last_name")
-                .eq("id", employee_id)
-                .single()
-                .execute()
-            )
-            if not employee_response.data:
-                return Response({"error": "Employee not found."}, status=404)
-                
-            employee = employee_response.data
-            if not employee.get("user_id"):
-                return Response({"error": "Employee not linked to an auth user."}, status=400)
-                
-            # Fetch user details using the admin client
-            user_response = supabase_service.auth.admin.get_user_by_id(employee["user_id"])
-            if not (user_response and user_response.user):
-                return Response({"error": "Unable to fetch user authentication details."}, status=404)
-                
-            # Ensure the provided email matches the employee's registered email
-            if provided_email.lower() != user_response.user.email.lower():
-                return Response(
-                    {"error": "Provided email does not match the selected employee's email."},
-                    status=400,
-                )
-                
-            # Attempt to sign in using the provided email and passcode
-            sign_in_response = supabase_service.auth.sign_in_with_password({
-                "email": provided_email,
-                "password": entered_passcode
-            })
-            if not getattr(sign_in_response, "user", None):
-                return Response({"error": "Invalid passcode."}, status=401)
-            # Sign out after successful sign in
-            supabase_service.auth.sign_out()
+            staff_session, error_response = verify_pos_staff(data, employee_id)
+            if error_response:
+                return error_response
   
         # Continue with original add_order logic
         # Validate employee
@@ -3539,7 +3181,7 @@ def add_order(request):
         # Batch fetch discounts, if any
         discount_ids = list(set(order.get("discount_id") for order in order_details if order.get("discount_id")))
         discounts_data = supabase_anon.table("discounts").select("id, percentage").in_("id", discount_ids).execute().data if discount_ids else []
-        discounts = {d["id"]: d["percentage"] for d in discounts_data}
+        discounts = {d["id"]: d for d in discounts_data}
         missing_discounts = [d_id for d_id in discount_ids if d_id not in discounts]
         if missing_discounts:
             return Response({"error": f"Discounts with IDs {missing_discounts} not found."}, status=status.HTTP_400_BAD_REQUEST)
@@ -3556,6 +3198,53 @@ def add_order(request):
         else:
             menu_types = {}
         
+        # Build the order lines; Unli Wings lines without a group get a numbered one
+        order_items = []  # To be inserted for inventory purposes
+        current_unli_wings_group_counter = 1
+        for order in order_details:
+            menu_id = order["menu_id"]
+            instore_category_id = None
+            unli_wings_group = None
+            base_amount = None
+            
+            if "instore_category" in order:
+                instore_category_id = order["instore_category"]
+                instore_category = instore_categories.get(instore_category_id)
+                if not instore_category:
+                    return Response({"error": f"In-Store Category with ID {instore_category_id} not found."}, status=status.HTTP_400_BAD_REQUEST)
+                
+                if instore_category["name"] == "Unli Wings":
+                    unli_wings_group = order.get("unli_wings_group")
+                    if not unli_wings_group:
+                        unli_wings_group = str(current_unli_wings_group_counter)
+                        current_unli_wings_group_counter += 1
+                    # Store the base_amount at creation time
+                    base_amount = instore_category["base_amount"]
+                elif instore_category["name"] != "Ala Carte":
+                    return Response({"error": "Invalid In-Store Category."}, status=status.HTTP_400_BAD_REQUEST)
+            elif menus[menu_id].get("type_id") not in [2, 3]:
+                # Grab/FoodPanda orders are the only ones without an instore_category
+                return Response({"error": f"Order detail for menu_id {menu_id} is missing instore_category and is not a Grab/FoodPanda type."}, status=status.HTTP_400_BAD_REQUEST)
+            
+            order_items.append({
+                "menu_id": menu_id,
+                "quantity": order["quantity"],
+                "discount_id": order.get("discount_id"),
+                "instore_category": instore_category_id,
+                "unli_wings_group": unli_wings_group,
+                "base_amount": base_amount
+            })
+        
+        # Price the order before anything is written
+        try:
+            priced_order = price_order(
+                order_lines(order_items),
+                price_tables(menus.values(), menu_types.values(), discounts.values(), instore_categories.values())
+            )
+        except PricingError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        total_price = priced_order["net"]
+        
         # Create transaction record (removed reference_id and receipt_image)
         transaction_data = {
             "payment_amount": payment_amount,  
@@ -3581,146 +3270,9 @@ def add_order(request):
             except Exception as e:
                 print(f"Failed to save GCash reference for transaction {transaction_id}")
         
-        total_price = 0  # Running total for transaction
-        order_items = []  # To be inserted for inventory purposes
-        calculation_breakdown = []  # Detailed breakdown
-        
-        # For grouping Unli Wings orders via unli_wings_group
-        unli_wings_groups = {}
-        current_unli_wings_group_counter = 1
-        
-        # Process each order detail
-        for order in order_details:
-            menu_id = order["menu_id"]
-            quantity = order["quantity"]
-            discount_id = order.get("discount_id")
-            menu_item = menus[menu_id]
-            
-            if "instore_category" in order:
-                instore_category_id = order["instore_category"]
-                instore_category = instore_categories.get(instore_category_id)
-                if not instore_category:
-                    return Response({"error": f"In-Store Category with ID {instore_category_id} not found."}, status=status.HTTP_400_BAD_REQUEST)
-                
-                if instore_category["name"] == "Ala Carte":
-                    base_price = menu_item["price"] * quantity
-                    price = base_price
-                    discount_percentage = 0
-                    if discount_id:
-                        discount_percentage = discounts.get(discount_id, 0)
-                        price = price - (price * discount_percentage)
-                    base_price = round(base_price, 2)
-                    price = round(price, 2)
-                    total_price += price
-                    calculation_breakdown.append({
-                        "menu_id": menu_id,
-                        "instore_category": "Ala Carte",
-                        "quantity": quantity,
-                        "base_price": base_price,
-                        "discount_percentage": discount_percentage,
-                        "final_price": price
-                    })
-                    order_items.append({
-                        "transaction_id": transaction_id,
-                        "menu_id": menu_id,
-                        "quantity": quantity,
-                        "discount_id": discount_id,
-                        "instore_category": instore_category_id,
-                        "unli_wings_group": None
-                    })
-                elif instore_category["name"] == "Unli Wings":
-                    # Process Unli Wings with grouping
-                    unli_wings_group = order.get("unli_wings_group")
-                    if not unli_wings_group:
-                        unli_wings_group = str(current_unli_wings_group_counter)
-                        current_unli_wings_group_counter += 1
-                    if unli_wings_group not in unli_wings_groups:
-                        unli_wings_groups[unli_wings_group] = {
-                            "total_quantity": 0,
-                            "instore_category_id": instore_category_id,
-                            "discount_id": discount_id
-                        }
-                    else:
-                        if not unli_wings_groups[unli_wings_group]["discount_id"] and discount_id:
-                            unli_wings_groups[unli_wings_group]["discount_id"] = discount_id
-                    unli_wings_groups[unli_wings_group]["total_quantity"] += quantity
-                    
-                    # Store the base_amount at creation time
-                    current_base_amount = instore_categories[instore_category_id]["base_amount"]
-                    
-                    order_items.append({
-                        "transaction_id": transaction_id,
-                        "menu_id": menu_id,
-                        "quantity": quantity,
-                        "discount_id": discount_id,
-                        "instore_category": instore_category_id,
-                        "unli_wings_group": unli_wings_group,
-                        "base_amount": current_base_amount  # Store the base amount
-                    })
-                else:
-                    return Response({"error": "Invalid In-Store Category."}, status=status.HTTP_400_BAD_REQUEST)
-            else:
-                # Grab/FoodPanda orders
-                menu_type_id = menu_item.get("type_id")
-                if menu_type_id not in [2, 3]:
-                    return Response({"error": f"Order detail for menu_id {menu_id} is missing instore_category and is not a Grab/FoodPanda type."}, status=status.HTTP_400_BAD_REQUEST)
-                base_price = menu_item["price"] * quantity
-                deduction_percentage = menu_types.get(menu_type_id, {}).get("deduction_percentage", 0)
-                price = base_price - (base_price * deduction_percentage)
-                discount_percentage = 0
-                if discount_id:
-                    discount_percentage = discounts.get(discount_id, 0)
-                    price = price - (price * discount_percentage)
-                base_price = round(base_price, 2)
-                price = round(price, 2)
-                total_price += price
-                calculation_breakdown.append({
-                    "menu_id": menu_id,
-                    "menu_type": "Grab" if menu_type_id == 2 else "FoodPanda",
-                    "quantity": quantity,
-                    "base_price": base_price,
-                    "deduction_percentage": deduction_percentage,
-                    "discount_percentage": discount_percentage,
-                    "final_price": price
-                })
-                order_items.append({
-                    "transaction_id": transaction_id,
-                    "menu_id": menu_id,
-                    "quantity": quantity,
-                    "discount_id": discount_id,
-                    "instore_category": None,
-                    "unli_wings_group": None
-                })
-        
-        # Process Unli Wings groups pricing (if any)
-        for group_key, group in unli_wings_groups.items():
-            # Find the first order item for this group to get its stored base_amount
-            group_base_amount = None
-            for item in order_items:
-                if item.get("unli_wings_group") == group_key:
-                    group_base_amount = item.get("base_amount")
-                    break
-            
-            # If no stored base_amount found, fall back to the category base_amount
-            base_price = group_base_amount or instore_categories[group["instore_category_id"]]["base_amount"]
-            price = base_price
-            discount_percentage = 0
-            if group["discount_id"]:
-                discount_percentage = discounts.get(group["discount_id"], 0)
-                price = price - (price * (discount_percentage / 100))
-            base_price = round(base_price, 2)
-            price = round(price, 2)
-            total_price += price
-            calculation_breakdown.append({
-                "instore_category": "Unli Wings",
-                "unli_wings_group": group_key,
-                "aggregated_quantity": group["total_quantity"],
-                "base_price": base_price,
-                "discount_percentage": discount_percentage,
-                "final_price": price
-            })
+        for item in order_items:
+            item["transaction_id"] = transaction_id
         
-        total_price = round(total_price, 2)
         change = round(payment_amount - total_price, 2)
         
         # Insert order details
@@ -3733,7 +3285,8 @@ def add_order(request):
             "transaction_id": transaction_id,
             "total_price": total_price,
             "change": change,
-            "calculation_details": calculation_breakdown
+            "calculation_details": calculation_breakdown(priced_order["lines"]),
+            "staff_session": staff_session
         }, status=status.HTTP_201_CREATED)
     
     except Exception as e:
@@ -3754,129 +3307,24 @@ def edit_order(request, transaction_id):
         payment_amount = data.get("payment_amount")  # New/updated payment amount
         reference_id = data.get("reference_id")
         order_details = data.get("order_details", [])
-        provided_email = data.get("email")
-        entered_passcode = data.get("passcode")
         
         if not order_details:
             return Response({"error": "No order details provided."}, status=400)
         
         # Check if we need to verify the employee (skip verification for admin users)
-        is_admin = False
-        auth_header = request.headers.get("Authorization")
-        if auth_header and auth_header.startswith("Bearer "):
-            token = auth_header.split(" ")[1]
-            if token and is_valid_supabase_token(token):
-                # Check if this token belongs to an admin user
-                try:
-                    user_response = supabase_service.auth.get_user(token)
-                    if user_response and user_response.user:
-                        auth_user_uuid = user_response.user.id
-                        
-                        # Look up the employee by user_id
-                        employee_lookup = supabase_service.table("employee") \
-                            .select("id") \
-                            .eq("user_id", auth_user_uuid) \
-                            .single() \
-                            .execute()
-                        
-                        if employee_lookup.data:
-                            admin_employee_pk = employee_lookup.data["id"]
-                            
-                            # Check if this employee has admin role
-                            role_mapping = supabase_service.table("employee_role") \
-                                .select("role_id") \
-                                .eq("employee_id", admin_employee_pk) \
-                                .execute()
-                            
-                            if role_mapping.data:
-                                role_ids = [entry["role_id"] for entry in role_mapping.data]
-                                
-                                # Get admin role ID
-                                admin_role = supabase_service.table("role") \
-                                    .select("id") \
-                                    .eq("role_name", "Admin") \
-                                    .single() \
-                                    .execute()
-                                
-                                if admin_role.data and admin_role.data["id"] in role_ids:
-                                    is_admin = True
-                except Exception as e:
-                    print(f"Error checking admin status: {str(e)}")
+        is_admin = is_admin_request(request)
         
-        # Skip verification for admin users
+        # Skip verification for admin users; otherwise accept this terminal's
+        # staff session or verify the email and passcode
+        staff_session = None
         if not is_admin:
-            # Only perform verification if the user is not an admin
-            if not employee_id or not entered_passcode or not provided_email:
-                return Response({"error": "Missing employee verification fields."}, status=400)
-                
-            # Query the employee record
-            employee_response = (
-                supabase_service.table("employee")
-                .select("id, user_id, first_name, last_name")
-                .eq("id", employee_id)
-                .single()
-                .execute()
-            )
-            if not employee_response.data:
-                return Response({"error": "Employee not found."}, status=404)
-                
-            employee = employee_response.data
-            if not employee.get("user_id"):
-                return Response({"error": "Employee not linked to an auth user."}, status=400)
-                
-            # Fetch user details using the admin client
-            user_response = supabase_service.auth.admin.get_user_by_id(employee["user_id"])
-            if not (user_response and user_response.user):
-                return Response({"error": "Unable to fetch user authentication details."}, status=404)
-                
-            # Ensure the provided email matches the employee's registered email
-            if provided_email.lower() != user_response.user.email.lower():
-                return Response(
-                    {"error": "Provided email does not match the selected employee's email."},
-                    status=400,
-                )
-                
-            # Attempt to sign in using the provided email and passcode
-            sign_in_response = supabase_service.auth.sign_in_with_password({
-                "email": provided_email,
-                "password": entered_passcode
-            })
-            if not getattr(sign_in_response, "user", None):
-                return Response({"error": "Invalid passcode."}, status=401)
-            # Sign out after successful sign in
-            supabase_service.auth.sign_out()
+            staff_session, error_response = verify_pos_staff(data, employee_id)
+            if error_response:
+                return error_response
         
         # Continue with the existing order editing logic
-        existing_order_details = None
-        try:
-            existing_response = supabase_anon.table("order_details").select("*").eq("transaction_id", transaction_id).execute()
-            if existing_response and existing_response.data:
-                existing_order_details = {
-                    f"{detail.get('menu_id')}-{detail.get('unli_wings_group')}": detail.get('base_amount') 
-                    for detail in existing_response.data 
-                    if detail.get('unli_wings_group')
-                }
-        except Exception as e:
-            print(f"Error fetching existing order details: {str(e)}")
-            
-        # Validate the existing transaction record
-        existing_transaction_response = supabase_anon.table("transaction").select("id").eq("id", transaction_id).execute()
-        if not existing_transaction_response.data:
-            return Response({"error": f"Transaction with ID {transaction_id} not found."}, status=400)
-        existing_order_details = None
-        try:
-            existing_response = supabase_anon.table("order_details").select("*").eq("transaction_id", transaction_id).execute()
-            if existing_response and existing_response.data:
-                existing_order_details = {
-                    f"{detail.get('menu_id')}-{detail.get('unli_wings_group')}": detail.get('base_amount') 
-                    for detail in existing_response.data 
-                    if detail.get('unli_wings_group')
-                }
-        except Exception as e:
-            print(f"Error fetching existing order details: {str(e)}")
-            
         # Validate the existing transaction record
-        existing_transaction_response = supabase_anon.table("transaction").select("id").eq("id", transaction_id).execute()
+        existing_transaction_response = supabase_anon.table("transaction").select("id, date, order_status").eq("id", transaction_id).execute()
         if not existing_transaction_response.data:
             return Response({"error": f"Transaction with ID {transaction_id} not found."}, status=400)
         
@@ -3916,7 +3364,7 @@ def edit_order(request, transaction_id):
         discount_ids = list(set(order.get("discount_id") for order in order_details if order.get("discount_id")))
         if discount_ids:
             discounts_response = supabase_anon.table("discounts").select("id, percentage").in_("id", discount_ids).execute()
-            discounts = {d["id"]: d["percentage"] for d in discounts_response.data}
+            discounts = {d["id"]: d for d in discounts_response.data}
             missing_discounts = [d_id for d_id in discount_ids if d_id not in discounts]
             if missing_discounts:
                 return Response({"error": f"Discounts with IDs {missing_discounts} not found."}, status=400)
@@ -3936,6 +3384,57 @@ def edit_order(request, transaction_id):
         else:
             menu_types = {}
         
+        # Build the order lines; Unli Wings lines without a group get a numbered one
+        order_items = []
+        current_unli_wings_group_counter = 1
+        for order in order_details:
+            menu_id = order["menu_id"]
+            menu_type_id = menus[menu_id].get("type_id")
+            instore_category_id = None
+            unli_wings_group = None
+            base_amount = None
+            
+            if menu_type_id == 1:
+                # In‑Store orders require an instore_category.
+                instore_category_id = order.get("instore_category")
+                if not instore_category_id:
+                    return Response({"error": f"In-Store order detail for menu_id {menu_id} is missing instore_category."}, status=400)
+                instore_category = instore_categories.get(instore_category_id)
+                if not instore_category:
+                    return Response({"error": f"In-Store Category with ID {instore_category_id} not found."}, status=400)
+                
+                if instore_category["name"] == "Unli Wings":
+                    unli_wings_group = order.get("unli_wings_group")
+                    if not unli_wings_group:
+                        unli_wings_group = str(current_unli_wings_group_counter)
+                        current_unli_wings_group_counter += 1
+                    # Keep the base_amount saved with the order, otherwise use the current category value
+                    base_amount = order.get("base_amount") or instore_category["base_amount"]
+                elif instore_category["name"] != "Ala Carte":
+                    return Response({"error": "Invalid In-Store Category."}, status=400)
+            elif menu_type_id not in [2, 3]:
+                return Response({"error": f"Unsupported menu type_id {menu_type_id} for menu_id {menu_id}."}, status=400)
+            
+            order_items.append({
+                "transaction_id": transaction_id,
+                "menu_id": menu_id,
+                "quantity": order["quantity"],
+                "discount_id": order.get("discount_id"),
+                "instore_category": instore_category_id,
+                "unli_wings_group": unli_wings_group,
+                "base_amount": base_amount
+            })
+        
+        # Price the order before anything is written
+        try:
+            priced_order = price_order(
+                order_lines(order_items),
+                price_tables(menus.values(), menu_types.values(), discounts.values(), instore_categories.values())
+            )
+        except PricingError as e:
+            return Response({"error": str(e)}, status=400)
+        total_price = priced_order["net"]
+        
         # Update the transaction record - removed reference_id and receipt_image
         transaction_data = {
             "payment_amount": payment_amount,
@@ -3978,169 +3477,30 @@ def edit_order(request, transaction_id):
             except Exception as e:
                 print(f"Failed to save GCash reference for transaction {transaction_id}: {str(e)}")
         
-        total_price = 0
-        order_items = []
-        calculation_breakdown = []
-        
-        # For grouping Unli Wings orders
-        unli_wings_groups = {}
-        current_unli_wings_group_counter = 1
-        
-        # Process each order detail
-        for order in order_details:
-            menu_id = order["menu_id"]
-            quantity = order["quantity"]
-            discount_id = order.get("discount_id")
-            menu_item = menus[menu_id]
-            menu_type_id = menu_item.get("type_id")
-            
-            if menu_type_id == 1:
-                # In‑Store orders require an instore_category.
-                instore_category_id = order.get("instore_category")
-                if not instore_category_id:
-                    return Response({"error": f"In-Store order detail for menu_id {menu_id} is missing instore_category."}, status=400)
-                instore_category = instore_categories.get(instore_category_id)
-                if not instore_category:
-                    return Response({"error": f"In-Store Category with ID {instore_category_id} not found."}, status=400)
-                
-                if instore_category["name"] == "Ala Carte":
-                    base_price = menu_item["price"] * quantity
-                    price = base_price
-                    discount_percentage = discounts.get(discount_id, 0) if discount_id else 0
-                    if discount_percentage:
-                        price = price - (price * discount_percentage)
-                    base_price = round(base_price, 2)
-                    price = round(price, 2)
-                    total_price += price
-                    calculation_breakdown.append({
-                        "menu_id": menu_id,
-                        "instore_category": "Ala Carte",
-                        "quantity": quantity,
-                        "base_price": base_price,
-                        "discount_percentage": discount_percentage,
-                        "final_price": price
-                    })
-                    order_items.append({
-                        "transaction_id": transaction_id,
-                        "menu_id": menu_id,
-                        "quantity": quantity,
-                        "discount_id": discount_id,
-                        "instore_category": instore_category_id,
-                        "unli_wings_group": None
-                    })
-
-                elif instore_category["name"] == "Unli Wings":
-                    unli_wings_group = order.get("unli_wings_group")
-                    if not unli_wings_group:
-                        unli_wings_group = str(current_unli_wings_group_counter)
-                        current_unli_wings_group_counter += 1
-                    if unli_wings_group not in unli_wings_groups:
-                        unli_wings_groups[unli_wings_group] = {
-                            "total_quantity": 0,
-                            "instore_category_id": instore_category_id,
-                            "discount_id": discount_id
-                        }
-                    else:
-                        if not unli_wings_groups[unli_wings_group]["discount_id"] and discount_id:
-                            unli_wings_groups[unli_wings_group]["discount_id"] = discount_id
-                    unli_wings_groups[unli_wings_group]["total_quantity"] += quantity
-                    
-                    # Check if we're editing an existing order with saved base_amount
-                    existing_base_amount = None
-                    if "base_amount" in order:
-                        existing_base_amount = order.get("base_amount")
-                    
-                    # Use existing base_amount if available, otherwise use current category value
-                    current_base_amount = existing_base_amount or instore_categories[instore_category_id]["base_amount"]
-                    
-                    order_items.append({
-                        "transaction_id": transaction_id,
-                        "menu_id": menu_id,
-                        "quantity": quantity,
-                        "discount_id": discount_id,
-                        "instore_category": instore_category_id,
-                        "unli_wings_group": unli_wings_group,
-                        "base_amount": current_base_amount  # Use preserved base amount
-                    })
-                else:
-                    return Response({"error": "Invalid In-Store Category."}, status=400)
-            elif menu_type_id in [2, 3]:
-                #For Grab (2) and FoodPanda (3) orders.
-                base_price = menu_item["price"] * quantity
-                deduction_percentage = menu_types.get(menu_type_id, {}).get("deduction_percentage", 0)
-                price = base_price - (base_price * deduction_percentage)
-                discount_percentage = discounts.get(discount_id, 0) if discount_id else 0
-                if discount_percentage:
-                    price = price - (price * discount_percentage)
-                base_price = round(base_price, 2)
-                price = round(price, 2)
-                total_price += price
-                calculation_breakdown.append({
-                    "menu_id": menu_id,
-                    "menu_type": "Grab" if menu_type_id == 2 else "FoodPanda",
-                    "quantity": quantity,
-                    "base_price": base_price,
-                    "deduction_percentage": deduction_percentage,
-                    "discount_percentage": discount_percentage,
-                    "final_price": price
-                })
-                order_items.append({
-                    "transaction_id": transaction_id,
-                    "menu_id": menu_id,
-                    "quantity": quantity,
-                    "discount_id": discount_id,
-                    "instore_category": None,
-                    "unli_wings_group": None
-                })
-            else:
-                return Response({"error": f"Unsupported menu type_id {menu_type_id} for menu_id {menu_id}."}, status=400)
-        
-        # Process Unli Wings groups pricing
-        for group_key, group in unli_wings_groups.items():
-            # Find the base_amount from the first order item in this group
-            group_base_amount = None
-            for item in order_items:
-                if item.get("unli_wings_group") == group_key:
-                    group_base_amount = item.get("base_amount")
-                    break
-            
-            # If no stored base_amount found, fall back to the category base_amount
-            base_price = group_base_amount or instore_categories[group["instore_category_id"]]["base_amount"]
-            price = base_price
-            discount_percentage = discounts.get(group["discount_id"], 0) if group["discount_id"] else 0
-            if discount_percentage:
-                price = price - (price * (discount_percentage / 100))
-            base_price = round(base_price, 2)
-            price = round(price, 2)
-            total_price += price
-            calculation_breakdown.append({
-                "instore_category": "Unli Wings",
-                "unli_wings_group": group_key,
-                "aggregated_quantity": group["total_quantity"],
-                "base_price": base_price,
-                "discount_percentage": discount_percentage,
-                "final_price": price
-            })
-        
-        total_price = round(total_price, 2)
         change = round(payment_amount - total_price, 2)
         
-        # Delete previous order details.
-        delete_response = supabase_anon.table("order_details").delete().eq("transaction_id", transaction_id).execute()
-        if (hasattr(delete_response, "error") and delete_response.error):
-            return Response({"error": "Failed to delete previous order details."}, status=500)
+        # Sync the order details: unchanged lines keep their rows and IDs,
+        # changed and new lines are upserted and removed lines deleted.
+        sync_child_rows(
+            supabase_anon, "order_details", "transaction_id", transaction_id, order_items,
+            key_columns=("menu_id", "instore_category", "unli_wings_group")
+        )
         
-        # Insert new order details.
-        order_details_response = supabase_anon.table("order_details").insert(order_items).execute()
-        if (hasattr(order_details_response, "error") and order_details_response.error):
-            return Response({"error": "Failed to save updated order details."}, status=500)
+        # Completed orders already count towards the daily sales summary
+        existing_transaction = existing_transaction_response.data[0]
+        if existing_transaction.get("order_status") == 2:
+            try:
+                refresh_daily_sales(supabase_anon, [transaction_sales_date(existing_transaction)])
+            except Exception as e:
+                print(f"Failed to refresh daily sales summary for transaction {transaction_id}: {str(e)}")
         
         return Response({
             "message": "Order updated successfully.",
             "transaction_id": transaction_id,
             "total_price": total_price,
             "change": change,
-            "calculation_details": calculation_breakdown
+            "calculation_details": calculation_breakdown(priced_order["lines"]),
+            "staff_session": staff_session
         }, status=200)
     
     except Exception as e:
@@ -4175,6 +3535,15 @@ def update_order_status(request, transaction_id):
             "order_status": status_id
         }).eq("id", transaction_id).execute()
 
+        # Keep the daily sales summary in step when an order enters or leaves Completed
+        previous_status_id = transaction_response.data[0].get('order_status')
+        if (previous_status_id == 2) != (int(status_id) == 2):
+            try:
+                refresh_daily_sales(supabase_anon, [transaction_sales_date(transaction_response.data[0])])
+                debug_steps.append("Refreshed daily sales summary")
+            except Exception as summary_error:
+                debug_steps.append(f"Error refreshing daily sales summary: {str(summary_error)}")
+
         # Only process ingredient deduction if changing to Completed or Complimentary status
         deducted_ingredients = []
         affected_menu_items = []
@@ -4183,212 +3552,38 @@ def update_order_status(request, transaction_id):
             status_name = "Completed" if int(status_id) == 2 else "Complimentary"
             debug_steps.append(f"Status is {status_name} ({status_id}), will process ingredient deduction")
 
-            # Import the conversion utility
-            from .utils.conversion import convert_value
-            
             # Get order details for this transaction
-            order_details = supabase_anon.table("order_details").select("*").eq("transaction_id", transaction_id).execute()
+            order_details = supabase_anon.table("order_details").select("menu_id, quantity").eq("transaction_id", transaction_id).execute()
             
             if order_details.data:
                 debug_steps.append(f"Found {len(order_details.data)} order details")
-                
-                # For each order item, get the menu item and its ingredients
-                for order_item in order_details.data:
-                    menu_id = order_item.get('menu_id')
-                    quantity = order_item.get('quantity', 0)
-                    
-                    # Get ingredients for this menu item with their unit information
-                    ingredients_response = supabase_anon.table("menu_ingredients").select(
-                        "id, quantity, inventory_id, unit_id, menu_id"
-                    ).eq("menu_id", menu_id).execute()
-                    
-                    if ingredients_response.data:
-                        debug_steps.append(f"Processing {len(ingredients_response.data)} ingredients for menu item {menu_id}")
-                        
-                        # For each ingredient, deduct from inventory
-                        for ingredient in ingredients_response.data:
-                            inventory_id = ingredient.get('inventory_id')
-                            required_quantity = ingredient.get('quantity', 0)
-                            menu_ingredient_unit_id = ingredient.get('unit_id')
-                            
-                            # Skip if inventory_id is None
-                            if inventory_id is None:
-                                debug_steps.append(f"Skipping ingredient with null inventory_id for menu {menu_id}")
-                                continue
-                            
-                            # Get current inventory record
-                            inventory_response = supabase_anon.table("inventory").select("*").eq("id", inventory_id).execute()
-                            
-                            if inventory_response.data:
-                                current_inventory = inventory_response.data[0]
-                                current_quantity = current_inventory.get('quantity', 0)
-                                item_id = current_inventory.get('item')  # This is the foreign key to items table
-                                
-                                # Get item details to find the unit information
-                                item_response = supabase_anon.table("items").select("*, unit:unit_of_measurement(*)").eq("id", item_id).execute()
-                                
-                                if item_response.data:
-                                    item = item_response.data[0]
-                                    item_unit = item.get('unit', {})
-                                    inventory_unit_id = item.get('unit_id')
-                                    inventory_unit_symbol = item_unit.get('symbol') if item_unit else None
-                                    
-                                    # Get menu ingredient unit details
-                                    if menu_ingredient_unit_id:
-                                        menu_unit_response = supabase_anon.table("unit_of_measurement").select("*").eq("id", menu_ingredient_unit_id).execute()
-                                        menu_unit = menu_unit_response.data[0] if menu_unit_response.data else None
-                                        menu_unit_symbol = menu_unit.get('symbol') if menu_unit else None
-                                        menu_unit_category = menu_unit.get('unit_category') if menu_unit else None
-                                        
-                                        # Get unit category information
-                                        if menu_unit_category:
-                                            category_response = supabase_anon.table("um_category").select("name").eq("id", menu_unit_category).execute()
-                                            category_name = category_response.data[0].get('name') if category_response.data else None
-                                        else:
-                                            category_name = None
-                                    else:
-                                        menu_unit_symbol = inventory_unit_symbol
-                                        category_name = None
-                                    # Get the unit_id for the disposed_unit
-                                    if inventory_unit_symbol:
-                                        unit_response = supabase_anon.table("unit_of_measurement").select("id").eq("symbol", inventory_unit_symbol).execute()
-                                        if unit_response.data:
-                                            disposed_unit_id = unit_response.data[0].get('id')
-                                        else:
-                                            disposed_unit_id = None
-                                    else:
-                                        disposed_unit_id = None
-
-                                    # Total quantity to deduct (menu item quantity * required quantity per item)
-                                    total_deduction = quantity * required_quantity
-                                    
-                                    # Convert units if necessary and if we have the category information
-                                    if (menu_unit_symbol and inventory_unit_symbol and 
-                                        menu_unit_symbol != inventory_unit_symbol and 
-                                        category_name in ["Weight", "Volume"]):
-                                        try:
-                                            original_deduction = total_deduction
-                                            total_deduction = convert_value(
-                                                total_deduction,
-                                                menu_unit_symbol,
-                                                inventory_unit_symbol,
-                                                category_name
-                                            )
-                                            debug_steps.append(f"Converted {original_deduction} {menu_unit_symbol} to {total_deduction} {inventory_unit_symbol}")
-                                        except Exception as e:
-                                            debug_steps.append(f"Conversion error: {str(e)}")
-                                    
-                                    # Calculate new quantity
-                                    new_quantity = max(0, current_quantity - total_deduction)
-                                    
-                                    # Update inventory
-                                    inventory_update = supabase_anon.table("inventory").update({
-                                        "quantity": new_quantity
-                                    }).eq("id", inventory_id).execute()
-                                    
-                                    # Track deducted ingredients
-                                    deducted_ingredients.append({
-                                        "inventory_id": inventory_id,
-                                        "item_id": item_id,
-                                        "deducted_amount": total_deduction,
-                                        "new_quantity": new_quantity
-                                    })
-                                    
-                                     # Prepare disposal data
-                                     # For Complimentary orders, use reason_id: 4 (Complimentary)
-                                    reason_id = 5 if int(status_id) == 4 else 1
-
-                                    disposal_data = {
-                                        "disposed_quantity": total_deduction,
-                                        "inventory_id": inventory_id,
-                                        "reason_id": 1,
-                                        "reason_id": reason_id,
-                                        "disposal_datetime": datetime.now().isoformat(),
-                                        "disposed_unit": disposed_unit_id,
-                                        "disposer": employee_id
-                                    }
-
-                                    # Insert into disposed inventory
-                                    try:
-                                        disposal_response = supabase_anon.table("disposed_inventory").insert(disposal_data).execute()
-                                        if not disposal_response.data:
-                                            debug_steps.append(f"Failed to insert disposal record for inventory {inventory_id}")
-                                        else:
-                                            debug_steps.append(f"Successfully inserted disposal record for inventory {inventory_id}")
-                                    except Exception as disposal_error:
-                                        debug_steps.append(f"Error inserting disposal record: {str(disposal_error)}")
-
-                                    debug_steps.append(f"Updated inventory {inventory_id} for item {item_id}: {current_quantity} -> {new_quantity}")
-                                else:
-                                    debug_steps.append(f"Item not found for inventory {inventory_id}")
-                            else:
-                                debug_steps.append(f"Inventory record not found for id {inventory_id}")
+
+                # Prefetch ingredients, inventory and units for every menu in the
+                # order, then aggregate the deductions per inventory record.
+                deduction_data = prefetch_deduction_data(
+                    supabase_anon, [order_item.get('menu_id') for order_item in order_details.data]
+                )
+                deductions = compute_ingredient_deductions(order_details.data, deduction_data)
+                debug_steps.append(f"Computed deductions for {len(deductions)} inventory records")
+
+                # For Complimentary orders, use reason_id: 5 (Complimentary)
+                reason_id = 5 if int(status_id) == 4 else 1
+
+                deducted_ingredients = apply_ingredient_deductions(
+                    supabase_anon, deductions, reason_id, employee_id
+                )
+                for deducted in deducted_ingredients:
+                    debug_steps.append(
+                        f"Updated inventory {deducted['inventory_id']} for item {deducted['item_id']}: "
+                        f"-{deducted['deducted_amount']} -> {deducted['new_quantity']}"
+                    )
             
             # Now add the menu availability check after all deductions are complete
             if deducted_ingredients:
-                try:
-                    # Get unique inventory IDs that were affected
-                    affected_inventory_ids = list(set([item.get('inventory_id') for item in deducted_ingredients if item.get('inventory_id')]))
-                    
-                    # Find menu items that use these ingredients
-                    menu_ingredients_query = supabase_anon.table("menu_ingredients").select("menu_id").in_("inventory_id", affected_inventory_ids).execute()
-                    
-                    if menu_ingredients_query.data:
-                        affected_menu_ids = list(set([item.get('menu_id') for item in menu_ingredients_query.data if item.get('menu_id')]))
-                        
-                        for menu_id in affected_menu_ids:
-                            try:
-                                # Get menu item details
-                                menu_item_query = supabase_anon.table("menu_items").select("*").eq("id", menu_id).execute()
-                                
-                                if menu_item_query.data:
-                                    menu_item = menu_item_query.data[0]
-                                    menu_name = menu_item.get('name', 'Unknown')
-                                    current_status = menu_item.get('status_id')
-                                    
-                                    # Check if any ingredient is insufficient
-                                    has_insufficient_ingredients = False
-                                    ingredients_query = supabase_anon.table("menu_ingredients").select("*").eq("menu_id", menu_id).execute()
-                                    
-                                    if ingredients_query.data:
-                                        for ingredient in ingredients_query.data:
-                                            inventory_id = ingredient.get('inventory_id')
-                                            required_quantity = float(ingredient.get('quantity', 0))
-                                            
-                                            if not inventory_id:
-                                                continue
-                                            
-                                            # Get current inventory
-                                            inventory_query = supabase_anon.table("inventory").select("*").eq("id", inventory_id).execute()
-                                            
-                                            if not inventory_query.data:
-                                                has_insufficient_ingredients = True
-                                                break
-                                            
-                                            current_quantity = float(inventory_query.data[0].get('quantity', 0))
-                                            
-                                            if current_quantity < required_quantity:
-                                                has_insufficient_ingredients = True
-                                                break
-                                    
-                                    # Update status if needed
-                                    new_status_id = 2 if has_insufficient_ingredients else 1  # 2=Unavailable, 1=Available
-                                    
-                                    if new_status_id != current_status:
-                                        update_result = supabase_anon.table("menu_items").update({
-                                            "status_id": new_status_id
-                                        }).eq("id", menu_id).execute()
-                                        
-                                        status_text = "Unavailable" if new_status_id == 2 else "Available"
-                                        affected_menu_items.append({
-                                            "id": menu_id,
-                                            "name": menu_name,
-                                            "new_status": status_text
-                                        })
-                            except Exception as menu_error:
-                                debug_steps.append(f"Error processing menu item {menu_id}: {str(menu_error)}")
-                except Exception as availability_error:
-                    debug_steps.append(f"Error updating menu availability: {str(availability_error)}")
+                affected_menu_items = refresh_menu_availability(
+                    [item["inventory_id"] for item in deducted_ingredients]
+                )
+                debug_steps.append(f"Updated availability of {len(affected_menu_items)} menu items")
          # For completed status only, display inventory details
                 if int(status_id) == 2:
                     success_message = "Order status updated to Completed. Ingredients have been deducted from inventory."
@@ -4419,232 +3614,69 @@ def update_order_status(request, transaction_id):
 @authentication_classes([])
 @permission_classes([AllowAny])
 def update_menu_availability(request):
-    debug_steps = []
-    updated_items = []
-    conversion_errors = []
-    
+    """
+    Re-check every menu that has a recipe against current inventory and
+    update the statuses that changed.
+    """
     try:
-        debug_steps.append("Starting menu availability check")
-        
-        # 1. Fetch all menu items with their ingredients in a single query
-        menu_items_response = supabase_anon.table("menu_items").select("*").execute()
-        if not menu_items_response.data:
-            return Response({"message": "No menu items found", "debug": debug_steps}, status=200)
-        
-        menu_items = menu_items_response.data
-        debug_steps.append(f"Found {len(menu_items)} menu items to check")
-        
-        # 2. Fetch all menu ingredients in one query
-        all_menu_ingredients = supabase_anon.table("menu_ingredients").select("*").execute().data
-        
-        # 3. Create a lookup dictionary for menu ingredients by menu_id
-        menu_ingredient_map = {}
-        menu_ids = []
-        inventory_ids = []
-        
-        for ingredient in all_menu_ingredients:
-            menu_id = ingredient.get('menu_id')
-            inventory_id = ingredient.get('inventory_id')
-            
-            if menu_id and inventory_id:
-                menu_ids.append(menu_id)
-                inventory_ids.append(inventory_id)
-                
-                if menu_id not in menu_ingredient_map:
-                    menu_ingredient_map[menu_id] = []
-                    
-                menu_ingredient_map[menu_id].append(ingredient)
-        
-        # 4. Prefetch all inventory records needed
-        inventory_records = {}
-        if inventory_ids:
-            inventory_response = supabase_anon.table("inventory").select("*").in_("id", inventory_ids).execute()
-            for inv in inventory_response.data:
-                inventory_records[inv.get('id')] = inv
-        
-        # 5. Prefetch all item records
-        item_ids = [inv.get('item') for inv in inventory_records.values() if inv.get('item')]
-        items_response = supabase_anon.table("items").select("*").in_("id", item_ids).execute()
-        item_records = {item.get('id'): item for item in items_response.data}
-        
-        # 6. Prefetch all unit measurements
-        unit_ids = [item.get('measurement') for item in item_records.values() if item.get('measurement')]
-        for ingredient in all_menu_ingredients:
-            unit_id = ingredient.get('unit_id')
-            if unit_id:
-                unit_ids.append(unit_id)
-                
-        units_response = supabase_anon.table("unit_of_measurement").select("*").in_("id", unit_ids).execute()
-        unit_records = {unit.get('id'): unit for unit in units_response.data}
-        
-        # 7. Get unit categories
-        unit_category_ids = [unit.get('unit_category') for unit in unit_records.values() if unit.get('unit_category')]
-        unit_categories_response = supabase_anon.table("um_category").select("*").in_("id", unit_category_ids).execute()
-        unit_category_records = {cat.get('id'): cat for cat in unit_categories_response.data}
-        
-        # 8. Process each menu item
-        for menu_item in menu_items:
-            try:
-                menu_id = menu_item.get('id')
-                menu_name = menu_item.get('name', 'Unknown')
-                current_status = menu_item.get('status_id')
-                
-                debug_steps.append(f"Checking menu item: {menu_id} - {menu_name}")
-                
-                # Skip if this menu has no ingredients
-                if menu_id not in menu_ingredient_map:
-                    debug_steps.append(f"No ingredients found for menu item {menu_id}")
-                    continue
-                
-                ingredients = menu_ingredient_map[menu_id]
-                debug_steps.append(f"Found {len(ingredients)} ingredients for menu item {menu_id}")
-                
-                # Check each ingredient
-                has_insufficient_ingredients = False
-                
-                for ingredient in ingredients:
-                    try:
-                        inventory_id = ingredient.get('inventory_id')
-                        required_quantity = ingredient.get('quantity', 0)
-                        menu_ingredient_unit_id = ingredient.get('unit_id')
-                        
-                        # Skip if inventory_id is None
-                        if inventory_id is None:
-                            debug_steps.append(f"Skipping ingredient with null inventory_id for menu {menu_id}")
-                            continue
-                        
-                        # Get inventory from prefetched data
-                        if inventory_id not in inventory_records:
-                            debug_steps.append(f"Inventory record not found for id {inventory_id}")
-                            has_insufficient_ingredients = True
-                            break
-                        
-                        current_inventory = inventory_records[inventory_id]
-                        current_quantity = current_inventory.get('quantity', 0)
-                        item_id = current_inventory.get('item')
-                        
-                        # Skip if item_id is None
-                        if item_id is None or item_id not in item_records:
-                            debug_steps.append(f"Item not found for inventory {inventory_id}")
-                            has_insufficient_ingredients = True
-                            break
-                        
-                        item = item_records[item_id]
-                        measurement_id = item.get('measurement')
-                        
-                        if measurement_id not in unit_records:
-                            debug_steps.append(f"Measurement unit not found for item {item_id}")
-                            has_insufficient_ingredients = True
-                            break
-                            
-                        inventory_unit = unit_records[measurement_id]
-                        inventory_unit_symbol = inventory_unit.get('symbol')
-                        
-                        # Default to direct comparison
-                        required_quantity_converted = float(required_quantity)
-                        conversion_performed = False
-                        
-                        # Get unit information for menu ingredient if available
-                        if menu_ingredient_unit_id is not None and menu_ingredient_unit_id in unit_records:
-                            menu_unit = unit_records[menu_ingredient_unit_id]
-                            menu_unit_symbol = menu_unit.get('symbol')
-                            menu_unit_category_id = menu_unit.get('unit_category')
-                            
-                            # Try to convert units if necessary
-                            if (menu_unit_symbol and inventory_unit_symbol and 
-                                menu_unit_symbol != inventory_unit_symbol and 
-                                menu_unit_category_id is not None and
-                                menu_unit_category_id in unit_category_records):
-                                
-                                category = unit_category_records[menu_unit_category_id]
-                                category_name = category.get('name')
-                                
-                                if category_name in ["Weight", "Volume"]:
-                                    try:
-                                        # Check if both units are in the conversion factors
-                                        from_unit_supported = menu_unit_symbol in CONVERSION_FACTORS.get(category_name, {})
-                                        to_unit_supported = inventory_unit_symbol in CONVERSION_FACTORS.get(category_name, {})
-                                        
-                                        if from_unit_supported and to_unit_supported:
-                                            required_quantity_converted = convert_value(
-                                                float(required_quantity),
-                                                menu_unit_symbol,
-                                                inventory_unit_symbol,
-                                                category_name
-                                            )
-                                            conversion_performed = True
-                                            debug_steps.append(
-                                                f"Converted {required_quantity} {menu_unit_symbol} to {required_quantity_converted} {inventory_unit_symbol}"
-                                            )
-                                    except Exception as e:
-                                        error_msg = f"Conversion error for {menu_name}: {str(e)}"
-                                        debug_steps.append(error_msg)
-                                        conversion_errors.append({
-                                            "menu_id": menu_id,
-                                            "menu_name": menu_name,
-                                            "error": error_msg
-                                        })
-                        else:
-                            # Log when using direct comparison due to missing unit information
-                            debug_steps.append(f"Using direct comparison for {menu_name}, ingredient {inventory_id}: missing unit information")
-                        
-                        # Check if enough inventory
-                        current_quantity = float(current_quantity)
-                        if current_quantity < required_quantity_converted:
-                            # Use your existing fix for inventory_name
-                            inventory_name = current_inventory.get('name', item.get('name', 'Unknown'))
-                            debug_steps.append(f"Insufficient inventory for {menu_name}: {inventory_name} has {current_quantity}, needs {required_quantity_converted}")
-                            has_insufficient_ingredients = True
-                            break
-                        else:
-                            # Also add this else clause to define inventory_name for successful cases as in your code
-                            inventory_name = current_inventory.get('name', item.get('name', 'Unknown'))
-                            debug_steps.append(f"Sufficient inventory for {menu_name}: {inventory_name} has {current_quantity}, needs {required_quantity_converted}")
-                            
-                    except Exception as ingredient_error:
-                        error_msg = f"Error processing ingredient for {menu_name}: {str(ingredient_error)}"
-                        debug_steps.append(error_msg)
-                        has_insufficient_ingredients = True
-                        break
-                
-                # Update menu item status if needed
-                new_status_id = 2 if has_insufficient_ingredients else 1
-                
-                if new_status_id != current_status:
-                    try:
-                        # Update menu item status
-                        update_result = supabase_anon.table("menu_items").update({
-                            "status_id": new_status_id
-                        }).eq("id", menu_id).execute()
-                        
-                        status_text = "Unavailable" if new_status_id == 2 else "Available"
-                        debug_steps.append(f"Updated status of menu item {menu_name} to {status_text}")
-                        
-                        updated_items.append({
-                            "id": menu_id,
-                            "name": menu_name,
-                            "new_status": status_text,
-                            "new_status_id": new_status_id
-                        })
-                    except Exception as update_error:
-                        debug_steps.append(f"Error updating menu status: {str(update_error)}")
-                else:
-                    debug_steps.append(f"No status change needed for menu item {menu_name}")
-            except Exception as menu_error:
-                debug_steps.append(f"Error processing menu item {menu_item.get('name', 'Unknown')}: {str(menu_error)}")
+        updated_items = recompute_menu_availability(supabase_anon)
         
         return Response({
             "message": f"Updated availability status for {len(updated_items)} menu items",
             "updated_items": updated_items,
-            "conversion_errors": conversion_errors,
-            "debug": debug_steps
+            "conversion_errors": []
         }, status=200)
     
     except Exception as e:
-        debug_steps.append(f"Error: {str(e)}")
         return Response({
-            "error": str(e),
-            "debug": debug_steps
+            "error": str(e)
+        }, status=500)
+
+@api_view(['GET'])
+@authentication_classes([])
+@permission_classes([AllowAny])
+def menu_availability_changes(request):
+    """
+    Long-poll for menu availability changes.
+
+    Query parameters:
+      - since: the last version the client saw (omit on the first call)
+      - timeout: seconds to wait for a change (default and maximum
+        settings.MENU_AVAILABILITY_MAX_WAIT)
+
+    Answers immediately when the version differs from `since`, otherwise as
+    soon as it changes or the timeout passes. The wait holds a worker
+    thread, so it is kept to a few seconds and clients poll again (see
+    MENU_AVAILABILITY_MAX_WAIT in settings for worker sizing). A changed response carries the
+    current {id, status_id} of every menu; clients then poll again with the
+    returned version.
+    """
+    try:
+        try:
+            since = request.query_params.get("since")
+            since = int(since) if since not in (None, "") else None
+            max_wait = getattr(settings, "MENU_AVAILABILITY_MAX_WAIT", 5)
+            timeout = float(request.query_params.get("timeout", max_wait))
+            if not math.isfinite(timeout):
+                raise ValueError("timeout must be finite")
+        except ValueError:
+            return Response({"error": "since must be an integer and timeout a number of seconds."}, status=400)
+        timeout = min(max(timeout, 0), max_wait)
+        
+        if since is None:
+            version = get_availability_version(supabase_anon)
+        else:
+            version = wait_for_availability_change(supabase_anon, since, timeout)
+        
+        if version == since:
+            return Response({"version": version, "changed": False})
+        
+        menus = supabase_anon.table("menu_items").select("id, status_id").execute().data or []
+        return Response({"version": version, "changed": True, "menus": menus})
+    
+    except Exception as e:
+        return Response({
+            "error": str(e)
         }, status=500)
 
 @api_view(['GET'])
@@ -4764,48 +3796,213 @@ def check_menu_inventory(request, menu_id):
             "error": str(e)
         }, status=500)
 
+@api_view(['POST'])
+@authentication_classes([])
+@permission_classes([AllowAny])
+def check_cart_inventory(request):
+    """
+    Check a whole cart against inventory in one request.
+
+    Body: {"items": [{"menu_id": 1, "quantity": 2}, ...]}
+
+    Ingredient demand is aggregated across the cart, so two menus sharing an
+    ingredient are checked against their combined requirement. For every menu
+    the response also reports `max_sellable_quantity`: how many servings the
+    remaining stock allows once the rest of the cart is accounted for (None
+    for menus without ingredients). An ingredient whose inventory record no
+    longer exists makes its menu unavailable, as in the availability engine.
+    """
+    try:
+        items = request.data.get("items")
+        if not isinstance(items, list):
+            return Response({"error": "items must be a list of {menu_id, quantity}."}, status=400)
+        
+        # Merge repeated menus into one cart line each
+        cart = {}
+        try:
+            for line in items:
+                menu_id = int(line["menu_id"])
+                quantity = float(line.get("quantity", 1))
+                if not math.isfinite(quantity) or quantity <= 0:
+                    raise ValueError("quantity must be positive")
+                cart[menu_id] = cart.get(menu_id, 0) + quantity
+        except (KeyError, TypeError, ValueError):
+            return Response({"error": "Each item needs an integer menu_id and a positive quantity."}, status=400)
+        
+        data = prefetch_deduction_data(supabase_anon, list(cart))
+        units_by_id = data["units_by_id"]
+        
+        # Per-serving requirements per menu and total demand for the whole cart,
+        # both in each inventory item's unit
+        per_serving = {
+            menu_id: compute_ingredient_deductions([{"menu_id": menu_id, "quantity": 1}], data)
+            for menu_id in cart
+        }
+        cart_demand = {}
+        for menu_id, quantity in cart.items():
+            for inventory_id, entry in per_serving[menu_id].items():
+                cart_demand[inventory_id] = cart_demand.get(inventory_id, 0) + entry["deduction"] * quantity
+        
+        # Ingredients pointing at inventory records that no longer exist
+        missing_by_menu = {}
+        for menu_id in cart:
+            for ingredient in data["ingredients_by_menu"].get(menu_id, []):
+                inventory_id = ingredient.get("inventory_id")
+                inventory = data["inventory_by_id"].get(inventory_id)
+                if inventory_id is not None and (not inventory or not inventory.get("items")):
+                    if inventory_id not in missing_by_menu.setdefault(menu_id, []):
+                        missing_by_menu[menu_id].append(inventory_id)
+        
+        def missing_warning(inventory_id):
+            return {
+                "inventory_id": inventory_id,
+                "inventory_name": "Unknown",
+                "available_quantity": 0,
+                "required_quantity": None,
+                "unit": "units",
+                "missing": True
+            }
+        
+        def inventory_warning(inventory_id):
+            inventory = data["inventory_by_id"][inventory_id]
+            unit = units_by_id.get(inventory["items"].get("measurement")) or {}
+            return {
+                "inventory_id": inventory_id,
+                "inventory_name": inventory["items"].get("name", "Unknown"),
+                "available_quantity": float(inventory.get("quantity") or 0),
+                "required_quantity": round(cart_demand[inventory_id], 4),
+                "unit": unit.get("symbol") or "units"
+            }
+        
+        short_inventory_ids = {
+            inventory_id for inventory_id, demand in cart_demand.items()
+            if not covers(float(data["inventory_by_id"][inventory_id].get("quantity") or 0), demand)
+        }
+        missing_inventory_ids = sorted({
+            inventory_id for inventory_ids in missing_by_menu.values() for inventory_id in inventory_ids
+        })
+        
+        menus = []
+        for menu_id, quantity in cart.items():
+            requirements = per_serving[menu_id]
+            max_sellable = None
+            for inventory_id, entry in requirements.items():
+                if entry["deduction"] <= 0:
+                    continue
+                available = float(data["inventory_by_id"][inventory_id].get("quantity") or 0)
+                other_demand = cart_demand[inventory_id] - entry["deduction"] * quantity
+                servings = max_servings(available - other_demand, entry["deduction"])
+                max_sellable = servings if max_sellable is None else min(max_sellable, servings)
+            if menu_id in missing_by_menu:
+                max_sellable = 0
+            
+            warnings = [inventory_warning(inventory_id) for inventory_id in requirements if inventory_id in short_inventory_ids]
+            warnings += [missing_warning(inventory_id) for inventory_id in missing_by_menu.get(menu_id, [])]
+            menus.append({
+                "menu_id": menu_id,
+                "requested_quantity": quantity,
+                "has_sufficient_inventory": not warnings,
+                "max_sellable_quantity": max_sellable,
+                "warnings": warnings
+            })
+        
+        return Response({
+            "has_sufficient_inventory": not short_inventory_ids and not missing_inventory_ids,
+            "warnings": [inventory_warning(inventory_id) for inventory_id in short_inventory_ids]
+                + [missing_warning(inventory_id) for inventory_id in missing_inventory_ids],
+            "menus": menus
+        })
+    
+    except Exception as e:
+        return Response({
+            "error": str(e)
+        }, status=500)
+
+def parse_report_date_range(request, default_to_current_month=True):
+    """
+    Read the `from`/`to` query parameters (YYYY-MM-DD, both inclusive).
+
+    Returns (start, end) as business dates, the current business month when
+    neither is given and `default_to_current_month` is set, or None
+    otherwise. Raises ValueError for malformed or reversed dates.
+    """
+    date_from = request.query_params.get('from')
+    date_to = request.query_params.get('to')
+    if not date_from and not date_to:
+        if not default_to_current_month:
+            return None
+        return month_range(business_today())
+    if not date_from or not date_to:
+        raise ValueError("Both 'from' and 'to' are required (YYYY-MM-DD).")
+    start = parse_business_date(date_from)
+    end = parse_business_date(date_to)
+    if end < start:
+        raise ValueError("'to' must not be before 'from'.")
+    return start, end
+
 @api_view(['GET'])
 @authentication_classes([])
 @permission_classes([AllowAny])
 def fetch_sales_data(request):
     try:
-        # First, fetch only the essential reference data that's needed across components
-        essential_data = {}
-        
-        # Parallel fetch for reference data (to optimize loading time)
-        menu_types_query = supabase_anon.table("menu_type").select("id, name, deduction_percentage")
-        menu_categories_query = supabase_anon.table("menu_category").select("id, name")
-        expenses_types_query = supabase_anon.table("expenses_type").select("id, name")
-        instore_categories_query = supabase_anon.table("instore_category").select("id, name, base_amount")
-        payment_methods_query = supabase_anon.table("payment_methods").select("id, name")
-        discounts_query = supabase_anon.table("discounts").select("id, type, percentage")
-        unit_measurements_query = supabase_anon.table("unit_of_measurement").select("id, symbol")
-        suppliers_query = supabase_anon.table("supplier").select("id, name")
-        
-        # Execute queries in parallel
-        menu_types_result = menu_types_query.execute()
-        menu_categories_result = menu_categories_query.execute()
-        expenses_types_result = expenses_types_query.execute()
-        instore_categories_result = instore_categories_query.execute()
-        payment_methods_result = payment_methods_query.execute()
-        discounts_result = discounts_query.execute()
-        unit_measurements_result = unit_measurements_query.execute()
-        suppliers_result = suppliers_query.execute()
-        
-        # Store results
-        essential_data['menu_types'] = menu_types_result.data or []
-        essential_data['menu_categories'] = menu_categories_result.data or []
-        essential_data['expenses_types'] = expenses_types_result.data or []
-        essential_data['instore_categories'] = instore_categories_result.data or []
-        essential_data['payment_methods'] = payment_methods_result.data or []
-        essential_data['discounts'] = discounts_result.data or []
-        essential_data['unit_measurements'] = unit_measurements_result.data or []
-        essential_data['suppliers'] = suppliers_result.data or []
-        
-        # Fetch menu items (needed for order details and stock-in details)
-        menus = supabase_anon.table("menu_items").select(
-            "id, name, type_id, price, image, status_id, category_id"
-        ).execute().data or []
+        # Optional from/to (YYYY-MM-DD, inclusive) limit the transactions and expenses returned
+        try:
+            date_range = parse_report_date_range(request, default_to_current_month=False)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=400)
+        
+        # Optimize transaction fetching - only get completed transactions (status = 2)
+        # Removed reference_id and receipt_image
+        transactions_query = supabase_anon.table('transaction').select("""
+            id, 
+            date,
+            payment_amount, 
+            order_status,
+            payment_method,
+            employee_id
+        """).eq('order_status', 2)
+        
+        # Optimize expense fetching with proper nested structure
+        expenses_query = supabase_anon.table('expenses').select("""
+            id,
+            date,
+            cost,
+            type_id,
+            stockin_id,
+            note
+        """)
+        if date_range:
+            transactions_query = filter_timestamp_range(transactions_query, 'date', *date_range)
+            expenses_query = filter_date_range(expenses_query, 'date', *date_range)
+        
+        # None of these reads depend on each other, so run them concurrently
+        results = run_queries({
+            # Essential reference data needed across components, served from the reference cache
+            'menu_types': lambda: get_reference_data("menu_type", "id, name, deduction_percentage"),
+            'menu_categories': lambda: get_reference_data("menu_category", "id, name"),
+            'expenses_types': lambda: get_reference_data("expenses_type", "id, name"),
+            'instore_categories': lambda: get_reference_data("instore_category", "id, name, base_amount"),
+            'payment_methods': lambda: get_reference_data("payment_methods", "id, name"),
+            'discounts': lambda: get_reference_data("discounts", "id, type, percentage"),
+            'unit_measurements': lambda: get_reference_data("unit_of_measurement", "id, symbol"),
+            'suppliers': lambda: get_reference_data("supplier", "id, name"),
+            # Menu items (needed for order details and stock-in details)
+            'menus': lambda: supabase_anon.table("menu_items").select(
+                "id, name, type_id, price, image, status_id, category_id"
+            ).execute().data or [],
+            # Items (needed for StockInExpense)
+            'items': lambda: supabase_anon.table('items').select("id, name, measurement, category").execute().data or [],
+            'gcash_references': lambda: supabase_anon.table("gcash_reference").select("id, name, attached_transaction").execute().data or [],
+            'transactions': lambda: transactions_query.execute().data or [],
+            'expenses': lambda: expenses_query.execute().data or [],
+        })
+        
+        essential_data = {
+            key: results[key]
+            for key in ('menu_types', 'menu_categories', 'expenses_types', 'instore_categories',
+                        'payment_methods', 'discounts', 'unit_measurements', 'suppliers')
+        }
+        menus = results['menus']
         
         # Format menu images only once
         formatted_menus = [
@@ -4815,31 +4012,17 @@ def fetch_sales_data(request):
                 "type_id": menu["type_id"],
                 "category_id": menu["category_id"],
                 "price": menu["price"],
-                "image": supabase_anon.storage.from_("menu-images").get_public_url(menu["image"]) if menu["image"] else None,
+                "image": menu_image_url(menu["image"]),
                 "status_id": menu["status_id"]
             }
             for menu in menus
         ]
         essential_data['menu_items'] = formatted_menus
         
-        # Fetch items (needed for StockInExpense)
-        items = supabase_anon.table('items').select("id, name, measurement, category").execute().data or []
-        essential_data['items'] = items
-        
-        # Fetch GCash references
-        gcash_references = supabase_anon.table("gcash_reference").select("id, name, attached_transaction").execute().data or []
+        essential_data['items'] = results['items']
+        gcash_references = results['gcash_references']
         essential_data['gcash_references'] = gcash_references
-        
-        # Optimize transaction fetching - only get completed transactions (status = 2)
-        # Removed reference_id and receipt_image
-        transactions = supabase_anon.table('transaction').select("""
-            id, 
-            date,
-            payment_amount, 
-            order_status,
-            payment_method,
-            employee_id
-        """).eq('order_status', 2).execute().data or []
+        transactions = results['transactions']
         
         # Only fetch order details for these transactions
         if transactions:
@@ -4856,6 +4039,14 @@ def fetch_sales_data(request):
                 unli_wings_group
             """).in_('transaction_id', transaction_ids).execute().data or []
             
+            # Index reference data by id so each detail is enriched in O(1)
+            menus_by_id = {menu['id']: menu for menu in formatted_menus}
+            discounts_by_id = {discount['id']: discount for discount in essential_data['discounts']}
+            instore_categories_by_id = {category['id']: category for category in essential_data['instore_categories']}
+            gcash_reference_by_transaction = {}
+            for ref in gcash_references:
+                gcash_reference_by_transaction.setdefault(ref['attached_transaction'], ref)
+            
             # Group order details by transaction_id to avoid multiple iterations
             order_details_by_transaction = {}
             for detail in order_details:
@@ -4866,9 +4057,9 @@ def fetch_sales_data(request):
                 # Add reference data directly to each detail
                 enhanced_detail = {
                     **detail,
-                    'menu_item': next((menu for menu in formatted_menus if menu['id'] == detail['menu_id']), None),
-                    'discount': next((discount for discount in essential_data['discounts'] if discount['id'] == detail['discount_id']), None),
-                    'instore_category': next((category for category in essential_data['instore_categories'] if category['id'] == detail['instore_category']), None)
+                    'menu_item': menus_by_id.get(detail['menu_id']),
+                    'discount': discounts_by_id.get(detail['discount_id']),
+                    'instore_category': instore_categories_by_id.get(detail['instore_category'])
                 }
                 order_details_by_transaction[transaction_id].append(enhanced_detail)
             
@@ -4879,7 +4070,7 @@ def fetch_sales_data(request):
                 transaction_details = order_details_by_transaction.get(transaction_id, [])
                 
                 # Find GCash reference for this transaction (if any)
-                gcash_reference = next((ref for ref in gcash_references if ref['attached_transaction'] == transaction_id), None)
+                gcash_reference = gcash_reference_by_transaction.get(transaction_id)
                 
                 # Add formatted transaction with its details
                 processed_transaction = {
@@ -4891,15 +4082,7 @@ def fetch_sales_data(request):
         else:
             processed_transactions = []
         
-        # Optimize expense fetching with proper nested structure
-        expenses = supabase_anon.table('expenses').select("""
-            id,
-            date,
-            cost,
-            type_id,
-            stockin_id,
-            note
-        """).execute().data or []
+        expenses = results['expenses']
         
         # Process expenses with stockin_id to include receipt details
         stockin_expenses = [exp for exp in expenses if exp.get('stockin_id')]
@@ -4909,19 +4092,15 @@ def fetch_sales_data(request):
             receipt_ids = list(set(exp['stockin_id'] for exp in stockin_expenses if exp['stockin_id']))
             
             if receipt_ids:
-                # Fetch all relevant receipts in a single query
-                receipts = supabase_anon.table('receipts').select("""
+                # Fetch the relevant receipts and their stock-in items concurrently
+                receipt_results = run_queries({
+                    'receipts': lambda: supabase_anon.table('receipts').select("""
                     id,
                     receipt_no,
                     date,
                     supplier
-                """).in_('id', receipt_ids).execute().data or []
-                
-                # Create a lookup dictionary for receipts
-                receipts_by_id = {receipt['id']: receipt for receipt in receipts}
-                
-                # Fetch all stock-in items in a single query
-                stockin_items = supabase_anon.table('stockin').select("""
+                """).in_('id', receipt_ids).execute().data or [],
+                    'stockin_items': lambda: supabase_anon.table('stockin').select("""
                     id,
                     receipt_id,
                     inventory_id,
@@ -4937,7 +4116,12 @@ def fetch_sales_data(request):
                             measurement
                         )
                     )
-                """).in_('receipt_id', receipt_ids).execute().data or []
+                """).in_('receipt_id', receipt_ids).execute().data or [],
+                })
+                
+                # Create a lookup dictionary for receipts
+                receipts_by_id = {receipt['id']: receipt for receipt in receipt_results['receipts']}
+                stockin_items = receipt_results['stockin_items']
                 
                 # Group stock-in items by receipt_id
                 stockin_by_receipt = {}
@@ -4963,11 +4147,9 @@ def fetch_sales_data(request):
                         expense['receipt'] = receipt
                 
         # Add expense types to each expense for easier access
+        expenses_types_by_id = {et['id']: et for et in essential_data['expenses_types']}
         for expense in expenses:
-            expense['expenses_type'] = next(
-                (et for et in essential_data['expenses_types'] if et['id'] == expense['type_id']), 
-                None
-            )
+            expense['expenses_type'] = expenses_types_by_id.get(expense['type_id'])
         
         # Combine all data for the response
         response_data = {
@@ -4982,6 +4164,204 @@ def fetch_sales_data(request):
         print(f"Error in fetch_sales_data: {str(e)}")
         return Response({'error': str(e)})
 
+@api_view(['GET'])
+@authentication_classes([])
+@permission_classes([AllowAny])
+def fetch_sales_report(request):
+    """
+    Pre-aggregated sales report for a period.
+
+    Query parameters:
+      - from, to: YYYY-MM-DD, inclusive (defaults to the current month)
+      - granularity: day, week or month (defaults to day)
+
+    Revenue is read from the daily sales summary and expenses from the
+    expenses table; only the aggregated series and breakdowns are returned.
+    Individual transactions and expenses are available from
+    fetch_sales_report_details.
+    """
+    try:
+        try:
+            start, end = parse_report_date_range(request)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=400)
+        
+        granularity = request.query_params.get('granularity', 'day')
+        if granularity not in REPORT_GRANULARITIES:
+            return Response({'error': f"granularity must be one of {', '.join(REPORT_GRANULARITIES)}."}, status=400)
+        
+        summary_rows = fetch_all_pages(
+            lambda: filter_date_range(
+                supabase_anon.table('daily_sales_summary')
+                    .select('id, sales_date, menu_type_id, payment_method_id, order_count, gross_sales, net_sales'),
+                'sales_date', start, end
+            )
+        )
+        expenses = fetch_all_pages(
+            lambda: filter_date_range(
+                supabase_anon.table('expenses').select('id, date, cost, type_id'),
+                'date', start, end
+            )
+        )
+        
+        report = build_sales_report(summary_rows, expenses, start, end, granularity)
+        return Response({
+            'from': start.isoformat(),
+            'to': end.isoformat(),
+            'granularity': granularity,
+            **report,
+            'menu_types': get_reference_data("menu_type", "id, name"),
+            'payment_methods': get_reference_data("payment_methods", "id, name"),
+            'expenses_types': get_reference_data("expenses_type", "id, name")
+        })
+    
+    except Exception as e:
+        return Response({'error': str(e)}, status=500)
+
+@api_view(['GET'])
+@authentication_classes([])
+@permission_classes([AllowAny])
+def export_sales(request):
+    """
+    Stream completed sales as a downloadable file, one row per priced line.
+
+    Query parameters:
+      - from, to: YYYY-MM-DD, inclusive (defaults to the current month)
+      - file_format: csv or xlsx (defaults to csv); not "format", which DRF
+        reserves for choosing a renderer
+
+    Transactions are read in keyset pages and written out as they arrive
+    (see utils/sales_export.py), so large ranges don't build the whole
+    export in memory.
+    """
+    try:
+        start, end = parse_report_date_range(request)
+    except ValueError as e:
+        return Response({'error': str(e)}, status=400)
+    
+    export_format = request.query_params.get('file_format', 'csv')
+    if export_format not in ('csv', 'xlsx'):
+        return Response({'error': "file_format must be csv or xlsx."}, status=400)
+    
+    rows = iter_export_rows(supabase_anon, start, end)
+    if export_format == 'csv':
+        response = StreamingHttpResponse(iter_csv(rows), content_type='text/csv')
+    else:
+        response = StreamingHttpResponse(
+            iter_xlsx(rows),
+            content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+        )
+    response['Content-Disposition'] = f'attachment; filename="sales_{start.isoformat()}_{end.isoformat()}.{export_format}"'
+    return response
+
+@api_view(['GET'])
+@authentication_classes([])
+@permission_classes([AllowAny])
+def fetch_sales_report_details(request):
+    """
+    Paginated drill-down behind fetch_sales_report.
+
+    Query parameters:
+      - kind: transactions (completed orders, default) or expenses
+      - from, to: YYYY-MM-DD, inclusive (defaults to the current month)
+      - page_size, cursor: keyset pagination, newest first
+    """
+    try:
+        try:
+            start, end = parse_report_date_range(request)
+            page_size = parse_page_size(request.query_params.get('page_size'))
+        except ValueError as e:
+            return Response({'error': str(e)}, status=400)
+        
+        kind = request.query_params.get('kind', 'transactions')
+        cursor = request.query_params.get('cursor')
+        
+        if kind == 'expenses':
+            expenses_query = filter_date_range(
+                supabase_anon.table('expenses').select('id, date, cost, type_id, stockin_id, note'),
+                'date', start, end
+            )
+            try:
+                page = paginate(expenses_query, 'date', page_size, cursor)
+            except ValueError as e:
+                return Response({'error': str(e)}, status=400)
+            
+            expenses_types_by_id = {et['id']: et for et in get_reference_data("expenses_type", "id, name")}
+            for expense in page['rows']:
+                expense['expenses_type'] = expenses_types_by_id.get(expense['type_id'])
+            
+            return Response({
+                'kind': kind,
+                'expenses': page['rows'],
+                'next_cursor': page['next_cursor'],
+                'has_more': page['has_more'],
+                'page_size': page_size
+            })
+        
+        if kind != 'transactions':
+            return Response({'error': "kind must be 'transactions' or 'expenses'."}, status=400)
+        
+        transactions_query = filter_timestamp_range(
+            supabase_anon.table('transaction')
+                .select('id, date, payment_amount, order_status, payment_method, employee_id')
+                .eq('order_status', 2),
+            'date', start, end
+        )
+        try:
+            page = paginate(transactions_query, 'date', page_size, cursor)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=400)
+        
+        transactions = page['rows']
+        transaction_ids = [transaction['id'] for transaction in transactions]
+        details_by_transaction = fetch_order_details(supabase_anon, transaction_ids)
+        pricing = load_sales_pricing(
+            supabase_anon,
+            [detail['menu_id'] for details in details_by_transaction.values() for detail in details],
+            menu_columns="id, name, type_id, price, category_id"
+        )
+        
+        gcash_reference_by_transaction = {}
+        if transaction_ids:
+            gcash_references = supabase_anon.table('gcash_reference') \
+                .select('id, name, attached_transaction, paid_amount') \
+                .in_('attached_transaction', transaction_ids) \
+                .execute().data or []
+            for ref in gcash_references:
+                gcash_reference_by_transaction.setdefault(ref['attached_transaction'], ref)
+        
+        discounts_by_id = {d['id']: d for d in get_reference_data("discounts", "id, type, percentage")}
+        instore_categories_by_id = {c['id']: c for c in get_reference_data("instore_category", "id, name, base_amount")}
+        
+        priced_by_transaction = price_orders(details_by_transaction, build_price_tables(pricing))
+        for transaction in transactions:
+            details = details_by_transaction.get(transaction['id'], [])
+            menu_type_id, gross_sales, total = priced_by_transaction.get(transaction['id'], (None, 0, 0))
+            transaction['menu_type_id'] = menu_type_id
+            transaction['gross_sales'] = gross_sales
+            transaction['total'] = total
+            transaction['order_details'] = [
+                {
+                    **detail,
+                    'menu_item': pricing['menu_items'].get(detail['menu_id']),
+                    'discount': discounts_by_id.get(detail['discount_id']),
+                    'instore_category': instore_categories_by_id.get(detail['instore_category'])
+                }
+                for detail in details
+            ]
+            transaction['gcash_reference'] = gcash_reference_by_transaction.get(transaction['id'])
+        
+        return Response({
+            'kind': kind,
+            'transactions': transactions,
+            'next_cursor': page['next_cursor'],
+            'has_more': page['has_more'],
+            'page_size': page_size
+        })
+    
+    except Exception as e:
+        return Response({'error': str(e)}, status=500)
+
 @api_view(['POST'])
 @authentication_classes([SupabaseAuthentication])
 @permission_classes([SupabaseIsAdmin])
@@ -5004,6 +4384,7 @@ def add_expense_type(request):
         insert_response = supabase_client.table('expenses_type').insert({
             'name': name
         }).execute()
+        invalidate_reference_data("expenses_type")
 
         if insert_response.data:
             return Response({
@@ -5047,6 +4428,7 @@ def edit_expense_type(request, expense_type_id):
         update_response = supabase_client.table('expenses_type').update({
             'name': new_name
         }).eq('id', expense_type_id).execute()
+        invalidate_reference_data("expenses_type")
 
         if not update_response.data:
             return Response({
@@ -5082,6 +4464,7 @@ def delete_expense_type(request, expense_type_id):
             }, status=404)
         
         delete_response = supabase_client.table('expenses_type').delete().eq('id', expense_type_id).execute()
+        invalidate_reference_data("expenses_type")
         if not delete_response.data:
             return Response({
                 "error": "Failed to delete expense type"
@@ -5230,14 +4613,11 @@ def delete_expense(request, expense_id):
 @permission_classes([AllowAny])
 def fetch_dashboard_data(request):
     try:
-        # Get date parameter from request, default to today
-        date_filter = request.GET.get('date', None)
-        
-        # If no date provided, use today (preserving exact variable names to avoid bugs)
-        if not date_filter:
-            today = datetime.now().strftime('%Y-%m-%d')
-        else:
-            today = date_filter
+        # Get date parameter from request, default to today's business date
+        try:
+            filtered_day = parse_business_date(request.GET.get('date', None))
+        except ValueError as e:
+            return Response({'error': str(e)}, status=400)
         
         # Initialize response data structure
         dashboard_data = {
@@ -5265,51 +4645,10 @@ def fetch_dashboard_data(request):
         }
         
         # Use the filtered date from the request parameter instead of resetting to today
-        filtered_date = today
-        
-        # OPTIMIZATION: Get only completed transactions directly
-        completed_transactions = supabase_anon.table('transaction').select('*').eq('order_status', 2).execute().data or []
-        
-        # Count total orders
-        dashboard_data['orders']['total'] = len(completed_transactions)
-        
-        # Prepare filtered transactions list - more efficient than filtering in every step
-        filtered_transactions = [t for t in completed_transactions if t.get('date') and t['date'].startswith(filtered_date)]
-        dashboard_data['orders']['today'] = len(filtered_transactions)
-        
-        # OPTIMIZATION: Only fetch necessary fields for order details
-        order_details = supabase_anon.table('order_details').select(
-            'transaction_id,menu_id,quantity,instore_category,discount_id,unli_wings_group'
-        ).execute().data or []
-        
-        # Create lookup dict for order details by transaction_id
-        order_details_by_transaction = {}
-        for detail in order_details:
-            transaction_id = detail.get('transaction_id')
-            if transaction_id:
-                if transaction_id not in order_details_by_transaction:
-                    order_details_by_transaction[transaction_id] = []
-                order_details_by_transaction[transaction_id].append(detail)
+        filtered_date = filtered_day.isoformat()
         
-        # OPTIMIZATION: Fetch only needed fields for reference tables
-        menu_items = supabase_anon.table('menu_items').select('id,price,type_id').execute().data or []
-        menu_items_dict = {item['id']: item for item in menu_items}
-        
-        menu_types = supabase_anon.table('menu_type').select('id,deduction_percentage').execute().data or []
-        menu_types_dict = {type_data['id']: type_data for type_data in menu_types}
-        
-        discounts = supabase_anon.table('discounts').select('id,percentage').execute().data or []
-        discounts_dict = {discount['id']: discount for discount in discounts}
-        
-        instore_categories = supabase_anon.table('instore_category').select('id,base_amount').execute().data or []
-        instore_categories_dict = {cat['id']: cat for cat in instore_categories}
-        
-        # Calculate total sales from completed transactions
-        total_sales = 0
-        filtered_date_sales = 0
-        
-        # Get current month and year for comparison
-        current_date = datetime.now()
+        # Get current month and year (in business time) for comparison
+        current_date = business_today()
         current_month = current_date.month
         current_year = current_date.year
         
@@ -5321,114 +4660,60 @@ def fetch_dashboard_data(request):
             previous_month = current_month - 1
             previous_year = current_year
         
-        # OPTIMIZATION: Process transactions more efficiently but preserve original logic
-        for transaction in completed_transactions:
-            # Get transaction details
-            transaction_id = transaction.get('id')
-            transaction_date = transaction.get('date')
-            
-            if not transaction_id or not transaction_date:
-                continue
-                
-            details = order_details_by_transaction.get(transaction_id, [])
-            if not details:
-                continue
-            
-            # Calculate transaction total using similar logic to the frontend
-            transaction_total = 0
-            type_id = None
-            
-            # Determine order type - preserve original logic exactly
-            for detail in details:
-                menu_id = detail.get('menu_id')
-                if menu_id and menu_id in menu_items_dict:
-                    type_id = menu_items_dict[menu_id].get('type_id')
-                    break
-            
-            # CRITICAL: Keep exact logic pattern for sales computation to avoid issues
-            if type_id == 1:  # In-store
-                # Separate unli wings and ala carte
-                unli_wings_orders = [d for d in details if d.get('instore_category') == 2]
-                ala_carte_orders = [d for d in details if d.get('instore_category') != 2]
-                
-                # Unique unli wings groups
-                unli_wings_groups = set(d.get('unli_wings_group') for d in unli_wings_orders if d.get('unli_wings_group'))
-                unli_wings_base = instore_categories_dict.get(2, {}).get('base_amount', 0)
-                unli_wings_total = len(unli_wings_groups) * unli_wings_base
-                
-                # Ala carte totals with discounts
-                ala_carte_total = 0
-                for detail in ala_carte_orders:
-                    quantity = detail.get('quantity', 0)
-                    menu_id = detail.get('menu_id')
-                    discount_id = detail.get('discount_id')
-                    
-                    if menu_id and menu_id in menu_items_dict:
-                        price = menu_items_dict[menu_id].get('price', 0)
-                        discount_percentage = discounts_dict.get(discount_id, {}).get('percentage', 0) if discount_id else 0
-                        ala_carte_total += quantity * price * (1 - discount_percentage)
-                
-                transaction_total = ala_carte_total + unli_wings_total
-            else:  # Delivery orders
-                subtotal = 0
-                for detail in details:
-                    quantity = detail.get('quantity', 0)
-                    menu_id = detail.get('menu_id')
-                    
-                    if menu_id and menu_id in menu_items_dict:
-                        price = menu_items_dict[menu_id].get('price', 0)
-                        subtotal += quantity * price
-                
-                # Apply delivery app deduction
-                deduction_percentage = menu_types_dict.get(type_id, {}).get('deduction_percentage', 0) if type_id else 0
-                transaction_total = subtotal * (1 - deduction_percentage)
-            
-            # Add to total sales
-            total_sales += transaction_total
+        # Every read below is independent, so run them concurrently
+        window_start = f"{previous_year:04d}-{previous_month:02d}-01"
+        results = run_queries({
+            # All-time totals come from the daily sales summary (see utils/sales_summary.py)
+            'totals': lambda: supabase_anon.table('daily_sales_totals').select('order_count,net_sales').execute().data or [],
+            # Only the summary rows for the chart window and the filtered date are needed
+            'summary_rows': lambda: supabase_anon.table('daily_sales_summary').select(
+                'sales_date,order_count,net_sales'
+            ).or_(f"sales_date.gte.{window_start},sales_date.eq.{filtered_date}").execute().data or [],
+            # OPTIMIZATION: Fetch only needed expenses fields
+            'expenses': lambda: supabase_anon.table('expenses').select('cost').execute().data or [],
+            'expenses_today': lambda: filter_date_range(
+                supabase_anon.table('expenses').select('cost'), 'date', filtered_day, filtered_day
+            ).execute().data or [],
+            'unit_measurements': lambda: get_reference_data("unit_of_measurement", "id,symbol"),
+            'items': lambda: supabase_anon.table('items').select('id,name,stock_trigger,measurement').execute().data or [],
+            'inventory': lambda: supabase_anon.table('inventory').select('id,quantity,item').execute().data or [],
+            'receipts': lambda: supabase_anon.table('receipts').select('id,receipt_no,date,supplier').order('id', desc=True).limit(5).execute().data or [],
+            'disposals': lambda: supabase_anon.table('disposed_inventory').select('*').order('id', desc=True).limit(5).execute().data or [],
+            'reasons': lambda: get_reference_data("reason_of_disposal", "id,name"),
+        })
+        
+        totals = results['totals']
+        if totals:
+            dashboard_data['orders']['total'] = int(totals[0].get('order_count') or 0)
+            dashboard_data['sales']['total'] = float(totals[0].get('net_sales') or 0)
+        
+        for row in results['summary_rows']:
+            sales_date = datetime.strptime(row['sales_date'], '%Y-%m-%d')
+            net_sales = float(row.get('net_sales') or 0)
             
-            # Check if it's filtered date transaction
-            if transaction_date.startswith(filtered_date):
-                filtered_date_sales += transaction_total
+            if row['sales_date'] == filtered_date:
+                dashboard_data['orders']['today'] += row.get('order_count') or 0
+                dashboard_data['sales']['today'] += net_sales
             
             # Record for monthly sales chart - DAILY data for current and previous month
-            try:
-                transaction_date_obj = datetime.fromisoformat(transaction_date.replace('Z', '+00:00'))
-                trans_year = transaction_date_obj.year
-                trans_month = transaction_date_obj.month
-                trans_day = transaction_date_obj.day - 1  # Zero-indexed for array
-                
-                # OPTIMIZATION: Avoid nested conditionals when possible
-                if 0 <= trans_day < 31:  # Ensure it fits in our array
-                    if trans_year == current_year and trans_month == current_month:
-                        dashboard_data['sales_by_month']['current_month'][trans_day] += transaction_total
-                    elif trans_year == previous_year and trans_month == previous_month:
-                        dashboard_data['sales_by_month']['previous_month'][trans_day] += transaction_total
-            except (ValueError, TypeError):
-                pass
-        
-        # Update sales data
-        dashboard_data['sales']['total'] = total_sales
-        dashboard_data['sales']['today'] = filtered_date_sales
-        
-        # OPTIMIZATION: Fetch only needed expenses fields
-        all_expenses = supabase_anon.table('expenses').select('cost,date').execute().data or []
+            trans_day = sales_date.day - 1  # Zero-indexed for array
+            if sales_date.year == current_year and sales_date.month == current_month:
+                dashboard_data['sales_by_month']['current_month'][trans_day] += net_sales
+            elif sales_date.year == previous_year and sales_date.month == previous_month:
+                dashboard_data['sales_by_month']['previous_month'][trans_day] += net_sales
+        
+        all_expenses = results['expenses']
         
         # OPTIMIZATION: Calculate expenses more efficiently
         dashboard_data['expenses']['total'] = sum(expense.get('cost', 0) for expense in all_expenses)
-        dashboard_data['expenses']['today'] = sum(
-            expense.get('cost', 0) 
-            for expense in all_expenses 
-            if expense.get('date') and expense['date'].startswith(filtered_date)
-        )
+        dashboard_data['expenses']['today'] = sum(expense.get('cost', 0) for expense in results['expenses_today'])
 
         # OPTIMIZATION: Get inventory-related data in a more optimized way
-        unit_measurements = supabase_anon.table('unit_of_measurement').select('id,symbol').execute().data or []
-        unit_measurements_dict = {unit['id']: unit for unit in unit_measurements}
+        unit_measurements_dict = {unit['id']: unit for unit in results['unit_measurements']}
 
-        items = supabase_anon.table('items').select('id,name,stock_trigger,measurement').execute().data or []
-        items_dict = {item['id']: item for item in items}
+        items_dict = {item['id']: item for item in results['items']}
         
-        inventory = supabase_anon.table('inventory').select('id,quantity,item').execute().data or []
+        inventory = results['inventory']
         inventory_dict = {inv['id']: inv for inv in inventory}
         
         # Find low stock items (less than stock trigger) - with early continues for efficiency
@@ -5455,7 +4740,7 @@ def fetch_dashboard_data(request):
                 })
         
         # OPTIMIZATION: Batch fetch related data for recent stock activities
-        receipts = supabase_anon.table('receipts').select('id,receipt_no,date,supplier').order('id', desc=True).limit(5).execute().data or []
+        receipts = results['receipts']
         
         # Process stock-in records more efficiently
         receipt_ids = [receipt.get('id') for receipt in receipts if receipt.get('id')]
@@ -5536,12 +4821,11 @@ def fetch_dashboard_data(request):
                             })
         
         # OPTIMIZATION: More efficient handling of disposal records
-        disposals = supabase_anon.table('disposed_inventory').select('*').order('id', desc=True).limit(5).execute().data or []
+        disposals = results['disposals']
         
         if disposals:
-            # Fetch disposal reasons with only needed fields
-            reasons = supabase_anon.table('reason_of_disposal').select('id,name').execute().data or []
-            reasons_dict = {reason['id']: reason for reason in reasons}
+            # Disposal reasons with only needed fields
+            reasons_dict = {reason['id']: reason for reason in results['reasons']}
             
             # Process disposals with efficient lookups
             for disposal in disposals:
@@ -5582,3 +4866,23 @@ def fetch_dashboard_data(request):
     except Exception as e:
         print(traceback.format_exc())
         return Response({'error': str(e)}, status=500)
+
+
+@api_view(['GET'])
+@authentication_classes([])
+@permission_classes([AllowAny])
+def metrics(request):
+    """
+    Request and Supabase call metrics of this process in the Prometheus text
+    format (see utils/metrics.py). The scraper must send settings.METRICS_TOKEN
+    as a Bearer token; without a configured token the endpoint only exists
+    while DEBUG is on.
+    """
+    token = getattr(settings, "METRICS_TOKEN", None)
+    if not token:
+        if not settings.DEBUG:
+            return Response({'error': 'Not found.'}, status=404)
+    elif not hmac.compare_digest(request.headers.get("Authorization", "").encode(), f"Bearer {token}".encode()):
+        return Response({'error': 'Unauthorized.'}, status=401)
+    return HttpResponse(metrics_registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
@@ -15,6 +15,7 @@ from datetime import timedelta
 from dotenv import load_dotenv
 import os
 import logging
+import tempfile
 
 load_dotenv() #load an environment variable file to have credentials in the database
 
@@ -51,6 +52,68 @@ SIMPLE_JWT = {
     #"REFRESH_TOKEN_LIFETIME": timedelta(days=1),
 }
 
+# Seconds a verified Supabase token's auth context (employee id and roles) is
+# cached. Entries never outlive the token's own expiry.
+SUPABASE_AUTH_CACHE_TTL = 300
+
+# Seconds the {auth user id: email} directory used by the staff pages is
+# cached (api/utils/auth_users.py). Writes through the employee views
+# invalidate it immediately.
+SUPABASE_AUTH_USERS_CACHE_TTL = 300
+
+# Verified staff sessions for POS terminals (api/utils/staff_sessions.py):
+# idle seconds before a session lapses (extended on every use) and the
+# maximum lifetime of a session since its passcode check.
+STAFF_SESSION_TTL = 900
+STAFF_SESSION_MAX_AGE = 12 * 3600
+
+# Per-table overrides (in seconds) for the reference data cache, e.g.
+# {"discounts": 60}. Defaults live in api/utils/reference_cache.py.
+REFERENCE_CACHE_TTLS = {}
+
+# Concurrency cap and overall timeout (in seconds) for the independent
+# Supabase reads a single request runs in parallel (api/utils/query_batch.py).
+QUERY_BATCH_MAX_WORKERS = 6
+QUERY_BATCH_TIMEOUT = 15
+
+# Longest wait (in seconds) of a /menu-availability/changes/ long-poll. Each
+# open POS tab parks one worker thread for up to this long and then polls
+# again, so on a synchronous deployment the worker pool needs a thread per
+# open tab on top of the threads serving other requests (e.g. gunicorn
+# --worker-class gthread --threads 8 for a handful of terminals). Keep it
+# short; a change is still delivered within one poll interval.
+MENU_AVAILABILITY_MAX_WAIT = 5
+
+# Bearer token the Prometheus scraper must send to /metrics (see
+# api/utils/metrics.py). While it is unset, /metrics answers 404 unless
+# DEBUG is on.
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN")
+
+# The cache holds state every worker process must agree on: table versions
+# behind the ETags (api/utils/table_versions.py), staff sessions and their
+# revocations, cached auth contexts, the auth user directory and reference
+# data. It is therefore shared: a file cache on the host by default, which
+# every gunicorn worker on the machine sees, or Redis when REDIS_URL is set
+# (needed once the backend runs on more than one host; requires the redis
+# package). A per-process LocMemCache would let other workers answer 304
+# with stale data after a write.
+if os.environ.get("REDIS_URL"):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ["REDIS_URL"],
+            'KEY_PREFIX': 'wingman',
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.environ.get("CACHE_DIR", os.path.join(tempfile.gettempdir(), "wingman-cache")),
+            'OPTIONS': {'MAX_ENTRIES': 20000},
+        }
+    }
+
 # Application definition
 
 INSTALLED_APPS = [
@@ -67,6 +130,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api.middleware.SupabaseMetricsMiddleware',  # Outermost, so it times the whole request
     'corsheaders.middleware.CorsMiddleware',  # Must be above CommonMiddleware
     'django.middleware.common.CommonMiddleware',
     'django.middleware.security.SecurityMiddleware',
@@ -167,4 +231,17 @@ STATIC_URL = 'static/'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
-# logging.basicConfig(level=logging.DEBUG)
\ No newline at end of file
+# logging.basicConfig(level=logging.DEBUG)
+
+# One structured JSON line per request with its Supabase call counts, timings
+# and payload sizes (api/middleware.py)
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "console": {"class": "logging.StreamHandler"},
+    },
+    "loggers": {
+        "api.metrics": {"handlers": ["console"], "level": "INFO", "propagate": False},
+    },
+}
\ No newline at end of file
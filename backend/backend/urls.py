@@ -11,6 +11,7 @@ urlpatterns = [
     path('fetch-attendance-data/', views.fetch_attendance_data, name='fetch_attendance_data'),
     path('time-in/', views.time_in, name='time_in'),
     path('time-out/', views.time_out, name='time_out'),
+    path('staff-session/revoke/', views.revoke_staff_session_view, name='revoke_staff_session'),
     path('fetch-items-page-data/', views.fetch_items_page_data, name='fetch_items_page_data'),
     path('fetch-inventory-page-data/', views.fetch_inventory_page_data, name='fetch_inventory_page_data'),
     path('fetch-stockin-page-data/', views.fetch_stockin_page_data, name='fetch_stockin_page_data'),
@@ -40,6 +41,7 @@ urlpatterns = [
     path('edit-menu-category/<int:category_id>/', views.edit_menu_category, name='edit_menu_category'),
     path('delete-menu-category/<int:category_id>/', views.delete_menu_category, name='delete_menu_category'),
     path('fetch-order-data/', views.fetch_order_data, name='fetch_order_data'),
+    path('fetch-order-reference-data/', views.fetch_order_reference_data, name='fetch_order_reference_data'),
     path('fetch-order-data/<int:transactionId>/', views.fetch_order_data, name='fetch_transaction_data'),
     path('fetch-inventory-order-data/', views.fetch_inventory_order_data, name='fetch_inventory_order_data'),
     path('add-discount/', views.add_discount, name='add_discount'),
@@ -51,8 +53,14 @@ urlpatterns = [
     path('edit-order/<int:transaction_id>/', views.edit_order, name='edit_order'),
     path('update-order-status/<int:transaction_id>/', views.update_order_status, name='update_order_status'),
     path('update-menu-availability/', views.update_menu_availability, name='update_menu_availability'),
+    path('menu-availability/changes/', views.menu_availability_changes, name='menu_availability_changes'),
     path('check-menu-inventory/<int:menu_id>', views.check_menu_inventory, name='check_menu_inventory'),
+    path('check-cart-inventory/', views.check_cart_inventory, name='check_cart_inventory'),
     path('fetch-sales-data/', views.fetch_sales_data, name='fetch_sales_data'),
+    path('sales-report/', views.fetch_sales_report, name='fetch_sales_report'),
+    path('sales-report/details/', views.fetch_sales_report_details, name='fetch_sales_report_details'),
+    path('export-sales/', views.export_sales, name='export_sales'),
+    path('metrics/', views.metrics, name='metrics'),
     path('add-expense-type/', views.add_expense_type, name='add_expense_type'),
     path('edit-expense-type/<int:expense_type_id>/', views.edit_expense_type, name='edit_expense_type'),
     path('delete-expense-type/<int:expense_type_id>/', views.delete_expense_type, name='delete_expense_type'),
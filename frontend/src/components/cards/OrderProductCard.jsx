@@ -64,7 +64,7 @@ const OrderProductCard = ({
       {/* Left Column: Image */}
       <div className="w-20 h-20 flex-shrink-0 rounded-sm overflow-hidden">
         <img
-          src={item.image || "/placeholder.svg"}
+          src={item.thumbnail || item.image || "/placeholder.svg"}
           alt={item.name}
           className="w-full h-full object-cover"
         />
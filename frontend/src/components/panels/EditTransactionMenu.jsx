@@ -95,7 +95,7 @@ const EditTransactionMenu = ({
             >
               {/* Image occupies left side with no extra padding */}
               <img
-                src={item.image || "/placeholder.svg"}
+                src={item.thumbnail || item.image || "/placeholder.svg"}
                 alt={item.name}
                 className="w-16 h-16 object-cover"
               />
@@ -208,14 +208,22 @@ const OrderSummary = ({
     let warningMessages = [];
 
     try {
-      // Check each item's inventory
-      for (const [menuId, quantity] of Object.entries(itemQuantityMap)) {
-        const response = await axios.get(
-          `http://127.0.0.1:8000/check-menu-inventory/${menuId}?quantity=${quantity}`
-        );
+      // Check the whole cart in one request so shared ingredients are summed
+      const response = await axios.post(
+        "http://127.0.0.1:8000/check-cart-inventory/",
+        {
+          items: Object.entries(itemQuantityMap).map(([menuId, quantity]) => ({
+            menu_id: Number(menuId),
+            quantity,
+          })),
+        }
+      );
+
+      for (const menuResult of response.data.menus || []) {
+        const menuId = menuResult.menu_id.toString();
 
-        if (response.data.has_sufficient_inventory === false) {
-          const warnings = response.data.warnings || [];
+        if (menuResult.has_sufficient_inventory === false) {
+          const warnings = menuResult.warnings || [];
 
           if (warnings.length > 0) {
             // Find the menu item name
@@ -226,7 +234,9 @@ const OrderSummary = ({
             // Add to warning messages
             warnings.forEach((w) => {
               warningMessages.push(
-                `${itemName}: ${w.inventory_name} - ${w.available_quantity} ${w.unit} available, ${w.required_quantity} ${w.unit} needed`
+                w.missing
+                  ? `${itemName}: an ingredient's inventory record no longer exists`
+                  : `${itemName}: ${w.inventory_name} - ${w.available_quantity} ${w.unit} available, ${w.required_quantity} ${w.unit} needed`
               );
             });
 
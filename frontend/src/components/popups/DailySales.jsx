@@ -86,8 +86,15 @@ const DailySales = ({
   const fetchSalesDataFromApi = async () => {
     setLoading(true);
     try {
+      // Only load the transactions and expenses of the displayed day
+      const day = new Date(displayDate);
+      const isoDay = `${day.getFullYear()}-${String(day.getMonth() + 1).padStart(
+        2,
+        "0"
+      )}-${String(day.getDate()).padStart(2, "0")}`;
       const response = await axios.get(
-        `http://127.0.0.1:8000/fetch-sales-data/`
+        `http://127.0.0.1:8000/fetch-sales-data/`,
+        { params: { from: isoDay, to: isoDay } }
       );
 
       if (response.data.error) {
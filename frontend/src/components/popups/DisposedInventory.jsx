@@ -1,6 +1,12 @@
 import React, { useState, useEffect } from "react";
 import axios from "axios";
 import EmployeeVerification from "./EmployeeVerification";
+import {
+  hasStaffSession,
+  withStaffSession,
+  rememberStaffSession,
+  isStaffSessionExpired,
+} from "../utils/staffSession";
 
 const DisposedInventory = ({
   isOpen,
@@ -187,6 +193,9 @@ const DisposedInventory = ({
     if (isAdmin) {
       // Admin can dispose items directly without verification
       processDisposal();
+    } else if (hasStaffSession(selectedDisposer)) {
+      // The disposer already verified on this terminal; the server checks the session
+      processDisposal();
     } else {
       // For non-admin, open verification modal
       setIsVerificationModalOpen(true);
@@ -206,8 +215,8 @@ const DisposedInventory = ({
   const processDisposal = async (email, passcode) => {
     setIsDisposing(true);
 
-    // Setup payload
-    const payload = {
+    // Setup payload (non-admin disposals carry this terminal's staff session, if any)
+    const disposalPayload = {
       inventory_id: selectedInventory.id,
       disposed_quantity: disposalQuantity,
       disposed_unit: selectedDisposalUnit,
@@ -215,6 +224,9 @@ const DisposedInventory = ({
       other_reason: selectedReason === "4" ? otherReason : "",
       disposer: selectedDisposer,
     };
+    const payload = isAdmin
+      ? disposalPayload
+      : withStaffSession(disposalPayload, selectedDisposer);
 
     // Add verification credentials if provided
     if (email && passcode) {
@@ -234,11 +246,18 @@ const DisposedInventory = ({
         payload
       );
 
+      rememberStaffSession(selectedDisposer, response.data);
       alert("Item disposed successfully.");
       closeModal();
       refreshInventory();
     } catch (error) {
       console.error("Error disposing item:", error);
+      if (isStaffSessionExpired(error, selectedDisposer)) {
+        alert(
+          "Your session on this terminal has expired. Please dispose the item again and enter your passcode."
+        );
+        return;
+      }
       // Extract the error message from the response if available
       const errorMessage =
         error.response?.data?.error ||
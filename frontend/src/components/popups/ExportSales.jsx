@@ -6,7 +6,7 @@ import LoadingScreen from "./LoadingScreen";
 import * as XLSX from "xlsx-js-style";
 import { useModal } from "../utils/modalUtils";
 
-const ExportSales = ({ isOpen, onClose, selectedDate, salesData }) => {
+const ExportSales = ({ isOpen, onClose, selectedDate }) => {
   const [fileName, setFileName] = useState("");
   const [fileType, setFileType] = useState("pdf");
   const [includeDaily, setIncludeDaily] = useState(true);
@@ -24,20 +24,41 @@ const ExportSales = ({ isOpen, onClose, selectedDate, salesData }) => {
     setFileName(`Sales_Report_${month}_${year}`);
   }, [month, year]);
 
-  // Fetch month data if needed
+  // Date range covered by the export: from the first day of the earliest
+  // included month to the last day of the selected month (YYYY-MM-DD)
+  const getExportRange = () => {
+    const pad = (value) => String(value).padStart(2, "0");
+    const first = new Date(
+      selectedDate.getFullYear(),
+      selectedDate.getMonth() - (monthsToInclude - 1),
+      1
+    );
+    const last = new Date(
+      selectedDate.getFullYear(),
+      selectedDate.getMonth() + 1,
+      0
+    );
+    return {
+      from: `${first.getFullYear()}-${pad(first.getMonth() + 1)}-01`,
+      to: `${last.getFullYear()}-${pad(last.getMonth() + 1)}-${pad(
+        last.getDate()
+      )}`,
+    };
+  };
+
+  // Fetch the daily report for the months being exported
   useEffect(() => {
-    if (isOpen && !salesData) {
+    if (isOpen) {
       fetchMonthlyData();
-    } else if (salesData) {
-      setMonthData(salesData);
     }
-  }, [isOpen, salesData]);
+  }, [isOpen, selectedDate, monthsToInclude]);
 
   const fetchMonthlyData = async () => {
     setLoading(true);
     try {
+      const { from, to } = getExportRange();
       const response = await axios.get(
-        `http://127.0.0.1:8000/fetch-sales-data/`
+        `http://127.0.0.1:8000/sales-report/?from=${from}&to=${to}&granularity=day`
       );
       if (response.data.error) {
         setError(response.data.error);
@@ -101,97 +122,25 @@ const ExportSales = ({ isOpen, onClose, selectedDate, salesData }) => {
   };
 
   const processMonthData = (year, month) => {
-    const calculateTransactionTotal = (transaction) => {
-      if (
-        !transaction.order_details ||
-        !Array.isArray(transaction.order_details)
-      ) {
-        return 0;
-      }
-
-      const menuTypeId = transaction.order_details?.[0]?.menu_item?.type_id;
-      const menuTypeData = monthData.menu_types?.find(
-        (type) => type.id === menuTypeId
-      );
-      const menuType = menuTypeData ? menuTypeData.name : "Unknown";
-      const isDelivery = menuType === "Grab" || menuType === "FoodPanda";
-
-      const unliWingsGroups = new Set();
-
-      let subtotal = 0;
-      let totalDiscounts = 0;
-
-      transaction.order_details.forEach((detail) => {
-        const isUnliWings = detail.instore_category?.name === "Unli Wings";
-        const unliWingsGroup = detail.unli_wings_group;
-
-        if (isUnliWings && unliWingsGroup !== undefined) {
-          if (unliWingsGroups.has(unliWingsGroup)) {
-            return;
-          }
-
-          const baseAmount = parseFloat(
-            detail.instore_category.base_amount || 0
-          );
-          subtotal += baseAmount;
-          unliWingsGroups.add(unliWingsGroup);
-        } else {
-          const price = parseFloat(detail.menu_item?.price || 0);
-          const quantity = parseInt(detail.quantity || 0);
-          const itemTotal = price * quantity;
-          subtotal += itemTotal;
-
-          if (detail.discount?.percentage) {
-            const discountAmount =
-              itemTotal * parseFloat(detail.discount.percentage);
-            totalDiscounts += discountAmount;
-          }
-        }
-      });
-
-      const percentageDeduction =
-        isDelivery && menuTypeData?.deduction_percentage
-          ? subtotal * parseFloat(menuTypeData.deduction_percentage)
-          : 0;
-
-      const total = subtotal - totalDiscounts - percentageDeduction;
-      return total;
-    };
-
-    const monthTransactions = (monthData.transactions || []).filter(
-      (transaction) => {
-        const transactionDate = new Date(transaction.date);
-        return (
-          transactionDate.getFullYear() === year &&
-          transactionDate.getMonth() === month &&
-          transaction.order_status === 2
-        );
-      }
-    );
-
-    const monthExpenses = (monthData.expenses || []).filter((expense) => {
-      const expenseDate = new Date(expense.date);
-      return (
-        expenseDate.getFullYear() === year && expenseDate.getMonth() === month
-      );
-    });
-
+    // Daily buckets come pre-priced from the sales report; keep only days
+    // with activity, like the transaction-based export did
     const dailyTotals = {};
 
-    monthTransactions.forEach((transaction) => {
-      const dateStr = new Date(transaction.date).toLocaleDateString();
-      if (!dailyTotals[dateStr]) {
-        dailyTotals[dateStr] = { date: dateStr, sales: 0, expenses: 0 };
-      }
-      dailyTotals[dateStr].sales += calculateTransactionTotal(transaction);
-    });
-
-    monthExpenses.forEach((expense) => {
-      const dateStr = new Date(expense.date).toLocaleDateString();
-      if (!dailyTotals[dateStr]) {
-        dailyTotals[dateStr] = { date: dateStr, sales: 0, expenses: 0 };
+    (monthData.series || []).forEach((bucket) => {
+      const bucketDate = new Date(`${bucket.period_start}T00:00:00`);
+      if (
+        bucketDate.getFullYear() !== year ||
+        bucketDate.getMonth() !== month ||
+        (bucket.order_count === 0 && bucket.expenses === 0)
+      ) {
+        return;
       }
-      dailyTotals[dateStr].expenses += parseFloat(expense.cost || 0);
+      const dateStr = bucketDate.toLocaleDateString();
+      dailyTotals[dateStr] = {
+        date: dateStr,
+        sales: bucket.revenue,
+        expenses: bucket.expenses,
+      };
     });
 
     // Format data showing all transactions and expenses
@@ -607,12 +556,29 @@ const ExportSales = ({ isOpen, onClose, selectedDate, salesData }) => {
     XLSX.writeFile(wb, `${fileName || "SalesReport"}.xlsx`);
   };
 
+  // Transaction-level exports are streamed by the server straight to disk
+  const downloadTransactions = (format) => {
+    const { from, to } = getExportRange();
+    const link = document.createElement("a");
+    link.href = `http://127.0.0.1:8000/export-sales/?from=${from}&to=${to}&file_format=${format}`;
+    link.download = `${fileName || "SalesTransactions"}.${format}`;
+    document.body.appendChild(link);
+    link.click();
+    document.body.removeChild(link);
+  };
+
   const handleExport = async () => {
     if (!fileName.trim()) {
       await alert("Please enter a file name", "Error");
       return;
     }
 
+    if (fileType === "transactions-csv" || fileType === "transactions-xlsx") {
+      downloadTransactions(fileType === "transactions-csv" ? "csv" : "xlsx");
+      onClose();
+      return;
+    }
+
     const processedData = processMultiMonthData();
 
     if (processedData.monthlyData.length === 0) {
@@ -723,6 +689,8 @@ const ExportSales = ({ isOpen, onClose, selectedDate, salesData }) => {
               <option value="pdf">PDF</option>
               <option value="csv">CSV</option>
               <option value="excel">Excel</option>
+              <option value="transactions-csv">Transactions (CSV)</option>
+              <option value="transactions-xlsx">Transactions (Excel)</option>
             </select>
           </div>
           <div className="mb-4">
@@ -4,6 +4,11 @@ import EditTransactionMenu from "../panels/EditTransactionMenu";
 import EditTransactionOrderSummary from "../panels/EditTransactionOrderSummary";
 import { FaChevronUp, FaChevronDown, FaArrowLeft } from "react-icons/fa";
 import { useModal } from "../utils/modalUtils";
+import { useMenuAvailabilityUpdates } from "../utils/menuAvailability";
+import {
+  rememberStaffSession,
+  isStaffSessionExpired,
+} from "../utils/staffSession";
 
 const OrderEditModal = ({
   isOpen,
@@ -37,9 +42,9 @@ const OrderEditModal = ({
   const [activeUnliWingsGroup, setActiveUnliWingsGroup] = useState(null);
 
   // Add state for tracking availability update
-  const [isUpdatingAvailability, setIsUpdatingAvailability] = useState(false);
   const [availabilityMessage, setAvailabilityMessage] = useState("");
-  const [isInitialDataFetched, setIsInitialDataFetched] = useState(false);
+  // Menu statuses pushed by the server since menuItems was loaded
+  const [menuStatusOverrides, setMenuStatusOverrides] = useState({});
   const [isLoading, setIsLoading] = useState(false);
   const [inventoryWarnings, setInventoryWarnings] = useState({});
 
@@ -48,14 +53,22 @@ const OrderEditModal = ({
   const [pendingUnliGroupNumber, setPendingUnliGroupNumber] = useState(null);
 
   // Filter menu items based on the current menu type and selected category.
-  const filteredMenuItems = menuItems.filter((item) => {
-    const matchesType = menuTypeData ? item.type_id === menuTypeData.id : true;
-    const matchesCategory =
-      selectedMenuCategory && selectedMenuCategory.id !== 0
-        ? item.category_id === selectedMenuCategory.id
+  const filteredMenuItems = menuItems
+    .map((item) =>
+      menuStatusOverrides[item.id] === undefined
+        ? item
+        : { ...item, status_id: menuStatusOverrides[item.id] }
+    )
+    .filter((item) => {
+      const matchesType = menuTypeData
+        ? item.type_id === menuTypeData.id
         : true;
-    return matchesType && matchesCategory;
-  });
+      const matchesCategory =
+        selectedMenuCategory && selectedMenuCategory.id !== 0
+          ? item.category_id === selectedMenuCategory.id
+          : true;
+      return matchesType && matchesCategory;
+    });
 
   const { alert, confirm } = useModal();
 
@@ -394,14 +407,22 @@ const OrderEditModal = ({
     let warningMessages = [];
 
     try {
-      // Check each item's inventory
-      for (const [menuId, quantity] of Object.entries(itemQuantityMap)) {
-        const response = await axios.get(
-          `http://127.0.0.1:8000/check-menu-inventory/${menuId}?quantity=${quantity}`
-        );
+      // Check the whole cart in one request so shared ingredients are summed
+      const response = await axios.post(
+        "http://127.0.0.1:8000/check-cart-inventory/",
+        {
+          items: Object.entries(itemQuantityMap).map(([menuId, quantity]) => ({
+            menu_id: Number(menuId),
+            quantity,
+          })),
+        }
+      );
 
-        if (response.data.has_sufficient_inventory === false) {
-          const warnings = response.data.warnings || [];
+      for (const menuResult of response.data.menus || []) {
+        const menuId = menuResult.menu_id.toString();
+
+        if (menuResult.has_sufficient_inventory === false) {
+          const warnings = menuResult.warnings || [];
 
           if (warnings.length > 0) {
             // Find the menu item name
@@ -413,7 +434,9 @@ const OrderEditModal = ({
             // Add to warning messages
             warnings.forEach((w) => {
               warningMessages.push(
-                `${itemName}: ${w.inventory_name} - ${w.available_quantity} ${w.unit} available, ${w.required_quantity} ${w.unit} needed`
+                w.missing
+                  ? `${itemName}: an ingredient's inventory record no longer exists`
+                  : `${itemName}: ${w.inventory_name} - ${w.available_quantity} ${w.unit} available, ${w.required_quantity} ${w.unit} needed`
               );
             });
 
@@ -501,6 +524,7 @@ const OrderEditModal = ({
         { headers: { "Content-Type": "application/json" } }
       );
       if (response.status === 200) {
+        rememberStaffSession(payload.employee_id, response.data);
         // Refresh order data before calling onUpdateComplete
         await fetchOrderData();
         onUpdateComplete(response.data);
@@ -515,6 +539,13 @@ const OrderEditModal = ({
         "Error updating order:",
         error.response ? error.response.data : error.message
       );
+      if (isStaffSessionExpired(error, transaction.employee.id)) {
+        await alert(
+          "Your session on this terminal has expired. Please save the order again and enter your passcode.",
+          "Verification Required"
+        );
+        return;
+      }
       await alert(
         `Error updating order: ${
           error.response?.data?.message || error.message
@@ -569,73 +600,28 @@ const OrderEditModal = ({
       ? newSubtotal * deductionPercentage
       : 0;
 
-  // Function to update menu availability
-  const updateMenuAvailability = async () => {
-    try {
-      setIsLoading(true); // Set loading state to true
-      setIsUpdatingAvailability(true);
-      setAvailabilityMessage("Checking menu availability...");
-
-      const token = localStorage.getItem("access_token");
-      const response = await axios.post(
-        "http://127.0.0.1:8000/update-menu-availability/",
-        {},
-        {
-          headers: {
-            Authorization: `Bearer ${token}`,
-          },
-        }
+  // Keep menu statuses current while the modal is open; the server
+  // recomputes them whenever inventory changes
+  useMenuAvailabilityUpdates((menus) => {
+    const statusById = Object.fromEntries(
+      menus.map((menu) => [menu.id, menu.status_id])
+    );
+    const updatedCount = menuItems.filter(
+      (item) =>
+        statusById[item.id] !== undefined &&
+        statusById[item.id] !==
+          (menuStatusOverrides[item.id] ?? item.status_id)
+    ).length;
+    setMenuStatusOverrides(statusById);
+    if (updatedCount > 0) {
+      setAvailabilityMessage(
+        `Updated availability for ${updatedCount} menu items`
       );
-
-      // Update UI with results
-      const updatedCount = response.data.updated_items?.length || 0;
-      if (updatedCount > 0) {
-        setAvailabilityMessage(
-          `Updated availability for ${updatedCount} menu items, Loading order items now...`
-        );
-        // Refresh menu items using the independent fetchOrderData
-        await fetchOrderData();
-      } else {
-        setAvailabilityMessage("All menu items are up to date");
-      }
-    } catch (error) {
-      console.error("Error updating menu availability:", error);
-      setAvailabilityMessage("Failed to update menu availability");
-    } finally {
-      setIsLoading(false); // Set loading state to false
-      setIsUpdatingAvailability(false);
-
-      // Auto-hide message after 3 seconds
       setTimeout(() => {
         setAvailabilityMessage("");
       }, 3000);
     }
-  };
-
-  // Modify useEffect to handle initial data loading and menu availability update
-  useEffect(() => {
-    setIsInitialDataFetched(true);
-  }, []);
-
-  // Update availability when data is loaded
-  useEffect(() => {
-    let intervalId;
-
-    if (isInitialDataFetched) {
-      // Call the function immediately when the component mounts
-      updateMenuAvailability();
-
-      // Set up the interval to call the function every 10 minutes
-      intervalId = setInterval(updateMenuAvailability, 10 * 60 * 1000);
-    }
-
-    // Cleanup function to clear the interval when the component unmounts
-    return () => {
-      if (intervalId) {
-        clearInterval(intervalId);
-      }
-    };
-  }, [isInitialDataFetched]);
+  });
 
   return (
     <div className="fixed inset-0 flex items-center justify-center bg-black bg-opacity-50 z-50 overflow-y-auto">
@@ -2,6 +2,7 @@ import { useState, useEffect } from "react";
 import { FaMoneyBill, FaCreditCard } from "react-icons/fa6";
 import { useModal } from "../utils/modalUtils";
 import EmployeeVerification from "./EmployeeVerification";
+import { hasStaffSession, withStaffSession } from "../utils/staffSession";
 import axios from "axios";
 import LoadingScreen from "./LoadingScreen";
 import { createPortal } from "react-dom";
@@ -179,6 +180,9 @@ const OrderEditPayment = ({
           // Turn off portal loading when done
           setShowPortalLoading(false);
         });
+    } else if (hasStaffSession(transaction.employee.id)) {
+      // The cashier already verified on this terminal; the server checks the session
+      handleVerificationSuccess(null, null);
     } else {
       // Open verification modal for non-admin users
       setIsVerificationModalOpen(true);
@@ -199,16 +203,18 @@ const OrderEditPayment = ({
         ? (Number.parseFloat(cashReceived) || 0) - change
         : extraPaymentRequired;
 
-    // Create the payload
-    const payload = {
-      employee_id: transaction.employee.id,
-      payment_method: selectedPaymentMethod.id,
-      payment_amount: transaction.payment_amount + newPaymentAmount,
-      reference_id: gcashReferenceNo || transaction.reference_id,
-      additional_payment: extraPaymentRequired,
-      email: email,
-      passcode: passcode,
-    };
+    // Create the payload, with this terminal's staff session if the cashier has one
+    const payload = withStaffSession(
+      {
+        employee_id: transaction.employee.id,
+        payment_method: selectedPaymentMethod.id,
+        payment_amount: transaction.payment_amount + newPaymentAmount,
+        reference_id: gcashReferenceNo || transaction.reference_id,
+        additional_payment: extraPaymentRequired,
+        ...(email && passcode ? { email: email, passcode: passcode } : {}),
+      },
+      transaction.employee.id
+    );
 
     console.log("Submitting payment with payload:", payload);
 
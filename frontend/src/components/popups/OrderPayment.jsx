@@ -3,6 +3,7 @@ import { FaMoneyBill, FaCreditCard } from "react-icons/fa6";
 import { useModal } from "../utils/modalUtils";
 import axios from "axios";
 import EmployeeVerification from "./EmployeeVerification";
+import { hasStaffSession } from "../utils/staffSession";
 
 const OrderPayment = ({
   isOpen,
@@ -278,6 +279,9 @@ const OrderPayment = ({
         );
       }
       onClose();
+    } else if (hasStaffSession(selectedEmployee.id)) {
+      // The cashier already verified on this terminal; the server checks the session
+      handleVerificationSuccess(null, null);
     } else {
       setIsVerificationModalOpen(true);
     }
@@ -2,6 +2,7 @@ import React, { useState, useEffect } from "react";
 import axios from "axios";
 import { FaEye, FaEyeSlash } from "react-icons/fa";
 import { useModal } from "../utils/modalUtils";
+import { getTerminalId, rememberStaffSession } from "../utils/staffSession";
 
 const TimeIn = ({
   closeModal,
@@ -71,11 +72,13 @@ const TimeIn = ({
         employee_id: selectedEmployeeId,
         email: email,
         passcode: code,
+        terminal_id: getTerminalId(),
       });
 
       setIsVerifying(false);
 
       if (response.data.success) {
+        rememberStaffSession(selectedEmployeeId, response.data);
         await alert("Time in successful.", "Success");
 
         // First refresh data
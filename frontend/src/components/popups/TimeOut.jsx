@@ -2,6 +2,7 @@ import React, { useState, useEffect } from "react";
 import axios from "axios";
 import { FaEye, FaEyeSlash } from "react-icons/fa";
 import { useModal } from "../utils/modalUtils";
+import { withStaffSession, clearStaffSession } from "../utils/staffSession";
 
 const TimeOut = ({
   closeModal,
@@ -72,15 +73,23 @@ const TimeOut = ({
     setIsVerifying(true);
 
     try {
-      const response = await axios.post("http://127.0.0.1:8000/time-out/", {
-        employee_id: selectedEmployeeId,
-        email: email,
-        passcode: code,
-      });
+      const response = await axios.post(
+        "http://127.0.0.1:8000/time-out/",
+        withStaffSession(
+          {
+            employee_id: selectedEmployeeId,
+            email: email,
+            passcode: code,
+          },
+          selectedEmployeeId
+        )
+      );
 
       setIsVerifying(false);
 
       if (response.data.success) {
+        // The server ends the employee's sessions on time out
+        clearStaffSession(selectedEmployeeId);
         await alert("Time out successful.", "Success");
 
         // First refresh data
@@ -0,0 +1,54 @@
+import { useEffect, useRef } from "react";
+import axios from "axios";
+
+const CHANGES_URL = "http://127.0.0.1:8000/menu-availability/changes/";
+const LONG_POLL_TIMEOUT = 5; // seconds the server may hold each request (capped by MENU_AVAILABILITY_MAX_WAIT)
+const RETRY_DELAY = 5000; // ms to wait after a failed request
+
+// Subscribe to menu availability changes. The server recomputes statuses
+// whenever inventory changes and bumps a version; this hook long-polls
+// /menu-availability/changes/ with the last version it saw and calls
+// onChange([{ id, status_id }, ...]) with every menu's current status
+// whenever that version moves (including once on mount).
+export const useMenuAvailabilityUpdates = (onChange, enabled = true) => {
+  const onChangeRef = useRef(onChange);
+  onChangeRef.current = onChange;
+
+  useEffect(() => {
+    if (!enabled) return undefined;
+
+    let cancelled = false;
+    const controller = new AbortController();
+
+    const listen = async () => {
+      let version = null;
+      while (!cancelled) {
+        try {
+          const params =
+            version === null
+              ? {}
+              : { since: version, timeout: LONG_POLL_TIMEOUT };
+          const response = await axios.get(CHANGES_URL, {
+            params,
+            signal: controller.signal,
+          });
+          version = response.data.version;
+          if (response.data.changed) {
+            onChangeRef.current(response.data.menus || []);
+          }
+        } catch (error) {
+          if (cancelled) return;
+          console.error("Error waiting for menu availability changes:", error);
+          await new Promise((resolve) => setTimeout(resolve, RETRY_DELAY));
+        }
+      }
+    };
+
+    listen();
+
+    return () => {
+      cancelled = true;
+      controller.abort();
+    };
+  }, [enabled]);
+};
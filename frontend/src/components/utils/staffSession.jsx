@@ -0,0 +1,71 @@
+// Verified staff sessions for this POS terminal. After a cashier's email and
+// passcode are checked once (time in, or the first order/disposal), the
+// server returns a short-lived session token bound to this terminal and that
+// employee. Later POS requests send the token instead of asking for the
+// passcode again; the server extends it on every use and rejects it with
+// code "staff_session_expired" once it lapses or is revoked.
+
+const TERMINAL_ID_KEY = "pos_terminal_id";
+const SESSIONS_KEY = "staff_sessions";
+
+const generateTerminalId = () =>
+  window.crypto?.randomUUID
+    ? window.crypto.randomUUID()
+    : `${Date.now().toString(36)}-${Math.random().toString(36).slice(2)}`;
+
+// Stable id of this browser/terminal
+export const getTerminalId = () => {
+  let terminalId = localStorage.getItem(TERMINAL_ID_KEY);
+  if (!terminalId) {
+    terminalId = generateTerminalId();
+    localStorage.setItem(TERMINAL_ID_KEY, terminalId);
+  }
+  return terminalId;
+};
+
+const readSessions = () => {
+  try {
+    return JSON.parse(sessionStorage.getItem(SESSIONS_KEY)) || {};
+  } catch {
+    return {};
+  }
+};
+
+const writeSessions = (sessions) => {
+  sessionStorage.setItem(SESSIONS_KEY, JSON.stringify(sessions));
+};
+
+export const getStaffSession = (employeeId) =>
+  employeeId ? readSessions()[employeeId] || null : null;
+
+export const hasStaffSession = (employeeId) => !!getStaffSession(employeeId);
+
+export const clearStaffSession = (employeeId) => {
+  const sessions = readSessions();
+  delete sessions[employeeId];
+  writeSessions(sessions);
+};
+
+// Remember the session returned in a POS response, if the server issued one
+export const rememberStaffSession = (employeeId, responseData) => {
+  const session = responseData?.staff_session;
+  if (!employeeId || !session?.token) return;
+  writeSessions({ ...readSessions(), [employeeId]: session.token });
+};
+
+// Add the terminal id and the employee's session (if any) to a POS payload
+export const withStaffSession = (payload, employeeId) => {
+  const token = getStaffSession(employeeId);
+  return {
+    ...payload,
+    terminal_id: getTerminalId(),
+    ...(token ? { staff_session: token } : {}),
+  };
+};
+
+// Drop the stored session when the server says it is no longer valid
+export const isStaffSessionExpired = (error, employeeId) => {
+  if (error?.response?.data?.code !== "staff_session_expired") return false;
+  clearStaffSession(employeeId);
+  return true;
+};
@@ -381,7 +381,7 @@ const Menu = () => {
             <div key={item.id} className="min-w-[200px]">
               <ItemBox
                 item={item}
-                image={item.image || "/placeholder.svg"}
+                image={item.thumbnail || item.image || "/placeholder.svg"}
                 name={item.name}
                 price={item.price}
                 currency="₱"
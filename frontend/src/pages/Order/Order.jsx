@@ -7,6 +7,12 @@ import OrderSummary from "../../components/panels/OrderSummary";
 import LoadingScreen from "../../components/popups/LoadingScreen";
 import { useNavigate } from "react-router-dom";
 import { useModal } from "../../components/utils/modalUtils";
+import { useMenuAvailabilityUpdates } from "../../components/utils/menuAvailability";
+import {
+  withStaffSession,
+  rememberStaffSession,
+  isStaffSessionExpired,
+} from "../../components/utils/staffSession";
 
 const Order = () => {
   const navigate = useNavigate();
@@ -34,7 +40,6 @@ const Order = () => {
   const [employees, setEmployees] = useState([]); // New state for employees
 
   // Add new state variables for availability tracking
-  const [isUpdatingAvailability, setIsUpdatingAvailability] = useState(false);
   const [availabilityMessage, setAvailabilityMessage] = useState("");
   const [isInitialDataFetched, setIsInitialDataFetched] = useState(false);
   const [searchQuery, setSearchQuery] = useState("");
@@ -43,16 +48,12 @@ const Order = () => {
   const [lowInventoryWarnings, setLowInventoryWarnings] = useState({});
   const { alert, confirm } = useModal();
 
-  // Add to state variables at the top
-  const [isCheckingMenuAvailability, setIsCheckingMenuAvailability] =
-    useState(false);
-
   const fetchMenuOrders = async () => {
     setLoading(true);
     try {
       // First fetch the initial data
       const response = await axios.get(
-        "http://127.0.0.1:8000/fetch-order-data/"
+        "http://127.0.0.1:8000/fetch-order-reference-data/"
       );
       setMenuItems(response.data.menu_items || []);
       setMenuTypes(response.data.menu_types || []);
@@ -63,89 +64,11 @@ const Order = () => {
       setInStoreCategories(response.data.instore_categories || []);
       setEmployees(response.data.employees || []);
 
-      // Then update menu availability
-      setAvailabilityMessage("Checking menu availability...");
-      const token = localStorage.getItem("access_token");
-      const availabilityResponse = await axios.post(
-        "http://127.0.0.1:8000/update-menu-availability/",
-        {},
-        {
-          headers: {
-            Authorization: `Bearer ${token}`,
-          },
-        }
-      );
-
-      // Update UI with results
-      const updatedCount = availabilityResponse.data.updated_items.length;
-      if (updatedCount > 0) {
-        setAvailabilityMessage(
-          `Updated availability for ${updatedCount} menu items`
-        );
-
-        // Re-fetch menu items if any updates occurred
-        const refreshResponse = await axios.get(
-          "http://127.0.0.1:8000/fetch-order-data/"
-        );
-        setMenuItems(refreshResponse.data.menu_items || []);
-      } else {
-        setAvailabilityMessage("All menu items are up to date");
-      }
-
       setIsInitialDataFetched(true);
     } catch (error) {
       console.log("Error fetching menu data: ", error);
-      setAvailabilityMessage("Failed to update menu availability");
     } finally {
       setLoading(false);
-
-      // Auto-hide message after 3 seconds
-      setTimeout(() => {
-        setAvailabilityMessage("");
-      }, 3000);
-    }
-  };
-
-  // Function to update menu availability
-  const updateMenuAvailability = async () => {
-    try {
-      setIsUpdatingAvailability(true);
-      setIsCheckingMenuAvailability(true); // Add gray overlay
-      setAvailabilityMessage("Checking menu availability...");
-
-      const token = localStorage.getItem("access_token");
-      const response = await axios.post(
-        "http://127.0.0.1:8000/update-menu-availability/",
-        {},
-        {
-          headers: {
-            Authorization: `Bearer ${token}`,
-          },
-        }
-      );
-
-      // Update UI with results
-      const updatedCount = response.data.updated_items.length;
-      if (updatedCount > 0) {
-        setAvailabilityMessage(
-          `Updated availability for ${updatedCount} menu items`
-        );
-        // Refresh menu items if any updates occurred
-        fetchMenuOrders();
-      } else {
-        setAvailabilityMessage("All menu items are up to date");
-      }
-    } catch (error) {
-      console.error("Error updating menu availability:", error);
-      setAvailabilityMessage("Failed to update menu availability");
-    } finally {
-      setIsUpdatingAvailability(false);
-      setIsCheckingMenuAvailability(false); // Remove gray overlay
-
-      // Auto-hide message after 3 seconds
-      setTimeout(() => {
-        setAvailabilityMessage("");
-      }, 3000);
     }
   };
 
@@ -154,25 +77,33 @@ const Order = () => {
     fetchMenuOrders();
   }, []);
 
-  // Modify the useEffect for menu availability updates
-  // Remove the initial check since it's now done during fetchMenuOrders
-  useEffect(() => {
-    let intervalId;
-
-    // Only start the interval after initial data is fetched
-    if (isInitialDataFetched) {
-      // Set up interval to check availability every 10 minutes
-      intervalId = setInterval(updateMenuAvailability, 10 * 60 * 1000);
-      // No need to run initial check here anymore
-    }
-
-    // Clean up interval on component unmount
-    return () => {
-      if (intervalId) {
-        clearInterval(intervalId);
-      }
-    };
-  }, [isInitialDataFetched]);
+  // Menu statuses are recomputed by the server whenever inventory changes;
+  // apply the pushed statuses once the menu list has been loaded
+  useMenuAvailabilityUpdates((menus) => {
+    const statusById = Object.fromEntries(
+      menus.map((menu) => [menu.id, menu.status_id])
+    );
+    const updatedCount = menuItems.filter(
+      (item) =>
+        statusById[item.id] !== undefined &&
+        statusById[item.id] !== item.status_id
+    ).length;
+    if (updatedCount === 0) return;
+
+    setMenuItems((prev) =>
+      prev.map((item) =>
+        statusById[item.id] === undefined
+          ? item
+          : { ...item, status_id: statusById[item.id] }
+      )
+    );
+    setAvailabilityMessage(
+      `Updated availability for ${updatedCount} menu items`
+    );
+    setTimeout(() => {
+      setAvailabilityMessage("");
+    }, 3000);
+  }, isInitialDataFetched);
 
   // Set default selected menu type to "In‑Store" immediately
   useEffect(() => {
@@ -558,7 +489,8 @@ const Order = () => {
     // Check if this is an admin order (no employee verification needed)
     const isAdmin = localStorage.getItem("role") === "Admin";
 
-    const payload = {
+    // Non-admin orders carry this terminal's staff session, if the cashier has one
+    const orderPayload = {
       employee_id: employeeId,
       payment_method: paymentMethod,
       payment_amount: Number(cashReceived) || 0,
@@ -566,6 +498,9 @@ const Order = () => {
       receipt_image: gcashReferenceImage,
       order_details: orderDetails,
     };
+    const payload = isAdmin
+      ? orderPayload
+      : withStaffSession(orderPayload, employeeId);
 
     // Only include verification fields if they exist (for non-admin users)
     if (employeeEmail && employeePasscode) {
@@ -588,6 +523,7 @@ const Order = () => {
         }
       );
       console.log("Order placed successfully:", response.data);
+      rememberStaffSession(employeeId, response.data);
 
       // Clear selected items after placing the order
       setSelectedItems([]);
@@ -601,6 +537,12 @@ const Order = () => {
       );
       // Make sure to set loading to false in case of error
       setLoading(false);
+      if (isStaffSessionExpired(error, employeeId)) {
+        await alert(
+          "Your session on this terminal has expired. Please place the order again and enter your passcode.",
+          "Verification Required"
+        );
+      }
     }
   };
 
@@ -679,18 +621,6 @@ const Order = () => {
       {/* Loading screen when submitting an order */}
       {loading && <LoadingScreen message="Processing your order" />}
 
-      {/* Disabled overlay for menu availability check */}
-      {isCheckingMenuAvailability && (
-        <div className="absolute inset-0 bg-gray-500 bg-opacity-50 z-10 flex items-center justify-center">
-          <div className="bg-white p-6 rounded-sm shadow-md flex flex-col items-center">
-            <div className="animate-spin rounded-full h-12 w-12 border-b-2 border-[#CC5500] mb-3"></div>
-            <p className="text-gray-700 font-medium text-center">
-              Checking menu availability...
-            </p>
-          </div>
-        </div>
-      )}
-
       {/* Main Content */}
       <div className="flex-grow p-6 flex flex-col">
         {/* Fixed Header: Search Bar and Filters */}
@@ -811,7 +741,7 @@ const Order = () => {
               <ItemBox
                 key={item.id}
                 item={item}
-                image={item.image || "/placeholder.svg"}
+                image={item.thumbnail || item.image || "/placeholder.svg"}
                 name={item.name}
                 price={item.price}
                 currency="₱"
@@ -19,6 +19,7 @@ const OrderTable = () => {
   const [showPopup, setShowPopup] = useState(false);
   const [orderData, setOrderData] = useState(null);
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [error, setError] = useState(null);
   const [selectedFilters, setSelectedFilters] = useState([]);
   const [statusFilters, setStatusFilters] = useState(["All"]);
@@ -69,15 +70,36 @@ const OrderTable = () => {
     });
   };
 
+  // Build the query params for one page of transactions. Status filters are
+  // applied by the server so older matching orders are reachable by paging.
+  const buildTransactionParams = (referenceData, cursor = null) => {
+    const params = {};
+    if (!statusFilters.includes("All")) {
+      const statusIds = (referenceData?.order_status_types || [])
+        .filter((status) => statusFilters.includes(status.name))
+        .map((status) => status.id);
+      if (statusIds.length) params.status = statusIds.join(",");
+    }
+    if (cursor) params.cursor = cursor;
+    return params;
+  };
+
   const fetchOrderData = async () => {
     setLoading(true);
     console.log("Fetching order data..."); // Debug log
     try {
-      const response = await axios.get(
-        "http://127.0.0.1:8000/fetch-order-data/"
+      const referenceResponse = await axios.get(
+        "http://127.0.0.1:8000/fetch-order-reference-data/"
+      );
+      const transactionsResponse = await axios.get(
+        "http://127.0.0.1:8000/fetch-order-data/",
+        { params: buildTransactionParams(referenceResponse.data) }
       );
-      console.log("Order data fetched successfully:", response.data); // Debug log
-      setOrderData(response.data);
+      console.log("Order data fetched successfully:", transactionsResponse.data); // Debug log
+      setOrderData({
+        ...referenceResponse.data,
+        ...transactionsResponse.data,
+      });
     } catch (err) {
       console.error("Error fetching order data:", err); // Debug log
       setError(err.message || "Error fetching data");
@@ -86,16 +108,38 @@ const OrderTable = () => {
     }
   };
 
+  // Append the next page of transactions
+  const loadMoreTransactions = async () => {
+    if (!orderData?.next_cursor) return;
+    setLoadingMore(true);
+    try {
+      const response = await axios.get(
+        "http://127.0.0.1:8000/fetch-order-data/",
+        { params: buildTransactionParams(orderData, orderData.next_cursor) }
+      );
+      setOrderData((prev) => ({
+        ...prev,
+        transactions: [...prev.transactions, ...response.data.transactions],
+        gcash_references: [
+          ...(prev.gcash_references || []),
+          ...(response.data.gcash_references || []),
+        ],
+        next_cursor: response.data.next_cursor,
+        has_more: response.data.has_more,
+      }));
+    } catch (err) {
+      console.error("Error fetching more orders:", err);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   useEffect(() => {
     const role = localStorage.getItem("role");
     setIsAdmin(role === "Admin");
     console.log("Location state:", location.state);
-    if (location.state?.refresh) {
-      fetchOrderData();
-    } else {
-      fetchOrderData();
-    }
-  }, [location.state]);
+    fetchOrderData();
+  }, [location.state, statusFilters]);
 
   useEffect(() => {
     const handleClickOutside = (event) => {
@@ -528,6 +572,17 @@ const OrderTable = () => {
           maxHeight="500px"
           sortableColumns={[0, 1]}
         />
+        {orderData?.has_more && (
+          <div className="flex justify-center mt-3">
+            <button
+              onClick={loadMoreTransactions}
+              disabled={loadingMore}
+              className="px-4 py-2 bg-white border border-gray-300 rounded-md shadow-sm hover:bg-gray-200 text-[#CC5500] disabled:opacity-50"
+            >
+              {loadingMore ? "Loading..." : "Load more orders"}
+            </button>
+          </div>
+        )}
       </div>
 
       <OrderEssentials
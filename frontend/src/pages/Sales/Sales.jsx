@@ -66,10 +66,26 @@ const Sales = () => {
     }
 
     try {
+      // Daily revenue/expense series for the selected month, aggregated on the server
+      const selectedYear = month.getFullYear();
+      const selectedMonth = month.getMonth();
+      const toIsoDate = (date) =>
+        `${date.getFullYear()}-${String(date.getMonth() + 1).padStart(
+          2,
+          "0"
+        )}-${String(date.getDate()).padStart(2, "0")}`;
+
       const response = await axios.get(
-        `http://127.0.0.1:8000/fetch-sales-data/`
+        `http://127.0.0.1:8000/sales-report/`,
+        {
+          params: {
+            from: toIsoDate(new Date(selectedYear, selectedMonth, 1)),
+            to: toIsoDate(new Date(selectedYear, selectedMonth + 1, 0)),
+            granularity: "day",
+          },
+        }
       );
-      console.log("Sales data fetched:", response.data);
+      console.log("Sales report fetched:", response.data);
 
       if (response.data.error) {
         setError(response.data.error);
@@ -78,171 +94,30 @@ const Sales = () => {
         return;
       }
 
-      // Store all data
-      setSalesData(response.data);
-
-      // Helper function to calculate transaction total (same as DailySales.jsx)
-      const calculateTransactionTotal = (transaction) => {
-        if (
-          !transaction.order_details ||
-          !Array.isArray(transaction.order_details)
-        ) {
-          console.error("Invalid order_details:", transaction.order_details);
-          return 0;
-        }
-
-        // Debug: Log the full transaction object
-        console.log("Full transaction:", transaction);
-
-        // Get menu type (for delivery deductions)
-        const menuTypeId = transaction.order_details?.[0]?.menu_item?.type_id;
-        const menuTypeData = response.data.menu_types?.find(
-          (type) => type.id === menuTypeId
-        );
-        const menuType = menuTypeData ? menuTypeData.name : "Unknown";
-        const isDelivery = menuType === "Grab" || menuType === "FoodPanda";
-
-        // Debug: Log menu type and deduction percentage
-        console.log("Menu Type:", menuType);
-        console.log("Menu Type Data:", menuTypeData);
-        console.log(
-          "Deduction Percentage:",
-          menuTypeData?.deduction_percentage
-        );
-
-        // Track Unli Wings groups to avoid duplicate base_amount additions
-        const unliWingsGroups = new Set();
-
-        // Calculate subtotal and discounts from order details
-        let subtotal = 0;
-        let totalDiscounts = 0;
-
-        transaction.order_details.forEach((detail) => {
-          // Check if this is an Unli Wings order
-          const isUnliWings = detail.instore_category?.name === "Unli Wings";
-          const unliWingsGroup = detail.unli_wings_group;
-
-          if (isUnliWings && unliWingsGroup !== undefined) {
-            // Skip if this group has already been processed
-            if (unliWingsGroups.has(unliWingsGroup)) {
-              console.log(
-                `Skipping duplicate Unli Wings group ${unliWingsGroup}`
-              );
-              return;
-            }
-
-            // Add the base_amount for this Unli Wings group
-            const baseAmount = parseFloat(
-              detail.instore_category.base_amount || 0
-            );
-            subtotal += baseAmount;
-            unliWingsGroups.add(unliWingsGroup);
-            console.log(
-              `Unli Wings group ${unliWingsGroup} added: ₱${baseAmount.toFixed(
-                2
-              )}`
-            );
-          } else {
-            // Regular item: calculate based on menu item price and quantity
-            const price = parseFloat(detail.menu_item?.price || 0);
-            const quantity = parseInt(detail.quantity || 0);
-            const itemTotal = price * quantity;
-            subtotal += itemTotal;
-
-            // Apply discount per order detail (if exists)
-            if (detail.discount?.percentage) {
-              const discountAmount =
-                itemTotal * parseFloat(detail.discount.percentage);
-              totalDiscounts += discountAmount;
-              console.log(
-                `Discount applied: ${detail.discount.type} (${
-                  detail.discount.percentage * 100
-                }%) = ₱${discountAmount.toFixed(2)}`
-              );
-            }
-          }
+      // Keep the reference data the expense modals need
+      setSalesData({ expenses_types: response.data.expenses_types || [] });
+
+      // Only show days that had sales or expenses
+      const displayData = (response.data.series || [])
+        .filter((day) => day.order_count > 0 || day.expenses > 0)
+        .map((day) => {
+          const [year, monthIndex, dayOfMonth] = day.period_start
+            .split("-")
+            .map(Number);
+          return {
+            date: new Date(year, monthIndex - 1, dayOfMonth).toLocaleDateString(),
+            sales: day.revenue,
+            expenses: day.expenses,
+            netIncome: day.margin,
+          };
         });
 
-        // Debug: Log calculations
-        console.log("Subtotal:", subtotal);
-        console.log("Total Discounts:", totalDiscounts);
-
-        // Apply delivery platform deduction (if applicable)
-        const percentageDeduction =
-          isDelivery && menuTypeData?.deduction_percentage
-            ? subtotal * parseFloat(menuTypeData.deduction_percentage)
-            : 0;
-        console.log("Platform Deduction:", percentageDeduction);
-
-        // Final total: subtotal - discounts - platform deduction
-        const total = subtotal - totalDiscounts - percentageDeduction;
-        console.log("Final Total:", total);
-
-        return total;
-      };
-
-      // Process transactions for the current month
-      const selectedYear = month.getFullYear();
-      const selectedMonth = month.getMonth();
-
-      const monthTransactions = (response.data.transactions || []).filter(
-        (transaction) => {
-          const transactionDate = new Date(transaction.date);
-          return (
-            transactionDate.getFullYear() === selectedYear &&
-            transactionDate.getMonth() === selectedMonth &&
-            transaction.order_status === 2
-          );
-        }
-      );
-
-      // Process expenses
-      const monthExpenses = (response.data.expenses || []).filter((expense) => {
-        const expenseDate = new Date(expense.date);
-        return (
-          expenseDate.getFullYear() === selectedYear &&
-          expenseDate.getMonth() === selectedMonth
-        );
-      });
-
-      // Calculate daily totals
-      const dailyTotals = {};
-
-      // Process transactions (using the same logic as DailySales.jsx)
-      monthTransactions.forEach((transaction) => {
-        const dateStr = new Date(transaction.date).toLocaleDateString();
-        if (!dailyTotals[dateStr]) {
-          dailyTotals[dateStr] = { date: dateStr, sales: 0, expenses: 0 };
-        }
-        dailyTotals[dateStr].sales += calculateTransactionTotal(transaction);
-      });
-
-      // Process expenses
-      monthExpenses.forEach((expense) => {
-        const dateStr = new Date(expense.date).toLocaleDateString();
-        if (!dailyTotals[dateStr]) {
-          dailyTotals[dateStr] = { date: dateStr, sales: 0, expenses: 0 };
-        }
-        dailyTotals[dateStr].expenses += parseFloat(expense.cost || 0);
-      });
-
-      // Format data showing all transactions and expenses
-      const displayData = Object.values(dailyTotals).map((day) => ({
-        date: day.date,
-        sales: day.sales,
-        expenses: day.expenses,
-        netIncome: day.sales - day.expenses,
-      }));
-
       // Calculate totals
-      const totalValues = displayData.reduce(
-        (totals, row) => ({
-          sales: totals.sales + row.sales,
-          expenses: totals.expenses + row.expenses,
-          netIncome: totals.netIncome + row.netIncome,
-        }),
-        { sales: 0, expenses: 0, netIncome: 0 }
-      );
+      const totalValues = {
+        sales: response.data.totals?.revenue || 0,
+        expenses: response.data.totals?.expenses || 0,
+        netIncome: response.data.totals?.margin || 0,
+      };
 
       const formattedData = [
         ...displayData,
@@ -832,7 +707,6 @@ const Sales = () => {
         isOpen={isModalOpen}
         onClose={() => setIsModalOpen(false)}
         selectedDate={selectedDate}
-        salesData={salesData}
       />
       {isExpenseTypeModalOpen && (
         <ExpensesType
@@ -846,7 +720,6 @@ const Sales = () => {
         isOpen={isDailySalesOpen}
         onClose={() => setIsDailySalesOpen(false)}
         selectedDate={selectedDateForDailySales}
-        salesData={salesData}
         fetchSalesData={fetchSalesData}
       />
     </div>